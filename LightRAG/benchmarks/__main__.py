@@ -0,0 +1,54 @@
+import argparse
+import logging
+import os
+import time
+
+from .runner import BenchmarkConfig, DEFAULT_SCALES, TARGETS, run_benchmarks
+
+# Results land next to the other generated outputs, one file per run
+default_output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tmp", "benchmarks")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m LightRAG.benchmarks",
+        description="Benchmark every storage and retriever on synthetic corpora (offline, CPU only).",
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES), help="Corpus sizes in chunks")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), help="Targets to run (default: all)")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries per case")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--timeout", type=float, default=BenchmarkConfig.case_timeout_seconds,
+                        help="Seconds before a case is killed (0 waits indefinitely)")
+    parser.add_argument("--repeat-fraction", type=float, default=BenchmarkConfig.repeat_fraction,
+                        help="Share of timed queries that repeat an earlier one")
+    parser.add_argument("--no-isolate", action="store_true", help="Run all cases in this process (peak RSS is then shared)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON results path (default: LightRAG/tmp/benchmarks/<timestamp>.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = BenchmarkConfig(
+        scales=args.scales,
+        targets=args.targets,
+        embedding_dim=args.dim,
+        num_queries=args.queries,
+        top_k=args.top_k,
+        isolate=not args.no_isolate,
+        repeat_fraction=args.repeat_fraction,
+        case_timeout_seconds=args.timeout or None,
+        seed=args.seed,
+    )
+    output = args.output or os.path.join(default_output_dir, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    report = run_benchmarks(config, output_path=output)
+
+    print(f"\n{'target':<34}{'scale':>10}{'status':>9}{'ingest/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MiB':>10}")
+    for result in report["results"]:
+        latency = result["query_latency_ms"]
+        print(f"{result['target']:<34}{result['scale']:>10}{result['status']:>9}"
+              f"{result['ingest_chunks_per_second'] or 0:>12.0f}{latency.get('p50', 0):>10.3f}"
+              f"{latency.get('p95', 0):>10.3f}{latency.get('p99', 0):>10.3f}{result['peak_rss_mb'] or 0:>10.1f}")
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
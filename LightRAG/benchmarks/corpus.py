@@ -0,0 +1,139 @@
+from typing import List, Iterator, Optional, Tuple
+from dataclasses import dataclass
+import hashlib
+
+import numpy as np
+
+from ..models.data_models import Document, Chunk
+from ..models.embedding import Embedding
+from ..models.enums import DataSource
+
+# --- Configuration ---
+
+@dataclass
+class SyntheticCorpusConfig:
+    """Shape of a synthetic corpus; the same config always produces the same corpus."""
+    num_chunks: int
+    embedding_dim: int = 384
+    chunks_per_document: int = 10
+    words_per_chunk: int = 48
+    # Words are drawn Zipf-like from "w0".."w<N-1>", so BM25 sees realistic term frequencies
+    vocabulary_size: int = 20000
+    # Embeddings are noisy copies of this many cluster centres, so ANN indexes see structure
+    num_topics: int = 64
+    topic_noise: float = 0.5
+    # Entities ("entity<N>") mentioned per chunk; co-mentions become graph relations
+    entities_per_chunk: int = 2
+    # Defaults to one entity per ten chunks
+    num_entities: Optional[int] = None
+    seed: int = 0
+
+@dataclass
+class SyntheticQuery:
+    """A benchmark query: text for lexical/graph retrieval and a matching embedding."""
+    text: str
+    embedding: np.ndarray
+    # Chunk the query was derived from
+    source_chunk_id: str
+
+# --- Corpus ---
+
+class SyntheticCorpus:
+    """
+    Deterministic generator of Documents and embedded Chunks, produced a batch at a time.
+
+    Nothing is materialised up front: each document is generated from its own seeded RNG,
+    so a 1M-chunk corpus costs only what the system under test keeps, any document can be
+    regenerated on its own (which is how queries are derived), and the corpus does not
+    depend on the batch size. Chunk text mixes Zipf-distributed vocabulary with
+    entity names; embeddings are float32 noisy copies of topic centres. Document content
+    is a short title rather than the joined chunk text, to keep memory focused on chunks.
+    """
+    def __init__(self, config: SyntheticCorpusConfig):
+        self.config = config
+        rng = np.random.default_rng([config.seed, 0])
+        self._centres = rng.standard_normal((config.num_topics, config.embedding_dim)).astype(np.float32)
+        weights = 1.0 / np.arange(1, config.vocabulary_size + 1, dtype=np.float64)
+        self._word_cdf = np.cumsum(weights) / np.sum(weights)
+        self._word_cdf[-1] = 1.0
+        self.num_entities = config.num_entities or config.num_chunks // 10 + 1
+
+    @property
+    def num_documents(self) -> int:
+        return -(-self.config.num_chunks // self.config.chunks_per_document)
+
+    def batches(self, chunks_per_batch: int = 2048) -> Iterator[Tuple[List[Document], List[Chunk]]]:
+        """Yields (documents, their chunks); batches hold whole documents, about `chunks_per_batch` chunks."""
+        docs_per_batch = max(1, chunks_per_batch // self.config.chunks_per_document)
+        for first_doc in range(0, self.num_documents, docs_per_batch):
+            documents: List[Document] = []
+            chunks: List[Chunk] = []
+            for doc in range(first_doc, min(first_doc + docs_per_batch, self.num_documents)):
+                document, doc_chunks = self.document(doc)
+                documents.append(document)
+                chunks.extend(doc_chunks)
+            yield documents, chunks
+
+    def document(self, doc: int) -> Tuple[Document, List[Chunk]]:
+        """Document number `doc` and its chunks, generated from the document's own RNG."""
+        config = self.config
+        rng = np.random.default_rng([config.seed, 1, doc])
+        first_chunk = doc * config.chunks_per_document
+        count = min(config.chunks_per_document, config.num_chunks - first_chunk)
+
+        topics = rng.integers(0, config.num_topics, size=count)
+        vectors = self._centres[topics] + config.topic_noise * rng.standard_normal((count, config.embedding_dim), dtype=np.float32)
+        words = np.searchsorted(self._word_cdf, rng.random((count, config.words_per_chunk)))
+        entities = rng.integers(0, self.num_entities, size=(count, config.entities_per_chunk))
+
+        chunks = []
+        for i in range(count):
+            names = [f"entity{entity}" for entity in entities[i].tolist()]
+            chunks.append(Chunk(
+                id=f"chunk-{first_chunk + i}",
+                document_id=f"doc-{doc}",
+                content=" ".join([f"w{word}" for word in words[i].tolist()] + names),
+                embedding=Embedding(vectors[i]),
+                metadata={"topic": int(topics[i]), "entities": names},
+            ))
+        document = Document(id=f"doc-{doc}", content=f"Synthetic document {doc}", source=DataSource.TEXT, metadata={"doc_index": doc})
+        return document, chunks
+
+    def queries(self, count: int, query_words: int = 4, seed: int = 1) -> List[SyntheticQuery]:
+        """Queries derived from random chunks: a few of their words plus one entity, and a perturbed embedding."""
+        config = self.config
+        rng = np.random.default_rng([config.seed, 2, seed])
+        sources = rng.choice(config.num_chunks, size=min(count, config.num_chunks), replace=False)
+        queries = []
+        for chunk_index in sources.tolist():
+            doc, offset = divmod(chunk_index, config.chunks_per_document)
+            chunk = self.document(doc)[1][offset]
+            words = chunk.content.split()[:config.words_per_chunk]
+            picked = np.sort(rng.choice(len(words), size=min(query_words, len(words)), replace=False))
+            text = " ".join([words[i] for i in picked.tolist()] + chunk.metadata["entities"][:1])
+            noise = 0.1 * rng.standard_normal(config.embedding_dim, dtype=np.float32)
+            queries.append(SyntheticQuery(text=text, embedding=np.asarray(chunk.embedding) + noise, source_chunk_id=chunk.id))
+        return queries
+
+# --- Offline Embedding ---
+
+class SyntheticQueryEmbedder:
+    """
+    EmbeddingFunction for benchmarks: known query texts map to their synthetic embeddings.
+
+    Unknown texts get a deterministic pseudo-random vector seeded from their hash, so
+    retrievers that embed queries run offline and the lookup costs next to nothing.
+    """
+    def __init__(self, queries: List[SyntheticQuery], embedding_dim: int):
+        self.embedding_dim = embedding_dim
+        self._vectors = {query.text: query.embedding for query in queries}
+
+    async def __call__(self, texts: List[str], **kwargs) -> np.ndarray:
+        return np.stack([self._vector(text) for text in texts]) if texts else np.empty((0, self.embedding_dim), dtype=np.float32)
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = self._vectors.get(text)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.embedding_dim).astype(np.float32)
+        return vector
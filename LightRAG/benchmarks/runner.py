@@ -0,0 +1,403 @@
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Protocol, Sequence, Tuple
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import traceback
+
+import numpy as np
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+from ..core.interfaces import BaseRetriever, BaseVectorStorage
+from ..models.data_models import Document, Chunk, Query
+from ..models.enums import ANNIndexType, QuantizationMode, RetrievalMode
+from ..retrievers.bm25_retriever import BM25Retriever
+from ..retrievers.cached_retriever import CachedRetriever
+from ..retrievers.graph_retriever import GraphRetriever
+from ..retrievers.hybrid_retriever import HybridBranch, HybridRetriever
+from ..retrievers.vector_retriever import VectorRetriever
+from ..storage.ann_storage import ANNStorageConfig, ANNVectorStorage
+from ..storage.entity_graph import EntityGraph
+from ..storage.mmap_storage import MmapStorageConfig, MmapVectorStorage
+from ..storage.quantized_storage import QuantizedStorageConfig, QuantizedVectorStorage
+from ..storage.segmented_storage import SegmentedStorageConfig, SegmentedVectorStorage
+from ..storage.vector_storage import InMemoryVectorStorage
+from .corpus import SyntheticCorpus, SyntheticCorpusConfig, SyntheticQuery, SyntheticQueryEmbedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = (1_000, 100_000, 1_000_000)
+
+# --- Configuration ---
+
+@dataclass
+class BenchmarkConfig:
+    """What to run and how; every field is recorded in the JSON output."""
+    scales: Sequence[int] = DEFAULT_SCALES
+    # Target names from TARGETS; None runs all of them
+    targets: Optional[Sequence[str]] = None
+    embedding_dim: int = 384
+    num_queries: int = 200
+    # Untimed queries run first, so lazy index builds and caches do not skew the percentiles
+    warmup_queries: int = 10
+    # Share of timed queries that repeat an earlier query, so caching targets see hits too
+    repeat_fraction: float = 0.2
+    top_k: int = 10
+    ingest_batch_size: int = 2048
+    # Run every case in a fresh process, so peak RSS belongs to that case alone
+    isolate: bool = True
+    # Isolated cases still running after this many seconds are killed and reported as "timeout";
+    # None waits indefinitely (the pure-Python HNSW and PQ builds take hours at 1M chunks)
+    case_timeout_seconds: Optional[float] = 1800.0
+    # Parent directory for disk-backed storages; a temporary directory when unset
+    work_dir: Optional[str] = None
+    seed: int = 0
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one target at one scale."""
+    target: str
+    kind: str
+    scale: int
+    status: str = "ok"
+    error: Optional[str] = None
+    # Wall time of the storage/index calls only; corpus generation is excluded
+    ingest_seconds: Optional[float] = None
+    ingest_chunks_per_second: Optional[float] = None
+    queries: int = 0
+    # p50, p95, p99, mean and max, in milliseconds
+    query_latency_ms: Dict[str, float] = field(default_factory=dict)
+    # The same summary over only the timed queries that repeat an earlier one
+    repeat_queries: int = 0
+    repeat_query_latency_ms: Dict[str, float] = field(default_factory=dict)
+    peak_rss_mb: Optional[float] = None
+    # Peak RSS before the corpus was generated (interpreter plus imports)
+    baseline_rss_mb: Optional[float] = None
+    # False when cases shared a process, so peak RSS is the run's high-water mark so far
+    rss_isolated: bool = False
+
+# --- Harnesses ---
+
+class _Harness(Protocol):
+    """Uniform ingest/query/close surface over one component under test."""
+
+    async def ingest(self, documents: List[Document], chunks: List[Chunk]) -> None:
+        """Adds the documents and their chunks to the component."""
+        ...
+
+    async def query(self, query: SyntheticQuery, top_k: int) -> None:
+        """Runs one query; the result is discarded."""
+        ...
+
+    async def close(self) -> None:
+        """Releases files and background work held by the component."""
+        ...
+
+class _StorageHarness(_Harness):
+    def __init__(self, storage: BaseVectorStorage, close: Optional[Callable[[], Awaitable[None]]] = None):
+        self.storage = storage
+        self._close = close
+
+    async def ingest(self, documents: List[Document], chunks: List[Chunk]) -> None:
+        for document in documents:
+            await self.storage.add_document(document)
+        await self.storage.add_chunks(chunks)
+
+    async def query(self, query: SyntheticQuery, top_k: int) -> None:
+        await self.storage.search_similar_chunks_with_scores(query.embedding, top_k)
+
+    async def close(self) -> None:
+        if self._close is not None:
+            await self._close()
+
+class _RetrieverHarness(_StorageHarness):
+    """A retriever over an InMemoryVectorStorage, plus whatever side indexes it reads."""
+    def __init__(self, retriever: BaseRetriever, storage: BaseVectorStorage, mode: RetrievalMode,
+                 bm25: Optional[BM25Retriever] = None, graph: Optional[EntityGraph] = None):
+        super().__init__(storage)
+        self.retriever = retriever
+        self.mode = mode
+        self.bm25 = bm25
+        self.graph = graph
+        self._queries = 0
+
+    async def ingest(self, documents: List[Document], chunks: List[Chunk]) -> None:
+        await super().ingest(documents, chunks)
+        if self.bm25 is not None:
+            self.bm25.add_chunks(chunks)
+        if self.graph is not None:
+            _add_to_graph(self.graph, chunks)
+
+    async def query(self, query: SyntheticQuery, top_k: int) -> None:
+        self._queries += 1
+        await self.retriever.retrieve(Query(id=f"bench-{self._queries}", text=query.text, mode=self.mode, top_k=top_k))
+
+def _add_to_graph(graph: EntityGraph, chunks: List[Chunk]) -> None:
+    """Links each chunk to the entities it mentions and relates entities mentioned together."""
+    sources, targets = [], []
+    for chunk in chunks:
+        names = chunk.metadata["entities"]
+        for name in names:
+            graph.add_entity(name, [chunk.id])
+        for i in range(1, len(names)):
+            sources.append(names[0])
+            targets.append(names[i])
+    if sources:
+        graph.add_relations(sources, targets)
+
+# --- Targets ---
+
+# Builds a fresh harness from (working directory for on-disk state, offline query embedder)
+HarnessFactory = Callable[[str, SyntheticQueryEmbedder], Awaitable[_Harness]]
+
+@dataclass
+class BenchmarkTarget:
+    """One storage or retriever configuration under test."""
+    name: str
+    kind: str # "storage" or "retriever"
+    factory: HarnessFactory
+
+async def _in_memory(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(InMemoryVectorStorage())
+
+async def _hnsw(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(ANNVectorStorage(ANNStorageConfig(index_type=ANNIndexType.HNSW)))
+
+async def _ivf(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(ANNVectorStorage(ANNStorageConfig(index_type=ANNIndexType.IVF)))
+
+async def _scalar(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(QuantizedVectorStorage(QuantizedStorageConfig(quantization=QuantizationMode.SCALAR)))
+
+async def _product(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(QuantizedVectorStorage(QuantizedStorageConfig(quantization=QuantizationMode.PRODUCT)))
+
+async def _mmap(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    return _StorageHarness(MmapVectorStorage(MmapStorageConfig(path=os.path.join(work_dir, "mmap"))))
+
+async def _segmented(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = await SegmentedVectorStorage.open(SegmentedStorageConfig(path=os.path.join(work_dir, "segmented")))
+    return _StorageHarness(storage, close=storage.close)
+
+async def _vector_retriever(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = InMemoryVectorStorage()
+    return _RetrieverHarness(VectorRetriever(storage, embedder), storage, RetrievalMode.VECTOR)
+
+async def _bm25_retriever(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = InMemoryVectorStorage()
+    bm25 = BM25Retriever(storage)
+    return _RetrieverHarness(bm25, storage, RetrievalMode.NAIVE, bm25=bm25)
+
+async def _graph_retriever(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = InMemoryVectorStorage()
+    graph = EntityGraph()
+    return _RetrieverHarness(GraphRetriever(storage, graph), storage, RetrievalMode.GRAPH, graph=graph)
+
+async def _hybrid_retriever(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = InMemoryVectorStorage()
+    bm25 = BM25Retriever(storage)
+    graph = EntityGraph()
+    hybrid = HybridRetriever([
+        HybridBranch("vector", VectorRetriever(storage, embedder)),
+        HybridBranch("bm25", bm25),
+        HybridBranch("graph", GraphRetriever(storage, graph)),
+    ])
+    return _RetrieverHarness(hybrid, storage, RetrievalMode.HYBRID, bm25=bm25, graph=graph)
+
+async def _cached_retriever(work_dir: str, embedder: SyntheticQueryEmbedder) -> _Harness:
+    storage = InMemoryVectorStorage()
+    return _RetrieverHarness(CachedRetriever(VectorRetriever(storage, embedder), storage), storage, RetrievalMode.VECTOR)
+
+TARGETS: Dict[str, BenchmarkTarget] = {target.name: target for target in [
+    BenchmarkTarget("InMemoryVectorStorage", "storage", _in_memory),
+    BenchmarkTarget("ANNVectorStorage[HNSW]", "storage", _hnsw),
+    BenchmarkTarget("ANNVectorStorage[IVF]", "storage", _ivf),
+    BenchmarkTarget("QuantizedVectorStorage[SCALAR]", "storage", _scalar),
+    BenchmarkTarget("QuantizedVectorStorage[PRODUCT]", "storage", _product),
+    BenchmarkTarget("MmapVectorStorage", "storage", _mmap),
+    BenchmarkTarget("SegmentedVectorStorage", "storage", _segmented),
+    BenchmarkTarget("VectorRetriever", "retriever", _vector_retriever),
+    BenchmarkTarget("BM25Retriever", "retriever", _bm25_retriever),
+    BenchmarkTarget("GraphRetriever", "retriever", _graph_retriever),
+    BenchmarkTarget("HybridRetriever", "retriever", _hybrid_retriever),
+    BenchmarkTarget("CachedRetriever", "retriever", _cached_retriever),
+]}
+
+# --- Measurement ---
+
+def peak_rss_mb() -> Optional[float]:
+    """This process's peak resident set size so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of per-query latencies, in milliseconds."""
+    if not seconds:
+        return {}
+    latencies = np.asarray(seconds, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "mean": round(float(latencies.mean()), 4),
+        "max": round(float(latencies.max()), 4),
+    }
+
+def query_schedule(corpus: SyntheticCorpus, config: BenchmarkConfig) -> Tuple[List[SyntheticQuery], List[SyntheticQuery], List[bool]]:
+    """
+    Warmup queries, timed queries, and which timed queries repeat an earlier one. Repeats
+    are drawn from every query issued before them, including the warmup.
+    """
+    repeats = int(round(config.num_queries * config.repeat_fraction))
+    distinct = corpus.queries(config.warmup_queries + config.num_queries - repeats)
+    warmup, fresh = distinct[:config.warmup_queries], distinct[config.warmup_queries:]
+    rng = np.random.default_rng([config.seed, 3])
+    repeat_slots = set(rng.choice(config.num_queries, size=repeats, replace=False).tolist()) if repeats else set()
+    issued, timed, is_repeat = list(warmup), [], []
+    fresh_queries = iter(fresh)
+    for slot in range(config.num_queries):
+        query = None if slot in repeat_slots and issued else next(fresh_queries, None)
+        # Small corpora can run out of distinct queries; the rest are repeats too
+        repeat = query is None
+        if repeat:
+            if not issued:
+                break
+            query = issued[int(rng.integers(len(issued)))]
+        timed.append(query)
+        is_repeat.append(repeat)
+        issued.append(query)
+    return warmup, timed, is_repeat
+
+async def run_case(target: BenchmarkTarget, scale: int, config: BenchmarkConfig, work_dir: str) -> BenchmarkResult:
+    """Ingests a `scale`-chunk corpus into a fresh instance of `target`, then times queries against it."""
+    result = BenchmarkResult(target=target.name, kind=target.kind, scale=scale, baseline_rss_mb=peak_rss_mb())
+    corpus = SyntheticCorpus(SyntheticCorpusConfig(num_chunks=scale, embedding_dim=config.embedding_dim, seed=config.seed))
+    warmup, timed, is_repeat = query_schedule(corpus, config)
+    harness = await target.factory(work_dir, SyntheticQueryEmbedder(warmup + timed, config.embedding_dim))
+    try:
+        ingest_seconds = 0.0
+        for documents, chunks in corpus.batches(config.ingest_batch_size):
+            started = time.perf_counter()
+            await harness.ingest(documents, chunks)
+            ingest_seconds += time.perf_counter() - started
+        result.ingest_seconds = round(ingest_seconds, 4)
+        result.ingest_chunks_per_second = round(scale / ingest_seconds, 1) if ingest_seconds > 0 else None
+
+        for query in warmup:
+            await harness.query(query, config.top_k)
+        latencies = []
+        for query in timed:
+            started = time.perf_counter()
+            await harness.query(query, config.top_k)
+            latencies.append(time.perf_counter() - started)
+        result.queries = len(latencies)
+        result.query_latency_ms = latency_summary(latencies)
+        repeat_latencies = [latency for latency, repeat in zip(latencies, is_repeat) if repeat]
+        result.repeat_queries = len(repeat_latencies)
+        result.repeat_query_latency_ms = latency_summary(repeat_latencies)
+    finally:
+        await harness.close()
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+def _run_case_in_child(connection, target_name: str, scale: int, config: BenchmarkConfig, work_dir: str) -> None:
+    """Process entry point for isolated cases: runs one case and sends back its result as a dict."""
+    try:
+        result = asyncio.run(run_case(TARGETS[target_name], scale, config, work_dir))
+        result.rss_isolated = True
+    except Exception:
+        result = BenchmarkResult(target=target_name, kind=TARGETS[target_name].kind, scale=scale,
+                                 status="error", error=traceback.format_exc(), rss_isolated=True)
+    connection.send(asdict(result))
+    connection.close()
+
+def _run_isolated(target: BenchmarkTarget, scale: int, config: BenchmarkConfig, work_dir: str) -> BenchmarkResult:
+    # Spawned rather than forked, so the child starts without the parent's memory
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case_in_child, args=(sender, target.name, scale, config, work_dir))
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(config.case_timeout_seconds):
+            return BenchmarkResult(**receiver.recv())
+        status, error = "timeout", f"Case did not finish within {config.case_timeout_seconds}s"
+    except EOFError:
+        status, error = "error", f"Benchmark process exited with code {process.exitcode} before reporting"
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+    return BenchmarkResult(target=target.name, kind=target.kind, scale=scale, status=status, error=error, rss_isolated=True)
+
+# --- Runner ---
+
+def environment() -> Dict[str, Any]:
+    """Machine and library details stored with every run, so results are compared like for like."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run_benchmarks(config: Optional[BenchmarkConfig] = None, output_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs every selected target at every scale and returns the report (also written to
+    `output_path` as JSON when given). A failing or timed-out case is recorded with its
+    status and error and the run moves on.
+    """
+    config = config or BenchmarkConfig()
+    names = list(config.targets) if config.targets is not None else list(TARGETS)
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark targets: {unknown}; choose from {list(TARGETS)}")
+
+    results: List[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory(dir=config.work_dir, prefix="lightrag-bench-") as root:
+        for scale in config.scales:
+            for name in names:
+                case_dir = os.path.join(root, f"{name}-{scale}")
+                os.makedirs(case_dir)
+                logger.info("Benchmarking %s at %d chunks", name, scale)
+                if config.isolate:
+                    result = _run_isolated(TARGETS[name], scale, config, case_dir)
+                else:
+                    try:
+                        result = asyncio.run(run_case(TARGETS[name], scale, config, case_dir))
+                    except Exception:
+                        logger.exception("Benchmark case %s at %d chunks failed", name, scale)
+                        result = BenchmarkResult(target=name, kind=TARGETS[name].kind, scale=scale,
+                                                 status="error", error=traceback.format_exc())
+                logger.info("%s at %d chunks: %s", name, scale, result.status)
+                results.append(result)
+
+    report = {
+        "environment": environment(),
+        "config": {**asdict(config), "scales": list(config.scales), "targets": names},
+        "results": [asdict(result) for result in results],
+    }
+    if output_path is not None:
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -1,6 +1,10 @@
-from typing import Protocol, List, Optional, AsyncGenerator
+import asyncio
+from typing import Protocol, List, Optional, AsyncGenerator, Tuple, Callable, Awaitable, Any, Sequence
 from ..models.data_models import Document, Chunk, Query, RetrieverResult, GeneratorContext, GeneratorResponse, Metadata
 
+# Async callable mapping a batch of texts to one embedding per text (e.g. lightrag's openai_embed)
+EmbeddingFunction = Callable[[List[str]], Awaitable[Any]]
+
 # Storage Interfaces
 class BaseStorage(Protocol):
     """Interface for storing and retrieving documents and chunks."""
@@ -25,6 +29,14 @@ class BaseStorage(Protocol):
         """Retrieves all chunks associated with a document ID."""
         ...
 
+    async def delete_document(self, doc_id: str) -> int:
+        """Removes a document and all of its chunks. Returns the number of chunks removed."""
+        ...
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        """Replaces a document and its full set of chunks with new versions."""
+        ...
+
 class BaseVectorStorage(BaseStorage, Protocol):
     """Interface specifically for vector storage and similarity search."""
 
@@ -32,6 +44,14 @@ class BaseVectorStorage(BaseStorage, Protocol):
         """Finds chunks with embeddings similar to the query embedding."""
         ...
 
+    async def search_similar_chunks_with_scores(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[Chunk, float]]:
+        """Like search_similar_chunks, but pairs each chunk with its similarity score (higher is better)."""
+        ...
+
+    async def search_similar_chunks_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int, filters: Optional[Metadata] = None) -> List[List[Tuple[Chunk, float]]]:
+        """Scored search for a batch of query embeddings (one row each), returning one result list per query."""
+        ...
+
 # RAG Component Interfaces
 class BaseRetriever(Protocol):
     """Interface for retrieving relevant context based on a query."""
@@ -40,6 +60,11 @@ class BaseRetriever(Protocol):
         """Retrieves relevant chunks for a given query."""
         ...
 
+    async def retrieve_many(self, queries: List[Query]) -> List[RetrieverResult]:
+        """Retrieves for several queries, returning results in query order."""
+        # Default: concurrent single retrievals; implementations can batch the underlying work
+        return list(await asyncio.gather(*(self.retrieve(query) for query in queries)))
+
 class BaseGenerator(Protocol):
     """Interface for generating a response based on query and context."""
 
@@ -48,7 +73,7 @@ class BaseGenerator(Protocol):
         ...
 
     async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
-        """Streams the generated answer token by token."""
+        """Streams the generated answer token by token, yielding each piece as the model produces it."""
         # Yield intermediate results
         yield ""
         # Ensure the generator is properly defined
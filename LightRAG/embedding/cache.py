@@ -0,0 +1,246 @@
+from typing import List, Dict, Iterable, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+
+from ..core.interfaces import EmbeddingFunction
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, with whitespace runs collapsed and trimmed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def cache_key(model: str, text: str, options: str = "") -> bytes:
+    """Content address of an embedding: SHA-256 over the model name, call options and normalised text."""
+    prefix = model.encode("utf-8") + (b"\0" + options.encode("utf-8") if options else b"")
+    return hashlib.sha256(prefix + b"\0" + normalize_text(text).encode("utf-8")).digest()
+
+def call_options(kwargs: Dict) -> Optional[str]:
+    """Canonical JSON of embedder keyword arguments, or None when they cannot be part of a key."""
+    if not kwargs:
+        return ""
+    try:
+        return json.dumps(kwargs, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+# --- Configuration ---
+
+@dataclass
+class EmbeddingCacheConfig:
+    """Configuration for CachedEmbeddingFunction."""
+    # Part of every key, so switching models never returns stale vectors
+    model: str
+    max_memory_entries: int = 10000
+    # SQLite file for the persistent tier; None keeps the cache in memory only
+    disk_path: Optional[str] = None
+
+@dataclass
+class EmbeddingCacheStats:
+    """Lookup counters for CachedEmbeddingFunction."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    # Texts embedded without the cache because the call options could not be keyed
+    bypassed: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+# --- Persistent Tier ---
+
+class SQLiteEmbeddingStore:
+    """Key -> float32 blob table in SQLite; batched reads and writes, safe across threads."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        # Stay well below SQLite's bound-parameter limit
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                for key, blob in rows:
+                    found[bytes(key)] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.ascontiguousarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # A shared call whose callers were all cancelled has nobody left to see its failure
+    if not task.cancelled():
+        task.exception()
+
+# --- Cached Embedding Function ---
+
+class CachedEmbeddingFunction:
+    """
+    Content-addressed cache in front of any EmbeddingFunction.
+
+    Calls take and return the same shapes as the wrapped function (a list of texts in,
+    one float32 row per text out), so an instance can be passed wherever the original
+    was, e.g. as `EmbeddingFunc(func=...)`. Each text is looked up in a bounded in-memory
+    LRU, then in the optional SQLite tier; only the remaining distinct texts are sent to
+    the embedder, in one call. Texts already being embedded by a concurrent call are
+    awaited rather than embedded twice.
+
+    Keyword arguments (e.g. `model=`) are passed through and folded into the key; calls
+    whose arguments are not JSON-serialisable bypass the cache. SQLite reads and writes
+    run on a worker thread so they never block the event loop.
+    """
+    def __init__(self, embedding_func: EmbeddingFunction, config: EmbeddingCacheConfig):
+        self.embedding_func = embedding_func
+        self.config = config
+        self.stats = EmbeddingCacheStats()
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._disk = SQLiteEmbeddingStore(config.disk_path) if config.disk_path else None
+        self._in_flight: Dict[bytes, asyncio.Future] = {}
+
+    async def __call__(self, texts: List[str], **kwargs) -> np.ndarray:
+        options = call_options(kwargs)
+        if options is None:
+            self.stats.bypassed += len(texts)
+            return np.asarray(await self.embedding_func(texts, **kwargs), dtype=np.float32)
+        keys = [cache_key(self.config.model, text, options) for text in texts]
+        vectors: Dict[bytes, np.ndarray] = {}
+
+        pending = self._lookup_memory(keys, vectors)
+        if pending and self._disk is not None:
+            found = await asyncio.to_thread(self._disk.get_many, list(pending))
+            self.stats.disk_hits += sum(len(pending[key]) for key in found)
+            for key, vector in found.items():
+                vectors[key] = vector
+                self._remember(key, vector)
+                del pending[key]
+
+        waiting = {key: self._in_flight[key] for key in pending if key in self._in_flight}
+        to_embed = {key: positions for key, positions in pending.items() if key not in waiting}
+        self.stats.misses += sum(len(positions) for positions in to_embed.values())
+        if to_embed:
+            vectors.update(await self._embed(texts, to_embed, **kwargs))
+        retry: Dict[bytes, List[int]] = {}
+        for key, future in waiting.items():
+            try:
+                # Shielded so a cancelled waiter does not cancel the vector other callers share
+                vectors[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The embedding itself was cancelled rather than this caller: embed it here
+                retry[key] = pending[key]
+        if retry:
+            vectors.update(await self._embed(texts, retry, **kwargs))
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def _lookup_memory(self, keys: List[bytes], vectors: Dict[bytes, np.ndarray]) -> Dict[bytes, List[int]]:
+        """Fills `vectors` from the LRU; returns the missing keys with their positions in the batch."""
+        pending: Dict[bytes, List[int]] = {}
+        for position, key in enumerate(keys):
+            vector = vectors.get(key)
+            if vector is None:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            if vector is not None:
+                self.stats.memory_hits += 1
+            else:
+                pending.setdefault(key, []).append(position)
+        return pending
+
+    async def _embed(self, texts: List[str], to_embed: Dict[bytes, List[int]], **kwargs) -> Dict[bytes, np.ndarray]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in to_embed}
+        self._in_flight.update(futures)
+        batch = [texts[positions[0]] for positions in to_embed.values()]
+        # The call runs in its own task so cancelling this caller leaves it running for the
+        # callers waiting on the same texts
+        task = asyncio.ensure_future(self._embed_shared(batch, futures, **kwargs))
+        task.add_done_callback(_retrieve_exception)
+        return await asyncio.shield(task)
+
+    async def _embed_shared(self, batch: List[str], futures: Dict[bytes, asyncio.Future], **kwargs) -> Dict[bytes, np.ndarray]:
+        try:
+            embedded = np.asarray(await self.embedding_func(batch, **kwargs), dtype=np.float32).reshape(len(batch), -1)
+            results = {key: embedded[i].copy() for i, key in enumerate(futures)}
+            for key, vector in results.items():
+                self._remember(key, vector)
+                futures[key].set_result(vector)
+            # Waiters already have their vectors; only the owning call waits for the write
+            if self._disk is not None:
+                await asyncio.to_thread(self._disk.put_many, results)
+            return results
+        except Exception as error:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(error)
+                    # Mark retrieved so an unawaited failure is not logged as never retrieved
+                    future.exception()
+            raise
+        finally:
+            for key, future in futures.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+                # Only reached unresolved when the task itself was cancelled; waiters retry
+                future.cancel()
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    async def warm(self, texts: Iterable[str], vectors: np.ndarray, **kwargs) -> None:
+        """Seeds the cache with embeddings computed elsewhere, for calls made with `kwargs`."""
+        options = call_options(kwargs)
+        if options is None:
+            raise ValueError("Embedder keyword arguments must be JSON-serialisable to be cached")
+        items = {cache_key(self.config.model, text, options): np.asarray(vector, dtype=np.float32) for text, vector in zip(texts, vectors)}
+        for key, vector in items.items():
+            self._remember(key, vector)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put_many, items)
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
@@ -0,0 +1,133 @@
+from typing import List, Callable, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import logging
+
+import numpy as np
+
+from ..core.interfaces import EmbeddingFunction
+
+logger = logging.getLogger(__name__)
+
+def approximate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for batching budgets."""
+    return len(text) // 4 + 1
+
+@dataclass
+class CoalescerConfig:
+    """Batch bounds for EmbeddingCoalescer."""
+    max_batch_size: int = 256
+    # Token budget per batched call, e.g. the provider's per-request limit
+    max_batch_tokens: int = 100_000
+    # Longest a text waits for others to join its batch
+    max_wait_seconds: float = 0.005
+    # Batched calls in flight at once; None leaves them unbounded
+    max_concurrent_batches: Optional[int] = None
+    token_counter: Callable[[str], int] = field(default=approximate_tokens)
+
+@dataclass
+class CoalescerStats:
+    """Counters for EmbeddingCoalescer."""
+    requests: int = 0
+    texts: int = 0
+    batches: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
+
+class _Request:
+    """One caller's texts, filled in as the batches carrying them complete."""
+    __slots__ = ("future", "vectors", "remaining")
+
+    def __init__(self, future: asyncio.Future, size: int):
+        self.future = future
+        self.vectors: List[Optional[np.ndarray]] = [None] * size
+        self.remaining = size
+
+class EmbeddingCoalescer:
+    """
+    Merges concurrent embedding requests into batched calls of the wrapped function.
+
+    Each call queues its texts and waits. A batch is sent as soon as the queued texts
+    reach `max_batch_size` or `max_batch_tokens`, or when the oldest text has waited
+    `max_wait_seconds`. A caller's texts may be split across batches; each caller gets
+    back its own (n, dim) float32 array in its own text order. If a batched call fails,
+    every caller with texts in it receives the error.
+
+    Calls with keyword arguments bypass coalescing, since they may change what the
+    function returns.
+    """
+    def __init__(self, embedding_func: EmbeddingFunction, config: Optional[CoalescerConfig] = None):
+        self.embedding_func = embedding_func
+        self.config = config or CoalescerConfig()
+        self.stats = CoalescerStats()
+        # (request, position in the request, text, tokens) in arrival order
+        self._queue: "deque[Tuple[_Request, int, str, int]]" = deque()
+        self._queued_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrent_batches) if self.config.max_concurrent_batches else None
+
+    async def __call__(self, texts: List[str], **kwargs) -> np.ndarray:
+        if kwargs:
+            return np.asarray(await self.embedding_func(texts, **kwargs), dtype=np.float32)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        request = _Request(asyncio.get_running_loop().create_future(), len(texts))
+        for position, text in enumerate(texts):
+            tokens = self.config.token_counter(text)
+            self._queue.append((request, position, text, tokens))
+            self._queued_tokens += tokens
+        self.stats.requests += 1
+        self.stats.texts += len(texts)
+        self._schedule()
+        return await request.future
+
+    def _schedule(self) -> None:
+        while self._queue and (len(self._queue) >= self.config.max_batch_size or self._queued_tokens >= self.config.max_batch_tokens):
+            self._send_batch()
+        if self._queue and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.config.max_wait_seconds, self._on_timer)
+        elif not self._queue and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        while self._queue:
+            self._send_batch()
+
+    def _send_batch(self) -> None:
+        """Takes texts from the front of the queue up to the batch bounds (at least one) and sends them."""
+        batch = [self._queue.popleft()]
+        tokens = batch[0][3]
+        while self._queue and len(batch) < self.config.max_batch_size and tokens + self._queue[0][3] <= self.config.max_batch_tokens:
+            item = self._queue.popleft()
+            batch.append(item)
+            tokens += item[3]
+        self._queued_tokens -= tokens
+        self.stats.batches += 1
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[_Request, int, str, int]]) -> None:
+        try:
+            if self._semaphore is not None:
+                async with self._semaphore:
+                    vectors = await self.embedding_func([text for _, _, text, _ in batch])
+            else:
+                vectors = await self.embedding_func([text for _, _, text, _ in batch])
+            vectors = np.asarray(vectors, dtype=np.float32).reshape(len(batch), -1)
+        except Exception as e:
+            for request, _, _, _ in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        for (request, position, _, _), vector in zip(batch, vectors):
+            request.vectors[position] = vector
+            request.remaining -= 1
+            if request.remaining == 0 and not request.future.done():
+                request.future.set_result(np.stack(request.vectors))
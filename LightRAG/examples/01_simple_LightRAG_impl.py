@@ -22,6 +22,8 @@ from lightrag.lightrag import LightRAG, QueryParam
 # Import the helper functions directly
 from lightrag.llm.openai import openai_embed, gpt_4o_mini_complete
 from lightrag.utils import EmbeddingFunc # Wrapper for embedding function details
+from LightRAG.embedding.cache import CachedEmbeddingFunction, EmbeddingCacheConfig
+from LightRAG.utils.rate_limiter import AdaptiveRateLimiter, RateLimiterConfig
 # Correct import path for initialize_pipeline_status
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
@@ -54,8 +56,22 @@ logger = logging.getLogger("LightRAG_Example")
 EMBEDDING_DIM = 1536 # Common dimension for text-embedding-ada-002
 MAX_TOKEN_SIZE = 8191 # Common limit for ada-002
 
+# Keep model calls within the account's quota (adjust to your OpenAI tier); the in-flight
+# limit adapts to 429s instead of retrying in a storm
+limited_embed = AdaptiveRateLimiter(openai_embed, RateLimiterConfig(requests_per_minute=3000, tokens_per_minute=1_000_000))
+limited_complete = AdaptiveRateLimiter(gpt_4o_mini_complete, RateLimiterConfig(requests_per_minute=500, tokens_per_minute=200_000))
+
+# Cache embeddings by content so re-running the example only embeds new text
+cached_embed = CachedEmbeddingFunction(
+    limited_embed,
+    EmbeddingCacheConfig(
+        model="text-embedding-3-small", # openai_embed's default model
+        disk_path=os.path.join(working_dir, "embedding_cache.sqlite"),
+    ),
+)
+
 embedding_details = EmbeddingFunc(
-    func=openai_embed, # Pass the function itself
+    func=cached_embed,
     embedding_dim=EMBEDDING_DIM,
     max_token_size=MAX_TOKEN_SIZE
 )
@@ -70,7 +86,7 @@ async def main():
     # Initialize LightRAG with embedding and LLM functions
     rag = LightRAG(
         embedding_func=embedding_details, # Pass the wrapped function details
-        llm_model_func=gpt_4o_mini_complete, # Pass the completion function
+        llm_model_func=limited_complete, # Pass the completion function
         working_dir=working_dir # Use the calculated path
     )
 
@@ -23,6 +23,8 @@ load_dotenv(dotenv_path=dotenv_path)
 from lightrag.lightrag import LightRAG, QueryParam
 from lightrag.llm.openai import openai_embed, gpt_4o_mini_complete
 from lightrag.utils import EmbeddingFunc
+from LightRAG.embedding.cache import CachedEmbeddingFunction, EmbeddingCacheConfig
+from LightRAG.utils.rate_limiter import AdaptiveRateLimiter, RateLimiterConfig
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
 # --- Configuration & Logging ---
@@ -39,8 +41,23 @@ logger = logging.getLogger("LightRAG_Example_03") # Updated logger name
 # --- Define Embedding Function Details ---
 EMBEDDING_DIM = 1536
 MAX_TOKEN_SIZE = 8191
+
+# Keep model calls within the account's quota (adjust to your OpenAI tier); the in-flight
+# limit adapts to 429s instead of retrying in a storm
+limited_embed = AdaptiveRateLimiter(openai_embed, RateLimiterConfig(requests_per_minute=3000, tokens_per_minute=1_000_000))
+limited_complete = AdaptiveRateLimiter(gpt_4o_mini_complete, RateLimiterConfig(requests_per_minute=500, tokens_per_minute=200_000))
+
+# Cache embeddings by content so re-running the example only embeds new text
+cached_embed = CachedEmbeddingFunction(
+    limited_embed,
+    EmbeddingCacheConfig(
+        model="text-embedding-3-small", # openai_embed's default model
+        disk_path=os.path.join(working_dir, "embedding_cache.sqlite"),
+    ),
+)
+
 embedding_details = EmbeddingFunc(
-    func=openai_embed,
+    func=cached_embed,
     embedding_dim=EMBEDDING_DIM,
     max_token_size=MAX_TOKEN_SIZE
 )
@@ -60,7 +77,7 @@ async def main():
     # Initialize LightRAG
     rag = LightRAG(
         embedding_func=embedding_details,
-        llm_model_func=gpt_4o_mini_complete,
+        llm_model_func=limited_complete,
         working_dir=working_dir # Use the new path for this example
     )
 
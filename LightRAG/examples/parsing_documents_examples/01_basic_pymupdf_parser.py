@@ -3,7 +3,8 @@
 import os
 import asyncio
 import logging
-import fitz  # PyMuPDF
+
+from LightRAG.ingestion.pdf import stream_pdf_pages # Parallel PyMuPDF page extraction
 
 # --- Configuration & Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,21 +23,15 @@ OUTPUT_FILENAME = "01_basic_pymupdf_output.txt"
 # --- Core Functions ---
 
 async def parse_pdf_text(pdf_path: str) -> str | None:
-    """Parses text content from a PDF file using PyMuPDF."""
+    """Parses text content from a PDF file using PyMuPDF, extracting pages in parallel worker processes."""
     logger.info(f"Attempting to parse PDF: {pdf_path}")
     full_text = []
     try:
-        # Note: fitz.open is synchronous, wrapping in async for structure
-        doc = fitz.open(pdf_path)
-        logger.info(f"Opened PDF with {len(doc)} pages.")
-        for page_num, page in enumerate(doc.pages(), start=1):
-            try:
-                page_text = page.get_text("text") # Extract plain text
-                if page_text:
-                    full_text.append(page_text)
-            except Exception as page_e:
-                logger.warning(f"Could not extract text from page {page_num}: {page_e}")
-        doc.close()
+        # Page ranges are extracted in a process pool (each worker opens its own fitz document)
+        # and streamed back in page order, so the event loop is never blocked
+        async for page_num, page_text in stream_pdf_pages(pdf_path):
+            if page_text:
+                full_text.append(page_text)
         logger.info(f"Successfully extracted text from {len(full_text)} pages.")
         return "\n".join(full_text)
     except FileNotFoundError:
@@ -46,6 +41,10 @@ async def parse_pdf_text(pdf_path: str) -> str | None:
         logger.error(f"Failed to open or parse PDF '{pdf_path}': {e}")
         return None
 
+def _write_text(path: str, text_content: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text_content)
+
 async def save_text_output(text_content: str, output_dir: str, filename: str) -> bool:
     """Saves the extracted text content to a file."""
     output_path = os.path.join(output_dir, filename)
@@ -53,9 +52,8 @@ async def save_text_output(text_content: str, output_dir: str, filename: str) ->
     try:
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
-        # Note: open/write is synchronous, wrapping in async for structure
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text_content)
+        # Write in a worker thread so the event loop is not blocked by disk I/O
+        await asyncio.to_thread(_write_text, output_path, text_content)
         logger.info(f"Successfully saved output to {output_path}")
         return True
     except Exception as e:
@@ -0,0 +1,243 @@
+from typing import List, Dict, AsyncGenerator, Callable, Optional, Set, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import re
+import time
+
+import numpy as np
+
+from ..core.interfaces import BaseGenerator, EmbeddingFunction
+from ..embedding.cache import normalize_text
+from .streaming import STREAM_TIMING_KEYS
+from ..models.data_models import GeneratorContext, GeneratorResponse
+
+logger = logging.getLogger(__name__)
+
+# Replayed stream pieces: a word with its trailing whitespace
+_REPLAY_PATTERN = re.compile(r"\s*\S+\s*")
+
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+def response_cache_key(context: GeneratorContext) -> CacheKey:
+    """Normalised, case-folded query text plus the ordered ids of the context chunks."""
+    chunk_ids = tuple(chunk.id for chunk in context.retrieved_context.retrieved_chunks)
+    return normalize_text(context.query.text).casefold(), chunk_ids
+
+# --- Configuration ---
+
+@dataclass
+class ResponseCacheConfig:
+    """Configuration for CachedGenerator."""
+    max_entries: int = 1024
+    # Entries older than this are treated as misses; None disables expiry
+    ttl_seconds: Optional[float] = 3600.0
+    # Semantic mode: with an embedding function, a query whose cosine similarity to a cached
+    # query (with the same context chunk ids) reaches this threshold is a hit
+    similarity_threshold: float = 0.95
+    clock: Callable[[], float] = field(default=time.monotonic)
+
+@dataclass
+class ResponseCacheStats:
+    """Lookup counters for CachedGenerator."""
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return (self.hits + self.semantic_hits) / lookups if lookups else 0.0
+
+@dataclass
+class _CacheEntry:
+    response: GeneratorResponse
+    created_at: float
+    # Unit-length query embedding, set in semantic mode
+    embedding: Optional[np.ndarray] = None
+
+# --- Cached Generator ---
+
+class CachedGenerator(BaseGenerator):
+    """
+    Response cache in front of any BaseGenerator.
+
+    Responses are keyed on the normalised query text and the ordered chunk ids of the
+    retrieved context, so the same question over the same context is answered once. Entries
+    expire after `ttl_seconds` and the least recently used entry is evicted beyond
+    `max_entries`. Concurrent identical requests share one underlying generation.
+
+    When an `embedding_func` is given, exact misses fall back to a semantic lookup among
+    entries for the same context ids. Cached answers are also replayed through
+    `stream_generate`, and a fully consumed stream populates the cache.
+    """
+    def __init__(self, generator: BaseGenerator, config: Optional[ResponseCacheConfig] = None,
+                 embedding_func: Optional[EmbeddingFunction] = None):
+        self.generator = generator
+        self.config = config or ResponseCacheConfig()
+        self.embedding_func = embedding_func
+        self.stats = ResponseCacheStats()
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._keys_by_context: Dict[Tuple[str, ...], Dict[CacheKey, None]] = {}
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        # Running generations, referenced until done
+        self._generations: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def generate(self, context: GeneratorContext) -> GeneratorResponse:
+        key = response_cache_key(context)
+        embedding = None
+        entry = self._get(key)
+        if entry is None and self.embedding_func is not None:
+            embedding = await self._embed(context.query.text)
+            entry = self._get_similar(key, embedding)
+        if entry is not None:
+            return self._replay(entry, context)
+
+        in_flight = self._in_flight.get(key)
+        owner = in_flight is None
+        if owner:
+            self.stats.misses += 1
+            in_flight = self._start_generation(key, context, embedding)
+        else:
+            self.stats.hits += 1
+        try:
+            # Shielded so cancelling one caller does not cancel the generation others share
+            entry = await asyncio.shield(in_flight)
+        except asyncio.CancelledError:
+            if not in_flight.cancelled():
+                raise
+            # The shared generation itself was cancelled rather than this caller
+            return await self.generate(context)
+        return entry.response if owner else self._replay(entry, context)
+
+    def _start_generation(self, key: CacheKey, context: GeneratorContext, embedding: Optional[np.ndarray]) -> asyncio.Future:
+        """Runs the generation in its own task; the returned future resolves to its cache entry."""
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        task = asyncio.ensure_future(self._generate_shared(key, context, embedding, future))
+        self._generations.add(task)
+        task.add_done_callback(self._generations.discard)
+        return future
+
+    async def _generate_shared(self, key: CacheKey, context: GeneratorContext, embedding: Optional[np.ndarray],
+                               future: asyncio.Future) -> None:
+        try:
+            response = await self.generator.generate(context)
+            future.set_result(self._put(key, response, embedding))
+        except Exception as error:
+            future.set_exception(error)
+            # Mark retrieved so a failure nobody waited for is not logged
+            future.exception()
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            # Only still pending when this task was cancelled; waiters then start over
+            future.cancel()
+
+    async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
+        key = response_cache_key(context)
+        embedding = None
+        entry = self._get(key)
+        if entry is None and self.embedding_func is not None:
+            embedding = await self._embed(context.query.text)
+            entry = self._get_similar(key, embedding)
+        if entry is not None:
+            for piece in _REPLAY_PATTERN.findall(entry.response.answer):
+                yield piece
+            return
+
+        self.stats.misses += 1
+        pieces: List[str] = []
+        async for piece in self.generator.stream_generate(context):
+            pieces.append(piece)
+            yield piece
+        # Only a stream that ran to completion is cached
+        self._put(key, GeneratorResponse(
+            query_id=context.query.id,
+            answer="".join(pieces),
+            context_used=list(key[1]),
+        ), embedding)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_context.clear()
+
+    # --- Entries ---
+
+    def _get(self, key: CacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            self.stats.expirations += 1
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry
+
+    def _get_similar(self, key: CacheKey, embedding: np.ndarray) -> Optional[_CacheEntry]:
+        candidates = []
+        for candidate in list(self._keys_by_context.get(key[1], ())):
+            entry = self._entries[candidate]
+            if self._expired(entry):
+                self.stats.expirations += 1
+                self._remove(candidate)
+            elif entry.embedding is not None:
+                candidates.append(candidate)
+        if not candidates:
+            return None
+        similarities = np.stack([self._entries[candidate].embedding for candidate in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.config.similarity_threshold:
+            return None
+        self._entries.move_to_end(candidates[best])
+        self.stats.semantic_hits += 1
+        return self._entries[candidates[best]]
+
+    def _put(self, key: CacheKey, response: GeneratorResponse, embedding: Optional[np.ndarray]) -> _CacheEntry:
+        entry = _CacheEntry(response=response, created_at=self.config.clock(), embedding=embedding)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._keys_by_context.setdefault(key[1], {})[key] = None
+        while len(self._entries) > self.config.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+        return entry
+
+    def _remove(self, key: CacheKey) -> None:
+        del self._entries[key]
+        keys = self._keys_by_context.get(key[1])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._keys_by_context[key[1]]
+
+    def _expired(self, entry: _CacheEntry) -> bool:
+        ttl = self.config.ttl_seconds
+        return ttl is not None and self.config.clock() - entry.created_at > ttl
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self.embedding_func([text]), dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    @staticmethod
+    def _replay(entry: _CacheEntry, context: GeneratorContext) -> GeneratorResponse:
+        """The cached response, re-addressed to the current query."""
+        response = entry.response
+        # Latencies of the original generation say nothing about this one
+        metadata = {key: value for key, value in response.metadata.items() if key not in STREAM_TIMING_KEYS}
+        return GeneratorResponse(
+            query_id=context.query.id,
+            answer=response.answer,
+            context_used=list(response.context_used),
+            metadata={**metadata, "cached": True},
+        )
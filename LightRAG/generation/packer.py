@@ -0,0 +1,220 @@
+from typing import List, Dict, AsyncGenerator, Callable, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import logging
+
+from ..core.interfaces import BaseGenerator
+from ..ingestion.chunker import RegexTokenEncoder, TiktokenEncoder
+from ..models.data_models import Chunk, RetrieverResult, GeneratorContext, GeneratorResponse
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+
+def default_token_counter() -> Callable[[str], int]:
+    """Counts tokens with TokenChunker's tiktoken encoding, or RegexTokenEncoder when tiktoken is not installed."""
+    try:
+        encoding = TiktokenEncoder().encoding
+    except ImportError:
+        encoder = RegexTokenEncoder()
+        return lambda text: len(encoder.token_offsets(text))
+    return lambda text: len(encoding.encode_ordinary(text))
+
+@dataclass
+class ContextPackerConfig:
+    """Configuration for ContextPacker."""
+    # Token budget for all packed chunk text, including per-chunk overhead
+    max_tokens: int = 3000
+    # Tokens reserved per packed chunk for separators, citations, etc. in the prompt
+    per_chunk_overhead_tokens: int = 0
+    token_counter: Callable[[str], int] = field(default_factory=default_token_counter)
+    # Token counts kept in memory, keyed by chunk id
+    max_cached_counts: int = 100_000
+    trim_overlaps: bool = True
+    # Text fallback for chunks without char offsets: shortest suffix/prefix match that counts as overlap
+    min_overlap_chars: int = 16
+    max_overlap_chars: int = 4096
+
+@dataclass
+class PackingStats:
+    """Outcome of one ContextPacker.pack call."""
+    chunks_in: int = 0
+    chunks_packed: int = 0
+    # Chunks left out because they did not fit, or were entirely covered by packed neighbours
+    chunks_over_budget: int = 0
+    chunks_redundant: int = 0
+    chars_trimmed: int = 0
+    tokens_used: int = 0
+
+# --- Context Packer ---
+
+class ContextPacker:
+    """
+    Fits retrieved chunks into a token budget before they reach the generator.
+
+    Chunks are considered best score first (retrieval order when there are no scores) and
+    added while they fit in `max_tokens`; a chunk that does not fit is skipped so smaller,
+    lower-ranked chunks can still fill the remaining budget. Before counting, the part of
+    a chunk already covered by a packed chunk of the same document is trimmed: by the
+    `char_start`/`char_end` offsets TokenChunker records, or else by matching the
+    neighbour's suffix against the chunk's prefix (and vice versa). Chunks that are fully
+    covered are dropped.
+
+    Token counts are cached per chunk id (checked against the content's length and hash,
+    so a re-ingested chunk that reuses an id is recounted), so repeated packing of
+    popular chunks does not re-tokenize them.
+    """
+    def __init__(self, config: Optional[ContextPackerConfig] = None):
+        self.config = config or ContextPackerConfig()
+        # (chunk id, start, end) -> (content length, content hash, count); the content itself is not kept
+        self._counts: "OrderedDict[Tuple[str, int, int], Tuple[int, int, int]]" = OrderedDict()
+        self.count_hits = 0
+        self.count_misses = 0
+
+    def pack(self, result: RetrieverResult) -> RetrieverResult:
+        """A copy of `result` holding only the packed (and possibly trimmed) chunks, best first."""
+        stats = PackingStats(chunks_in=len(result.retrieved_chunks))
+        scores = result.scores if result.scores and len(result.scores) == len(result.retrieved_chunks) else None
+        order = list(range(len(result.retrieved_chunks)))
+        if scores is not None:
+            order.sort(key=lambda i: scores[i], reverse=True)
+
+        packed: List[Chunk] = []
+        packed_scores: List[float] = []
+        # Document id -> packed chunks of that document, for overlap trimming
+        by_document: Dict[str, List[Chunk]] = {}
+        for i in order:
+            chunk = result.retrieved_chunks[i]
+            start, end = 0, len(chunk.content)
+            if self.config.trim_overlaps:
+                start, end = self._uncovered(chunk, by_document.get(chunk.document_id, []))
+                if start >= end:
+                    stats.chunks_redundant += 1
+                    continue
+            cost = self._count(chunk, start, end) + self.config.per_chunk_overhead_tokens
+            if stats.tokens_used + cost > self.config.max_tokens:
+                stats.chunks_over_budget += 1
+                continue
+
+            trimmed = self._trimmed(chunk, start, end)
+            stats.tokens_used += cost
+            stats.chars_trimmed += len(chunk.content) - (end - start)
+            packed.append(trimmed)
+            if scores is not None:
+                packed_scores.append(scores[i])
+            # Trim later neighbours against the full chunk: its text is what the prompt already covers
+            by_document.setdefault(chunk.document_id, []).append(chunk)
+
+        stats.chunks_packed = len(packed)
+        logger.debug("Packed %d of %d chunks into %d/%d tokens", stats.chunks_packed, stats.chunks_in,
+                     stats.tokens_used, self.config.max_tokens)
+        return result.model_copy(update={
+            "retrieved_chunks": packed,
+            "scores": packed_scores if scores is not None else None,
+            "metadata": {**result.metadata, "packing": {"max_tokens": self.config.max_tokens, **vars(stats)}},
+        })
+
+    def pack_context(self, context: GeneratorContext) -> GeneratorContext:
+        return context.model_copy(update={"retrieved_context": self.pack(context.retrieved_context)})
+
+    # --- Token Counts ---
+
+    def count_tokens(self, chunk: Chunk) -> int:
+        """Token count of the whole chunk, served from the cache when possible."""
+        return self._count(chunk, 0, len(chunk.content))
+
+    def _count(self, chunk: Chunk, start: int, end: int) -> int:
+        key = (chunk.id, start, end)
+        fingerprint = (len(chunk.content), hash(chunk.content))
+        cached = self._counts.get(key)
+        if cached is not None and cached[:2] == fingerprint:
+            self._counts.move_to_end(key)
+            self.count_hits += 1
+            return cached[2]
+        self.count_misses += 1
+        count = self.config.token_counter(chunk.content[start:end])
+        self._counts[key] = (*fingerprint, count)
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.config.max_cached_counts:
+            self._counts.popitem(last=False)
+        return count
+
+    # --- Overlap Trimming ---
+
+    def _uncovered(self, chunk: Chunk, neighbours: List[Chunk]) -> Tuple[int, int]:
+        """[start, end) of `chunk.content` not already covered at either edge by `neighbours`."""
+        start, end = 0, len(chunk.content)
+        for neighbour in neighbours:
+            if start >= end:
+                break
+            offsets = self._offsets(chunk, neighbour)
+            if offsets is not None:
+                start, end = self._trim_by_offsets(start, end, *offsets)
+            else:
+                start, end = self._trim_by_text(chunk.content, start, end, neighbour.content)
+        return start, end
+
+    @staticmethod
+    def _offsets(chunk: Chunk, neighbour: Chunk) -> Optional[Tuple[int, int, int]]:
+        """(chunk start, neighbour start, neighbour end) in document characters, if both chunks record them."""
+        try:
+            chunk_start, chunk_end = int(chunk.metadata["char_start"]), int(chunk.metadata["char_end"])
+            other_start, other_end = int(neighbour.metadata["char_start"]), int(neighbour.metadata["char_end"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        # Offsets that disagree with the text (e.g. edited content) are not trusted
+        if chunk_end - chunk_start != len(chunk.content) or other_end - other_start != len(neighbour.content):
+            return None
+        return chunk_start, other_start, other_end
+
+    @staticmethod
+    def _trim_by_offsets(start: int, end: int, base: int, other_start: int, other_end: int) -> Tuple[int, int]:
+        other_start, other_end = other_start - base, other_end - base
+        if other_start <= start and other_end > start:
+            start = min(other_end, end)
+        if other_end >= end and other_start < end:
+            end = max(other_start, start)
+        return start, end
+
+    def _trim_by_text(self, text: str, start: int, end: int, other: str) -> Tuple[int, int]:
+        segment = text[start:end]
+        if other.find(segment) != -1:
+            return start, start
+        limit = min(len(segment), len(other), self.config.max_overlap_chars)
+        for size in range(limit, self.config.min_overlap_chars - 1, -1):
+            if other.endswith(segment[:size]):
+                start += size
+                segment = segment[size:]
+                break
+        limit = min(len(segment), len(other), self.config.max_overlap_chars)
+        for size in range(limit, self.config.min_overlap_chars - 1, -1):
+            if other.startswith(segment[-size:]):
+                end -= size
+                break
+        return start, end
+
+    @staticmethod
+    def _trimmed(chunk: Chunk, start: int, end: int) -> Chunk:
+        if start == 0 and end == len(chunk.content):
+            return chunk
+        metadata = dict(chunk.metadata)
+        if "char_start" in metadata:
+            metadata["char_end"] = metadata["char_start"] + end
+            metadata["char_start"] = metadata["char_start"] + start
+        metadata["trimmed"] = True
+        return chunk.model_copy(update={"content": chunk.content[start:end], "metadata": metadata})
+
+# --- Packing Generator ---
+
+class PackedContextGenerator(BaseGenerator):
+    """BaseGenerator wrapper that packs the retrieved context into the token budget before generating."""
+    def __init__(self, generator: BaseGenerator, packer: Optional[ContextPacker] = None):
+        self.generator = generator
+        self.packer = packer or ContextPacker()
+
+    async def generate(self, context: GeneratorContext) -> GeneratorResponse:
+        return await self.generator.generate(self.packer.pack_context(context))
+
+    async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
+        async for token in self.generator.stream_generate(self.packer.pack_context(context)):
+            yield token
@@ -0,0 +1,129 @@
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional
+import logging
+import time
+
+from ..core.interfaces import BaseGenerator, BaseRetriever
+from ..models.data_models import Query, GeneratorContext, GeneratorResponse
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys written by TokenStream; they describe one generation and are not replayed from caches
+STREAM_TIMING_KEYS = (
+    "retrieval_ms",
+    "time_to_first_token_ms",
+    "mean_inter_token_ms",
+    "max_inter_token_ms",
+    "total_ms",
+    "tokens",
+)
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+# --- Token Stream ---
+
+class TokenStream:
+    """
+    Times a generator's token stream as it is consumed.
+
+    Tokens are passed through the moment the underlying `stream_generate` yields them;
+    nothing is buffered ahead of the consumer. Time to first token is measured from
+    `started_at` (the start of retrieval when built by `stream_answer`, otherwise the
+    moment the stream is created), and the gap before every later token is recorded as
+    an inter-token latency. Once the stream is exhausted, `response()` returns the full
+    GeneratorResponse with these timings in its metadata.
+    """
+    def __init__(self, tokens: AsyncIterator[str], context: GeneratorContext,
+                 started_at: Optional[float] = None, clock: Callable[[], float] = time.perf_counter,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.context = context
+        self._tokens = tokens.__aiter__()
+        self._clock = clock
+        self._started_at = clock() if started_at is None else started_at
+        self._metadata = dict(metadata or {})
+        self._pieces: List[str] = []
+        self._first_token_at: Optional[float] = None
+        self._last_token_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._gaps: List[float] = []
+
+    def __aiter__(self) -> "TokenStream":
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            piece = await self._tokens.__anext__()
+        except StopAsyncIteration:
+            if self._finished_at is None:
+                self._finished_at = self._clock()
+            raise
+        now = self._clock()
+        if self._first_token_at is None:
+            self._first_token_at = now
+        else:
+            self._gaps.append(now - self._last_token_at)
+        self._last_token_at = now
+        self._pieces.append(piece)
+        return piece
+
+    @property
+    def done(self) -> bool:
+        return self._finished_at is not None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from the start of the request to the first token; None before it arrives."""
+        return None if self._first_token_at is None else self._first_token_at - self._started_at
+
+    @property
+    def inter_token_latencies(self) -> List[float]:
+        """Seconds between consecutive tokens, in arrival order."""
+        return list(self._gaps)
+
+    def timings(self) -> Dict[str, Any]:
+        """Latency metadata for the tokens seen so far."""
+        timings = dict(self._metadata)
+        timings["tokens"] = len(self._pieces)
+        if self._first_token_at is not None:
+            timings["time_to_first_token_ms"] = _ms(self._first_token_at - self._started_at)
+        if self._gaps:
+            timings["mean_inter_token_ms"] = _ms(sum(self._gaps) / len(self._gaps))
+            timings["max_inter_token_ms"] = _ms(max(self._gaps))
+        if self._finished_at is not None:
+            timings["total_ms"] = _ms(self._finished_at - self._started_at)
+        return timings
+
+    def response(self) -> GeneratorResponse:
+        """The complete answer; only valid once the stream has been consumed."""
+        if not self.done:
+            raise RuntimeError("Token stream has not been fully consumed")
+        return GeneratorResponse(
+            query_id=self.context.query.id,
+            answer="".join(self._pieces),
+            context_used=[chunk.id for chunk in self.context.retrieved_context.retrieved_chunks],
+            metadata=self.timings(),
+        )
+
+# --- Retrieval to Generation ---
+
+async def stream_answer(retriever: BaseRetriever, generator: BaseGenerator, query: Query,
+                        clock: Callable[[], float] = time.perf_counter) -> TokenStream:
+    """
+    Retrieves context for `query` and starts streaming the answer over it.
+
+    The retrieval result is handed to `stream_generate` as soon as it returns, and the
+    returned stream's time to first token covers retrieval as well as generation, i.e.
+    what the user actually waits for. Retrieval time is also recorded as `retrieval_ms`.
+    """
+    started_at = clock()
+    retrieved = await retriever.retrieve(query)
+    retrieval_seconds = clock() - started_at
+    logger.debug("Retrieved %d chunks for query %s in %.3fs", len(retrieved.retrieved_chunks), query.id, retrieval_seconds)
+    context = GeneratorContext(query=query, retrieved_context=retrieved)
+    return TokenStream(
+        generator.stream_generate(context),
+        context,
+        started_at=started_at,
+        clock=clock,
+        metadata={"retrieval_ms": _ms(retrieval_seconds)},
+    )
@@ -0,0 +1,191 @@
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Protocol, Union
+from dataclasses import dataclass
+import logging
+import re
+
+from ..models.data_models import Document, Chunk
+
+try:
+    import tiktoken
+except ImportError: # Optional at import time; TiktokenEncoder needs it
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# --- Token Encoders ---
+
+class TokenEncoder(Protocol):
+    """Splits text into tokens, reporting the character offset where each token starts."""
+
+    def token_offsets(self, text: str) -> List[int]:
+        ...
+
+class TiktokenEncoder:
+    """tiktoken BPE encoding (cl100k_base matches the OpenAI embedding and chat models)."""
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        if tiktoken is None:
+            raise ImportError("TiktokenEncoder requires the 'tiktoken' package")
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def token_offsets(self, text: str) -> List[int]:
+        return self.encoding.decode_with_offsets(self.encoding.encode_ordinary(text))[1]
+
+class RegexTokenEncoder:
+    """Dependency-free approximation: words and punctuation runs, each with its leading whitespace."""
+    _PATTERN = re.compile(r"\s*(?:\w+|[^\w\s]+)|\s+")
+
+    def token_offsets(self, text: str) -> List[int]:
+        return [match.start() for match in self._PATTERN.finditer(text)]
+
+# --- Chunker ---
+
+@dataclass
+class ChunkerConfig:
+    """Configuration for TokenChunker."""
+    chunk_size: int = 512
+    # Tokens shared by consecutive chunks
+    chunk_overlap: int = 64
+    # Characters tokenized at a time; bounds the token offsets held in memory
+    window_chars: int = 65536
+
+@dataclass
+class TextSpan:
+    """One chunk's text and its position in the source."""
+    text: str
+    char_start: int
+    char_end: int
+    token_start: int
+    token_end: int
+
+class TokenChunker:
+    """
+    Splits text into chunks of `chunk_size` tokens, consecutive chunks sharing `chunk_overlap`.
+
+    Text is tokenized one window at a time (cut at whitespace so no token straddles two
+    windows) and chunks are yielded as soon as they are complete, so only a window of
+    token offsets is ever held. Chunk text is a slice of the source between token
+    offsets. The input may be a string or an iterable of text pieces (e.g. pages read
+    lazily); pieces are buffered only until their tokens have been chunked.
+
+    Calling the chunker on a Document yields positioned Chunks, which makes it a Chunker
+    for IngestionPipeline.
+    """
+    def __init__(self, config: Optional[ChunkerConfig] = None, encoder: Optional[TokenEncoder] = None):
+        self.config = config or ChunkerConfig()
+        if not 0 <= self.config.chunk_overlap < self.config.chunk_size:
+            raise ValueError("chunk_overlap must be at least 0 and smaller than chunk_size")
+        self.encoder = encoder or TiktokenEncoder()
+
+    def __call__(self, document: Document) -> Iterator[Chunk]:
+        return self.chunk_document(document)
+
+    def chunk_document(self, document: Document, pieces: Optional[Iterable[str]] = None) -> Iterator[Chunk]:
+        """Chunks of `document` (or of `pieces` streamed in its place), with offsets in metadata."""
+        source = document.content if pieces is None else pieces
+        for index, span in enumerate(self.spans(source)):
+            yield self._chunk(document, index, span)
+
+    async def achunk_document(self, document: Document, pieces: AsyncIterable[str]) -> AsyncIterator[Chunk]:
+        """Like `chunk_document` for an async stream of pieces (e.g. pages from stream_pdf_pages)."""
+        index = 0
+        async for span in self.aspans(pieces):
+            yield self._chunk(document, index, span)
+            index += 1
+
+    def spans(self, source: Union[str, Iterable[str]]) -> Iterator[TextSpan]:
+        """Yields chunk spans of a string or of a stream of text pieces, in order."""
+        streaming = not isinstance(source, str)
+        builder = _SpanBuilder(self, streaming)
+        for piece in (source if streaming else (source,)):
+            yield from builder.feed(piece)
+        yield from builder.finish()
+
+    async def aspans(self, pieces: AsyncIterable[str]) -> AsyncIterator[TextSpan]:
+        """Like `spans` for an async stream of text pieces."""
+        builder = _SpanBuilder(self, streaming=True)
+        async for piece in pieces:
+            for span in builder.feed(piece):
+                yield span
+        for span in builder.finish():
+            yield span
+
+    @staticmethod
+    def _chunk(document: Document, index: int, span: TextSpan) -> Chunk:
+        metadata: Dict[str, Any] = {
+            **document.metadata,
+            "chunk_index": index,
+            "char_start": span.char_start,
+            "char_end": span.char_end,
+            "token_start": span.token_start,
+            "token_end": span.token_end,
+        }
+        return Chunk(id=f"{document.id}-chunk-{index}", document_id=document.id, content=span.text, metadata=metadata)
+
+    @staticmethod
+    def _window_end(buffer: str, buffer_start: int, start: int, limit: int) -> int:
+        """Where to end a window: before the last whitespace run in range, else at `limit`."""
+        low = start - buffer_start + 1
+        cut = max(buffer.rfind(" ", low, limit - buffer_start), buffer.rfind("\n", low, limit - buffer_start))
+        # Keep the whole run in the next window, as tokenizers attach whitespace to the following word
+        while cut > low and buffer[cut - 1].isspace():
+            cut -= 1
+        return buffer_start + cut if cut >= low else limit
+
+class _SpanBuilder:
+    """Incremental state of TokenChunker.spans: feed pieces in order, then finish."""
+    def __init__(self, chunker: TokenChunker, streaming: bool):
+        self.encoder = chunker.encoder
+        self.size = chunker.config.chunk_size
+        self.overlap = chunker.config.chunk_overlap
+        self.window = chunker.config.window_chars
+        # A string source is used as the buffer directly and never copied
+        self.streaming = streaming
+        # buffer[0] is source character `buffer_start`
+        self.buffer, self.buffer_start = "", 0
+        # Source characters tokenized so far
+        self.encoded_to = 0
+        # Start offsets of tokens not yet dropped, the first being token number `first_token`
+        self.starts: List[int] = []
+        self.first_token = 0
+        # Tokens covered by the chunks emitted so far
+        self.covered = 0
+
+    def feed(self, piece: str) -> Iterator[TextSpan]:
+        self.buffer = self.buffer + piece if self.streaming else piece
+        while self.buffer_start + len(self.buffer) - self.encoded_to >= self.window:
+            self._encode(TokenChunker._window_end(self.buffer, self.buffer_start, self.encoded_to, self.encoded_to + self.window))
+            yield from self._emit(final=False)
+            if self.streaming:
+                # Keep only text from the first pending token (or the untokenized tail) on
+                keep_from = self.starts[0] if self.starts else self.encoded_to
+                self.buffer, self.buffer_start = self.buffer[keep_from - self.buffer_start:], keep_from
+
+    def finish(self) -> Iterator[TextSpan]:
+        self._encode(self.buffer_start + len(self.buffer))
+        yield from self._emit(final=True)
+
+    def _encode(self, end: int) -> None:
+        text = self.buffer[self.encoded_to - self.buffer_start:end - self.buffer_start]
+        self.starts.extend(self.encoded_to + offset for offset in self.encoder.token_offsets(text))
+        self.encoded_to = end
+
+    def _emit(self, final: bool) -> Iterator[TextSpan]:
+        size, starts = self.size, self.starts
+        # A chunk's end is the next token's start, so it is only known once that token exists
+        while len(starts) > size:
+            yield self._span(starts[0], starts[size], self.first_token, self.first_token + size)
+            self.covered = self.first_token + size
+            del starts[:size - self.overlap]
+            self.first_token += size - self.overlap
+        if final and self.first_token + len(starts) > self.covered:
+            end = self.buffer_start + len(self.buffer)
+            yield self._span(starts[0], end, self.first_token, self.first_token + len(starts))
+
+    def _span(self, char_start: int, char_end: int, token_start: int, token_end: int) -> TextSpan:
+        return TextSpan(
+            text=self.buffer[char_start - self.buffer_start:char_end - self.buffer_start],
+            char_start=char_start,
+            char_end=char_end,
+            token_start=token_start,
+            token_end=token_end,
+        )
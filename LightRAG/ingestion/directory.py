@@ -0,0 +1,184 @@
+from typing import Dict, AsyncIterator, Iterator, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import itertools
+import logging
+import os
+
+from ..models.data_models import Document
+from ..models.enums import DataSource
+from .pdf import PDFExtractionConfig, stream_pdf_pages
+from .pipeline import IngestionPipeline, IngestionReport
+from .registry import DocumentRegistry, SOURCE_SIZE_KEY, SOURCE_MTIME_KEY
+
+logger = logging.getLogger(__name__)
+
+# Queue item marking the end of the loaded documents
+_END = object()
+
+def _read_text(path: str, encoding: str) -> str:
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        return f.read()
+
+def _stat_if_changed(path: str, doc_id: str, registry: Optional[DocumentRegistry]) -> Optional[os.stat_result]:
+    """The file's stat, or None when the registry holds it completed with the same size and mtime."""
+    stat = os.stat(path)
+    if registry is not None and registry.is_unchanged_source(doc_id, stat.st_size, stat.st_mtime_ns):
+        return None
+    return stat
+
+@dataclass
+class DirectoryIngestionConfig:
+    """Configuration for DirectoryLoader."""
+    extensions: Tuple[str, ...] = (".txt", ".md", ".pdf")
+    # Files being read at once (a PDF counts as one while its pages are extracted)
+    max_open_files: int = 64
+    # Documents read or being read but not yet taken by the consumer
+    max_in_flight_documents: int = 256
+    # Threads for directory listing and text file reads
+    read_threads: int = 32
+    encoding: str = "utf-8"
+    follow_symlinks: bool = False
+    pdf: PDFExtractionConfig = field(default_factory=PDFExtractionConfig)
+
+class DirectoryLoader:
+    """
+    Walks a directory tree and streams its files as Documents without blocking the event loop.
+
+    Listing and text reads run in a thread pool, and PDFs are extracted page-parallel
+    in a process pool (shared across files), so disk reads and PDF parsing overlap.
+    At most `max_open_files` files are read at a time and at most
+    `max_in_flight_documents` are loaded ahead of the consumer. Documents are yielded as
+    they finish loading, with the path relative to the root as their id (so a registry
+    recognises them across runs) and the file's size and mtime in their metadata. Files
+    that cannot be read are logged in `failures` and skipped.
+
+    With a `registry`, files whose size and mtime match a COMPLETED record are skipped
+    before they are opened (or, for PDFs, extracted); the pipeline then only hashes the
+    content of files that look changed.
+    """
+    def __init__(self, root: str, config: Optional[DirectoryIngestionConfig] = None,
+                 thread_executor: Optional[Executor] = None, pdf_executor: Optional[Executor] = None,
+                 registry: Optional[DocumentRegistry] = None):
+        self.root = os.path.abspath(root)
+        self.config = config or DirectoryIngestionConfig()
+        self.thread_executor = thread_executor
+        self.pdf_executor = pdf_executor
+        self.registry = registry
+        # Relative path -> error message
+        self.failures: Dict[str, str] = {}
+        self.files_found = 0
+        self.files_loaded = 0
+        # Skipped unread because the registry holds them unchanged
+        self.files_unchanged = 0
+
+    async def documents(self) -> AsyncIterator[Document]:
+        config = self.config
+        own_threads = self.thread_executor is None
+        threads = self.thread_executor or ThreadPoolExecutor(max_workers=config.read_threads)
+        own_pdf_pool = self.pdf_executor is None and ".pdf" in config.extensions
+        pdf_pool = self.pdf_executor or (ProcessPoolExecutor(max_workers=config.pdf.workers) if own_pdf_pool else None)
+        ready: asyncio.Queue = asyncio.Queue()
+        in_flight = asyncio.Semaphore(config.max_in_flight_documents)
+        open_files = asyncio.Semaphore(config.max_open_files)
+        loads = set()
+
+        async def load(path: str) -> None:
+            document = None
+            try:
+                document = await self._load(path, threads, pdf_pool, open_files)
+            except Exception as e:
+                relative = self._relative(path)
+                self.failures[relative] = f"{type(e).__name__}: {e}"
+                logger.warning("Could not load %s: %s", relative, e)
+            await ready.put(document)
+
+        async def produce() -> None:
+            try:
+                async for path in self._walk(threads):
+                    await in_flight.acquire()
+                    task = asyncio.create_task(load(path))
+                    loads.add(task)
+                    task.add_done_callback(loads.discard)
+                if loads:
+                    await asyncio.gather(*loads)
+            finally:
+                await ready.put(_END)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                document = await ready.get()
+                if document is _END:
+                    break
+                in_flight.release()
+                if document is not None:
+                    self.files_loaded += 1
+                    yield document
+            # Surface walk errors
+            await producer
+        finally:
+            producer.cancel()
+            for task in list(loads):
+                task.cancel()
+            if own_threads:
+                threads.shutdown(wait=False, cancel_futures=True)
+            if own_pdf_pool:
+                pdf_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _load(self, path: str, threads: Executor, pdf_pool: Optional[Executor], open_files: asyncio.Semaphore) -> Optional[Document]:
+        loop = asyncio.get_running_loop()
+        extension = os.path.splitext(path)[1].lower()
+        relative = self._relative(path)
+        # Stat before reading: a write racing the read then leaves a stale mtime, not a stale skip
+        stat = await loop.run_in_executor(threads, _stat_if_changed, path, relative, self.registry)
+        if stat is None:
+            self.files_unchanged += 1
+            return None
+        async with open_files:
+            if extension == ".pdf":
+                pages = [text async for _, text in stream_pdf_pages(path, self.config.pdf, pdf_pool) if text]
+                content = "\n".join(pages)
+            else:
+                content = await loop.run_in_executor(threads, _read_text, path, self.config.encoding)
+        return Document(
+            id=relative,
+            content=content,
+            source=DataSource.FILE,
+            source_uri=path,
+            metadata={"path": relative, "extension": extension, SOURCE_SIZE_KEY: stat.st_size, SOURCE_MTIME_KEY: stat.st_mtime_ns},
+        )
+
+    async def _walk(self, threads: Executor, batch_size: int = 512) -> AsyncIterator[str]:
+        """Matching file paths, listed in the thread pool a batch at a time."""
+        loop = asyncio.get_running_loop()
+        paths = self._iter_paths()
+        while True:
+            batch = await loop.run_in_executor(threads, lambda: list(itertools.islice(paths, batch_size)))
+            if not batch:
+                return
+            self.files_found += len(batch)
+            for path in batch:
+                yield path
+
+    def _iter_paths(self) -> Iterator[str]:
+        extensions = tuple(extension.lower() for extension in self.config.extensions)
+        for directory, subdirectories, files in os.walk(self.root, followlinks=self.config.follow_symlinks):
+            subdirectories.sort()
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    yield os.path.join(directory, name)
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+async def ingest_directory(root: str, pipeline: IngestionPipeline,
+                           config: Optional[DirectoryIngestionConfig] = None) -> IngestionReport:
+    """Streams every matching file under `root` through `pipeline`; unreadable files count as failed."""
+    loader = DirectoryLoader(root, config, registry=pipeline.registry)
+    report = await pipeline.run(loader.documents())
+    report.documents_unchanged += loader.files_unchanged
+    report.documents_failed += len(loader.failures)
+    report.failures.update(loader.failures)
+    return report
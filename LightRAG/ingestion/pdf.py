@@ -0,0 +1,99 @@
+from typing import List, AsyncIterator, Callable, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import collections
+import logging
+import os
+
+try:
+    import fitz # PyMuPDF
+except ImportError: # Optional at import time; only the default page functions need it
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+# --- Worker Functions ---
+# Module-level so they can be pickled into pool processes; each call opens its own document.
+
+def count_pdf_pages(path: str) -> int:
+    if fitz is None:
+        raise ImportError("PDF extraction requires the 'PyMuPDF' package")
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """Plain text of pages [start, end); a page that fails to extract yields ""."""
+    if fitz is None:
+        raise ImportError("PDF extraction requires the 'PyMuPDF' package")
+    texts = []
+    with fitz.open(path) as doc:
+        for page_number in range(start, end):
+            try:
+                texts.append(doc.load_page(page_number).get_text("text"))
+            except Exception as e:
+                logger.warning("Could not extract text from page %d of %s: %s", page_number + 1, path, e)
+                texts.append("")
+    return texts
+
+# --- Parallel Extraction ---
+
+@dataclass
+class PDFExtractionConfig:
+    """Configuration for stream_pdf_pages."""
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    # Pages per pool task; larger ranges amortise reopening the document in each task
+    pages_per_task: int = 16
+    # Tasks submitted ahead of the page being yielded; bounds the text buffered in memory
+    max_pending_tasks: Optional[int] = None
+    count_pages: Callable[[str], int] = count_pdf_pages
+    extract_pages: Callable[[str, int, int], List[str]] = extract_pdf_pages
+
+async def stream_pdf_pages(path: str, config: Optional[PDFExtractionConfig] = None,
+                           executor: Optional[Executor] = None) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yields (page number from 1, page text) for a PDF in page order, extracting in parallel.
+
+    The page range is split into tasks of `pages_per_task` pages that run in a process
+    pool, each worker opening its own document, so extraction uses every core and the
+    event loop is never blocked. Tasks are submitted in page order, at most
+    `max_pending_tasks` ahead of the consumer, and pages are yielded as soon as their task
+    and all earlier ones are done, so downstream work (e.g. chunking) starts before the
+    last page is parsed. Pass `executor` to share a pool; otherwise one is created for
+    the call.
+    """
+    config = config or PDFExtractionConfig()
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=config.workers)
+    # (first page index, future) of submitted tasks, in page order
+    pending: "collections.deque[Tuple[int, asyncio.Future]]" = collections.deque()
+    try:
+        total = await loop.run_in_executor(executor, config.count_pages, path)
+        logger.info("Extracting %d pages from %s", total, path)
+        ranges = iter(range(0, total, config.pages_per_task))
+        max_pending = config.max_pending_tasks or 2 * config.workers
+
+        def submit_next() -> bool:
+            start = next(ranges, None)
+            if start is None:
+                return False
+            end = min(start + config.pages_per_task, total)
+            pending.append((start, loop.run_in_executor(executor, config.extract_pages, path, start, end)))
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+        while pending:
+            start, future = pending[0]
+            texts = await future
+            pending.popleft()
+            submit_next()
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,453 @@
+from typing import Any, List, Dict, AsyncIterable, Callable, Iterable, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from ..core.interfaces import BaseStorage, EmbeddingFunction
+from ..models.data_models import Document, Chunk
+from ..models.enums import ProcessingStatus
+from .registry import DocumentRegistry, SOURCE_SIZE_KEY, SOURCE_MTIME_KEY, content_hash
+
+logger = logging.getLogger(__name__)
+
+# Splits a document into chunks; may return a list, a generator or an async generator
+Chunker = Callable[[Document], Union[Iterable[Chunk], AsyncIterable[Chunk]]]
+# Called on every document state change with (doc_id, status, error message or None)
+StatusCallback = Callable[[str, ProcessingStatus, Optional[str]], None]
+
+# Queue item telling a stage worker that no more input will arrive
+_END = object()
+
+# --- Configuration & Metrics ---
+
+@dataclass
+class IngestionConfig:
+    """Concurrency, batching and queue bounds for IngestionPipeline."""
+    chunk_workers: int = 2
+    embed_workers: int = 2
+    write_workers: int = 1
+    embed_batch_size: int = 64
+    write_batch_size: int = 256
+    # Longest a worker waits to fill a partial batch before sending it
+    batch_timeout: float = 0.05
+    # Bounds of the queues between stages; these cap the memory held in flight
+    document_queue_size: int = 64
+    chunk_queue_size: int = 1024
+    write_queue_size: int = 1024
+
+@dataclass
+class StageMetrics:
+    """Counters for one pipeline stage."""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    batches: int = 0
+    errors: int = 0
+    # Seconds workers spent processing (excluding waits on queues)
+    busy_seconds: float = 0.0
+    # Queue feeding this stage
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    def throughput(self, elapsed: float) -> float:
+        """Items out per second of wall-clock time."""
+        return self.items_out / elapsed if elapsed > 0 else 0.0
+
+@dataclass
+class IngestionReport:
+    """Outcome of one IngestionPipeline.run."""
+    documents_completed: int = 0
+    documents_failed: int = 0
+    # Documents whose id was already in flight
+    documents_skipped: int = 0
+    # Documents the registry already holds, completed, with the same content
+    documents_unchanged: int = 0
+    chunks_written: int = 0
+    # Chunks whose stored embedding was reused because their text did not change
+    chunks_reused: int = 0
+    elapsed_seconds: float = 0.0
+    # doc_id -> error message
+    failures: Dict[str, str] = field(default_factory=dict)
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+
+@dataclass
+class _DocumentState:
+    document: Document
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    # Chunks produced but not yet written
+    outstanding: int = 0
+    # Chunks already stored, removed again if the document fails
+    written: int = 0
+    chunking_done: bool = False
+    failed: bool = False
+    # Content hash -> embedding of the previously stored version's chunks
+    reusable: Dict[str, np.ndarray] = field(default_factory=dict)
+    # New chunks of a changed document, held until they replace the stored version in one
+    # call; None when there is no stored version to keep
+    replacement: Optional[List[Chunk]] = None
+
+# --- Pipeline ---
+
+class IngestionPipeline:
+    """
+    Streaming Document -> chunker -> embedder -> BaseStorage.add_chunks pipeline.
+
+    Stages run as independent pools of asyncio workers connected by bounded queues, so
+    a slow stage blocks the ones before it instead of letting work pile up in memory:
+    with a lazy document source, memory use stays flat however many documents are
+    ingested. The embed and write stages take batches from their queues (up to the
+    configured size, waiting at most `batch_timeout` for a partial batch).
+
+    A document is PENDING once read from the source, PROCESSING while its chunks move
+    through the stages and COMPLETED once all of them (and then the document itself) are
+    stored. Any error while chunking, embedding or writing marks it FAILED: its remaining
+    chunks are dropped and, once none are left in flight, the ones already written are
+    deleted from storage, so a failed document is never partially searchable. Only
+    in-flight documents are tracked in memory; pass `on_status` to record every transition.
+    If the source or a stage raises, every other stage is cancelled and the error propagates.
+
+    With a DocumentRegistry, ingestion is idempotent: documents already COMPLETED with the
+    same content hash are skipped, transitions are persisted, and a changed document
+    replaces its stored version, reusing the embeddings of chunks whose text is unchanged.
+    The new chunks are held until the whole version is embedded and then swapped in with
+    `replace_document`, so if it fails the previous version and its chunk hashes remain.
+    Registry reads and commits run on one worker thread, in the order they were issued,
+    so SQLite never blocks the event loop; chunk hashes are recorded once per write batch.
+    """
+    def __init__(self, storage: BaseStorage, chunker: Chunker, embedding_func: Optional[EmbeddingFunction] = None,
+                 config: Optional[IngestionConfig] = None, on_status: Optional[StatusCallback] = None,
+                 registry: Optional[DocumentRegistry] = None):
+        self.storage = storage
+        self.chunker = chunker
+        self.embedding_func = embedding_func
+        self.config = config or IngestionConfig()
+        self.on_status = on_status
+        self.registry = registry
+        self.stages: Dict[str, StageMetrics] = {name: StageMetrics(name) for name in ("chunk", "embed", "write")}
+        self._states: Dict[str, _DocumentState] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._report = IngestionReport()
+        # Single thread, so registry updates apply in the order they were issued
+        self._registry_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def in_flight(self) -> Dict[str, ProcessingStatus]:
+        """Status of every document currently inside the pipeline."""
+        return {doc_id: state.status for doc_id, state in self._states.items()}
+
+    def metrics(self) -> Dict[str, StageMetrics]:
+        """Per-stage counters with current queue depths."""
+        for name, queue in self._queues.items():
+            self.stages[name].queue_depth = queue.qsize()
+        return self.stages
+
+    async def run(self, documents: Union[Iterable[Document], AsyncIterable[Document]]) -> IngestionReport:
+        """Ingests every document from the source and returns once all are stored or failed."""
+        config = self.config
+        self.stages = {name: StageMetrics(name) for name in ("chunk", "embed", "write")}
+        self._report = IngestionReport(stages=self.stages)
+        self._queues = {
+            "chunk": asyncio.Queue(config.document_queue_size),
+            "embed": asyncio.Queue(config.chunk_queue_size),
+            "write": asyncio.Queue(config.write_queue_size),
+        }
+        if self.registry is not None:
+            self._registry_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion-registry")
+        started = time.perf_counter()
+        tasks = [
+            asyncio.ensure_future(self._feed(documents)),
+            asyncio.ensure_future(self._run_stage("chunk", config.chunk_workers, self._chunk_worker, "embed", config.embed_workers)),
+            asyncio.ensure_future(self._run_stage("embed", config.embed_workers, self._embed_worker, "write", config.write_workers)),
+            asyncio.ensure_future(self._run_stage("write", config.write_workers, self._write_worker, None, 0)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Nothing would feed or drain the other stages any more
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            if self._registry_executor is not None:
+                self._registry_executor.shutdown(wait=False)
+                self._registry_executor = None
+        self._report.elapsed_seconds = time.perf_counter() - started
+        return self._report
+
+    # --- Stages ---
+
+    async def _feed(self, documents: Union[Iterable[Document], AsyncIterable[Document]]) -> None:
+        queue = self._queues["chunk"]
+        if hasattr(documents, "__aiter__"):
+            async for document in documents:
+                await self._admit(queue, document)
+        else:
+            for document in documents:
+                await self._admit(queue, document)
+        # On error `run` cancels the stages instead, so they are only told to stop on success
+        for _ in range(self.config.chunk_workers):
+            await queue.put(_END)
+
+    async def _admit(self, queue: asyncio.Queue, document: Document) -> None:
+        if document.id in self._states:
+            logger.warning("Skipping document %s: it is already being ingested", document.id)
+            self._report.documents_skipped += 1
+            return
+        if self.registry is not None:
+            begun = await self._registry_call(
+                self.registry.begin_if_changed, document.id, content_hash(document.content),
+                document.metadata.get(SOURCE_SIZE_KEY), document.metadata.get(SOURCE_MTIME_KEY),
+            )
+            if not begun:
+                self._report.documents_unchanged += 1
+                return
+        self._states[document.id] = _DocumentState(document)
+        # begin_if_changed already recorded PENDING
+        await self._set_status(document.id, ProcessingStatus.PENDING, persist=False)
+        await self._put(queue, "chunk", document)
+
+    async def _run_stage(self, name: str, workers: int, worker, next_stage: Optional[str], next_workers: int) -> None:
+        """Runs a stage's workers to completion, then tells every downstream worker to stop."""
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        for _ in range(next_workers):
+            await self._queues[next_stage].put(_END)
+
+    async def _chunk_worker(self) -> None:
+        queue, metrics = self._queues["chunk"], self.stages["chunk"]
+        while True:
+            document = await queue.get()
+            if document is _END:
+                return
+            metrics.items_in += 1
+            state = self._states[document.id]
+            await self._set_status(document.id, ProcessingStatus.PROCESSING)
+            try:
+                if self.registry is not None:
+                    await self._load_previous_version(state)
+                chunks = self.chunker(document)
+                if hasattr(chunks, "__aiter__"):
+                    async for chunk in chunks:
+                        await self._emit_chunk(state, chunk)
+                else:
+                    for chunk in chunks:
+                        await self._emit_chunk(state, chunk)
+            except Exception as e:
+                metrics.errors += 1
+                state.chunking_done = True
+                await self._fail(document.id, e)
+                continue
+            state.chunking_done = True
+            await self._maybe_complete(document.id)
+
+    async def _emit_chunk(self, state: _DocumentState, chunk: Chunk) -> None:
+        if state.failed:
+            return
+        if state.reusable and chunk.embedding is None:
+            vector = state.reusable.get(content_hash(chunk.content))
+            if vector is not None:
+                chunk = chunk.model_copy(update={"embedding": vector})
+                self._report.chunks_reused += 1
+        state.outstanding += 1
+        self.stages["chunk"].items_out += 1
+        await self._put(self._queues["embed"], "embed", chunk)
+
+    async def _embed_worker(self) -> None:
+        metrics = self.stages["embed"]
+        while True:
+            batch, done = await self._take_batch("embed", self.config.embed_batch_size)
+            batch = await self._live(batch)
+            if batch:
+                metrics.items_in += len(batch)
+                started = time.perf_counter()
+                try:
+                    batch = await self._embed(batch)
+                except Exception as e:
+                    metrics.errors += 1
+                    await self._fail_chunks(batch, e)
+                    batch = []
+                metrics.busy_seconds += time.perf_counter() - started
+                metrics.batches += 1
+                metrics.items_out += len(batch)
+                for chunk in batch:
+                    await self._put(self._queues["write"], "write", chunk)
+            if done:
+                return
+
+    async def _write_worker(self) -> None:
+        metrics = self.stages["write"]
+        while True:
+            batch, done = await self._take_batch("write", self.config.write_batch_size)
+            batch = await self._live(batch)
+            if batch:
+                metrics.items_in += len(batch)
+                # Chunks of a changed document are only stored once all of them are ready
+                held = [chunk for chunk in batch if self._states[chunk.document_id].replacement is not None]
+                written = [chunk for chunk in batch if self._states[chunk.document_id].replacement is None]
+                for chunk in held:
+                    self._states[chunk.document_id].replacement.append(chunk)
+                started = time.perf_counter()
+                if written:
+                    try:
+                        await self.storage.add_chunks(written)
+                    except Exception as e:
+                        metrics.errors += 1
+                        await self._fail_chunks(written, e)
+                        written = []
+                metrics.busy_seconds += time.perf_counter() - started
+                metrics.batches += 1
+                metrics.items_out += len(held) + len(written)
+                self._report.chunks_written += len(written)
+                if self.registry is not None and written:
+                    records = [(chunk.id, chunk.document_id, content_hash(chunk.content)) for chunk in written]
+                    await self._registry_call(self.registry.put_chunk_records, records)
+                for doc_id in {chunk.document_id: None for chunk in held + written}:
+                    count = sum(1 for chunk in held + written if chunk.document_id == doc_id)
+                    state = self._states[doc_id]
+                    state.outstanding -= count
+                    if state.replacement is None:
+                        state.written += count
+                    await self._maybe_complete(doc_id)
+            if done:
+                return
+
+    async def _load_previous_version(self, state: _DocumentState) -> None:
+        """Collects the reusable embeddings of a stored version, which stays in place until it is replaced."""
+        doc_id = state.document.id
+        hashes = await self._registry_call(self.registry.chunk_hashes, doc_id)
+        if not hashes:
+            return
+        for chunk in await self.storage.get_chunks_by_doc_id(doc_id):
+            digest = hashes.get(chunk.id)
+            if digest is not None and chunk.embedding is not None:
+                state.reusable[digest] = np.asarray(chunk.embedding, dtype=np.float32)
+        state.replacement = []
+
+    async def _embed(self, chunks: List[Chunk]) -> List[Chunk]:
+        """Embeds the chunks that have no embedding yet, in one call."""
+        missing = [i for i, chunk in enumerate(chunks) if chunk.embedding is None]
+        if not missing or self.embedding_func is None:
+            return chunks
+        vectors = np.asarray(await self.embedding_func([chunks[i].content for i in missing]), dtype=np.float32)
+        vectors = vectors.reshape(len(missing), -1)
+        embedded = list(chunks)
+        for i, vector in zip(missing, vectors):
+            embedded[i] = chunks[i].model_copy(update={"embedding": vector})
+        return embedded
+
+    # --- Queues & Document State ---
+
+    async def _put(self, queue: asyncio.Queue, stage: str, item) -> None:
+        await queue.put(item)
+        metrics = self.stages[stage]
+        metrics.max_queue_depth = max(metrics.max_queue_depth, queue.qsize())
+
+    async def _take_batch(self, stage: str, size: int) -> Tuple[List[Chunk], bool]:
+        """Up to `size` items from a stage's queue; the flag reports that the stage input has ended."""
+        queue = self._queues[stage]
+        item = await queue.get()
+        if item is _END:
+            return [], True
+        batch = [item]
+        deadline = time.perf_counter() + self.config.batch_timeout
+        while len(batch) < size:
+            if queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = queue.get_nowait()
+            if item is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _live(self, chunks: List[Chunk]) -> List[Chunk]:
+        """Drops chunks of documents that have already failed."""
+        live = []
+        for chunk in chunks:
+            state = self._states[chunk.document_id]
+            if state.failed:
+                state.outstanding -= 1
+                await self._forget_if_drained(chunk.document_id)
+            else:
+                live.append(chunk)
+        return live
+
+    async def _fail_chunks(self, chunks: List[Chunk], error: Exception) -> None:
+        for doc_id in {chunk.document_id: None for chunk in chunks}:
+            self._states[doc_id].outstanding -= sum(1 for chunk in chunks if chunk.document_id == doc_id)
+            await self._fail(doc_id, error)
+
+    async def _fail(self, doc_id: str, error: Exception) -> None:
+        state = self._states[doc_id]
+        if not state.failed:
+            state.failed = True
+            message = f"{type(error).__name__}: {error}"
+            logger.warning("Ingestion of document %s failed: %s", doc_id, message)
+            self._report.documents_failed += 1
+            self._report.failures[doc_id] = message
+            await self._set_status(doc_id, ProcessingStatus.FAILED, message)
+        await self._forget_if_drained(doc_id)
+
+    async def _maybe_complete(self, doc_id: str) -> None:
+        state = self._states[doc_id]
+        if state.failed:
+            await self._forget_if_drained(doc_id)
+            return
+        if not state.chunking_done or state.outstanding > 0:
+            return
+        try:
+            if state.replacement is None:
+                await self.storage.add_document(state.document)
+            else:
+                await self.storage.replace_document(state.document, state.replacement)
+        except Exception as e:
+            await self._fail(doc_id, e)
+            return
+        if state.replacement is not None:
+            self._report.chunks_written += len(state.replacement)
+            records = [(chunk.id, doc_id, content_hash(chunk.content)) for chunk in state.replacement]
+            await self._registry_call(self.registry.replace_chunk_records, doc_id, records)
+        del self._states[doc_id]
+        self._report.documents_completed += 1
+        await self._set_status(doc_id, ProcessingStatus.COMPLETED)
+
+    async def _forget_if_drained(self, doc_id: str) -> None:
+        # A failed document stays tracked until its queued chunks have been dropped
+        state = self._states.get(doc_id)
+        if state is None or not state.failed or not state.chunking_done or state.outstanding > 0:
+            return
+        written, state.written = state.written, 0
+        if written:
+            # No chunk of the document is in flight any more, so nothing can re-add one after this;
+            # the state stays tracked meanwhile so a new version is not admitted mid-delete
+            try:
+                await self.storage.delete_document(doc_id)
+            except Exception:
+                logger.exception("Could not remove the partially written chunks of failed document %s", doc_id)
+            else:
+                if self.registry is not None:
+                    await self._registry_call(self.registry.clear_chunks, doc_id)
+        self._states.pop(doc_id, None)
+
+    async def _set_status(self, doc_id: str, status: ProcessingStatus, error: Optional[str] = None, persist: bool = True) -> None:
+        state = self._states.get(doc_id)
+        if state is not None:
+            state.status = status
+        if self.on_status is not None:
+            self.on_status(doc_id, status, error)
+        if self.registry is not None and persist:
+            await self._registry_call(self.registry.set_status, doc_id, status, error)
+
+    async def _registry_call(self, method: Callable[..., Any], *args) -> Any:
+        """Runs a registry method on the registry thread, after every call issued before it."""
+        return await asyncio.get_running_loop().run_in_executor(self._registry_executor, method, *args)
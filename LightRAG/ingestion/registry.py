@@ -0,0 +1,192 @@
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from ..models.enums import ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+# Document metadata set by file loaders, recorded so unchanged files can be skipped unread
+SOURCE_SIZE_KEY = "file_size"
+SOURCE_MTIME_KEY = "file_mtime_ns"
+
+_COLUMNS = "doc_id, content_hash, status, error, updated_at, source_size, source_mtime_ns"
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a document's or chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+@dataclass
+class DocumentRecord:
+    """Last known ingestion state of one document."""
+    doc_id: str
+    content_hash: str
+    status: ProcessingStatus
+    error: Optional[str]
+    updated_at: float
+    # Size and modification time of the source file, when the document came from one
+    source_size: Optional[int] = None
+    source_mtime_ns: Optional[int] = None
+
+class DocumentRegistry:
+    """
+    Persistent record of ingested documents and chunks, keyed by id, with content hashes.
+
+    Stores one row per document (content hash, ProcessingStatus, last error) and one row
+    per stored chunk (content hash). IngestionPipeline consults it to skip documents whose
+    content is unchanged and already COMPLETED, to reuse the stored embeddings of chunks
+    whose text is unchanged, and to persist every status transition, so an interrupted
+    bulk load picks up the documents that never completed. For documents loaded from
+    files it also keeps the file's size and mtime, so DirectoryLoader can skip unchanged
+    files without reading them. Backed by SQLite; `path=None` keeps it in memory.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "doc_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, status TEXT NOT NULL, error TEXT, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (chunk_id TEXT PRIMARY KEY, doc_id TEXT NOT NULL, content_hash TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_by_doc ON chunks (doc_id)")
+        # Registries created before source stats were recorded gain the columns empty
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        for column in ("source_size", "source_mtime_ns"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE documents ADD COLUMN {column} INTEGER")
+        self._conn.commit()
+
+    # --- Documents ---
+
+    def get(self, doc_id: str) -> Optional[DocumentRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def is_current(self, doc_id: str, digest: str) -> bool:
+        """Whether the document was completely ingested with this content hash."""
+        record = self.get(doc_id)
+        return record is not None and record.status is ProcessingStatus.COMPLETED and record.content_hash == digest
+
+    def begin(self, doc_id: str, digest: str) -> None:
+        """Records a new (or changed) version of a document as PENDING."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, content_hash, status, error, updated_at) VALUES (?, ?, ?, NULL, ?)",
+                (doc_id, digest, ProcessingStatus.PENDING.name, time.time()),
+            )
+            self._conn.commit()
+
+    def begin_if_changed(self, doc_id: str, digest: str, source_size: Optional[int] = None,
+                         source_mtime_ns: Optional[int] = None) -> bool:
+        """
+        `begin` unless the document is already current; returns whether it was begun.
+
+        The source file stats are stored with the new version, or refreshed on a current
+        one (e.g. a touched but unchanged file), so the next load can skip the file unread.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, status, source_size, source_mtime_ns FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is not None and row[0] == digest and row[1] == ProcessingStatus.COMPLETED.name:
+                if source_size is not None and (row[2], row[3]) != (source_size, source_mtime_ns):
+                    self._conn.execute(
+                        "UPDATE documents SET source_size = ?, source_mtime_ns = ? WHERE doc_id = ?",
+                        (source_size, source_mtime_ns, doc_id),
+                    )
+                    self._conn.commit()
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, content_hash, status, error, updated_at, source_size, source_mtime_ns) "
+                "VALUES (?, ?, ?, NULL, ?, ?, ?)",
+                (doc_id, digest, ProcessingStatus.PENDING.name, time.time(), source_size, source_mtime_ns),
+            )
+            self._conn.commit()
+        return True
+
+    def is_unchanged_source(self, doc_id: str, source_size: int, source_mtime_ns: int) -> bool:
+        """Whether the document was completely ingested from a file with this size and mtime."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, source_size, source_mtime_ns FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row is not None and row[0] == ProcessingStatus.COMPLETED.name and (row[1], row[2]) == (source_size, source_mtime_ns)
+
+    def set_status(self, doc_id: str, status: ProcessingStatus, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET status = ?, error = ?, updated_at = ? WHERE doc_id = ?",
+                (status.name, error, time.time(), doc_id),
+            )
+            self._conn.commit()
+
+    def with_status(self, *statuses: ProcessingStatus) -> List[DocumentRecord]:
+        """Records in any of the given states, e.g. the documents an interrupted load left unfinished."""
+        placeholders = ",".join("?" * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM documents WHERE status IN ({placeholders}) ORDER BY doc_id",
+                [status.name for status in statuses],
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def forget(self, doc_id: str) -> None:
+        """Drops a document and its chunk hashes (e.g. after deleting it from storage)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._conn.commit()
+
+    # --- Chunks ---
+
+    def chunk_hashes(self, doc_id: str) -> Dict[str, str]:
+        """chunk_id -> content hash of the document's stored chunks."""
+        with self._lock:
+            rows = self._conn.execute("SELECT chunk_id, content_hash FROM chunks WHERE doc_id = ?", (doc_id,)).fetchall()
+        return dict(rows)
+
+    def put_chunk_hashes(self, doc_id: str, hashes: Dict[str, str]) -> None:
+        self.put_chunk_records([(chunk_id, doc_id, digest) for chunk_id, digest in hashes.items()])
+
+    def put_chunk_records(self, records: List[Tuple[str, str, str]]) -> None:
+        """Stores (chunk_id, doc_id, content hash) rows of any number of documents in one transaction."""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks (chunk_id, doc_id, content_hash) VALUES (?, ?, ?)", records)
+            self._conn.commit()
+
+    def replace_chunk_records(self, doc_id: str, records: List[Tuple[str, str, str]]) -> None:
+        """Swaps a document's chunk rows for `records` in one transaction."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._conn.executemany("INSERT OR REPLACE INTO chunks (chunk_id, doc_id, content_hash) VALUES (?, ?, ?)", records)
+            self._conn.commit()
+
+    def clear_chunks(self, doc_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _record(row) -> DocumentRecord:
+        doc_id, digest, status, error, updated_at, source_size, source_mtime_ns = row
+        return DocumentRecord(doc_id=doc_id, content_hash=digest, status=ProcessingStatus[status], error=error,
+                              updated_at=updated_at, source_size=source_size, source_mtime_ns=source_mtime_ns)
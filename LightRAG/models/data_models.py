@@ -3,9 +3,11 @@ from typing import List, Optional, Dict, Any, TypeAlias
 from datetime import datetime, timezone
 
 from .enums import DataSource, RetrievalMode
+from .embedding import Embedding
 
 # Type Aliases
-VectorEmbedding: TypeAlias = List[float]
+# Array-backed float32 vector; lists, float32 arrays and raw buffers all validate into it
+VectorEmbedding: TypeAlias = Embedding
 Metadata: TypeAlias = Dict[str, Any]
 
 # Core Data Models
@@ -0,0 +1,99 @@
+from typing import Any, Iterator, List, Union
+import numpy as np
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+
+EmbeddingInput = Union["Embedding", np.ndarray, bytes, bytearray, memoryview, List[float]]
+
+class Embedding:
+    """
+    Immutable float32 embedding vector backed by a NumPy array.
+
+    A 1536-dim embedding costs ~6KB here versus ~49KB as a list of boxed Python floats.
+    Float32 arrays (and raw little-endian float32 buffers) are wrapped without copying,
+    and `np.asarray(embedding)` hands the same buffer to storage backends. Plain lists
+    are still accepted by pydantic validation, and JSON serialisation emits a list.
+    """
+    __slots__ = ("_array",)
+
+    def __init__(self, values: EmbeddingInput):
+        if isinstance(values, Embedding):
+            array = values._array
+        elif isinstance(values, (bytes, bytearray, memoryview)):
+            array = np.frombuffer(values, dtype=np.float32)
+        else:
+            array = np.asarray(values, dtype=np.float32)
+        if array.ndim != 1:
+            raise ValueError(f"Embedding must be one-dimensional, got shape {array.shape}")
+        # A fresh read-only view: shares memory with the input without freezing the caller's array
+        array = array.view()
+        array.flags.writeable = False
+        self._array = array
+
+    # --- Conversions ---
+
+    @property
+    def array(self) -> np.ndarray:
+        """Read-only float32 view of the vector."""
+        return self._array
+
+    @property
+    def nbytes(self) -> int:
+        return self._array.nbytes
+
+    def tolist(self) -> List[float]:
+        return self._array.tolist()
+
+    def to_bytes(self) -> bytes:
+        """Raw float32 buffer, reversible with `Embedding(buffer)`."""
+        return self._array.tobytes()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is not None and np.dtype(dtype) != self._array.dtype:
+            return self._array.astype(dtype)
+        return self._array.copy() if copy else self._array
+
+    # --- Sequence Behaviour ---
+
+    def __len__(self) -> int:
+        return self._array.shape[0]
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._array.tolist())
+
+    def __getitem__(self, index):
+        item = self._array[index]
+        return float(item) if np.ndim(item) == 0 else item
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Embedding):
+            other = other._array
+        elif not isinstance(other, (np.ndarray, list, tuple)):
+            return NotImplemented
+        other = np.asarray(other, dtype=np.float32)
+        return other.shape == self._array.shape and bool(np.array_equal(self._array, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        preview = ", ".join(f"{value:.4g}" for value in self._array[:4].tolist())
+        suffix = ", ..." if len(self) > 4 else ""
+        return f"Embedding([{preview}{suffix}], dim={len(self)})"
+
+    # --- Pydantic Integration ---
+
+    @classmethod
+    def validate(cls, value: Any) -> "Embedding":
+        return value if isinstance(value, Embedding) else cls(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda value: value.tolist(), when_used="json"),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> JsonSchemaValue:
+        return {"type": "array", "items": {"type": "number"}}
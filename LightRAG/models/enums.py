@@ -20,4 +20,31 @@ class DataSource(Enum):
     TEXT = auto()
     URL = auto()
     DATABASE = auto()
-    API = auto() 
\ No newline at end of file
+    API = auto()
+
+class SimilarityMetric(Enum):
+    """Scoring function used for vector similarity search."""
+    COSINE = auto()
+    DOT_PRODUCT = auto()
+    L2 = auto() # Scored as negated Euclidean distance so higher is always better
+
+class ANNIndexType(Enum):
+    """Approximate nearest-neighbour index used by ANNVectorStorage."""
+    HNSW = auto() # Graph-based (hierarchical navigable small world)
+    IVF = auto() # Partition-based (inverted file over k-means centroids)
+
+class FilterStrategy(Enum):
+    """How a vector search applies metadata filters."""
+    PRE_FILTER = auto() # Resolve candidates first, then score only those rows
+    POST_FILTER = auto() # Score every row, then mask out non-matching rows before top-k
+
+class QuantizationMode(Enum):
+    """In-memory representation of stored embeddings."""
+    NONE = auto() # Full float32 vectors
+    SCALAR = auto() # One int8 code per dimension
+    PRODUCT = auto() # One uint8 code per subspace (product quantization)
+
+class FusionStrategy(Enum):
+    """How HybridRetriever merges the rankings of its branches."""
+    RECIPROCAL_RANK = auto() # Sum of weight / (k + rank) across branches
+    WEIGHTED_SCORE = auto() # Sum of weight * min-max normalised branch score
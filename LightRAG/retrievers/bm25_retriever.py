@@ -0,0 +1,50 @@
+from typing import List, Callable, Optional
+from dataclasses import dataclass, field
+import asyncio
+
+from ..core.interfaces import BaseRetriever, BaseStorage
+from ..models.data_models import Chunk, Query, RetrieverResult
+from ..models.enums import RetrievalMode
+from ..storage.inverted_index import InvertedIndex, tokenize
+
+@dataclass
+class BM25Config:
+    """Configuration for BM25Retriever."""
+    # Term frequency saturation and length normalisation
+    k1: float = 1.2
+    b: float = 0.75
+    # Maps text to index terms; queries and chunks use the same analyzer
+    tokenizer: Callable[[str], List[str]] = field(default=tokenize)
+
+class BM25Retriever(BaseRetriever):
+    """
+    Lexical retriever for RetrievalMode.NAIVE, ranking chunks by BM25 over an inverted index.
+
+    The index holds only term statistics and chunk ids; chunk objects are read back from
+    `storage`. Chunks are indexed incrementally with `add_chunks`, and queries need no
+    embedding call.
+    """
+    def __init__(self, storage: BaseStorage, config: Optional[BM25Config] = None):
+        self.storage = storage
+        self.config = config or BM25Config()
+        self.index = InvertedIndex(k1=self.config.k1, b=self.config.b)
+
+    def add_chunks(self, chunks: List[Chunk]) -> None:
+        """Indexes chunk texts; a chunk id that is already indexed is replaced."""
+        for chunk in chunks:
+            self.index.add(chunk.id, chunk.document_id, self.config.tokenizer(chunk.content), chunk.metadata)
+
+    def remove_document(self, doc_id: str) -> int:
+        """Drops every chunk of a document from the index."""
+        return self.index.remove_document(doc_id)
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        ranked = self.index.search(self.config.tokenizer(query.text), query.top_k, query.filters)
+        chunks = await asyncio.gather(*(self.storage.get_chunk(chunk_id) for chunk_id, _ in ranked))
+        found = [(chunk, score) for chunk, (_, score) in zip(chunks, ranked) if chunk is not None]
+        return RetrieverResult(
+            query_id=query.id,
+            retrieved_chunks=[chunk for chunk, _ in found],
+            scores=[score for _, score in found],
+            metadata={"mode": RetrievalMode.NAIVE.name}
+        )
@@ -0,0 +1,408 @@
+from typing import List, Dict, Any, Callable, FrozenSet, Hashable, Iterable, Optional, Protocol, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import json
+import logging
+import time
+
+import numpy as np
+
+from ..core.interfaces import BaseRetriever, BaseStorage
+from ..embedding.cache import normalize_text
+from ..models.data_models import Document, Chunk, Query, RetrieverResult
+from ..models.enums import SimilarityMetric
+from ..storage import similarity
+from ..storage.inverted_index import tokenize
+from ..storage.metadata_index import matches
+from .bm25_retriever import BM25Retriever
+from .vector_retriever import VectorRetriever
+
+logger = logging.getLogger(__name__)
+
+RetrievalCacheKey = Tuple[str, str, int, str]
+
+def retrieval_cache_key(query: Query) -> RetrievalCacheKey:
+    """(normalised text, mode, top_k, canonical filters) of a query."""
+    filters = json.dumps(query.filters, sort_keys=True, default=str) if query.filters else ""
+    return normalize_text(query.text), query.mode.name, query.top_k, filters
+
+# --- Configuration ---
+
+@dataclass
+class RetrievalCacheConfig:
+    """Configuration for CachedRetriever."""
+    max_entries: int = 4096
+    # Upper bound on entry age as a safety net for writes the cache is not told about
+    ttl_seconds: Optional[float] = None
+    clock: Callable[[], float] = field(default=time.monotonic)
+
+@dataclass
+class RetrievalCacheStats:
+    """Counters for CachedRetriever, including the staleness of served entries."""
+    hits: int = 0
+    misses: int = 0
+    # Entries dropped because a write could have changed their result
+    invalidations: int = 0
+    # Entries dropped by the size bound or the TTL
+    evictions: int = 0
+    # Results not cached because a write landed while they were being retrieved
+    discarded_fills: int = 0
+    # Seconds between filling an entry and serving it
+    total_hit_age: float = 0.0
+    max_hit_age: float = 0.0
+    # Writes an entry survived before being served
+    max_hit_writes_behind: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def mean_hit_age(self) -> float:
+        return self.total_hit_age / self.hits if self.hits else 0.0
+
+@dataclass
+class _CacheEntry:
+    query: Query
+    result: RetrieverResult
+    chunk_ids: FrozenSet[str]
+    doc_ids: FrozenSet[str]
+    # Lowest score in a full result; a new chunk must beat it to enter. None if not full
+    min_score: Optional[float]
+    created_at: float
+    generation: int
+
+# --- Invalidation Indexes ---
+
+class InvalidationIndex(Protocol):
+    """
+    Finds the cached entries that newly written chunks could enter, without calling any model.
+
+    Each entry is indexed under a signature captured when it is filled (e.g. the query
+    embedding); `affected` then maps new chunks to candidate entries in bulk. Metadata
+    filters are checked by CachedRetriever afterwards, only for the candidates.
+    """
+
+    async def fill(self, retriever: BaseRetriever, query: Query) -> Tuple[RetrieverResult, Any]:
+        """Runs the retrieval and returns its result with the signature to index the entry under."""
+        ...
+
+    def add(self, key: Hashable, signature: Any, min_score: Optional[float]) -> None:
+        """Indexes an entry; `min_score` is its lowest score when full, else None."""
+        ...
+
+    def discard(self, key: Hashable) -> None:
+        ...
+
+    def affected(self, chunks: List[Chunk]) -> Dict[Hashable, List[int]]:
+        """Entry key -> positions in `chunks` of the chunks that could enter that entry."""
+        ...
+
+class VectorInvalidation:
+    """
+    InvalidationIndex for VectorRetriever.
+
+    The query embedding computed by the retrieval itself is kept with each entry, in one
+    growing matrix. On a write, the new chunks are scored against every cached query with
+    a single matrix product per block of chunks, and a chunk is a candidate for an entry
+    when it scores at least the entry's lowest score (any score if the entry was not full).
+    Chunks without an embedding are never returned by a vector search and are skipped.
+    """
+    # New chunks scored per matrix product, bounding the (entries x chunks) score block
+    chunk_block = 1024
+
+    def __init__(self, metric: SimilarityMetric = SimilarityMetric.COSINE):
+        self.metric = metric
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        # Per slot: lowest score to beat, on the ranking scale; -inf when any score enters
+        self._thresholds = np.empty(0, dtype=np.float32)
+        self._keys: List[Optional[Hashable]] = []
+        self._slots: Dict[Hashable, int] = {}
+        self._free: List[int] = []
+
+    async def fill(self, retriever: BaseRetriever, query: Query) -> Tuple[RetrieverResult, Any]:
+        return await retriever.retrieve_with_embedding(query)
+
+    def add(self, key: Hashable, signature: Any, min_score: Optional[float]) -> None:
+        self.discard(key)
+        vector = np.asarray(signature, dtype=np.float32).reshape(-1)
+        if self._vectors.shape[1] != vector.shape[0]:
+            if self._slots:
+                raise ValueError(f"Query embedding has dimension {vector.shape[0]}, expected {self._vectors.shape[1]}")
+            self._vectors = np.empty((0, vector.shape[0]), dtype=np.float32)
+            self._keys, self._free = [], []
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._vectors[slot] = vector
+        self._norms[slot] = np.linalg.norm(vector)
+        self._thresholds[slot] = -np.inf if min_score is None else self._ranking_threshold(min_score)
+        self._keys[slot] = key
+        self._slots[key] = slot
+
+    def discard(self, key: Hashable) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._keys[slot] = None
+            self._thresholds[slot] = np.inf
+            self._free.append(slot)
+
+    def affected(self, chunks: List[Chunk]) -> Dict[Hashable, List[int]]:
+        positions = [i for i, chunk in enumerate(chunks) if chunk.embedding is not None]
+        found: Dict[Hashable, List[int]] = {}
+        if not self._slots or not positions:
+            return found
+        for start in range(0, len(positions), self.chunk_block):
+            block = positions[start:start + self.chunk_block]
+            matrix = np.stack([np.asarray(chunks[i].embedding, dtype=np.float32) for i in block])
+            # (slots, chunks): every cached query against every new chunk at once
+            scores = similarity.ranking_scores_batch(matrix, similarity.row_norms(matrix), self._vectors, self.metric)
+            slots, columns = np.nonzero(scores >= self._thresholds[:, None])
+            for slot, column in zip(slots.tolist(), columns.tolist()):
+                found.setdefault(self._keys[slot], []).append(block[column])
+        return found
+
+    def _grow(self) -> None:
+        old = self._vectors.shape[0]
+        new = max(64, old * 2)
+        vectors = np.zeros((new, self._vectors.shape[1]), dtype=np.float32)
+        vectors[:old] = self._vectors
+        self._vectors = vectors
+        self._norms = np.concatenate([self._norms, np.zeros(new - old, dtype=np.float32)])
+        # Free slots can never be beaten
+        self._thresholds = np.concatenate([self._thresholds, np.full(new - old, np.inf, dtype=np.float32)])
+        self._keys.extend([None] * (new - old))
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def _ranking_threshold(self, min_score: float) -> float:
+        # Reported L2 scores are negated distances; ranking scores are negated squared distances
+        threshold = -(min_score * min_score) if self.metric is SimilarityMetric.L2 else min_score
+        # Tolerate float32 round-off between the search's scores and this product
+        return threshold - 1e-5 * max(1.0, abs(threshold))
+
+class TermInvalidation:
+    """
+    InvalidationIndex by shared terms, through an inverted term -> entry map.
+
+    A new chunk is a candidate only for entries whose query shares at least one term with
+    the chunk's text. This is an approximation for every retriever. For BM25 it catches
+    every chunk that could enter a result (a chunk with no query term scores nothing), but
+    a write also shifts document frequencies and the average document length, which can
+    reorder cached results whose terms it does not contain; those entries are kept. For
+    other retrievers, e.g. graph retrieval, entity names in the query are expected to
+    appear in the text of the chunks they reach. Pair it with `ttl_seconds` to bound how
+    stale such entries can get.
+    """
+    def __init__(self, tokenizer: Callable[[str], List[str]] = tokenize):
+        self.tokenizer = tokenizer
+        self._keys_by_term: Dict[str, Dict[Hashable, None]] = {}
+        self._terms_by_key: Dict[Hashable, FrozenSet[str]] = {}
+
+    async def fill(self, retriever: BaseRetriever, query: Query) -> Tuple[RetrieverResult, Any]:
+        return await retriever.retrieve(query), frozenset(self.tokenizer(query.text))
+
+    def add(self, key: Hashable, signature: Any, min_score: Optional[float]) -> None:
+        self.discard(key)
+        self._terms_by_key[key] = signature
+        for term in signature:
+            self._keys_by_term.setdefault(term, {})[key] = None
+
+    def discard(self, key: Hashable) -> None:
+        for term in self._terms_by_key.pop(key, ()):
+            keys = self._keys_by_term.get(term)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._keys_by_term[term]
+
+    def affected(self, chunks: List[Chunk]) -> Dict[Hashable, List[int]]:
+        found: Dict[Hashable, List[int]] = {}
+        for position, chunk in enumerate(chunks):
+            keys: Dict[Hashable, None] = {}
+            for term in set(self.tokenizer(chunk.content)):
+                keys.update(self._keys_by_term.get(term, {}))
+            for key in keys:
+                found.setdefault(key, []).append(position)
+        return found
+
+def default_invalidation(retriever: BaseRetriever) -> InvalidationIndex:
+    """VectorInvalidation for a VectorRetriever, otherwise TermInvalidation with the retriever's tokenizer."""
+    if isinstance(retriever, VectorRetriever):
+        return VectorInvalidation(getattr(retriever.storage, "metric", SimilarityMetric.COSINE))
+    if isinstance(retriever, BM25Retriever):
+        return TermInvalidation(retriever.config.tokenizer)
+    return TermInvalidation()
+
+# --- Cached Retriever ---
+
+class CachedRetriever(BaseRetriever):
+    """
+    RetrieverResult cache in front of any BaseRetriever, invalidated selectively on writes.
+
+    Results are keyed on (text, mode, top_k, filters). Each entry records the chunk and
+    document ids it returned and the storage generation it was filled at. Writes made
+    through this object (or reported via `notify_chunks_added` / `notify_documents_removed`)
+    bump the generation and drop only the entries they can affect:
+
+    - deleting a document drops entries that returned one of its chunks;
+    - adding chunks drops entries that returned a replaced chunk id, and entries the new
+      chunks could enter: the `invalidation` index names the candidate entries (by query
+      embedding for vector retrieval, by shared terms otherwise; see `default_invalidation`),
+      and a candidate is dropped when one of its chunks also passes the entry's filters.
+
+    Invalidation never calls the embedder or the underlying retriever. A result whose
+    retrieval overlapped a write is returned but not cached.
+    """
+    def __init__(self, retriever: BaseRetriever, storage: Optional[BaseStorage] = None,
+                 config: Optional[RetrievalCacheConfig] = None, invalidation: Optional[InvalidationIndex] = None):
+        self.retriever = retriever
+        self.storage = storage
+        self.config = config or RetrievalCacheConfig()
+        self.invalidation = invalidation or default_invalidation(retriever)
+        self.stats = RetrievalCacheStats()
+        self.generation = 0
+        self._entries: "OrderedDict[RetrievalCacheKey, _CacheEntry]" = OrderedDict()
+        self._keys_by_chunk: Dict[str, Dict[RetrievalCacheKey, None]] = {}
+        self._keys_by_doc: Dict[str, Dict[RetrievalCacheKey, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- BaseRetriever ---
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        key = retrieval_cache_key(query)
+        entry = self._get(key)
+        if entry is not None:
+            return entry.result.model_copy(update={
+                "query_id": query.id,
+                "metadata": {**entry.result.metadata, "cached": True},
+            })
+        self.stats.misses += 1
+        generation = self.generation
+        result, signature = await self.invalidation.fill(self.retriever, query)
+        if generation == self.generation:
+            self._put(key, query, result, signature)
+        else:
+            self.stats.discarded_fills += 1
+        return result
+
+    # --- Writes ---
+
+    async def add_document(self, document: Document) -> None:
+        await self._require_storage().add_document(document)
+
+    async def add_chunks(self, chunks: List[Chunk]) -> None:
+        await self._require_storage().add_chunks(chunks)
+        await self.notify_chunks_added(chunks)
+
+    async def delete_document(self, doc_id: str) -> int:
+        removed = await self._require_storage().delete_document(doc_id)
+        self.notify_documents_removed([doc_id])
+        return removed
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        await self._require_storage().replace_document(document, chunks)
+        self.notify_documents_removed([document.id])
+        await self.notify_chunks_added(chunks)
+
+    async def notify_chunks_added(self, chunks: List[Chunk]) -> None:
+        """Invalidates the entries that chunks written to the underlying store could change."""
+        self.generation += 1
+        affected = self._keys_for(self._keys_by_chunk, (chunk.id for chunk in chunks))
+        for key, positions in self.invalidation.affected(chunks).items():
+            entry = self._entries.get(key)
+            if entry is None or key in affected:
+                continue
+            if any(matches(chunks[i].metadata, entry.query.filters) for i in positions):
+                affected[key] = None
+        self._invalidate(affected)
+
+    def notify_documents_removed(self, doc_ids: Iterable[str]) -> None:
+        """Invalidates the entries that returned chunks of the removed documents."""
+        self.generation += 1
+        self._invalidate(self._keys_for(self._keys_by_doc, doc_ids))
+
+    def clear(self) -> None:
+        self.generation += 1
+        for key in self._entries:
+            self.invalidation.discard(key)
+        self._entries.clear()
+        self._keys_by_chunk.clear()
+        self._keys_by_doc.clear()
+
+    # --- Entries ---
+
+    def _get(self, key: RetrievalCacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = self.config.clock() - entry.created_at
+        if self.config.ttl_seconds is not None and age > self.config.ttl_seconds:
+            self._remove(key)
+            self.stats.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        self.stats.total_hit_age += age
+        self.stats.max_hit_age = max(self.stats.max_hit_age, age)
+        self.stats.max_hit_writes_behind = max(self.stats.max_hit_writes_behind, self.generation - entry.generation)
+        return entry
+
+    def _put(self, key: RetrievalCacheKey, query: Query, result: RetrieverResult, signature: Any) -> None:
+        if key in self._entries:
+            self._remove(key)
+        chunks = result.retrieved_chunks
+        scores = result.scores
+        full = len(chunks) >= query.top_k
+        entry = _CacheEntry(
+            query=query,
+            result=result,
+            chunk_ids=frozenset(chunk.id for chunk in chunks),
+            doc_ids=frozenset(chunk.document_id for chunk in chunks),
+            min_score=min(scores) if full and scores else None,
+            created_at=self.config.clock(),
+            generation=self.generation,
+        )
+        self._entries[key] = entry
+        self.invalidation.add(key, signature, entry.min_score)
+        for chunk_id in entry.chunk_ids:
+            self._keys_by_chunk.setdefault(chunk_id, {})[key] = None
+        for doc_id in entry.doc_ids:
+            self._keys_by_doc.setdefault(doc_id, {})[key] = None
+        while len(self._entries) > self.config.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _remove(self, key: RetrievalCacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.invalidation.discard(key)
+        for index, ids in ((self._keys_by_chunk, entry.chunk_ids), (self._keys_by_doc, entry.doc_ids)):
+            for item in ids:
+                keys = index.get(item)
+                if keys is not None:
+                    keys.pop(key, None)
+                    if not keys:
+                        del index[item]
+
+    def _invalidate(self, keys: Dict[RetrievalCacheKey, None]) -> None:
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+                self.stats.invalidations += 1
+        if keys:
+            logger.debug("Invalidated %d cached retrieval results", len(keys))
+
+    @staticmethod
+    def _keys_for(index: Dict[str, Dict[RetrievalCacheKey, None]], ids: Iterable[str]) -> Dict[RetrievalCacheKey, None]:
+        keys: Dict[RetrievalCacheKey, None] = {}
+        for item in ids:
+            keys.update(index.get(item, {}))
+        return keys
+
+    def _require_storage(self) -> BaseStorage:
+        if self.storage is None:
+            raise ValueError("CachedRetriever was created without a storage to write through to")
+        return self.storage
@@ -0,0 +1,75 @@
+from typing import Dict, Optional
+from dataclasses import dataclass
+import asyncio
+
+from ..core.interfaces import BaseRetriever, BaseStorage
+from ..models.data_models import Query, RetrieverResult
+from ..models.enums import RetrievalMode
+from ..storage.entity_graph import EntityGraph
+from ..storage.metadata_index import matches
+
+@dataclass
+class GraphRetrieverConfig:
+    """Traversal bounds for GraphRetriever."""
+    hops: int = 2
+    # Heaviest edges followed per node and hop
+    fan_out: int = 32
+    # Edges lighter than this (raw weight) are never followed
+    min_edge_weight: float = 0.0
+    # Path score multiplier per hop, so nearer entities rank higher
+    hop_decay: float = 0.5
+    # New nodes kept per hop (best path scores first)
+    max_frontier: int = 1024
+
+class GraphRetriever(BaseRetriever):
+    """
+    Retriever for RetrievalMode.GRAPH.
+
+    Entities named in the query text seed a bounded k-hop expansion over an EntityGraph.
+    Each chunk attached to a visited entity scores the best path score among those
+    entities, and the top-k chunks are read back from `storage`.
+    """
+    def __init__(self, storage: BaseStorage, graph: EntityGraph, config: Optional[GraphRetrieverConfig] = None):
+        self.storage = storage
+        self.graph = graph
+        self.config = config or GraphRetrieverConfig()
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        seeds = self.graph.find_entities(query.text)
+        nodes, scores = self.graph.expand(
+            seeds,
+            hops=self.config.hops,
+            fan_out=self.config.fan_out,
+            min_weight=self.config.min_edge_weight,
+            hop_decay=self.config.hop_decay,
+            max_frontier=self.config.max_frontier,
+        )
+        chunk_scores: Dict[str, float] = {}
+        for node, score in zip(nodes.tolist(), scores.tolist()):
+            for chunk_id in self.graph.chunk_ids(node):
+                if score > chunk_scores.get(chunk_id, 0.0):
+                    chunk_scores[chunk_id] = score
+        ranked = sorted(chunk_scores.items(), key=lambda item: item[1], reverse=True)
+
+        # Read candidates a page at a time, skipping chunks missing from storage or failing filters
+        retrieved, retrieved_scores = [], []
+        page_size = max(query.top_k, 1)
+        for start in range(0, len(ranked), page_size):
+            if len(retrieved) >= query.top_k:
+                break
+            page = ranked[start:start + page_size]
+            chunks = await asyncio.gather(*(self.storage.get_chunk(chunk_id) for chunk_id, _ in page))
+            for chunk, (_, score) in zip(chunks, page):
+                if chunk is not None and matches(chunk.metadata, query.filters) and len(retrieved) < query.top_k:
+                    retrieved.append(chunk)
+                    retrieved_scores.append(score)
+        return RetrieverResult(
+            query_id=query.id,
+            retrieved_chunks=retrieved,
+            scores=retrieved_scores,
+            metadata={
+                "mode": RetrievalMode.GRAPH.name,
+                "seed_entities": [self.graph.name(node) for node in seeds],
+                "visited_entities": int(nodes.shape[0]),
+            }
+        )
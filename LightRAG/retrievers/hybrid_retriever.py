@@ -0,0 +1,110 @@
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import logging
+import time
+
+from ..core.interfaces import BaseRetriever
+from ..models.data_models import Chunk, Query, RetrieverResult
+from ..models.enums import FusionStrategy, RetrievalMode
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HybridBranch:
+    """One retriever fanned out to by HybridRetriever."""
+    name: str
+    retriever: BaseRetriever
+    weight: float = 1.0
+    # Seconds before this branch is dropped from the query; None uses the config default
+    timeout: Optional[float] = None
+
+@dataclass
+class HybridRetrieverConfig:
+    """Configuration for HybridRetriever."""
+    fusion: FusionStrategy = FusionStrategy.RECIPROCAL_RANK
+    # RRF damping constant: larger values flatten the gap between top and lower ranks
+    rrf_k: int = 60
+    # Each branch is asked for top_k * candidate_multiplier results to fuse
+    candidate_multiplier: int = 2
+    default_timeout: Optional[float] = None
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever for RetrievalMode.HYBRID: runs every branch concurrently and fuses the rankings.
+
+    Branches run under `asyncio.gather`, each with its own deadline; a branch that times
+    out or raises is dropped from the fusion instead of failing or delaying the query.
+    The result metadata records each branch's latency, status and result count, plus the
+    branches that contributed at least one returned chunk.
+    """
+    def __init__(self, branches: List[HybridBranch], config: Optional[HybridRetrieverConfig] = None):
+        if len({branch.name for branch in branches}) != len(branches):
+            raise ValueError("Hybrid branch names must be unique")
+        self.branches = branches
+        self.config = config or HybridRetrieverConfig()
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        branch_query = query.model_copy(update={"top_k": query.top_k * self.config.candidate_multiplier})
+        outcomes = await asyncio.gather(*(self._run_branch(branch, branch_query) for branch in self.branches))
+
+        branch_stats: Dict[str, Dict] = {}
+        ranked_lists: List[Tuple[HybridBranch, RetrieverResult]] = []
+        for branch, (result, status, latency) in zip(self.branches, outcomes):
+            branch_stats[branch.name] = {
+                "status": status,
+                "latency_ms": round(latency * 1000.0, 3),
+                "results": len(result.retrieved_chunks) if result is not None else 0,
+            }
+            if result is not None:
+                ranked_lists.append((branch, result))
+
+        fused, sources = self._fuse(ranked_lists)
+        top = sorted(fused.items(), key=lambda item: item[1][1], reverse=True)[:query.top_k]
+        contributing = {name for chunk_id, _ in top for name in sources[chunk_id]}
+        return RetrieverResult(
+            query_id=query.id,
+            retrieved_chunks=[chunk for _, (chunk, _) in top],
+            scores=[score for _, (_, score) in top],
+            metadata={
+                "mode": RetrievalMode.HYBRID.name,
+                "fusion": self.config.fusion.name,
+                "branches": branch_stats,
+                "contributing_branches": [branch.name for branch in self.branches if branch.name in contributing],
+            }
+        )
+
+    async def _run_branch(self, branch: HybridBranch, query: Query) -> Tuple[Optional[RetrieverResult], str, float]:
+        """Runs one branch under its deadline; returns (result or None, status, seconds elapsed)."""
+        timeout = branch.timeout if branch.timeout is not None else self.config.default_timeout
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(branch.retriever.retrieve(query), timeout)
+            return result, "ok", time.perf_counter() - started
+        except asyncio.TimeoutError:
+            logger.warning("Hybrid branch '%s' timed out after %.3fs", branch.name, timeout)
+            return None, "timeout", time.perf_counter() - started
+        except Exception:
+            logger.exception("Hybrid branch '%s' failed", branch.name)
+            return None, "error", time.perf_counter() - started
+
+    def _fuse(self, ranked_lists: List[Tuple[HybridBranch, RetrieverResult]]) -> Tuple[Dict[str, Tuple[Chunk, float]], Dict[str, List[str]]]:
+        """Fused (chunk, score) per chunk id, and the branches that returned each chunk."""
+        fused: Dict[str, Tuple[Chunk, float]] = {}
+        sources: Dict[str, List[str]] = {}
+        for branch, result in ranked_lists:
+            for chunk, contribution in zip(result.retrieved_chunks, self._contributions(result)):
+                chunk_obj, score = fused.get(chunk.id, (chunk, 0.0))
+                fused[chunk.id] = (chunk_obj, score + branch.weight * contribution)
+                sources.setdefault(chunk.id, []).append(branch.name)
+        return fused, sources
+
+    def _contributions(self, result: RetrieverResult) -> List[float]:
+        count = len(result.retrieved_chunks)
+        if self.config.fusion is FusionStrategy.RECIPROCAL_RANK or not result.scores:
+            # Rank-based; also the fallback for branches that report no scores
+            return [1.0 / (self.config.rrf_k + rank) for rank in range(1, count + 1)]
+        low, high = min(result.scores), max(result.scores)
+        if high == low:
+            return [1.0] * count
+        return [(score - low) / (high - low) for score in result.scores]
@@ -0,0 +1,55 @@
+from typing import List, Dict, Tuple
+import json
+
+import numpy as np
+
+from ..core.interfaces import BaseRetriever, BaseVectorStorage, EmbeddingFunction
+from ..models.data_models import Chunk, Query, RetrieverResult
+
+class VectorRetriever(BaseRetriever):
+    """Embeds the query text and ranks chunks by vector similarity in a BaseVectorStorage."""
+    def __init__(self, storage: BaseVectorStorage, embedding_func: EmbeddingFunction):
+        self.storage = storage
+        self.embedding_func = embedding_func
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """Embeds a single query text as a float32 vector."""
+        embeddings = await self.embedding_func([text])
+        return np.asarray(embeddings, dtype=np.float32).reshape(1, -1)[0]
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        result, _ = await self.retrieve_with_embedding(query)
+        return result
+
+    async def retrieve_with_embedding(self, query: Query) -> Tuple[RetrieverResult, np.ndarray]:
+        """Like retrieve, also returning the query embedding it searched with."""
+        query_embedding = await self.embed_query(query.text)
+        scored = await self.storage.search_similar_chunks_with_scores(query_embedding, query.top_k, query.filters)
+        return self._to_result(query, scored), query_embedding
+
+    async def retrieve_many(self, queries: List[Query]) -> List[RetrieverResult]:
+        """Embeds all query texts in one call and searches each group of same-filter queries as one batch."""
+        if not queries:
+            return []
+        embeddings = np.asarray(await self.embedding_func([query.text for query in queries]), dtype=np.float32)
+        embeddings = embeddings.reshape(len(queries), -1)
+        groups: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            groups.setdefault(json.dumps(query.filters, sort_keys=True, default=str), []).append(i)
+
+        results: List[RetrieverResult] = [None] * len(queries)
+        for indices in groups.values():
+            # One search at the largest top_k in the group; smaller requests are truncated
+            top_k = max(queries[i].top_k for i in indices)
+            batch = await self.storage.search_similar_chunks_batch(embeddings[indices], top_k, queries[indices[0]].filters)
+            for i, scored in zip(indices, batch):
+                results[i] = self._to_result(queries[i], scored[:queries[i].top_k])
+        return results
+
+    def _to_result(self, query: Query, scored: List[Tuple[Chunk, float]]) -> RetrieverResult:
+        return RetrieverResult(
+            query_id=query.id,
+            retrieved_chunks=[chunk for chunk, _ in scored],
+            scores=[score for _, score in scored],
+            metadata={"mode": query.mode.name}
+        )
@@ -0,0 +1,313 @@
+from typing import List, Dict, Optional, Tuple, Callable, Sequence
+import heapq
+import math
+import random
+
+import numpy as np
+
+from ..models.enums import SimilarityMetric
+from . import similarity
+from .kmeans import kmeans, assign_nearest
+
+# Returns the live (matrix, norms) pair of the owning storage. A callable is used because
+# the storage reallocates its matrix as it grows.
+VectorSource = Callable[[], Tuple[np.ndarray, np.ndarray]]
+
+def _empty_result() -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+# --- Graph-Based Index ---
+
+class HNSWIndex:
+    """
+    Hierarchical navigable small world graph over storage rows.
+
+    Nodes are matrix row numbers; vectors are read from the owning storage rather than
+    copied. Inserts are incremental, and `accept` masks (deleted or filtered rows) keep rows
+    navigable while excluding them from results.
+    """
+    def __init__(self, metric: SimilarityMetric, vector_source: VectorSource, m: int = 16, ef_construction: int = 100, seed: int = 0):
+        self.metric = metric
+        self.m = m
+        self.max_links_layer0 = 2 * m
+        self.ef_construction = ef_construction
+        self._vector_source = vector_source
+        self._level_mult = 1.0 / math.log(max(m, 2))
+        self._rng = random.Random(seed)
+        # One adjacency dict per layer: row -> neighbour rows
+        self._layers: List[Dict[int, List[int]]] = []
+        self._entry_point: Optional[int] = None
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        return len(self._layers[0]) if self._layers else 0
+
+    def add(self, rows: Sequence[int]) -> None:
+        """Inserts rows (already written to the storage matrix) into the graph."""
+        matrix, _ = self._vector_source()
+        for row in rows:
+            self._insert(int(row), matrix[row])
+
+    def remap(self, mapping: np.ndarray) -> None:
+        """
+        Follows a storage compaction without re-inserting surviving rows: dropped nodes are
+        unlinked, each node that lost a link is reconnected to the best of the dropped
+        neighbours' own links (capped as on insert), and rows are renumbered. Only nodes left
+        with no links at all are re-inserted.
+        """
+        new_row = mapping.tolist()
+        for layer, adjacency in enumerate(self._layers):
+            max_links = self.max_links_layer0 if layer == 0 else self.m
+            repaired: Dict[int, List[int]] = {}
+            for row, links in adjacency.items():
+                if new_row[row] < 0:
+                    continue
+                kept = [new_row[node] for node in links if new_row[node] >= 0]
+                if len(kept) < len(links):
+                    # Two-hop candidates through the dropped neighbours
+                    seen = set(kept)
+                    seen.add(new_row[row])
+                    for node in links:
+                        if new_row[node] >= 0:
+                            continue
+                        for candidate in adjacency[node]:
+                            if new_row[candidate] >= 0 and new_row[candidate] not in seen:
+                                seen.add(new_row[candidate])
+                                kept.append(new_row[candidate])
+                    if len(kept) > max_links:
+                        # The storage matrix is already compacted, so new row numbers index it
+                        self._shrink_links(new_row[row], kept, max_links)
+                repaired[new_row[row]] = kept
+            self._layers[layer] = repaired
+        if self._entry_point is not None:
+            self._entry_point = new_row[self._entry_point] if new_row[self._entry_point] >= 0 else None
+
+        orphans = [row for row, links in self._layers[0].items() if not links] if self._layers and len(self._layers[0]) > 1 else []
+        for adjacency in self._layers:
+            for row in orphans:
+                adjacency.pop(row, None)
+        self._fix_entry_point()
+        self.add(orphans)
+
+    def search(self, query: np.ndarray, top_k: int, accept: Optional[np.ndarray] = None, ef_search: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (rows, ranking scores) of the approximate top_k accepted rows, best first."""
+        if self._entry_point is None or top_k <= 0:
+            return _empty_result()
+        entry = self._entry_point
+        entry_score = float(self._scores(query, [entry])[0])
+        for layer in range(self._max_level, 0, -1):
+            entry, entry_score = self._greedy_closest(query, entry, entry_score, layer)
+        found = self._search_layer(query, [(entry_score, entry)], max(ef_search, top_k), 0, accept)[:top_k]
+        rows = np.asarray([row for _, row in found], dtype=np.int64)
+        scores = np.asarray([score for score, _ in found], dtype=np.float32)
+        return rows, scores
+
+    # --- Internals ---
+
+    def _scores(self, query: np.ndarray, rows: List[int]) -> np.ndarray:
+        matrix, norms = self._vector_source()
+        index = np.asarray(rows, dtype=np.int64)
+        return similarity.ranking_scores(matrix[index], norms[index], query, self.metric)
+
+    def _insert(self, row: int, vector: np.ndarray) -> None:
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        while len(self._layers) <= level:
+            self._layers.append({})
+        if self._entry_point is None:
+            for layer in range(level + 1):
+                self._layers[layer][row] = []
+            self._entry_point, self._max_level = row, level
+            return
+
+        entry = self._entry_point
+        entry_score = float(self._scores(vector, [entry])[0])
+        for layer in range(self._max_level, level, -1):
+            entry, entry_score = self._greedy_closest(vector, entry, entry_score, layer)
+
+        candidates = [(entry_score, entry)]
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(vector, candidates, self.ef_construction, layer)
+            neighbours = [node for _, node in found[:self.m]]
+            self._layers[layer][row] = neighbours
+            max_links = self.max_links_layer0 if layer == 0 else self.m
+            for node in neighbours:
+                links = self._layers[layer][node]
+                links.append(row)
+                if len(links) > max_links:
+                    self._shrink_links(node, links, max_links)
+            candidates = found
+
+        for layer in range(self._max_level + 1, level + 1):
+            self._layers[layer][row] = []
+        if level > self._max_level:
+            self._entry_point, self._max_level = row, level
+
+    def _fix_entry_point(self) -> None:
+        """Drops empty top layers and keeps the entry point on the (new) top layer."""
+        while self._layers and not self._layers[-1]:
+            self._layers.pop()
+        self._max_level = len(self._layers) - 1
+        if not self._layers:
+            self._entry_point = None
+        elif self._entry_point not in self._layers[-1]:
+            self._entry_point = next(iter(self._layers[-1]))
+
+    def _shrink_links(self, node: int, links: List[int], max_links: int) -> None:
+        """Keeps only the `max_links` neighbours closest to `node`."""
+        matrix, _ = self._vector_source()
+        scores = self._scores(matrix[node], links)
+        keep = np.argsort(-scores, kind="stable")[:max_links]
+        links[:] = [links[i] for i in keep.tolist()]
+
+    def _greedy_closest(self, query: np.ndarray, entry: int, entry_score: float, layer: int) -> Tuple[int, float]:
+        """Walks to the locally best node on an upper layer."""
+        while True:
+            neighbours = self._layers[layer].get(entry)
+            if not neighbours:
+                return entry, entry_score
+            scores = self._scores(query, neighbours)
+            best = int(np.argmax(scores))
+            if scores[best] <= entry_score:
+                return entry, entry_score
+            entry, entry_score = neighbours[best], float(scores[best])
+
+    def _search_layer(self, query: np.ndarray, entries: List[Tuple[float, int]], ef: int, layer: int, accept: Optional[np.ndarray] = None) -> List[Tuple[float, int]]:
+        """Beam search keeping the `ef` best accepted nodes; returns (score, row) pairs best first."""
+        adjacency = self._layers[layer]
+        visited = {row for _, row in entries}
+        candidates = [(-score, row) for score, row in entries]
+        heapq.heapify(candidates)
+        results: List[Tuple[float, int]] = []
+        for score, row in entries:
+            if accept is None or accept[row]:
+                heapq.heappush(results, (score, row))
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative_score, row = heapq.heappop(candidates)
+            if len(results) >= ef and -negative_score < results[0][0]:
+                break
+            neighbours = [node for node in adjacency.get(row, ()) if node not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for node, score in zip(neighbours, self._scores(query, neighbours).tolist()):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, node))
+                    if accept is None or accept[node]:
+                        heapq.heappush(results, (score, node))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+# --- Partition-Based Index ---
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are bucketed under their nearest k-means centroid and a query
+    scores only the rows in its `nprobe` nearest buckets.
+
+    Rows added before the centroids are trained are kept in a pending list and searched
+    exhaustively; training happens automatically once `train_size` rows have arrived.
+    New rows after training are assigned to the existing centroids, so adds never trigger
+    a rebuild.
+    """
+    def __init__(self, metric: SimilarityMetric, vector_source: VectorSource, nlist: int = 256, train_size: Optional[int] = None, seed: int = 0):
+        self.metric = metric
+        self.nlist = nlist
+        # Rule of thumb: ~39 training points per centroid
+        self.train_size = train_size or nlist * 39
+        self.seed = seed
+        self._vector_source = vector_source
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        # Lazily rebuilt numpy views of `_lists`, invalidated on append
+        self._list_arrays: List[Optional[np.ndarray]] = []
+        self._pending: List[int] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._pending) + sum(len(rows) for rows in self._lists)
+
+    def add(self, rows: Sequence[int]) -> None:
+        rows = [int(row) for row in rows]
+        if self.is_trained:
+            self._assign(rows)
+            return
+        self._pending.extend(rows)
+        if len(self._pending) >= self.train_size:
+            self.train()
+
+    def train(self) -> None:
+        """Trains centroids on the pending rows and distributes them into buckets."""
+        if not self._pending:
+            return
+        matrix, _ = self._vector_source()
+        sample = self._coarse_vectors(matrix[np.asarray(self._pending, dtype=np.int64)])
+        self._centroids = kmeans(sample, self.nlist, seed=self.seed)
+        self._lists = [[] for _ in range(self._centroids.shape[0])]
+        self._list_arrays = [None] * len(self._lists)
+        pending, self._pending = self._pending, []
+        self._assign(pending)
+
+    def remap(self, mapping: np.ndarray) -> None:
+        """Follows a storage compaction by renumbering bucket entries; centroids are kept."""
+        def renumber(rows: List[int]) -> List[int]:
+            renumbered = mapping[np.asarray(rows, dtype=np.int64)] if rows else np.empty(0, dtype=np.int64)
+            return renumbered[renumbered >= 0].tolist()
+        self._pending = renumber(self._pending)
+        self._lists = [renumber(rows) for rows in self._lists]
+        self._list_arrays = [None] * len(self._lists)
+
+    def search(self, query: np.ndarray, top_k: int, accept: Optional[np.ndarray] = None, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (rows, ranking scores) of the top_k accepted rows within the probed buckets."""
+        if top_k <= 0:
+            return _empty_result()
+        if self.is_trained:
+            probe = self._nearest_centroids(query, nprobe)
+            rows = np.concatenate([self._list_array(bucket) for bucket in probe.tolist()])
+        else:
+            rows = np.asarray(self._pending, dtype=np.int64)
+        if accept is not None and rows.size:
+            rows = rows[accept[rows]]
+        if rows.size == 0:
+            return _empty_result()
+        matrix, norms = self._vector_source()
+        scores = similarity.ranking_scores(matrix[rows], norms[rows], query, self.metric)
+        selected = similarity.top_k_indices(scores, top_k)
+        return rows[selected], scores[selected]
+
+    # --- Internals ---
+
+    def _coarse_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """Space the centroids live in: unit sphere for cosine, raw vectors otherwise."""
+        if self.metric is SimilarityMetric.COSINE:
+            norms = similarity.row_norms(vectors)
+            return vectors / np.where(norms > 0, norms, 1.0)[:, None]
+        return vectors
+
+    def _assign(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        matrix, _ = self._vector_source()
+        labels = assign_nearest(self._coarse_vectors(matrix[np.asarray(rows, dtype=np.int64)]), self._centroids)
+        for row, bucket in zip(rows, labels.tolist()):
+            self._lists[bucket].append(row)
+            self._list_arrays[bucket] = None
+
+    def _nearest_centroids(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        coarse = self._coarse_vectors(query[None, :])[0]
+        distances = np.einsum("ij,ij->i", self._centroids, self._centroids) - 2.0 * (self._centroids @ coarse)
+        nprobe = min(max(nprobe, 1), distances.shape[0])
+        return np.argpartition(distances, nprobe - 1)[:nprobe]
+
+    def _list_array(self, bucket: int) -> np.ndarray:
+        array = self._list_arrays[bucket]
+        if array is None:
+            array = np.asarray(self._lists[bucket], dtype=np.int64)
+            self._list_arrays[bucket] = array
+        return array
@@ -0,0 +1,104 @@
+from typing import List, Optional, Tuple, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..models.data_models import Chunk, Metadata
+from ..models.enums import ANNIndexType
+from . import similarity
+from .ann_index import HNSWIndex, IVFIndex
+from .vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+# --- Configuration ---
+
+@dataclass
+class ANNStorageConfig(VectorStorageConfig):
+    """Configuration for ANNVectorStorage. Build-time and default query-time knobs per index type."""
+    index_type: ANNIndexType = ANNIndexType.HNSW
+    # HNSW: links per node, build beam width, default query beam width
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 100
+    hnsw_ef_search: int = 64
+    # IVF: number of centroids, default buckets probed per query, rows used to train centroids
+    ivf_nlist: int = 256
+    ivf_nprobe: int = 8
+    ivf_train_size: Optional[int] = None
+    # Below this many searchable rows an exact scan is cheaper than walking the index
+    exact_search_threshold: int = 2048
+    # Filters estimated to match at most this many rows are scored exactly instead of via the index
+    exact_candidate_limit: int = 4096
+    seed: int = 0
+
+# --- Storage Implementation ---
+
+class ANNVectorStorage(InMemoryVectorStorage):
+    """
+    Vector storage that answers searches from an approximate nearest-neighbour index.
+
+    Embeddings still live in the contiguous matrix of InMemoryVectorStorage; the HNSW or
+    IVF index only holds row numbers, so `add_chunks` extends the index incrementally
+    without copying vectors or rebuilding.
+
+    With HNSW, deleted rows are not compacted away automatically: they stay in the graph as
+    routing-only tombstones (searches never return them), so a delete never stalls on graph
+    repair. An explicit `compact` reclaims them, repairing the graph locally around the
+    dropped nodes.
+    """
+    def __init__(self, config: Optional[ANNStorageConfig] = None):
+        super().__init__(config or ANNStorageConfig())
+        vector_source = lambda: (self._matrix, self._norms)
+        if self.config.index_type is ANNIndexType.HNSW:
+            self._index = HNSWIndex(self.metric, vector_source, m=self.config.hnsw_m,
+                                    ef_construction=self.config.hnsw_ef_construction, seed=self.config.seed)
+        else:
+            self._index = IVFIndex(self.metric, vector_source, nlist=self.config.ivf_nlist,
+                                   train_size=self.config.ivf_train_size, seed=self.config.seed)
+
+    @property
+    def index(self):
+        return self._index
+
+    def _on_rows_added(self, rows: np.ndarray) -> None:
+        self._index.add(rows.tolist())
+
+    def _on_compact(self, mapping: np.ndarray) -> None:
+        self._index.remap(mapping)
+
+    def _maybe_compact(self) -> None:
+        if self.config.index_type is not ANNIndexType.HNSW:
+            super()._maybe_compact()
+
+    async def search_similar_chunks_with_scores(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None,
+                                                *, ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                                exact: bool = False) -> List[Tuple[Chunk, float]]:
+        """
+        Approximate top-k search. `ef_search` (HNSW) and `nprobe` (IVF) override the configured
+        query-time defaults for this call; `exact=True` forces a full scan.
+        """
+        if exact or self._live_count <= self.config.exact_search_threshold:
+            return await super().search_similar_chunks_with_scores(query_embedding, top_k, filters)
+        if top_k <= 0:
+            return []
+        accept = self._live[:self._size] if self._live_count < self._size else None
+        if filters:
+            if self._metadata_index.estimate(filters) <= self.config.exact_candidate_limit:
+                return await super().search_similar_chunks_with_scores(query_embedding, top_k, filters)
+            accept = self._filter_mask(filters)
+
+        query = similarity.as_query_vector(query_embedding, self._dim)
+        if self.config.index_type is ANNIndexType.HNSW:
+            found_rows, scores = self._index.search(query, top_k, accept, ef_search=ef_search or self.config.hnsw_ef_search)
+        else:
+            found_rows, scores = self._index.search(query, top_k, accept, nprobe=nprobe or self.config.ivf_nprobe)
+        return self._collect(found_rows, scores)
+
+    async def search_similar_chunks_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int, filters: Optional[Metadata] = None,
+                                          *, ef_search: Optional[int] = None, nprobe: Optional[int] = None,
+                                          exact: bool = False) -> List[List[Tuple[Chunk, float]]]:
+        """Batched search: one exact matrix-matrix pass when the store is small, else one index walk per query."""
+        if exact or self._live_count <= self.config.exact_search_threshold:
+            return await super().search_similar_chunks_batch(query_embeddings, top_k, filters)
+        return [
+            await self.search_similar_chunks_with_scores(query, top_k, filters, ef_search=ef_search, nprobe=nprobe)
+            for query in similarity.as_query_matrix(query_embeddings, self._dim)
+        ]
@@ -0,0 +1,81 @@
+from typing import Iterable, List
+import hashlib
+import math
+import os
+import struct
+
+import numpy as np
+
+# --- File Layout ---
+# [header: magic, version, num_bits, num_hashes][bit array, num_bits / 8 bytes]
+
+MAGIC = b"LRBF"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQI")
+
+class BloomFilter:
+    """
+    Set-membership filter over string keys with no false negatives.
+
+    Keys are hashed once into a pair of 64-bit values (`hash_keys`), and the filter's
+    probe positions are derived from that pair by double hashing, so one batch of hashes
+    can be tested against any number of filters with a few vectorised numpy operations.
+    """
+    def __init__(self, num_bits: int, num_hashes: int):
+        self.num_bits = max(8, num_bits + (-num_bits) % 8)
+        self.num_hashes = max(1, num_hashes)
+        self._bits = np.zeros(self.num_bits // 8, dtype=np.uint8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = 0.01) -> "BloomFilter":
+        """A filter sized so `capacity` keys give about `false_positive_rate` false positives."""
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        return cls(num_bits, round(num_bits / capacity * math.log(2)))
+
+    @staticmethod
+    def hash_keys(keys: Iterable[str]) -> np.ndarray:
+        """(n, 2) uint64 hash pairs for the keys, reusable across filters."""
+        digests = b"".join(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest() for key in keys)
+        return np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+
+    def add(self, keys: Iterable[str]) -> None:
+        self.add_hashes(self.hash_keys(keys))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def might_contain(self, keys: List[str]) -> np.ndarray:
+        return self.contains_hashes(self.hash_keys(keys))
+
+    def contains_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Boolean mask: False means the key was certainly never added."""
+        positions = self._positions(hashes)
+        return np.all((self._bits[positions >> 3] >> (positions & 7)) & 1, axis=1)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        probes = np.arange(self.num_hashes, dtype=np.uint64)
+        # uint64 arithmetic wraps, which is fine for hashing
+        combined = hashes[:, :1] + probes[None, :] * (hashes[:, 1:] | np.uint64(1))
+        return (combined % np.uint64(self.num_bits)).astype(np.int64)
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        with open(path + ".tmp", "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.num_bits, self.num_hashes))
+            f.write(self._bits.tobytes())
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, version, num_bits, num_hashes = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} bloom filter")
+            bloom = cls(num_bits, num_hashes)
+            bloom._bits = np.frombuffer(f.read(), dtype=np.uint8).copy()
+        if bloom._bits.shape[0] != bloom.num_bits // 8:
+            raise ValueError(f"{path} is truncated")
+        return bloom
@@ -0,0 +1,205 @@
+from typing import List, Dict, Iterable, Optional, Sequence, Tuple
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def _normalize(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_PATTERN.findall(text.lower()))
+
+class EntityGraph:
+    """
+    Entity/relation graph with chunk ids attached to entities, traversed via CSR arrays.
+
+    Entities and weighted relations are added incrementally. The first traversal after a
+    change freezes the edges into compressed sparse row arrays (`indptr`, `indices`,
+    `weights`), with each node's neighbours sorted by descending weight. A k-hop expansion
+    then touches only contiguous slices of those arrays, one vectorised gather per hop,
+    instead of looking up edge attributes one dict at a time.
+
+    Relations are traversed in both directions unless `directed` is set.
+    """
+    def __init__(self, directed: bool = False):
+        self.directed = directed
+        self._node_ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._chunks_by_node: List[List[str]] = []
+        self._ids_by_name_tokens: Dict[Tuple[str, ...], int] = {}
+        self._max_name_tokens = 0
+        # Pending edges, appended in blocks
+        self._sources: List[np.ndarray] = []
+        self._targets: List[np.ndarray] = []
+        self._edge_weights: List[np.ndarray] = []
+        # Frozen CSR arrays, rebuilt lazily after changes
+        self._indptr: Optional[np.ndarray] = None
+        self._indices: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._max_weight = 1.0
+
+    # --- Construction ---
+
+    def add_entity(self, name: str, chunk_ids: Iterable[str] = ()) -> int:
+        """Adds an entity (or returns the existing one) and links it to chunk ids."""
+        node = self._node_ids.get(name)
+        if node is None:
+            node = self._node_ids[name] = len(self._names)
+            self._names.append(name)
+            self._chunks_by_node.append([])
+            tokens = _normalize(name)
+            if tokens:
+                self._ids_by_name_tokens.setdefault(tokens, node)
+                self._max_name_tokens = max(self._max_name_tokens, len(tokens))
+            self._indptr = None
+        chunks = self._chunks_by_node[node]
+        for chunk_id in chunk_ids:
+            if chunk_id not in chunks:
+                chunks.append(chunk_id)
+        return node
+
+    def add_relation(self, source: str, target: str, weight: float = 1.0) -> None:
+        self.add_relations([source], [target], [weight])
+
+    def add_relations(self, sources: Sequence[str], targets: Sequence[str], weights: Optional[Sequence[float]] = None) -> None:
+        """Adds many weighted relations at once; unknown entity names are created."""
+        node_ids = self._node_ids
+        resolve = lambda name: node_ids[name] if name in node_ids else self.add_entity(name)
+        source_ids = np.fromiter(map(resolve, sources), dtype=np.int64, count=len(sources))
+        target_ids = np.fromiter(map(resolve, targets), dtype=np.int64, count=len(targets))
+        weights = np.ones(len(sources), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+        if np.any(weights <= 0):
+            raise ValueError("Relation weights must be positive")
+        self._sources.append(source_ids)
+        self._targets.append(target_ids)
+        self._edge_weights.append(weights)
+        self._indptr = None
+
+    @classmethod
+    def from_networkx(cls, graph, weight: str = "weight", chunk_ids: str = "chunk_ids") -> "EntityGraph":
+        """Copies a networkx graph; node attribute `chunk_ids` and edge attribute `weight` are optional."""
+        entity_graph = cls(directed=graph.is_directed())
+        for node, data in graph.nodes(data=True):
+            entity_graph.add_entity(str(node), data.get(chunk_ids, ()))
+        edges = list(graph.edges(data=True))
+        entity_graph.add_relations(
+            [str(source) for source, _, _ in edges],
+            [str(target) for _, target, _ in edges],
+            [data.get(weight, 1.0) for _, _, data in edges],
+        )
+        return entity_graph
+
+    # --- Lookups ---
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._names)
+
+    @property
+    def num_edges(self) -> int:
+        """Stored relations (each counted once, even when traversed both ways)."""
+        return sum(block.shape[0] for block in self._sources)
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._node_ids.get(name)
+
+    def name(self, node: int) -> str:
+        return self._names[node]
+
+    def chunk_ids(self, node: int) -> List[str]:
+        return self._chunks_by_node[node]
+
+    def find_entities(self, text: str) -> List[int]:
+        """Entities whose (normalised) name occurs in `text`, longest match first."""
+        tokens = _normalize(text)
+        found: Dict[int, None] = {}
+        for length in range(min(self._max_name_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - length + 1):
+                node = self._ids_by_name_tokens.get(tokens[start:start + length])
+                if node is not None:
+                    found[node] = None
+        return list(found)
+
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbour ids and raw edge weights of `node`, heaviest first."""
+        self._freeze()
+        start, end = self._indptr[node], self._indptr[node + 1]
+        return self._indices[start:end], self._weights[start:end]
+
+    # --- Traversal ---
+
+    def expand(self, seeds: Sequence[int], hops: int = 2, fan_out: int = 32, min_weight: float = 0.0,
+               hop_decay: float = 0.5, max_frontier: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bounded k-hop expansion from `seeds` (score 1.0 each).
+
+        Each hop follows at most `fan_out` of a node's heaviest edges and ignores edges
+        lighter than `min_weight`. A node reached over a path scores the product of its
+        edge weights (relative to the heaviest edge in the graph) times `hop_decay` per
+        hop, keeping its best path. Only the `max_frontier` best new nodes of a hop are
+        expanded further. Returns (node ids, path scores), seeds included.
+        """
+        self._freeze()
+        frontier = np.unique(np.asarray(seeds, dtype=np.int64))
+        frontier_scores = np.ones(frontier.shape[0], dtype=np.float32)
+        # np.zeros is backed by calloc, so untouched pages of large graphs cost nothing
+        seen = np.zeros(self.num_nodes, dtype=bool)
+        seen[frontier] = True
+        visited, visited_scores = [frontier], [frontier_scores]
+        for _ in range(hops):
+            if frontier.shape[0] == 0:
+                break
+            starts = self._indptr[frontier]
+            degrees = np.minimum(self._indptr[frontier + 1] - starts, fan_out)
+            total = int(degrees.sum())
+            if total == 0:
+                break
+            # Flattened edge positions of every frontier node's first `degrees` neighbours
+            parents = np.repeat(np.arange(frontier.shape[0]), degrees)
+            offsets = np.arange(total) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+            edges = starts[parents] + offsets
+            weights = self._weights[edges]
+            keep = weights >= min_weight
+            nodes = self._indices[edges[keep]]
+            scores = frontier_scores[parents[keep]] * (weights[keep] / self._max_weight) * hop_decay
+            unseen = ~seen[nodes]
+            nodes, scores = nodes[unseen], scores[unseen]
+            if nodes.shape[0] == 0:
+                break
+            # Best path per node: sort by (node, -score) and keep each node's first entry
+            order = np.lexsort((-scores, nodes))
+            nodes, scores = nodes[order], scores[order]
+            first = np.concatenate(([True], nodes[1:] != nodes[:-1]))
+            nodes, scores = nodes[first], scores[first].astype(np.float32)
+            if nodes.shape[0] > max_frontier:
+                best = np.argpartition(-scores, max_frontier - 1)[:max_frontier]
+                nodes, scores = nodes[best], scores[best]
+            seen[nodes] = True
+            visited.append(nodes)
+            visited_scores.append(scores)
+            frontier, frontier_scores = nodes, scores
+        return np.concatenate(visited), np.concatenate(visited_scores)
+
+    def _freeze(self) -> None:
+        if self._indptr is not None:
+            return
+        if self._sources:
+            sources = np.concatenate(self._sources)
+            targets = np.concatenate(self._targets)
+            weights = np.concatenate(self._edge_weights)
+        else:
+            sources = targets = np.empty(0, dtype=np.int64)
+            weights = np.empty(0, dtype=np.float32)
+        if not self.directed:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+            weights = np.concatenate((weights, weights))
+        # Group by source, heaviest edge first within each group
+        order = np.lexsort((-weights, sources))
+        sources = sources[order]
+        self._indices = targets[order]
+        self._weights = weights[order]
+        self._indptr = np.searchsorted(sources, np.arange(self.num_nodes + 1))
+        self._max_weight = float(weights.max()) if weights.shape[0] else 1.0
+        logger.debug("Froze entity graph: %d nodes, %d adjacency entries", self.num_nodes, self._indices.shape[0])
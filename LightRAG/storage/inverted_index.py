@@ -0,0 +1,271 @@
+from typing import List, Dict, Optional, Tuple
+import logging
+import math
+import re
+
+import numpy as np
+
+from ..models.data_models import Metadata
+from .metadata_index import MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Default analyzer: lower-cased runs of word characters."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+class _TermPosting:
+    """Append-only rows (ascending) and term frequencies for one term."""
+    __slots__ = ("rows", "tfs", "size", "df", "max_tf", "min_length")
+
+    def __init__(self):
+        self.rows = np.empty(4, dtype=np.int64)
+        self.tfs = np.empty(4, dtype=np.float32)
+        self.size = 0
+        # Live rows containing the term
+        self.df = 0
+        # Bounds over every row ever appended; kept conservative across deletes for MaxScore
+        self.max_tf = 0.0
+        self.min_length = math.inf
+
+    def append(self, row: int, tf: int, length: int) -> None:
+        if self.size == self.rows.shape[0]:
+            self.rows = np.resize(self.rows, self.size * 2)
+            self.tfs = np.resize(self.tfs, self.size * 2)
+        self.rows[self.size] = row
+        self.tfs[self.size] = tf
+        self.size += 1
+        self.df += 1
+        self.max_tf = max(self.max_tf, float(tf))
+        self.min_length = min(self.min_length, float(length))
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.rows[:self.size], self.tfs[:self.size]
+
+class InvertedIndex:
+    """
+    Incremental BM25 index over chunk texts.
+
+    Each added chunk gets the next row; postings store (row, term frequency) with rows in
+    ascending order, next to an array of row lengths. Removed chunks leave dead rows that
+    are skipped during scoring and dropped by `compact` once they are a large enough share.
+
+    `search` runs MaxScore over the query terms. Each term has a score upper bound (from
+    its largest tf and shortest row). Terms are processed in descending bound order, and
+    full postings are only merged while the remaining bounds could still lift an unseen
+    row into the top-k. The remaining terms are only probed (binary search) for rows that
+    are already candidates, and candidates that cannot reach the current k-th score are
+    pruned, so most postings of common terms are never read.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compaction_threshold: float = 0.3, compaction_min_dead_rows: int = 1024):
+        self.k1 = k1
+        self.b = b
+        self.compaction_threshold = compaction_threshold
+        self.compaction_min_dead_rows = compaction_min_dead_rows
+        self._postings: Dict[str, _TermPosting] = {}
+        # Row bookkeeping
+        self._chunk_id_by_row: List[Optional[str]] = []
+        self._row_by_chunk_id: Dict[str, int] = {}
+        self._rows_by_doc: Dict[str, Dict[int, None]] = {}
+        self._terms_by_row: List[Tuple[str, ...]] = []
+        self._metadata_by_row: List[Metadata] = []
+        self._doc_id_by_row: List[str] = []
+        self._lengths = np.empty(0, dtype=np.float32)
+        self._live = np.empty(0, dtype=bool)
+        self._size = 0
+        self._live_count = 0
+        self._total_length = 0.0
+        self._metadata_index = MetadataIndex()
+        # Postings entries scored or probed by searches, for observing early termination
+        self.postings_visited = 0
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @property
+    def total_postings(self) -> int:
+        return sum(posting.size for posting in self._postings.values())
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._row_by_chunk_id
+
+    # --- Updates ---
+
+    def add(self, chunk_id: str, doc_id: str, tokens: List[str], metadata: Optional[Metadata] = None) -> None:
+        """Indexes one chunk, replacing any earlier version with the same id."""
+        self.remove([chunk_id])
+        row = self._size
+        self._ensure_capacity(row + 1)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        length = len(tokens)
+        for term, tf in counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = _TermPosting()
+            posting.append(row, tf, length)
+
+        self._chunk_id_by_row.append(chunk_id)
+        self._row_by_chunk_id[chunk_id] = row
+        self._rows_by_doc.setdefault(doc_id, {})[row] = None
+        self._terms_by_row.append(tuple(counts))
+        self._metadata_by_row.append(metadata or {})
+        self._doc_id_by_row.append(doc_id)
+        self._metadata_index.add(row, metadata or {})
+        self._lengths[row] = length
+        self._live[row] = True
+        self._size += 1
+        self._live_count += 1
+        self._total_length += length
+
+    def remove(self, chunk_ids: List[str]) -> int:
+        """Marks chunks as deleted; returns how many were indexed."""
+        removed = 0
+        for chunk_id in chunk_ids:
+            row = self._row_by_chunk_id.pop(chunk_id, None)
+            if row is None:
+                continue
+            self._live[row] = False
+            self._chunk_id_by_row[row] = None
+            self._live_count -= 1
+            self._total_length -= float(self._lengths[row])
+            for term in self._terms_by_row[row]:
+                self._postings[term].df -= 1
+            doc_rows = self._rows_by_doc.get(self._doc_id_by_row[row])
+            if doc_rows is not None:
+                doc_rows.pop(row, None)
+                if not doc_rows:
+                    del self._rows_by_doc[self._doc_id_by_row[row]]
+            removed += 1
+        if removed:
+            self._maybe_compact()
+        return removed
+
+    def remove_document(self, doc_id: str) -> int:
+        """Removes every chunk of a document."""
+        rows = list(self._rows_by_doc.get(doc_id, ()))
+        return self.remove([self._chunk_id_by_row[row] for row in rows])
+
+    # --- Search ---
+
+    def search(self, tokens: List[str], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[str, float]]:
+        """Top-k (chunk_id, BM25 score) for the query tokens, best first. Repeated tokens count once."""
+        terms = [term for term in dict.fromkeys(tokens) if term in self._postings and self._postings[term].df > 0]
+        if top_k <= 0 or not terms or self._live_count == 0:
+            return []
+        accept = self._live[:self._size]
+        if filters:
+            accept = accept & self._metadata_index.resolve(filters, self._size)
+
+        avg_length = self._total_length / self._live_count
+        idf = {term: self._idf(self._postings[term].df) for term in terms}
+        bounds = {term: self._upper_bound(self._postings[term], idf[term], avg_length) for term in terms}
+        terms.sort(key=lambda term: bounds[term], reverse=True)
+        # remaining[i]: the most that terms i.. can still add to any row
+        remaining = np.cumsum([bounds[term] for term in reversed(terms)])[::-1]
+
+        cand_rows = np.empty(0, dtype=np.int64)
+        cand_scores = np.empty(0, dtype=np.float32)
+        for i, term in enumerate(terms):
+            threshold = self._kth_score(cand_scores, top_k)
+            rows, tfs = self._postings[term].view()
+            if remaining[i] > threshold:
+                # Essential term: unseen rows could still make the top-k, so merge its whole posting
+                self.postings_visited += rows.shape[0]
+                keep = accept[rows]
+                rows, tfs = rows[keep], tfs[keep]
+                contributions = self._term_scores(tfs, rows, idf[term], avg_length)
+                merged_rows = np.union1d(cand_rows, rows)
+                merged_scores = np.zeros(merged_rows.shape[0], dtype=np.float32)
+                merged_scores[np.searchsorted(merged_rows, cand_rows)] += cand_scores
+                merged_scores[np.searchsorted(merged_rows, rows)] += contributions
+                cand_rows, cand_scores = merged_rows, merged_scores
+            else:
+                # Non-essential term: only existing candidates can win; drop those that cannot
+                viable = cand_scores + remaining[i] >= threshold
+                cand_rows, cand_scores = cand_rows[viable], cand_scores[viable]
+                self.postings_visited += cand_rows.shape[0]
+                positions = np.searchsorted(rows, cand_rows)
+                positions[positions == rows.shape[0]] = 0
+                hit = rows[positions] == cand_rows if rows.shape[0] else np.zeros(cand_rows.shape[0], dtype=bool)
+                cand_scores[hit] += self._term_scores(tfs[positions[hit]], cand_rows[hit], idf[term], avg_length)
+
+        k = min(top_k, cand_rows.shape[0])
+        if k == 0:
+            return []
+        best = np.argpartition(-cand_scores, k - 1)[:k] if k < cand_rows.shape[0] else np.arange(k)
+        best = best[np.argsort(-cand_scores[best], kind="stable")]
+        return [(self._chunk_id_by_row[row], float(score)) for row, score in zip(cand_rows[best].tolist(), cand_scores[best].tolist())]
+
+    def _idf(self, df: int) -> float:
+        # Lucene's non-negative BM25 idf
+        return math.log(1.0 + (self._live_count - df + 0.5) / (df + 0.5))
+
+    def _term_scores(self, tfs: np.ndarray, rows: np.ndarray, idf: float, avg_length: float) -> np.ndarray:
+        norm = self.k1 * (1.0 - self.b + self.b * self._lengths[rows] / avg_length)
+        return (idf * tfs * (self.k1 + 1.0) / (tfs + norm)).astype(np.float32)
+
+    def _upper_bound(self, posting: _TermPosting, idf: float, avg_length: float) -> float:
+        # BM25 grows with tf and shrinks with row length, so (max tf, min length) bounds every row
+        norm = self.k1 * (1.0 - self.b + self.b * posting.min_length / avg_length)
+        return idf * posting.max_tf * (self.k1 + 1.0) / (posting.max_tf + norm)
+
+    @staticmethod
+    def _kth_score(scores: np.ndarray, k: int) -> float:
+        if scores.shape[0] < k:
+            return 0.0
+        return float(np.partition(scores, scores.shape[0] - k)[scores.shape[0] - k])
+
+    # --- Row Storage ---
+
+    def _ensure_capacity(self, required_rows: int) -> None:
+        if required_rows <= self._live.shape[0]:
+            return
+        capacity = max(required_rows, 2 * self._live.shape[0], 1024)
+        self._lengths = np.resize(self._lengths, capacity)
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._live = live
+
+    def _maybe_compact(self) -> None:
+        dead = self._size - self._live_count
+        if dead >= self.compaction_min_dead_rows and dead > self.compaction_threshold * self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drops dead rows from every posting and renumbers the live rows."""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        mapping = np.full(self._size, -1, dtype=np.int64)
+        mapping[live_rows] = np.arange(live_rows.shape[0])
+        logger.debug("Compacting inverted index from %d to %d rows", self._size, live_rows.shape[0])
+        for term in list(self._postings):
+            posting = self._postings[term]
+            rows, tfs = posting.view()
+            keep = mapping[rows] >= 0
+            if not keep.any():
+                del self._postings[term]
+                continue
+            # The mapping is monotonic, so renumbered rows stay sorted
+            posting.rows, posting.tfs = mapping[rows[keep]], tfs[keep].copy()
+            posting.size = posting.rows.shape[0]
+            posting.max_tf = float(posting.tfs.max())
+            posting.min_length = float(self._lengths[rows[keep]].min())
+
+        keep_rows = live_rows.tolist()
+        self._chunk_id_by_row = [self._chunk_id_by_row[row] for row in keep_rows]
+        self._terms_by_row = [self._terms_by_row[row] for row in keep_rows]
+        self._metadata_by_row = [self._metadata_by_row[row] for row in keep_rows]
+        self._doc_id_by_row = [self._doc_id_by_row[row] for row in keep_rows]
+        self._lengths[:len(keep_rows)] = self._lengths[live_rows]
+        self._live[:] = False
+        self._live[:len(keep_rows)] = True
+        self._size = len(keep_rows)
+        self._row_by_chunk_id = {chunk_id: row for row, chunk_id in enumerate(self._chunk_id_by_row)}
+        self._rows_by_doc = {}
+        self._metadata_index.clear()
+        for row, (doc_id, metadata) in enumerate(zip(self._doc_id_by_row, self._metadata_by_row)):
+            self._rows_by_doc.setdefault(doc_id, {})[row] = None
+            self._metadata_index.add(row, metadata)
@@ -0,0 +1,32 @@
+import numpy as np
+
+def kmeans(vectors: np.ndarray, k: int, n_iter: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means on float32 rows, returning a (k, dim) centroid matrix.
+
+    Empty clusters are re-seeded from random points so every centroid stays useful.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    n = vectors.shape[0]
+    if n == 0:
+        raise ValueError("Cannot train k-means on an empty sample")
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(n, size=k, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign_nearest(vectors, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = vectors[rng.choice(n, size=int(empty.sum()), replace=False)]
+    return centroids
+
+def assign_nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for each row, computed with one matmul."""
+    centroid_sq = np.einsum("ij,ij->i", centroids, centroids)
+    # ||x||^2 is constant per row, so it is dropped without changing the argmin
+    distances = centroid_sq[None, :] - 2.0 * (vectors @ centroids.T)
+    return np.argmin(distances, axis=1)
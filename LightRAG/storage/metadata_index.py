@@ -0,0 +1,125 @@
+from typing import Dict, Any, Hashable, List, Optional
+import numpy as np
+
+from ..models.data_models import Metadata
+
+# --- Filter Expressions ---
+# Filters are plain Metadata dicts, so they fit Query.filters unchanged:
+#   {"lang": "en"}                               equality
+#   {"lang": {"$in": ["en", "de"]}}              membership
+#   {"lang": "en", "year": 2024}                 implicit AND across keys
+#   {"$and": [expr, ...]} / {"$or": [expr, ...]} explicit boolean combinators
+
+AND, OR, IN, EQ = "$and", "$or", "$in", "$eq"
+
+def matches(metadata: Metadata, filters: Optional[Metadata]) -> bool:
+    """Evaluates a filter expression against one metadata dict (for callers without an index)."""
+    if not filters:
+        return True
+    for key, condition in filters.items():
+        if key in (AND, OR):
+            results = [matches(metadata, expr) for expr in MetadataIndex._expressions(key, condition)]
+            if not (all(results) if key == AND else any(results)):
+                return False
+        elif key not in metadata or metadata[key] not in MetadataIndex._values(key, condition):
+            return False
+    return True
+
+class _Posting:
+    """Append-only, sorted array of rows holding one (key, value) pair."""
+    __slots__ = ("rows", "size")
+
+    def __init__(self):
+        self.rows = np.empty(8, dtype=np.int64)
+        self.size = 0
+
+    def append(self, row: int) -> None:
+        if self.size == self.rows.shape[0]:
+            self.rows = np.resize(self.rows, self.size * 2)
+        self.rows[self.size] = row
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.rows[:self.size]
+
+class MetadataIndex:
+    """
+    Inverted index from (metadata key, value) to storage rows.
+
+    Storage rows are append-only, so postings only ever grow and stay sorted; rows that
+    die (replaced or deleted chunks) are removed by AND-ing with the storage's live mask
+    rather than by rewriting postings. Filters resolve to a boolean bitmap over rows,
+    combined with vectorised AND/OR. Unhashable metadata values are not indexed.
+    """
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, _Posting]] = {}
+
+    def add(self, row: int, metadata: Metadata) -> None:
+        for key, value in metadata.items():
+            if not isinstance(value, Hashable):
+                continue
+            postings = self._postings.setdefault(key, {})
+            posting = postings.get(value)
+            if posting is None:
+                posting = postings[value] = _Posting()
+            posting.append(row)
+
+    def clear(self) -> None:
+        self._postings.clear()
+
+    def resolve(self, filters: Metadata, num_rows: int) -> np.ndarray:
+        """Boolean bitmap of length `num_rows` marking rows that satisfy `filters`."""
+        mask = np.ones(num_rows, dtype=bool)
+        for key, condition in filters.items():
+            mask &= self._resolve_clause(key, condition, num_rows)
+        return mask
+
+    def estimate(self, filters: Metadata) -> int:
+        """Upper bound on matching rows, computed from posting lengths without touching rows."""
+        estimates = [self._estimate_clause(key, condition) for key, condition in filters.items()]
+        return min(estimates) if estimates else 0
+
+    # --- Internals ---
+
+    def _resolve_clause(self, key: str, condition: Any, num_rows: int) -> np.ndarray:
+        if key in (AND, OR):
+            masks = [self.resolve(expr, num_rows) for expr in self._expressions(key, condition)]
+            if not masks:
+                return np.full(num_rows, key == AND, dtype=bool)
+            reduce = np.logical_and if key == AND else np.logical_or
+            return reduce.reduce(masks)
+        mask = np.zeros(num_rows, dtype=bool)
+        for value in self._values(key, condition):
+            mask[self._rows(key, value)] = True
+        return mask
+
+    def _estimate_clause(self, key: str, condition: Any) -> int:
+        if key in (AND, OR):
+            estimates = [self.estimate(expr) for expr in self._expressions(key, condition)]
+            if not estimates:
+                return 0
+            return min(estimates) if key == AND else sum(estimates)
+        return sum(self._rows(key, value).shape[0] for value in self._values(key, condition))
+
+    def _rows(self, key: str, value: Hashable) -> np.ndarray:
+        posting = self._postings.get(key, {}).get(value)
+        return posting.view() if posting is not None else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _expressions(key: str, condition: Any) -> List[Metadata]:
+        if not isinstance(condition, (list, tuple)):
+            raise ValueError(f"'{key}' expects a list of filter expressions")
+        return list(condition)
+
+    @staticmethod
+    def _values(key: str, condition: Any) -> List[Hashable]:
+        """Normalises an equality or $in condition into the list of accepted values."""
+        if isinstance(condition, dict):
+            if set(condition) == {IN}:
+                return list(condition[IN])
+            if set(condition) == {EQ}:
+                return [condition[EQ]]
+            raise ValueError(f"Unsupported filter operator for '{key}': {sorted(condition)}")
+        if not isinstance(condition, Hashable):
+            raise ValueError(f"Filter value for '{key}' must be hashable; use {{'{IN}': [...]}} for membership")
+        return [condition]
@@ -0,0 +1,402 @@
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Sequence
+from dataclasses import dataclass
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+from ..core.interfaces import BaseVectorStorage
+from ..models.data_models import Document, Chunk, Metadata
+from ..models.embedding import Embedding
+from ..models.enums import SimilarityMetric
+from . import similarity
+from .metadata_index import MetadataIndex
+from .vector_file import VectorFile
+
+logger = logging.getLogger(__name__)
+
+# --- On-Disk Layout ---
+# <path>/manifest.json   format version, dim, metric, committed row count and file sizes
+# <path>/vectors.f32     VectorFile: fixed header + row-major float32 matrix
+# <path>/records.bin     one fixed-size RECORD_DTYPE entry per row (payload offset/length, norm, flags)
+# <path>/payload.bin     length-prefixed JSON of each chunk without its embedding
+# <path>/keys.bin        length-prefixed [chunk_id, document_id] per row, loaded only for id lookups
+# <path>/documents.jsonl one Document (or deletion marker) per line
+#
+# Rows are appended to every file before the manifest is advanced, so a crash mid-write
+# only leaves trailing bytes, which the next write truncates away.
+
+FORMAT_VERSION = 1
+RECORD_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("norm", "<f4"), ("flags", "u1")], align=True)
+LIVE, EMBEDDED = 1, 2
+SEARCHABLE = LIVE | EMBEDDED
+_LENGTH = struct.Struct("<I")
+
+@dataclass
+class MmapStorageConfig:
+    """Configuration for MmapVectorStorage. Metric and dimension are fixed once the store exists."""
+    path: str
+    metric: SimilarityMetric = SimilarityMetric.COSINE
+    embedding_dim: Optional[int] = None
+    # Filters estimated to match at most this fraction of rows only fault in candidate rows
+    prefilter_selectivity: float = 0.25
+
+class MmapVectorStorage(BaseVectorStorage):
+    """
+    Persistent vector storage whose matrix and row records are memory-mapped.
+
+    Opening reads only the manifest, so startup time does not depend on index size; the
+    OS faults pages in as searches touch them. Chunk text and metadata are read from the
+    payload file only for the rows a search returns. Id-based lookups, document operations
+    and metadata filters build their in-memory indexes lazily on first use.
+    """
+    def __init__(self, config: MmapStorageConfig):
+        self.config = config
+        os.makedirs(config.path, exist_ok=True)
+        manifest = self._read_manifest()
+        if manifest is None:
+            self._dim = config.embedding_dim
+            self._count = self._searchable = 0
+            self._committed_bytes = {"payload.bin": 0, "keys.bin": 0}
+        else:
+            if manifest["metric"] != config.metric.name:
+                raise ValueError(f"Store at {config.path} uses metric {manifest['metric']}, not {config.metric.name}")
+            self._dim = manifest["dim"]
+            self._count, self._searchable = manifest["count"], manifest["searchable"]
+            self._committed_bytes = manifest["bytes"]
+        self._vectors: Optional[VectorFile] = VectorFile(self._file("vectors.f32"), self._dim) if self._dim else None
+        self._records_map: Optional[np.memmap] = None
+        self._payload_map: Optional[mmap.mmap] = None
+        # Lazily loaded indexes; keys are None for dead rows
+        self._keys_by_row: Optional[List[Optional[Tuple[str, str]]]] = None
+        self._row_by_chunk_id: Optional[Dict[str, int]] = None
+        self._rows_by_doc: Optional[Dict[str, Dict[int, None]]] = None
+        self._metadata_index: Optional[MetadataIndex] = None
+        self._documents: Optional[Dict[str, Document]] = None
+        # Searches may run on worker threads: row flags change under `_flags_lock`,
+        # and the metadata index is built once under `_index_lock`
+        self._flags_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    @property
+    def metric(self) -> SimilarityMetric:
+        return self.config.metric
+
+    @property
+    def embedding_dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        """Number of searchable (live, embedded) chunks."""
+        return self._searchable
+
+    # --- BaseStorage ---
+
+    async def add_document(self, document: Document) -> None:
+        self._write_document(document)
+
+    async def add_chunks(self, chunks: List[Chunk]) -> None:
+        self._write_chunks(chunks)
+
+    async def get_document(self, doc_id: str) -> Optional[Document]:
+        return self._load_documents().get(doc_id)
+
+    async def get_chunk(self, chunk_id: str) -> Optional[Chunk]:
+        self._load_keys()
+        row = self._row_by_chunk_id.get(chunk_id)
+        return self._read_chunk(row) if row is not None else None
+
+    async def get_chunks_by_doc_id(self, doc_id: str) -> List[Chunk]:
+        self._load_keys()
+        return [self._read_chunk(row) for row in self._rows_by_doc.get(doc_id, ())]
+
+    async def delete_document(self, doc_id: str) -> int:
+        self._load_keys()
+        rows = list(self._rows_by_doc.get(doc_id, ()))
+        if rows:
+            self._retire_rows(rows)
+            self._write_manifest()
+        if doc_id in self._load_documents():
+            with open(self._file("documents.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"id": doc_id, "deleted": True}) + "\n")
+            del self._documents[doc_id]
+        return len(rows)
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        await self.delete_document(document.id)
+        await self.add_document(document)
+        await self.add_chunks(chunks)
+
+    # --- Writing ---
+    # Synchronous so a segment nothing else can see yet may be written from a worker thread
+
+    def _write_document(self, document: Document) -> None:
+        documents = self._load_documents()
+        with open(self._file("documents.jsonl"), "a", encoding="utf-8") as f:
+            f.write(document.model_dump_json() + "\n")
+        documents[document.id] = document
+
+    def _write_chunks(self, chunks: List[Chunk]) -> None:
+        batch = list({chunk.id: chunk for chunk in chunks}.values())
+        if not batch:
+            return
+        # Validate before touching the store, so a rejected batch leaves the chunks it replaces intact
+        vectors = self._batch_vectors(batch)
+        self._load_keys()
+        replaced = [self._row_by_chunk_id[chunk.id] for chunk in batch if chunk.id in self._row_by_chunk_id]
+
+        records = np.zeros(len(batch), dtype=RECORD_DTYPE)
+        payload, keys = bytearray(), bytearray()
+        payload_start = self._committed_bytes["payload.bin"]
+        for i, chunk in enumerate(batch):
+            body = chunk.model_dump_json(exclude={"embedding"}).encode("utf-8")
+            records[i]["offset"] = payload_start + len(payload) + _LENGTH.size
+            records[i]["length"] = len(body)
+            records[i]["flags"] = LIVE | (EMBEDDED if chunk.embedding is not None else 0)
+            payload += _LENGTH.pack(len(body)) + body
+            key = json.dumps([chunk.id, chunk.document_id]).encode("utf-8")
+            keys += _LENGTH.pack(len(key)) + key
+        records["norm"] = similarity.row_norms(vectors)
+
+        self._append_bytes("payload.bin", payload)
+        self._append_bytes("keys.bin", keys)
+        self._append_bytes("records.bin", records.tobytes(), committed=self._count * RECORD_DTYPE.itemsize)
+        self._records_map = None
+        vector_file = self._vectors_file()
+        vector_file.truncate(self._count)
+        vector_file.append(vectors)
+
+        start = self._count
+        self._count += len(batch)
+        self._searchable += int(np.count_nonzero(records["flags"] == SEARCHABLE))
+        for row, chunk in enumerate(batch, start=start):
+            self._index_row(row, chunk.id, chunk.document_id)
+            if self._metadata_index is not None:
+                self._metadata_index.add(row, chunk.metadata)
+        # The new rows are on disk; retire the ones they replace and commit both with one manifest
+        self._retire_rows(replaced)
+        self._write_manifest()
+
+    # --- Bulk Access ---
+
+    def iter_chunks(self, batch_size: int = 1024) -> Iterator[List[Chunk]]:
+        """Yields live chunks in row order, `batch_size` at a time."""
+        live_rows = np.flatnonzero(self._records()["flags"] & LIVE).tolist()
+        for start in range(0, len(live_rows), batch_size):
+            yield [self._read_chunk(row) for row in live_rows[start:start + batch_size]]
+
+    def retire_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Marks the given chunks dead without touching their row data; returns how many were live."""
+        self._load_keys()
+        rows = [self._row_by_chunk_id[chunk_id] for chunk_id in chunk_ids if chunk_id in self._row_by_chunk_id]
+        if rows:
+            self._retire_rows(rows)
+            self._write_manifest()
+        return len(rows)
+
+    # --- BaseVectorStorage ---
+
+    async def search_similar_chunks(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Chunk]:
+        return [chunk for chunk, _ in await self.search_similar_chunks_with_scores(query_embedding, top_k, filters)]
+
+    async def search_similar_chunks_with_scores(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[Chunk, float]]:
+        if top_k <= 0 or self._searchable == 0:
+            return []
+        query = similarity.as_query_vector(query_embedding, self._dim)
+        rows, scores = self._search_rows(query, top_k, filters)
+        reported = similarity.finalize_scores(scores, self.metric)
+        return [(self._read_chunk(row), float(score)) for row, score in zip(rows.tolist(), reported.tolist())]
+
+    async def search_similar_chunks_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int, filters: Optional[Metadata] = None) -> List[List[Tuple[Chunk, float]]]:
+        if top_k <= 0 or self._searchable == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        queries = similarity.as_query_matrix(query_embeddings, self._dim)
+        results = []
+        for rows, scores in self._search_rows_batch(queries, top_k, filters):
+            reported = similarity.finalize_scores(scores, self.metric)
+            results.append([(self._read_chunk(row), float(score)) for row, score in zip(rows.tolist(), reported.tolist())])
+        return results
+
+    def _search_rows(self, query: np.ndarray, top_k: int, filters: Optional[Metadata]) -> Tuple[np.ndarray, np.ndarray]:
+        return self._search_rows_batch(query[None, :], top_k, filters)[0]
+
+    def _search_rows_batch(self, queries: np.ndarray, top_k: int, filters: Optional[Metadata]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Exact top-k as (rows, ranking scores) per query, one matrix product per block of queries."""
+        with self._flags_lock:
+            # Comparing copies the flags, so tombstones issued mid-search cannot tear the mask
+            records = self._records()
+            valid = records["flags"] == SEARCHABLE if self._searchable < self._count else None
+        matrix, norms = self._vectors_file().matrix[:records.shape[0]], records["norm"]
+        rows = None
+        if filters:
+            index = self._load_metadata_index()
+            mask = index.resolve(filters, self._count)
+            if valid is not None:
+                mask &= valid
+            valid = mask
+            if index.estimate(filters) <= self.config.prefilter_selectivity * self._count:
+                # Fancy indexing a memmap only faults in the candidate rows
+                rows, valid = np.flatnonzero(mask), None
+                matrix, norms = matrix[rows], norms[rows]
+        results = []
+        for block in similarity.query_blocks(queries.shape[0], matrix.shape[0]):
+            for scores in similarity.ranking_scores_batch(matrix, norms, queries[block], self.metric):
+                selected = similarity.top_k_indices(scores, top_k, valid)
+                results.append((selected if rows is None else rows[selected], scores[selected]))
+        return results
+
+    # --- Files ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.config.path, name)
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(self._file("manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store format in {self.config.path}: {manifest.get('format')}")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        manifest = {"format": FORMAT_VERSION, "dim": self._dim, "metric": self.metric.name,
+                    "count": self._count, "searchable": self._searchable, "bytes": self._committed_bytes}
+        tmp_path = self._file("manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._file("manifest.json"))
+
+    def _vectors_file(self) -> VectorFile:
+        if self._vectors is None:
+            raise ValueError("Store has no embedding dimension yet; add an embedded chunk first")
+        return self._vectors
+
+    def _batch_vectors(self, batch: List[Chunk]) -> np.ndarray:
+        """Stacks batch embeddings; rows for chunks without one are zero and never searchable."""
+        embedded = [chunk for chunk in batch if chunk.embedding is not None]
+        dim = self._dim
+        if dim is None:
+            if not embedded:
+                raise ValueError("The first chunks added to a new store must carry embeddings")
+            dim = len(embedded[0].embedding)
+        vectors = np.zeros((len(batch), dim), dtype=np.float32)
+        for i, chunk in enumerate(batch):
+            if chunk.embedding is not None:
+                vector = np.asarray(chunk.embedding, dtype=np.float32)
+                if vector.shape != (dim,):
+                    raise ValueError(f"Chunk embeddings have dimension {vector.shape[0]}, expected {dim}")
+                vectors[i] = vector
+        if self._dim is None:
+            self._dim = dim
+            self._vectors = VectorFile(self._file("vectors.f32"), dim)
+        return vectors
+
+    def _append_bytes(self, name: str, data: bytes, committed: Optional[int] = None) -> None:
+        """Appends after the last committed byte, dropping leftovers of an uncommitted write."""
+        if committed is None:
+            committed = self._committed_bytes[name]
+            self._committed_bytes[name] = committed + len(data)
+        with open(self._file(name), "ab") as f:
+            f.truncate(committed)
+            f.write(data)
+
+    def _records(self) -> np.memmap:
+        if self._records_map is None or self._records_map.shape[0] != self._count:
+            if self._count == 0:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            self._records_map = np.memmap(self._file("records.bin"), dtype=RECORD_DTYPE, mode="r+", shape=(self._count,))
+        return self._records_map
+
+    def _payload(self) -> mmap.mmap:
+        size = os.path.getsize(self._file("payload.bin"))
+        if self._payload_map is None or self._payload_map.size() != size:
+            with open(self._file("payload.bin"), "rb") as f:
+                self._payload_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._payload_map
+
+    def _read_chunk(self, row: int) -> Chunk:
+        record = self._records()[row]
+        offset, length = int(record["offset"]), int(record["length"])
+        data = json.loads(self._payload()[offset:offset + length])
+        if record["flags"] & EMBEDDED:
+            data["embedding"] = Embedding(np.array(self._vectors_file().matrix[row]))
+        return Chunk.model_validate(data)
+
+    def _retire_rows(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        index = np.asarray(rows, dtype=np.int64)
+        with self._flags_lock:
+            records = self._records()
+            self._searchable -= int(np.count_nonzero(records["flags"][index] == SEARCHABLE))
+            records["flags"][index] &= ~np.uint8(LIVE)
+            records.flush()
+        for row in rows:
+            chunk_id, doc_id = self._keys_by_row[row]
+            self._keys_by_row[row] = None
+            if self._row_by_chunk_id.get(chunk_id) == row:
+                del self._row_by_chunk_id[chunk_id]
+            doc_rows = self._rows_by_doc.get(doc_id)
+            if doc_rows is not None:
+                doc_rows.pop(row, None)
+                if not doc_rows:
+                    del self._rows_by_doc[doc_id]
+
+    # --- Lazy Indexes ---
+
+    def _load_keys(self) -> None:
+        if self._keys_by_row is not None:
+            return
+        self._keys_by_row, self._row_by_chunk_id, self._rows_by_doc = [], {}, {}
+        if self._count == 0:
+            return
+        flags = self._records()["flags"]
+        with open(self._file("keys.bin"), "rb") as f:
+            data = f.read()
+        position = 0
+        for row in range(self._count):
+            (length,) = _LENGTH.unpack_from(data, position)
+            chunk_id, doc_id = json.loads(data[position + _LENGTH.size:position + _LENGTH.size + length])
+            position += _LENGTH.size + length
+            if flags[row] & LIVE:
+                self._index_row(row, chunk_id, doc_id)
+            else:
+                self._keys_by_row.append(None)
+
+    def _index_row(self, row: int, chunk_id: str, doc_id: str) -> None:
+        self._keys_by_row.append((chunk_id, doc_id))
+        self._row_by_chunk_id[chunk_id] = row
+        self._rows_by_doc.setdefault(doc_id, {})[row] = None
+
+    def _load_metadata_index(self) -> MetadataIndex:
+        with self._index_lock:
+            # Concurrent filtered searches wait for one build instead of each starting their own
+            if self._metadata_index is None:
+                logger.info("Building metadata index over %d rows", self._count)
+                index = MetadataIndex()
+                records, payload = self._records(), self._payload()
+                for row in range(self._count):
+                    offset, length = int(records[row]["offset"]), int(records[row]["length"])
+                    index.add(row, json.loads(payload[offset:offset + length]).get("metadata", {}))
+                self._metadata_index = index
+        return self._metadata_index
+
+    def _load_documents(self) -> Dict[str, Document]:
+        if self._documents is None:
+            self._documents = {}
+            path = self._file("documents.jsonl")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        data = json.loads(line)
+                        if data.get("deleted"):
+                            self._documents.pop(data["id"], None)
+                        else:
+                            self._documents[data["id"]] = Document.model_validate(data)
+        return self._documents
@@ -0,0 +1,133 @@
+import numpy as np
+
+from .kmeans import kmeans
+
+# Bounds the float32 temporaries created while scoring codes (~64MB per block)
+_BLOCK_ELEMENTS = 1 << 24
+
+def _blocks(num_rows: int, row_width: int):
+    step = max(1, _BLOCK_ELEMENTS // max(row_width, 1))
+    for start in range(0, num_rows, step):
+        yield slice(start, min(start + step, num_rows))
+
+# --- Scalar Quantization ---
+
+class ScalarQuantizer:
+    """
+    Per-dimension affine int8 quantization (4x smaller than float32).
+
+    Each dimension's [min, max] range from the training sample is mapped onto the 256
+    int8 levels. Inner products are taken directly against the codes:
+    q . x_hat = codes @ (q * scale) + q . offset.
+    """
+    code_dtype = np.int8
+
+    def __init__(self):
+        self.scale = None
+        self.offset = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.scale is not None
+
+    @property
+    def nbytes(self) -> int:
+        return self.scale.nbytes + self.offset.nbytes if self.is_trained else 0
+
+    def code_width(self, dim: int) -> int:
+        return dim
+
+    def check_dimension(self, dim: int) -> None:
+        pass
+
+    def train(self, sample: np.ndarray) -> None:
+        low, high = sample.min(axis=0), sample.max(axis=0)
+        self.scale = (np.maximum(high - low, 1e-12) / 255.0).astype(np.float32)
+        # Code c decodes to (c + 128) * scale + low
+        self.offset = (low + 128.0 * self.scale).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, -128, 127).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scale + self.offset
+
+    def dots(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        scaled_query = (query * self.scale).astype(np.float32)
+        bias = float(query @ self.offset)
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for block in _blocks(codes.shape[0], codes.shape[1]):
+            out[block] = codes[block].astype(np.float32) @ scaled_query
+        return out + bias
+
+# --- Product Quantization ---
+
+class ProductQuantizer:
+    """
+    Product quantization: the vector is split into `num_subspaces` slices and each slice is
+    replaced by the id of its nearest centroid in a per-slice codebook (one byte each).
+
+    Inner products use asymmetric distance computation: a (num_subspaces x centroids)
+    lookup table of query-slice . centroid is built once per query, and each row's score
+    is the sum of its table entries.
+    """
+    code_dtype = np.uint8
+
+    def __init__(self, num_subspaces: int = 16, num_centroids: int = 256, seed: int = 0):
+        if not 1 <= num_centroids <= 256:
+            raise ValueError("num_centroids must fit in one byte (1..256)")
+        self.num_subspaces = num_subspaces
+        self.num_centroids = num_centroids
+        self.seed = seed
+        # (num_subspaces, centroids, subspace_dim)
+        self.codebooks = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def nbytes(self) -> int:
+        return self.codebooks.nbytes if self.is_trained else 0
+
+    def code_width(self, dim: int) -> int:
+        return self.num_subspaces
+
+    def check_dimension(self, dim: int) -> None:
+        if dim % self.num_subspaces:
+            raise ValueError(f"Embedding dimension {dim} is not divisible by {self.num_subspaces} subspaces")
+
+    def train(self, sample: np.ndarray) -> None:
+        dim = sample.shape[1]
+        self.check_dimension(dim)
+        sub_dim = dim // self.num_subspaces
+        codebooks = np.zeros((self.num_subspaces, self.num_centroids, sub_dim), dtype=np.float32)
+        for j in range(self.num_subspaces):
+            centroids = kmeans(sample[:, j * sub_dim:(j + 1) * sub_dim], self.num_centroids, seed=self.seed + j)
+            codebooks[j, :centroids.shape[0]] = centroids
+            # Small samples yield fewer centroids; pad by repeating so every code decodes
+            codebooks[j, centroids.shape[0]:] = centroids[0]
+        self.codebooks = codebooks
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        sub_dim = self.codebooks.shape[2]
+        codes = np.empty((vectors.shape[0], self.num_subspaces), dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            sub_vectors = vectors[:, j * sub_dim:(j + 1) * sub_dim]
+            distances = np.einsum("ij,ij->i", codebook, codebook)[None, :] - 2.0 * (sub_vectors @ codebook.T)
+            codes[:, j] = np.argmin(distances, axis=1)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.num_subspaces)]
+        return np.concatenate(parts, axis=1)
+
+    def dots(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        sub_queries = query.reshape(self.num_subspaces, -1)
+        table = np.einsum("jkd,jd->jk", self.codebooks, sub_queries).astype(np.float32)
+        subspaces = np.arange(self.num_subspaces)
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for block in _blocks(codes.shape[0], codes.shape[1]):
+            out[block] = table[subspaces, codes[block]].sum(axis=1)
+        return out
@@ -0,0 +1,199 @@
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+import logging
+import os
+
+import numpy as np
+
+from ..models.data_models import Metadata
+from ..models.enums import QuantizationMode
+from . import similarity
+from .quantization import ScalarQuantizer, ProductQuantizer
+from .vector_file import VectorFile
+from .vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+
+@dataclass
+class QuantizedStorageConfig(VectorStorageConfig):
+    """Configuration for QuantizedVectorStorage."""
+    quantization: QuantizationMode = QuantizationMode.SCALAR
+    # Rows held at full precision before the quantizer is trained on a sample of them
+    train_size: int = 10000
+    pq_subspaces: int = 16
+    pq_centroids: int = 256
+    # Full-precision copies are appended here for re-ranking; None keeps only the codes
+    # and disables re-ranking
+    full_precision_path: Optional[str] = None
+    # The store is in-memory, so an existing file at full_precision_path is never reused:
+    # it is replaced when this is set, and is an error otherwise
+    overwrite_full_precision: bool = False
+    # Candidates re-scored at full precision per requested result
+    rerank_factor: int = 4
+    seed: int = 0
+
+# --- Storage Implementation ---
+
+class QuantizedVectorStorage(InMemoryVectorStorage):
+    """
+    Vector storage that keeps compressed codes in memory instead of float32 vectors.
+
+    The first `train_size` rows are buffered at full precision (and searched exactly);
+    the quantizer is then trained on a sample of them, every row is encoded, and the
+    float32 buffer is released. Later rows are encoded as they arrive. Searches score the
+    codes directly; with `full_precision_path` set, the best `top_k * rerank_factor`
+    candidates are re-scored against float32 vectors read from a memory-mapped file.
+    """
+    def __init__(self, config: Optional[QuantizedStorageConfig] = None):
+        super().__init__(config or QuantizedStorageConfig())
+        mode = self.config.quantization
+        if mode is QuantizationMode.SCALAR:
+            self._quantizer = ScalarQuantizer()
+        elif mode is QuantizationMode.PRODUCT:
+            self._quantizer = ProductQuantizer(self.config.pq_subspaces, self.config.pq_centroids, seed=self.config.seed)
+        else:
+            self._quantizer = None
+        if self._dim is not None:
+            self._check_dimension(self._dim)
+        self._codes: Optional[np.ndarray] = None
+        self._full_precision: Optional[VectorFile] = None
+        # Storage row -> row in the full-precision file
+        self._file_rows = np.empty(0, dtype=np.int64)
+        path = self.config.full_precision_path
+        if path is not None and os.path.exists(path):
+            if not self.config.overwrite_full_precision:
+                raise FileExistsError(f"{path} already exists; set overwrite_full_precision=True to replace it")
+            os.remove(path)
+
+    @property
+    def is_quantized(self) -> bool:
+        return self._quantizer is not None and self._quantizer.is_trained
+
+    def memory_footprint(self) -> Dict[str, int]:
+        footprint = {
+            "vectors": self._matrix.nbytes,
+            "codes": self._codes.nbytes if self._codes is not None else 0,
+            "codebooks": self._quantizer.nbytes if self._quantizer is not None else 0,
+            "norms": self._norms.nbytes,
+            "live_mask": self._live.nbytes,
+            "file_rows": self._file_rows.nbytes,
+        }
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    def train(self) -> None:
+        """Trains the quantizer on a sample of the buffered rows and encodes every row."""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        rng = np.random.default_rng(self.config.seed)
+        sample_rows = rng.choice(live_rows, size=min(self.config.train_size, live_rows.shape[0]), replace=False)
+        logger.info("Training %s quantizer on %d of %d rows", self.config.quantization.name, sample_rows.shape[0], self._size)
+        self._quantizer.train(self._matrix[np.sort(sample_rows)])
+
+        width = self._quantizer.code_width(self._dim)
+        self._codes = np.zeros((self.capacity, width), dtype=self._quantizer.code_dtype)
+        block = 65536
+        for start in range(0, self._size, block):
+            rows = np.arange(start, min(start + block, self._size))
+            self._encode_rows(rows, self._matrix[rows])
+        self._matrix = np.empty((0, self._dim), dtype=np.float32)
+
+    # --- Search ---
+
+    def _search_rows(self, query: np.ndarray, top_k: int, filters: Optional[Metadata]) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_quantized or self._full_precision is None or self.config.rerank_factor <= 1:
+            return super()._search_rows(query, top_k, filters)
+        rows, _ = super()._search_rows(query, top_k * self.config.rerank_factor, filters)
+        return self._rerank(query, rows, top_k)
+
+    def _search_rows_batch(self, queries: np.ndarray, top_k: int, filters: Optional[Metadata]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        if not self.is_quantized or self._full_precision is None or self.config.rerank_factor <= 1:
+            return super()._search_rows_batch(queries, top_k, filters)
+        candidates = super()._search_rows_batch(queries, top_k * self.config.rerank_factor, filters)
+        return [self._rerank(query, rows, top_k) for query, (rows, _) in zip(queries, candidates)]
+
+    def _rerank(self, query: np.ndarray, rows: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-scores candidate rows against their full-precision vectors."""
+        full = self._full_precision.read(self._file_rows[rows])
+        exact = similarity.ranking_scores(full, similarity.row_norms(full), query, self.metric)
+        selected = similarity.top_k_indices(exact, top_k)
+        return rows[selected], exact[selected]
+
+    def _score_all(self, query: np.ndarray) -> np.ndarray:
+        if not self.is_quantized:
+            return super()._score_all(query)
+        return self._score_codes(query, self._codes[:self._size], self._norms[:self._size])
+
+    def _score_rows(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        if not self.is_quantized:
+            return super()._score_rows(query, rows)
+        return self._score_codes(query, self._codes[rows], self._norms[rows])
+
+    def _score_batch(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self.is_quantized:
+            return super()._score_batch(queries, rows)
+        # Quantized dots build per-query tables (PQ) or scaled queries (SQ), so score one query at a time
+        if rows is None:
+            return np.stack([self._score_all(query) for query in queries])
+        return np.stack([self._score_rows(query, rows) for query in queries])
+
+    def _score_codes(self, query: np.ndarray, codes: np.ndarray, norms: np.ndarray) -> np.ndarray:
+        dots = self._quantizer.dots(query, codes)
+        return similarity.scores_from_dots(dots, norms, float(np.linalg.norm(query)), self.metric)
+
+    # --- Row Storage Hooks ---
+
+    def _grow_vectors(self, new_capacity: int) -> None:
+        file_rows = np.zeros(new_capacity, dtype=np.int64)
+        file_rows[:self._size] = self._file_rows[:self._size]
+        self._file_rows = file_rows
+        if not self.is_quantized:
+            super()._grow_vectors(new_capacity)
+            return
+        codes = np.zeros((new_capacity, self._codes.shape[1]), dtype=self._codes.dtype)
+        codes[:self._size] = self._codes[:self._size]
+        norms = np.empty(new_capacity, dtype=np.float32)
+        norms[:self._size] = self._norms[:self._size]
+        self._codes, self._norms = codes, norms
+
+    def _write_rows(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.config.full_precision_path is not None:
+            if self._full_precision is None:
+                self._full_precision = VectorFile(self.config.full_precision_path, self._dim)
+            self._file_rows[rows] = self._full_precision.append(vectors)
+        if self.is_quantized:
+            self._encode_rows(rows, vectors)
+        else:
+            super()._write_rows(rows, vectors)
+
+    def _check_dimension(self, dim: int) -> None:
+        # Rejected here rather than at training time, when rows would already be stored
+        if self._quantizer is not None:
+            self._quantizer.check_dimension(dim)
+
+    def _on_rows_added(self, rows: np.ndarray) -> None:
+        if self._quantizer is not None and not self._quantizer.is_trained and self._live_count >= self.config.train_size:
+            self.train()
+
+    def _move_rows(self, live_rows: np.ndarray) -> None:
+        count = live_rows.shape[0]
+        self._file_rows[:count] = self._file_rows[live_rows]
+        if not self.is_quantized:
+            super()._move_rows(live_rows)
+            return
+        self._codes[:count] = self._codes[live_rows]
+        self._norms[:count] = self._norms[live_rows]
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        if self._full_precision is not None:
+            return self._full_precision.read(self._file_rows[row:row + 1])[0]
+        if self.is_quantized:
+            return self._quantizer.decode(self._codes[row:row + 1])[0]
+        return super()._row_vector(row)
+
+    def _encode_rows(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        codes = self._quantizer.encode(vectors)
+        self._codes[rows] = codes
+        # Norms of the reconstructions keep cosine/L2 consistent with the code dot products
+        self._norms[rows] = similarity.row_norms(self._quantizer.decode(codes))
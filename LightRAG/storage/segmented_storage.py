@@ -0,0 +1,537 @@
+from typing import List, Dict, Iterator, Optional, Tuple, Sequence, Set
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+
+from ..core.interfaces import BaseVectorStorage
+from ..models.data_models import Document, Chunk, Metadata
+from ..models.embedding import Embedding
+from ..models.enums import SimilarityMetric
+from . import similarity
+from .bloom import BloomFilter
+from .mmap_storage import MmapVectorStorage, MmapStorageConfig
+from .vector_storage import InMemoryVectorStorage, VectorStorageConfig
+from .wal import WriteAheadLog
+
+logger = logging.getLogger(__name__)
+
+# --- On-Disk Layout ---
+# <path>/manifest.json     format version, metric, dim, ordered sealed segment names
+# <path>/wal.log           operations applied to the mutable segment since it was last sealed
+# <path>/wal-<name>.log    operations of the segment being sealed as <name>, only while it is written
+# <path>/segments/<name>/  one MmapVectorStorage directory per sealed segment, oldest first,
+#                          plus ids.bloom, a filter over the chunk ids written to the segment
+#
+# Sealing moves the WAL aside to wal-<name>.log, writes the segment directory completely,
+# lets the manifest name it and only then deletes the moved log. A crash at any point
+# recovers by opening the segments in the manifest, removing unlisted directories, folding
+# the moved logs of unlisted segments back into the head of the WAL and replaying it.
+
+FORMAT_VERSION = 1
+
+# --- Configuration ---
+
+@dataclass
+class SegmentedStorageConfig:
+    """Configuration for SegmentedVectorStorage."""
+    path: str
+    metric: SimilarityMetric = SimilarityMetric.COSINE
+    embedding_dim: Optional[int] = None
+    # The in-memory segment is sealed to disk once it holds this many chunks
+    segment_max_rows: int = 50000
+    # Background compaction runs while there are more sealed segments than this...
+    max_segments: int = 8
+    # ...merging this many adjacent segments per step
+    merge_factor: int = 4
+    # Chunks copied between event loop yields while merging
+    merge_batch_size: int = 1024
+    # Threads used to search sealed segments in parallel
+    search_workers: int = 4
+    # fsync every WAL append (durable against power loss, not just process crashes)
+    sync_wal: bool = False
+    prefilter_selectivity: float = 0.25
+
+# --- Storage Implementation ---
+
+class SegmentedVectorStorage(BaseVectorStorage):
+    """
+    Log-structured persistent vector storage.
+
+    Writes are appended to a write-ahead log and applied to a small in-memory segment
+    (an InMemoryVectorStorage), so `add_chunks` costs O(batch) however large the store
+    grows. Once that segment reaches `segment_max_rows` it is frozen, a fresh one takes
+    new writes, and a background task writes the frozen one out on a worker thread as an
+    immutable memory-mapped segment.
+
+    Deletes and re-added chunks never rewrite sealed data: they flip the row's live flag
+    in the owning segment (a tombstone). Each sealed segment keeps a Bloom filter of its
+    chunk ids, so a write only loads the id index of segments that may hold its chunks.
+    Searches scan all segments in parallel on a thread pool and merge the per-segment
+    top-k. When too many segments accumulate, a background task merges adjacent ones into
+    a single segment, dropping tombstoned rows.
+
+    Use `await SegmentedVectorStorage.open(config)`, which also replays the WAL.
+    """
+    def __init__(self, config: SegmentedStorageConfig):
+        self.config = config
+        os.makedirs(self._segments_dir(), exist_ok=True)
+        manifest = self._read_manifest()
+        if manifest is not None and manifest["metric"] != config.metric.name:
+            raise ValueError(f"Store at {config.path} uses metric {manifest['metric']}, not {config.metric.name}")
+        self._dim: Optional[int] = manifest["dim"] if manifest else config.embedding_dim
+        self._next_segment: int = manifest["next_segment"] if manifest else 0
+        names = manifest["segments"] if manifest else []
+        self._remove_unlisted_segments(names)
+        # Sealed segments, oldest first
+        self._segments: List[Tuple[str, MmapVectorStorage]] = [(name, self._open_segment(name)) for name in names]
+        # Writes only tombstone segments whose filter may hold the chunk id (None: no filter, check always)
+        self._id_filters: Dict[str, Optional[BloomFilter]] = {name: self._load_id_filter(name) for name in names}
+        self._mutable = self._new_mutable()
+        # The previous mutable segment while a background seal writes it out; still searchable
+        self._sealing: Optional[Tuple[str, InMemoryVectorStorage]] = None
+        self._seal_lock = asyncio.Lock()
+        self._seal_task: Optional[asyncio.Task] = None
+        self._wal = WriteAheadLog(os.path.join(config.path, "wal.log"), sync=config.sync_wal)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._compaction_task: Optional[asyncio.Task] = None
+        # Tombstones issued while a merge is copying its source segments
+        self._merging: Set[str] = set()
+        self._merge_retired_chunks: Set[str] = set()
+        self._merge_deleted_docs: Set[str] = set()
+        # Merged-away segments are removed once no search still reads them
+        self._obsolete: List[str] = []
+        self._active_searches = 0
+
+    @classmethod
+    async def open(cls, config: SegmentedStorageConfig) -> "SegmentedVectorStorage":
+        """Opens (or creates) the store at `config.path` and recovers unsealed writes from the WAL."""
+        storage = cls(config)
+        await storage._recover()
+        return storage
+
+    @property
+    def metric(self) -> SimilarityMetric:
+        return self.config.metric
+
+    @property
+    def segment_count(self) -> int:
+        """Number of sealed segments."""
+        return len(self._segments)
+
+    def __len__(self) -> int:
+        """Number of searchable chunks across all segments."""
+        return sum(len(segment) for segment in self._newest_first())
+
+    # --- BaseStorage ---
+
+    async def add_document(self, document: Document) -> None:
+        self._wal.append({"op": "add_document", "document": document.model_dump(mode="json")})
+        await self._mutable.add_document(document)
+
+    async def add_chunks(self, chunks: List[Chunk]) -> None:
+        if not chunks:
+            return
+        self._wal.append({"op": "add_chunks", "chunks": [chunk.model_dump(mode="json") for chunk in chunks]})
+        await self._apply_add_chunks(chunks)
+        if len(self._mutable._chunks) >= self.config.segment_max_rows:
+            self._schedule_seal()
+
+    async def get_document(self, doc_id: str) -> Optional[Document]:
+        # Newest segment first: a re-added document shadows older copies
+        for segment in self._newest_first():
+            document = await segment.get_document(doc_id)
+            if document is not None:
+                return document
+        return None
+
+    async def get_chunk(self, chunk_id: str) -> Optional[Chunk]:
+        for segment in self._newest_first():
+            chunk = await segment.get_chunk(chunk_id)
+            if chunk is not None:
+                return chunk
+        return None
+
+    async def get_chunks_by_doc_id(self, doc_id: str) -> List[Chunk]:
+        chunks = []
+        for segment in reversed(list(self._newest_first())):
+            chunks.extend(await segment.get_chunks_by_doc_id(doc_id))
+        return chunks
+
+    async def delete_document(self, doc_id: str) -> int:
+        self._wal.append({"op": "delete_document", "doc_id": doc_id})
+        return await self._apply_delete_document(doc_id)
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        await self.delete_document(document.id)
+        await self.add_document(document)
+        await self.add_chunks(chunks)
+
+    # --- BaseVectorStorage ---
+
+    async def search_similar_chunks(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Chunk]:
+        return [chunk for chunk, _ in await self.search_similar_chunks_with_scores(query_embedding, top_k, filters)]
+
+    async def search_similar_chunks_with_scores(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[Chunk, float]]:
+        if top_k <= 0 or len(self) == 0:
+            return []
+        query = similarity.as_query_vector(query_embedding, self._dim)
+        return (await self._search_batch(query[None, :], top_k, filters))[0]
+
+    async def search_similar_chunks_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int, filters: Optional[Metadata] = None) -> List[List[Tuple[Chunk, float]]]:
+        if top_k <= 0 or len(self) == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        return await self._search_batch(similarity.as_query_matrix(query_embeddings, self._dim), top_k, filters)
+
+    async def _search_batch(self, queries: np.ndarray, top_k: int, filters: Optional[Metadata]) -> List[List[Tuple[Chunk, float]]]:
+        segments = [segment for _, segment in self._segments if len(segment) > 0]
+        self._active_searches += 1
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._search_executor()
+            futures = [loop.run_in_executor(executor, segment._search_rows_batch, queries, top_k, filters) for segment in segments]
+            # In-memory segments change on every write, so they are searched on the event loop
+            candidates = [[] for _ in range(queries.shape[0])]
+            for in_memory in self._in_memory_segments():
+                scored_per_query = await in_memory.search_similar_chunks_batch(queries, top_k, filters)
+                for query_candidates, scored in zip(candidates, scored_per_query):
+                    query_candidates.extend((score, chunk) for chunk, score in scored)
+            for segment, per_query in zip(segments, await asyncio.gather(*futures)):
+                for query_candidates, (rows, scores) in zip(candidates, per_query):
+                    reported = similarity.finalize_scores(scores, self.metric)
+                    query_candidates.extend((score, (segment, row)) for row, score in zip(rows.tolist(), reported.tolist()))
+            # Reported scores are monotonic in the ranking scores, so they merge directly
+            results = []
+            for query_candidates in candidates:
+                query_candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+                results.append([
+                    (hit if isinstance(hit, Chunk) else hit[0]._read_chunk(hit[1]), float(score))
+                    for score, hit in query_candidates[:top_k]
+                ])
+            return results
+        finally:
+            self._active_searches -= 1
+            self._remove_obsolete_segments()
+
+    # --- Segment Lifecycle ---
+
+    async def seal(self) -> None:
+        """Writes the in-memory segment out as an immutable segment and drops its WAL."""
+        async with self._seal_lock:
+            await self._seal_mutable()
+
+    async def wait_for_seal(self) -> None:
+        """Waits for a background seal started by `add_chunks` to finish."""
+        if self._seal_task is not None:
+            await self._seal_task
+
+    async def compact(self) -> None:
+        """Waits for background sealing and compaction, then merges until the segment limit is met."""
+        await self.wait_for_seal()
+        if self._compaction_task is not None:
+            await self._compaction_task
+        await self._run_compaction()
+
+    async def close(self) -> None:
+        """Waits for background work and releases the WAL and search threads."""
+        await self.wait_for_seal()
+        if self._compaction_task is not None:
+            await self._compaction_task
+        self._wal.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _schedule_seal(self) -> None:
+        if self._seal_task is None or self._seal_task.done():
+            self._seal_task = asyncio.get_running_loop().create_task(self._run_seal())
+
+    async def _run_seal(self) -> None:
+        try:
+            async with self._seal_lock:
+                # Writes keep landing while a segment is written, so the new one may be full already
+                while len(self._mutable._chunks) >= self.config.segment_max_rows:
+                    await self._seal_mutable()
+        except Exception:
+            logger.exception("Sealing failed in %s", self.config.path)
+            raise
+
+    async def _seal_mutable(self) -> None:
+        if self._sealing is None:
+            mutable = self._mutable
+            if not mutable._chunks and not mutable._documents:
+                return
+            name = self._allocate_segment_name()
+            # New writes go to a fresh segment and log while the frozen one is written out
+            self._wal.rotate(self._sealing_log(name))
+            self._mutable = self._new_mutable()
+            self._sealing = (name, mutable)
+        # A seal that failed earlier left its frozen segment in place; this retries it
+        name, frozen = self._sealing
+        documents = list(frozen._documents.values())
+        chunks, rows = dict(frozen._chunks), dict(frozen._row_by_chunk_id)
+        # Deletes still reach the frozen segment (and may compact its matrix in place), so the
+        # worker thread reads copies
+        matrix = frozen._matrix[:frozen._size].copy()
+        segment, id_filter = await asyncio.to_thread(self._write_segment, name, documents, chunks, rows, matrix)
+
+        # Replay deletes and re-adds that reached the frozen segment while it was written
+        segment.retire_chunks([chunk_id for chunk_id in chunks if chunk_id not in frozen._chunks])
+        for document in documents:
+            if document.id not in frozen._documents:
+                await segment.delete_document(document.id)
+        self._segments.append((name, segment))
+        self._id_filters[name] = id_filter
+        self._write_manifest()
+        os.remove(self._sealing_log(name))
+        self._sealing = None
+        logger.info("Sealed segment %s with %d chunks", name, len(chunks))
+        self._schedule_compaction()
+
+    def _write_segment(self, name: str, documents: List[Document], chunks: Dict[str, Chunk],
+                       rows: Dict[str, int], matrix: np.ndarray) -> Tuple[MmapVectorStorage, BloomFilter]:
+        """Writes a frozen in-memory segment to a new segment directory; runs on a worker thread."""
+        shutil.rmtree(os.path.join(self._segments_dir(), name), ignore_errors=True)
+        segment = self._open_segment(name)
+        for document in documents:
+            segment._write_document(document)
+        chunk_ids = list(chunks)
+        for start in range(0, len(chunk_ids), self.config.merge_batch_size):
+            batch = []
+            for chunk_id in chunk_ids[start:start + self.config.merge_batch_size]:
+                chunk, row = chunks[chunk_id], rows.get(chunk_id)
+                batch.append(chunk if row is None else chunk.model_copy(update={"embedding": Embedding(matrix[row])}))
+            segment._write_chunks(batch)
+        return segment, self._save_id_filter(name, chunk_ids)
+
+    def _schedule_compaction(self) -> None:
+        if len(self._segments) <= self.config.max_segments:
+            return
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.get_running_loop().create_task(self._run_compaction())
+
+    async def _run_compaction(self) -> None:
+        try:
+            while len(self._segments) > self.config.max_segments:
+                await self._merge(self._choose_merge_window())
+        except Exception:
+            logger.exception("Segment compaction failed in %s", self.config.path)
+            raise
+
+    def _choose_merge_window(self) -> List[str]:
+        """The adjacent run of `merge_factor` segments holding the fewest chunks."""
+        width = max(2, min(self.config.merge_factor, len(self._segments)))
+        sizes = [len(segment) for _, segment in self._segments]
+        start = min(range(len(sizes) - width + 1), key=lambda i: sum(sizes[i:i + width]))
+        # Adjacent runs keep segment order meaningful for newest-wins document lookups
+        return [name for name, _ in self._segments[start:start + width]]
+
+    async def _merge(self, names: List[str]) -> None:
+        sources = [segment for name, segment in self._segments if name in names]
+        target_name = self._allocate_segment_name()
+        target = self._open_segment(target_name)
+        self._merging = set(names)
+        self._merge_retired_chunks, self._merge_deleted_docs = set(), set()
+        chunk_ids = []
+        try:
+            for source in sources:
+                for document in list(source._load_documents().values()):
+                    await target.add_document(document)
+                for batch in source.iter_chunks(self.config.merge_batch_size):
+                    await target.add_chunks(batch)
+                    chunk_ids.extend(chunk.id for chunk in batch)
+                    # Yield so searches and writes proceed while the merge copies rows
+                    await asyncio.sleep(0)
+            # Replay tombstones that hit the sources after their rows were copied
+            target.retire_chunks(self._merge_retired_chunks)
+            for doc_id in self._merge_deleted_docs:
+                await target.delete_document(doc_id)
+            id_filter = self._save_id_filter(target_name, chunk_ids)
+        finally:
+            self._merging = set()
+
+        position = next(i for i, (name, _) in enumerate(self._segments) if name in names)
+        remaining = [entry for entry in self._segments if entry[0] not in names]
+        self._segments = remaining[:position] + [(target_name, target)] + remaining[position:]
+        self._id_filters[target_name] = id_filter
+        for name in names:
+            del self._id_filters[name]
+        self._write_manifest()
+        self._obsolete.extend(names)
+        self._remove_obsolete_segments()
+        logger.info("Merged segments %s into %s (%d chunks)", names, target_name, len(target))
+
+    # --- Applying Operations ---
+
+    async def _apply_add_chunks(self, chunks: List[Chunk]) -> None:
+        # Tombstone older copies so each chunk id is live in exactly one segment
+        chunk_ids = [chunk.id for chunk in chunks]
+        hashes = BloomFilter.hash_keys(chunk_ids) if self._segments else None
+        for name, segment in self._segments:
+            id_filter = self._id_filters.get(name)
+            held = chunk_ids if id_filter is None else [
+                chunk_id for chunk_id, hit in zip(chunk_ids, id_filter.contains_hashes(hashes).tolist()) if hit
+            ]
+            if not held:
+                continue
+            segment.retire_chunks(held)
+            if name in self._merging:
+                self._merge_retired_chunks.update(held)
+        if self._sealing is not None:
+            self._sealing[1].retire_chunks(chunk_ids)
+        await self._mutable.add_chunks(chunks)
+        if self._dim is None:
+            self._dim = self._mutable.embedding_dim
+            self._write_manifest()
+
+    async def _apply_delete_document(self, doc_id: str) -> int:
+        deleted = await self._mutable.delete_document(doc_id)
+        if self._sealing is not None:
+            deleted += await self._sealing[1].delete_document(doc_id)
+        for name, segment in self._segments:
+            deleted += await segment.delete_document(doc_id)
+            if name in self._merging:
+                self._merge_deleted_docs.add(doc_id)
+        return deleted
+
+    async def _recover(self) -> None:
+        """Rebuilds the in-memory segment from operations logged since the last seal."""
+        self._fold_sealing_logs()
+        replayed = 0
+        for operation in self._wal.replay():
+            op = operation["op"]
+            if op == "add_document":
+                await self._mutable.add_document(Document.model_validate(operation["document"]))
+            elif op == "add_chunks":
+                await self._apply_add_chunks([Chunk.model_validate(chunk) for chunk in operation["chunks"]])
+            elif op == "delete_document":
+                await self._apply_delete_document(operation["doc_id"])
+            else:
+                raise ValueError(f"Unknown WAL operation: {op}")
+            replayed += 1
+        if replayed:
+            logger.info("Replayed %d WAL operations in %s", replayed, self.config.path)
+
+    def _fold_sealing_logs(self) -> None:
+        """Moves the operations of a seal that never reached the manifest back to the head of the WAL."""
+        sealed = {name for name, _ in self._segments}
+        pending = []
+        for file_name in sorted(os.listdir(self.config.path)):
+            if not (file_name.startswith("wal-") and file_name.endswith(".log")):
+                continue
+            path = os.path.join(self.config.path, file_name)
+            if file_name[len("wal-"):-len(".log")] in sealed:
+                os.remove(path)
+            else:
+                pending.append(path)
+        if not pending:
+            return
+        wal_path = os.path.join(self.config.path, "wal.log")
+        with open(wal_path + ".tmp", "wb") as out:
+            for path in pending + [wal_path]:
+                with open(path, "rb") as f:
+                    data = f.read()
+                # Only whole records: a torn tail would hide everything folded in after it
+                out.write(data[:data.rfind(b"\n") + 1] if path != wal_path else data)
+        self._wal.close()
+        os.replace(wal_path + ".tmp", wal_path)
+        self._wal = WriteAheadLog(wal_path, sync=self.config.sync_wal)
+        # A crash before this point replays the moved operations twice, which leaves the same state
+        for path in pending:
+            os.remove(path)
+        logger.info("Folded %d interrupted seal log(s) into the WAL in %s", len(pending), self.config.path)
+
+    # --- Segment Access ---
+
+    def _in_memory_segments(self) -> List[InMemoryVectorStorage]:
+        """The mutable segment and, while a seal runs, the frozen one."""
+        return [self._mutable] if self._sealing is None else [self._mutable, self._sealing[1]]
+
+    def _newest_first(self) -> Iterator[BaseVectorStorage]:
+        yield from self._in_memory_segments()
+        for _, segment in reversed(self._segments):
+            yield segment
+
+    # --- Files ---
+
+    def _segments_dir(self) -> str:
+        return os.path.join(self.config.path, "segments")
+
+    def _open_segment(self, name: str) -> MmapVectorStorage:
+        return MmapVectorStorage(MmapStorageConfig(
+            path=os.path.join(self._segments_dir(), name),
+            metric=self.config.metric,
+            embedding_dim=self._dim,
+            prefilter_selectivity=self.config.prefilter_selectivity,
+        ))
+
+    def _sealing_log(self, name: str) -> str:
+        return os.path.join(self.config.path, f"wal-{name}.log")
+
+    def _id_filter_path(self, name: str) -> str:
+        return os.path.join(self._segments_dir(), name, "ids.bloom")
+
+    def _save_id_filter(self, name: str, chunk_ids: List[str]) -> BloomFilter:
+        id_filter = BloomFilter.for_capacity(len(chunk_ids))
+        id_filter.add(chunk_ids)
+        id_filter.save(self._id_filter_path(name))
+        return id_filter
+
+    def _load_id_filter(self, name: str) -> Optional[BloomFilter]:
+        path = self._id_filter_path(name)
+        return BloomFilter.load(path) if os.path.exists(path) else None
+
+    def _new_mutable(self) -> InMemoryVectorStorage:
+        return InMemoryVectorStorage(VectorStorageConfig(
+            metric=self.config.metric,
+            embedding_dim=self._dim,
+            prefilter_selectivity=self.config.prefilter_selectivity,
+        ))
+
+    def _allocate_segment_name(self) -> str:
+        name = f"{self._next_segment:08d}"
+        self._next_segment += 1
+        return name
+
+    def _search_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.config.search_workers, thread_name_prefix="segment-search")
+        return self._executor
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.config.path, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store format in {self.config.path}: {manifest.get('format')}")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        manifest = {"format": FORMAT_VERSION, "metric": self.metric.name, "dim": self._dim,
+                    "segments": [name for name, _ in self._segments], "next_segment": self._next_segment}
+        path = os.path.join(self.config.path, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def _remove_unlisted_segments(self, names: List[str]) -> None:
+        """Deletes segments left behind by an interrupted seal or merge."""
+        listed = set(names)
+        for name in os.listdir(self._segments_dir()):
+            if name not in listed:
+                logger.info("Removing unlisted segment %s", name)
+                shutil.rmtree(os.path.join(self._segments_dir(), name))
+
+    def _remove_obsolete_segments(self) -> None:
+        if self._active_searches:
+            return
+        for name in self._obsolete:
+            shutil.rmtree(os.path.join(self._segments_dir(), name), ignore_errors=True)
+        self._obsolete = []
@@ -0,0 +1,90 @@
+from typing import Optional
+import numpy as np
+
+from ..models.enums import SimilarityMetric
+
+# --- Vectorised Scoring Helpers ---
+# Shared by every vector storage backend so they rank identically.
+
+# Bounds the (queries x rows) score block materialised by batched searches (~64MB)
+_BLOCK_ELEMENTS = 1 << 24
+
+def as_query_vector(query_embedding, dim: int) -> np.ndarray:
+    """Converts a query embedding into a float32 vector of the expected dimension."""
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+    if query.shape[0] != dim:
+        raise ValueError(f"Query embedding has dimension {query.shape[0]}, expected {dim}")
+    return query
+
+def as_query_matrix(query_embeddings, dim: int) -> np.ndarray:
+    """Converts a batch of query embeddings into a (num_queries, dim) float32 matrix."""
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    if queries.ndim != 2 or queries.shape[1] != dim:
+        raise ValueError(f"Query embeddings have shape {queries.shape}, expected (n, {dim})")
+    return queries
+
+def query_blocks(num_queries: int, num_rows: int):
+    """Slices of the query batch small enough to score against `num_rows` rows at once."""
+    step = max(1, _BLOCK_ELEMENTS // max(num_rows, 1))
+    for start in range(0, num_queries, step):
+        yield slice(start, min(start + step, num_queries))
+
+def row_norms(vectors: np.ndarray) -> np.ndarray:
+    """Euclidean norm of each row, as float32."""
+    return np.linalg.norm(vectors, axis=1).astype(np.float32, copy=False)
+
+def ranking_scores(matrix: np.ndarray, norms: np.ndarray, query: np.ndarray, metric: SimilarityMetric) -> np.ndarray:
+    """
+    Scores every row of `matrix` against `query` with a single matrix-vector product.
+
+    The returned values preserve the metric's ordering (higher is better) but for L2 are
+    negated *squared* distances; use `finalize_scores` on the selected rows to report them.
+    """
+    return scores_from_dots(matrix @ query, norms, float(np.linalg.norm(query)), metric)
+
+def ranking_scores_batch(matrix: np.ndarray, norms: np.ndarray, queries: np.ndarray, metric: SimilarityMetric) -> np.ndarray:
+    """Like `ranking_scores` for a batch of queries: one matrix-matrix product, (num_queries, rows)."""
+    return scores_from_dots(queries @ matrix.T, norms[None, :], row_norms(queries)[:, None], metric)
+
+def scores_from_dots(dots: np.ndarray, norms: np.ndarray, query_norm: float, metric: SimilarityMetric) -> np.ndarray:
+    """
+    Turns inner products with the query into ranking scores.
+
+    Lets backends that compute dots some other way (e.g. over quantized codes) share the
+    metric formulas; `norms` are the norms of the vectors the dots were taken against.
+    For a batch of queries, pass `query_norm` as a column that broadcasts against `dots`.
+    """
+    if metric is SimilarityMetric.DOT_PRODUCT:
+        return dots
+    if metric is SimilarityMetric.COSINE:
+        denom = norms * query_norm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denom > 0, dots / denom, 0.0).astype(np.float32, copy=False)
+    # L2: ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+    return -(norms * norms - 2.0 * dots + query_norm * query_norm)
+
+def finalize_scores(scores: np.ndarray, metric: SimilarityMetric) -> np.ndarray:
+    """Converts ranking scores of selected rows into the reported scores."""
+    if metric is SimilarityMetric.L2:
+        return -np.sqrt(np.maximum(-scores, 0.0))
+    return scores
+
+def top_k_indices(scores: np.ndarray, top_k: int, valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the `top_k` highest scores, best first.
+
+    Uses argpartition (O(n)) and only sorts the k survivors. Rows where `valid` is False
+    are never returned.
+    """
+    if valid is not None:
+        scores = np.where(valid, scores, -np.inf)
+    n = scores.shape[0]
+    k = min(top_k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order[np.isfinite(scores[order])]
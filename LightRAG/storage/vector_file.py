@@ -0,0 +1,83 @@
+from typing import Optional
+import os
+import struct
+
+import numpy as np
+
+# --- File Layout ---
+# [header: magic, version, dim, count][padding to HEADER_SIZE][count x dim float32, row-major]
+# The header has a fixed size so the matrix always starts at the same offset and can be
+# mapped straight into memory.
+
+MAGIC = b"LRVF"
+VERSION = 1
+_HEADER = struct.Struct("<4sIIQ")
+HEADER_SIZE = 64
+
+class VectorFile:
+    """
+    Append-only float32 matrix on disk, read through `np.memmap`.
+
+    Opening is O(1) regardless of file size: only the header is read, and matrix pages
+    are faulted in by the OS when rows are actually accessed.
+    """
+    def __init__(self, path: str, dim: Optional[int] = None):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            with open(path, "rb") as f:
+                magic, version, file_dim, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} vector file")
+            if dim is not None and dim != file_dim:
+                raise ValueError(f"{path} stores {file_dim}-dim vectors, expected {dim}")
+            self.dim, self._count = file_dim, count
+        else:
+            if dim is None:
+                raise ValueError("dim is required to create a new vector file")
+            self.dim, self._count = dim, 0
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, dim, 0).ljust(HEADER_SIZE, b"\0"))
+        self._map: Optional[np.memmap] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only (count, dim) view of the stored rows."""
+        if self._count == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if self._map is None or self._map.shape[0] != self._count:
+            self._map = np.memmap(self.path, dtype=np.float32, mode="r", offset=HEADER_SIZE, shape=(self._count, self.dim))
+        return self._map
+
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        """Appends rows and returns their row numbers in the file."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        start = self._count
+        with open(self.path, "r+b") as f:
+            f.seek(HEADER_SIZE + start * self.dim * 4)
+            f.write(vectors.tobytes())
+            # Rows are written before the count, so a crash never exposes a partial row
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, VERSION, self.dim, start + vectors.shape[0]))
+        self._count += vectors.shape[0]
+        return np.arange(start, self._count)
+
+    def truncate(self, count: int) -> None:
+        """Discards rows from `count` onwards (e.g. rows of a write that was never committed)."""
+        if count >= self._count:
+            return
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, VERSION, self.dim, count))
+            f.truncate(HEADER_SIZE + count * self.dim * 4)
+        self._count = count
+
+    def read(self, rows: np.ndarray) -> np.ndarray:
+        """Copies the given rows into memory."""
+        return np.asarray(self.matrix[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def close(self) -> None:
+        self._map = None
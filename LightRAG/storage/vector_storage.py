@@ -0,0 +1,386 @@
+from typing import List, Dict, Iterable, Optional, Tuple, Sequence
+from dataclasses import dataclass
+import logging
+
+import numpy as np
+
+from ..core.interfaces import BaseVectorStorage
+from ..models.data_models import Document, Chunk, Metadata
+from ..models.embedding import Embedding
+from ..models.enums import SimilarityMetric, FilterStrategy
+from . import similarity
+from .metadata_index import MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+
+@dataclass
+class VectorStorageConfig:
+    """Configuration for InMemoryVectorStorage."""
+    metric: SimilarityMetric = SimilarityMetric.COSINE
+    # Inferred from the first embedded chunk when left unset
+    embedding_dim: Optional[int] = None
+    # Rows reserved up front; the matrix then grows geometrically
+    initial_capacity: int = 1024
+    growth_factor: float = 2.0
+    # Filters estimated to match at most this fraction of rows are pre-filtered
+    prefilter_selectivity: float = 0.25
+    # Dead rows are compacted away once they exceed this fraction of used rows...
+    compaction_threshold: float = 0.3
+    # ...and there are at least this many of them
+    compaction_min_dead_rows: int = 1024
+
+# --- Storage Implementation ---
+
+class InMemoryVectorStorage(BaseVectorStorage):
+    """
+    Exact top-k vector storage backed by one contiguous float32 matrix.
+
+    Every embedding lives in a row of `_matrix`. Searches score all rows with a single
+    matrix-vector product and select the best rows with argpartition, so query cost is
+    one BLAS call plus O(n) selection rather than a Python loop over chunks.
+
+    Chunk metadata is kept in an inverted MetadataIndex, so filters resolve to a row
+    bitmap before any scoring. Selective filters gather and score only the candidate
+    rows; broad filters score the whole matrix and mask the rest out (see `plan_filters`).
+    Both strategies are exact and return up to `top_k` matching chunks.
+
+    Embeddings are adopted into the matrix and stripped from the stored Chunk objects, so
+    each vector is held exactly once; chunks handed back to callers get their embedding
+    re-attached from the matrix row.
+
+    A document -> chunk index makes per-document reads and bulk deletes O(chunks of the
+    document). Deleted or replaced chunks leave dead rows behind; these are reclaimed by
+    `compact` once they make up a large enough share of the matrix.
+    """
+    def __init__(self, config: Optional[VectorStorageConfig] = None):
+        self.config = config or VectorStorageConfig()
+        self._documents: Dict[str, Document] = {}
+        self._chunks: Dict[str, Chunk] = {}
+        # Row bookkeeping: chunk id <-> matrix row
+        self._row_by_chunk_id: Dict[str, int] = {}
+        self._chunk_id_by_row: List[Optional[str]] = []
+        self._dim: Optional[int] = self.config.embedding_dim
+        self._matrix = np.empty((0, self._dim or 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        # Rows are never reused; replaced chunks leave a dead row behind
+        self._live = np.empty(0, dtype=bool)
+        self._size = 0
+        self._live_count = 0
+        self._metadata_index = MetadataIndex()
+        # Insertion-ordered chunk ids per document (dict used as an ordered set)
+        self._chunk_ids_by_doc: Dict[str, Dict[str, None]] = {}
+
+    # --- Properties ---
+
+    @property
+    def metric(self) -> SimilarityMetric:
+        return self.config.metric
+
+    @property
+    def embedding_dim(self) -> Optional[int]:
+        return self._dim
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows currently allocated in the embedding matrix."""
+        return self._live.shape[0]
+
+    def __len__(self) -> int:
+        """Number of searchable (embedded) chunks."""
+        return self._live_count
+
+    # --- BaseStorage ---
+
+    async def add_document(self, document: Document) -> None:
+        self._documents[document.id] = document
+
+    async def add_chunks(self, chunks: List[Chunk]) -> None:
+        # Later duplicates in the same batch win, matching sequential inserts
+        batch = list({chunk.id: chunk for chunk in chunks}.values())
+        if not batch:
+            return
+        embedded = [chunk for chunk in batch if chunk.embedding is not None]
+        vectors = self._batch_vectors(embedded) if embedded else None
+
+        replaced_rows = []
+        for chunk in batch:
+            previous = self._chunks.get(chunk.id)
+            if previous is not None and previous.document_id != chunk.document_id:
+                self._unlink_from_document(previous)
+            if chunk.id in self._row_by_chunk_id:
+                replaced_rows.append(self._row_by_chunk_id.pop(chunk.id))
+            self._chunks[chunk.id] = chunk if chunk.embedding is None else chunk.model_copy(update={"embedding": None})
+            self._chunk_ids_by_doc.setdefault(chunk.document_id, {})[chunk.id] = None
+        self._retire_rows(replaced_rows)
+        self._maybe_compact()
+
+        if vectors is None:
+            return
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+            self._matrix = np.empty((0, self._dim), dtype=np.float32)
+
+        start = self._size
+        self._ensure_capacity(start + len(embedded))
+        rows = np.arange(start, start + len(embedded))
+        self._write_rows(rows, vectors)
+        for row, chunk in zip(rows.tolist(), embedded):
+            self._row_by_chunk_id[chunk.id] = row
+            self._chunk_id_by_row.append(chunk.id)
+            self._metadata_index.add(row, chunk.metadata)
+        self._live[rows] = True
+        self._size += len(embedded)
+        self._live_count += len(embedded)
+        self._on_rows_added(rows)
+
+    async def get_document(self, doc_id: str) -> Optional[Document]:
+        return self._documents.get(doc_id)
+
+    async def get_chunk(self, chunk_id: str) -> Optional[Chunk]:
+        return self._materialize(chunk_id) if chunk_id in self._chunks else None
+
+    async def get_chunks_by_doc_id(self, doc_id: str) -> List[Chunk]:
+        return [self._materialize(chunk_id) for chunk_id in self._chunk_ids_by_doc.get(doc_id, ())]
+
+    async def delete_document(self, doc_id: str) -> int:
+        chunk_ids = self._chunk_ids_by_doc.pop(doc_id, {})
+        self._documents.pop(doc_id, None)
+        rows = [self._row_by_chunk_id.pop(chunk_id) for chunk_id in chunk_ids if chunk_id in self._row_by_chunk_id]
+        for chunk_id in chunk_ids:
+            del self._chunks[chunk_id]
+        self._retire_rows(rows)
+        self._maybe_compact()
+        return len(chunk_ids)
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        await self.delete_document(document.id)
+        await self.add_document(document)
+        await self.add_chunks(chunks)
+
+    def retire_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Removes the given chunks, leaving their documents in place; returns how many were stored."""
+        removed, rows = 0, []
+        for chunk_id in chunk_ids:
+            chunk = self._chunks.pop(chunk_id, None)
+            if chunk is None:
+                continue
+            removed += 1
+            self._unlink_from_document(chunk)
+            if chunk_id in self._row_by_chunk_id:
+                rows.append(self._row_by_chunk_id.pop(chunk_id))
+        self._retire_rows(rows)
+        self._maybe_compact()
+        return removed
+
+    # --- BaseVectorStorage ---
+
+    async def search_similar_chunks(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Chunk]:
+        return [chunk for chunk, _ in await self.search_similar_chunks_with_scores(query_embedding, top_k, filters)]
+
+    async def search_similar_chunks_with_scores(self, query_embedding: Sequence[float], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[Chunk, float]]:
+        if top_k <= 0 or self._live_count == 0:
+            return []
+        query = similarity.as_query_vector(query_embedding, self._dim)
+        rows, scores = self._search_rows(query, top_k, filters)
+        return self._collect(rows, scores)
+
+    async def search_similar_chunks_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int, filters: Optional[Metadata] = None) -> List[List[Tuple[Chunk, float]]]:
+        if top_k <= 0 or self._live_count == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        queries = similarity.as_query_matrix(query_embeddings, self._dim)
+        return [self._collect(rows, scores) for rows, scores in self._search_rows_batch(queries, top_k, filters)]
+
+    def _search_rows(self, query: np.ndarray, top_k: int, filters: Optional[Metadata]) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-k as (rows, ranking scores), best first."""
+        strategy = self.plan_filters(filters)
+        if strategy is FilterStrategy.PRE_FILTER:
+            rows = np.flatnonzero(self._filter_mask(filters))
+            scores = self._score_rows(query, rows)
+            selected = similarity.top_k_indices(scores, top_k)
+            return rows[selected], scores[selected]
+        scores = self._score_all(query)
+        if strategy is FilterStrategy.POST_FILTER:
+            valid = self._filter_mask(filters)
+        else:
+            valid = self._live[:self._size] if self._live_count < self._size else None
+        selected = similarity.top_k_indices(scores, top_k, valid)
+        return selected, scores[selected]
+
+    def _search_rows_batch(self, queries: np.ndarray, top_k: int, filters: Optional[Metadata]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Exact top-k for every query, scoring blocks of queries with one matrix-matrix product."""
+        strategy = self.plan_filters(filters)
+        rows, valid = None, None
+        if strategy is FilterStrategy.PRE_FILTER:
+            rows = np.flatnonzero(self._filter_mask(filters))
+        elif strategy is FilterStrategy.POST_FILTER:
+            valid = self._filter_mask(filters)
+        elif self._live_count < self._size:
+            valid = self._live[:self._size]
+        num_rows = self._size if rows is None else rows.shape[0]
+        results = []
+        for block in similarity.query_blocks(queries.shape[0], num_rows):
+            for scores in self._score_batch(queries[block], rows):
+                selected = similarity.top_k_indices(scores, top_k, valid)
+                results.append((selected if rows is None else rows[selected], scores[selected]))
+        return results
+
+    # --- Filter Planning ---
+
+    def plan_filters(self, filters: Optional[Metadata]) -> Optional[FilterStrategy]:
+        """
+        Chooses how `filters` will be applied, or None when there is nothing to filter.
+
+        Gathering candidate rows costs a copy per row, so it only pays off when the filter
+        is selective; otherwise one contiguous matmul over all rows plus a mask is cheaper.
+        """
+        if not filters:
+            return None
+        estimated = self._metadata_index.estimate(filters)
+        if estimated <= self.config.prefilter_selectivity * max(self._live_count, 1):
+            return FilterStrategy.PRE_FILTER
+        return FilterStrategy.POST_FILTER
+
+    def _filter_mask(self, filters: Metadata) -> np.ndarray:
+        """Bitmap over the used rows that match `filters` and are still live."""
+        return self._metadata_index.resolve(filters, self._size) & self._live[:self._size]
+
+    # --- Matrix Management ---
+
+    def _ensure_capacity(self, required_rows: int) -> None:
+        """Grows the matrix geometrically so appends are amortised O(1) per row."""
+        capacity = self.capacity
+        if required_rows <= capacity:
+            return
+        new_capacity = max(required_rows, self.config.initial_capacity, int(capacity * self.config.growth_factor))
+        logger.debug("Growing vector matrix from %d to %d rows", capacity, new_capacity)
+        self._grow_vectors(new_capacity)
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        self._live = live
+
+    def _grow_vectors(self, new_capacity: int) -> None:
+        """Reallocates the per-row vector arrays, keeping the used rows."""
+        matrix = np.empty((new_capacity, self._dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        norms = np.empty(new_capacity, dtype=np.float32)
+        norms[:self._size] = self._norms[:self._size]
+        self._matrix, self._norms = matrix, norms
+
+    def _write_rows(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        self._matrix[rows] = vectors
+        self._norms[rows] = similarity.row_norms(vectors)
+
+    def _move_rows(self, live_rows: np.ndarray) -> None:
+        """Packs the given rows, in order, into the front of the per-row vector arrays."""
+        count = live_rows.shape[0]
+        self._matrix[:count] = self._matrix[live_rows]
+        self._norms[:count] = self._norms[live_rows]
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        """Full-precision copy of one stored vector."""
+        return self._matrix[row].copy()
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Bytes held in memory by the vector arrays (excluding chunk text and metadata)."""
+        footprint = {"vectors": self._matrix.nbytes, "norms": self._norms.nbytes, "live_mask": self._live.nbytes}
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    def _retire_rows(self, rows: List[int]) -> None:
+        """Marks rows as dead so they are skipped by searches."""
+        if not rows:
+            return
+        index = np.asarray(rows, dtype=np.int64)
+        self._live_count -= int(np.count_nonzero(self._live[index]))
+        self._live[index] = False
+        for row in rows:
+            self._chunk_id_by_row[row] = None
+
+    def _unlink_from_document(self, chunk: Chunk) -> None:
+        chunk_ids = self._chunk_ids_by_doc.get(chunk.document_id)
+        if chunk_ids is not None:
+            chunk_ids.pop(chunk.id, None)
+            if not chunk_ids:
+                del self._chunk_ids_by_doc[chunk.document_id]
+
+    # --- Compaction ---
+
+    def _maybe_compact(self) -> None:
+        dead = self._size - self._live_count
+        if dead >= self.config.compaction_min_dead_rows and dead > self.config.compaction_threshold * self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Moves live rows to the front of the matrix, dropping dead rows and renumbering."""
+        live_rows = np.flatnonzero(self._live[:self._size])
+        mapping = np.full(self._size, -1, dtype=np.int64)
+        mapping[live_rows] = np.arange(live_rows.shape[0])
+        count = live_rows.shape[0]
+        logger.debug("Compacting vector matrix from %d to %d rows", self._size, count)
+
+        self._move_rows(live_rows)
+        self._live[:count] = True
+        self._live[count:] = False
+        self._chunk_id_by_row = [self._chunk_id_by_row[row] for row in live_rows.tolist()]
+        self._row_by_chunk_id = {chunk_id: row for row, chunk_id in enumerate(self._chunk_id_by_row)}
+        self._size = self._live_count = count
+
+        self._metadata_index.clear()
+        for row, chunk_id in enumerate(self._chunk_id_by_row):
+            self._metadata_index.add(row, self._chunks[chunk_id].metadata)
+        self._on_compact(mapping)
+
+    def _batch_vectors(self, embedded: List[Chunk]) -> np.ndarray:
+        """Stacks and validates a batch's embeddings before any of it is stored."""
+        try:
+            # Embedding exposes its float32 buffer directly, so this is one memcpy per row
+            vectors = np.stack([np.asarray(chunk.embedding, dtype=np.float32) for chunk in embedded])
+        except ValueError as e:
+            raise ValueError("All chunk embeddings in a batch must have the same dimension") from e
+        if self._dim is None:
+            self._check_dimension(vectors.shape[1])
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(f"Chunk embeddings have dimension {vectors.shape[1]}, expected {self._dim}")
+        return vectors
+
+    # --- Subclass Hooks ---
+
+    def _check_dimension(self, dim: int) -> None:
+        """Called before the first embedded batch fixes the dimension; raises to reject it."""
+
+    def _on_rows_added(self, rows: np.ndarray) -> None:
+        """Called after new rows are written and marked live."""
+
+    def _on_compact(self, mapping: np.ndarray) -> None:
+        """Called after compaction; `mapping[old_row]` is the new row number, or -1 if dropped."""
+
+    # --- Search Helpers ---
+
+    def _score_all(self, query: np.ndarray) -> np.ndarray:
+        return similarity.ranking_scores(self._matrix[:self._size], self._norms[:self._size], query, self.metric)
+
+    def _score_rows(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return similarity.ranking_scores(self._matrix[rows], self._norms[rows], query, self.metric)
+
+    def _score_batch(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """(num_queries, rows) ranking scores against the given rows, or all used rows."""
+        if rows is None:
+            return similarity.ranking_scores_batch(self._matrix[:self._size], self._norms[:self._size], queries, self.metric)
+        return similarity.ranking_scores_batch(self._matrix[rows], self._norms[rows], queries, self.metric)
+
+    def _collect(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[Chunk, float]]:
+        reported = similarity.finalize_scores(scores, self.metric)
+        return [
+            (self._materialize(self._chunk_id_by_row[row]), float(score))
+            for row, score in zip(rows.tolist(), reported.tolist())
+        ]
+
+    def _materialize(self, chunk_id: str) -> Chunk:
+        """Stored chunk with its embedding re-attached from the matrix."""
+        chunk = self._chunks[chunk_id]
+        row = self._row_by_chunk_id.get(chunk_id)
+        if row is None:
+            return chunk
+        return chunk.model_copy(update={"embedding": Embedding(self._row_vector(row))})
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterator
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+class WriteAheadLog:
+    """
+    Append-only log of JSON operations, one per line.
+
+    Every operation is flushed before `append` returns (and fsynced when `sync` is set),
+    so a storage engine can apply it to in-memory state afterwards and rebuild that state
+    by replaying the log after a crash. A torn final line is dropped on replay.
+    """
+    def __init__(self, path: str, sync: bool = False):
+        self.path = path
+        self.sync = sync
+        self._file = open(path, "ab")
+
+    def append(self, operation: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(operation, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yields logged operations in order, truncating an incomplete trailing record."""
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    operation = json.loads(line) if line.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    operation = None
+                if operation is None:
+                    logger.warning("Dropping torn record at byte %d of %s", valid_bytes, self.path)
+                    break
+                valid_bytes += len(line)
+                yield operation
+        if valid_bytes != os.path.getsize(self.path):
+            self._file.truncate(valid_bytes)
+
+    def reset(self) -> None:
+        """Empties the log once its operations are durable elsewhere."""
+        self._file.truncate(0)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def rotate(self, path: str) -> None:
+        """Moves the logged operations to `path` and continues with an empty log."""
+        self._file.close()
+        os.replace(self.path, path)
+        self._file = open(self.path, "ab")
+
+    def close(self) -> None:
+        self._file.close()
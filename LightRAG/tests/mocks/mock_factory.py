@@ -1,8 +1,10 @@
 from typing import List, Dict, Optional, Tuple, AsyncGenerator
+import asyncio
 import uuid
 from dataclasses import dataclass, field
 
 from LightRAG.core.interfaces import BaseRetriever, BaseGenerator, BaseVectorStorage
+from LightRAG.generation.streaming import TokenStream
 from LightRAG.models.data_models import Document, Chunk, Query, RetrieverResult, GeneratorContext, GeneratorResponse, Metadata
 from LightRAG.models.enums import RetrievalMode, DataSource
 
@@ -18,12 +20,18 @@ class MockVectorStorage(BaseVectorStorage):
             for chunk_id, chunk in self._chunks.items()
             if chunk.embedding is not None
         }
+        # Document ID -> IDs of its chunks, so per-document lookups avoid a full scan
+        self._chunk_ids_by_doc: Dict[str, List[str]] = {}
+        for chunk in self._chunks.values():
+            self._chunk_ids_by_doc.setdefault(chunk.document_id, []).append(chunk.id)
 
     async def add_document(self, document: Document) -> None:
         self._documents[document.id] = document
 
     async def add_chunks(self, chunks_to_add: List[Chunk]) -> None:
         for chunk in chunks_to_add:
+            if chunk.id not in self._chunks:
+                self._chunk_ids_by_doc.setdefault(chunk.document_id, []).append(chunk.id)
             self._chunks[chunk.id] = chunk
             if chunk.embedding:
                 self._chunk_embeddings[chunk.id] = chunk.embedding
@@ -35,7 +43,20 @@ class MockVectorStorage(BaseVectorStorage):
         return self._chunks.get(chunk_id)
 
     async def get_chunks_by_doc_id(self, doc_id: str) -> List[Chunk]:
-        return [chunk for chunk in self._chunks.values() if chunk.document_id == doc_id]
+        return [self._chunks[chunk_id] for chunk_id in self._chunk_ids_by_doc.get(doc_id, [])]
+
+    async def delete_document(self, doc_id: str) -> int:
+        self._documents.pop(doc_id, None)
+        chunk_ids = self._chunk_ids_by_doc.pop(doc_id, [])
+        for chunk_id in chunk_ids:
+            self._chunks.pop(chunk_id, None)
+            self._chunk_embeddings.pop(chunk_id, None)
+        return len(chunk_ids)
+
+    async def replace_document(self, document: Document, chunks: List[Chunk]) -> None:
+        await self.delete_document(document.id)
+        await self.add_document(document)
+        await self.add_chunks(chunks)
 
     async def search_similar_chunks(self, query_embedding: List[float], top_k: int, filters: Optional[Metadata] = None) -> List[Chunk]:
         # Extremely naive mock similarity: just return the first top_k chunks
@@ -45,6 +66,13 @@ class MockVectorStorage(BaseVectorStorage):
         result_ids = all_chunk_ids[:top_k]
         return [self._chunks[id] for id in result_ids if id in self._chunks]
 
+    async def search_similar_chunks_with_scores(self, query_embedding: List[float], top_k: int, filters: Optional[Metadata] = None) -> List[Tuple[Chunk, float]]:
+        chunks = await self.search_similar_chunks(query_embedding, top_k, filters)
+        return [(chunk, 1.0) for chunk in chunks] # Dummy scores
+
+    async def search_similar_chunks_batch(self, query_embeddings: List[List[float]], top_k: int, filters: Optional[Metadata] = None) -> List[List[Tuple[Chunk, float]]]:
+        return [await self.search_similar_chunks_with_scores(embedding, top_k, filters) for embedding in query_embeddings]
+
 class MockRetriever(BaseRetriever):
     """Mock retriever that uses a mock storage or predefined results."""
     def __init__(self, storage: BaseVectorStorage, predefined_results: Optional[Dict[str, List[Chunk]]] = None):
@@ -70,37 +98,49 @@ class MockRetriever(BaseRetriever):
             scores=[1.0] * len(chunks) # Dummy scores
         )
 
+    async def retrieve_many(self, queries: List[Query]) -> List[RetrieverResult]:
+        return [await self.retrieve(query) for query in queries]
+
 class MockGenerator(BaseGenerator):
-    """Mock generator that returns predefined answers."""
-    def __init__(self, predefined_answers: Optional[Dict[str, str]] = None):
+    """
+    Mock generator that returns predefined answers.
+
+    `stream_generate` emits the answer incrementally, two words at a time, sleeping
+    `first_token_delay` seconds before the first piece and `token_delay` seconds before
+    each later one, so time-to-first-token behaviour can be exercised without a model.
+    `generate` consumes that stream and records its timings in the response metadata.
+    """
+    def __init__(self, predefined_answers: Optional[Dict[str, str]] = None,
+                 first_token_delay: float = 0.0, token_delay: float = 0.0):
         # Maps query text to the answer string
         self.predefined_answers = predefined_answers or {}
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
 
     async def generate(self, context: GeneratorContext) -> GeneratorResponse:
+        stream = TokenStream(self.stream_generate(context), context)
+        async for _ in stream:
+            pass
+        return stream.response()
+
+    async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
+        words = self._answer(context).split()
+        # Simulate a model producing tokens: yield two words at a time as they are "decoded"
+        for i in range(0, len(words), 2):
+            delay = self.first_token_delay if i == 0 else self.token_delay
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield " ".join(words[i:i+2]) + (" " if i+2 < len(words) else "")
+
+    def _answer(self, context: GeneratorContext) -> str:
         query_text = context.query.text
         print(f"MockGenerator: Generating for query '{query_text}'")
 
         if query_text in self.predefined_answers:
-            answer = self.predefined_answers[query_text]
             print(f"  -> Using predefined answer for query: {query_text}")
-        else:
-            answer = f"Mock answer for query: '{query_text}'. Context chunks: {[c.id for c in context.retrieved_context.retrieved_chunks]}"
-            print("  -> Using default generated mock answer.")
-
-        return GeneratorResponse(
-            query_id=context.query.id,
-            answer=answer,
-            context_used=[c.id for c in context.retrieved_context.retrieved_chunks]
-        )
-
-    async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
-        response = await self.generate(context)
-        # Simulate streaming by yielding parts of the answer
-        words = response.answer.split()
-        for i in range(0, len(words), 2): # Yield two words at a time
-            yield " ".join(words[i:i+2]) + (" " if i+2 < len(words) else "")
-        # Ensure the generator finishes
-        if False: yield # Should not be reached
+            return self.predefined_answers[query_text]
+        print("  -> Using default generated mock answer.")
+        return f"Mock answer for query: '{query_text}'. Context chunks: {[c.id for c in context.retrieved_context.retrieved_chunks]}"
 
 # --- Mock Configuration Dataclass ---
 
@@ -113,6 +153,9 @@ class MockPipelineConfig:
     retriever_predefined_results: Dict[str, List[Chunk]] = field(default_factory=dict)
     # Maps query text -> predefined answer string
     generator_predefined_answers: Dict[str, str] = field(default_factory=dict)
+    # Simulated decode latency of the mock generator, in seconds
+    generator_first_token_delay: float = 0.0
+    generator_token_delay: float = 0.0
 
 # --- Mock Factory Function ---
 
@@ -151,7 +194,9 @@ def create_mock_rag_pipeline(config: MockPipelineConfig) -> Tuple[BaseVectorStor
 
     # 3. Create Mock Generator
     mock_generator = MockGenerator(
-        predefined_answers=config.generator_predefined_answers
+        predefined_answers=config.generator_predefined_answers,
+        first_token_delay=config.generator_first_token_delay,
+        token_delay=config.generator_token_delay,
     )
     print(f"Initialized MockGenerator with {len(config.generator_predefined_answers)} predefined answers.")
     print("--- Mock Pipeline Creation Complete ---\n")
@@ -216,6 +261,5 @@ async def example_mock_usage():
     print("--- Simulation Complete ---")
 
 if __name__ == "__main__":
-    import asyncio
     # Need an event loop to run the async example function
     asyncio.run(example_mock_usage()) 
\ No newline at end of file
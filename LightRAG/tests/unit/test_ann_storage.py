@@ -0,0 +1,125 @@
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk
+from LightRAG.models.enums import ANNIndexType
+from LightRAG.storage.ann_storage import ANNVectorStorage, ANNStorageConfig
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+DIM = 16
+
+def make_chunks(count: int, start: int = 0, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    return [
+        Chunk(id=f"chunk-{start + i}", document_id="doc", content="", embedding=vectors[i].tolist(), metadata={"bucket": (start + i) % 4})
+        for i in range(count)
+    ]
+
+def make_config(index_type: ANNIndexType) -> ANNStorageConfig:
+    return ANNStorageConfig(index_type=index_type, exact_search_threshold=0, exact_candidate_limit=0,
+                            hnsw_m=8, hnsw_ef_construction=48, ivf_nlist=16, ivf_nprobe=8, ivf_train_size=400)
+
+async def recall_at_k(storage: ANNVectorStorage, exact: InMemoryVectorStorage, queries: np.ndarray, top_k: int, **params) -> float:
+    hits = 0
+    for query in queries:
+        approx = {chunk.id for chunk, _ in await storage.search_similar_chunks_with_scores(query, top_k, **params)}
+        truth = {chunk.id for chunk in await exact.search_similar_chunks(query, top_k)}
+        hits += len(approx & truth)
+    return hits / (len(queries) * top_k)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", list(ANNIndexType))
+async def test_incremental_adds_keep_high_recall(index_type: ANNIndexType):
+    """Test that an index built across several add_chunks calls agrees with exact search."""
+    storage = ANNVectorStorage(make_config(index_type))
+    exact = InMemoryVectorStorage()
+    for batch in range(4):
+        chunks = make_chunks(300, start=batch * 300, seed=batch)
+        await storage.add_chunks(chunks)
+        await exact.add_chunks(chunks)
+
+    if index_type is ANNIndexType.IVF:
+        assert storage.index.is_trained
+    assert len(storage.index) == 1200
+
+    queries = np.random.default_rng(99).normal(size=(20, DIM)).astype(np.float32)
+    assert await recall_at_k(storage, exact, queries, 10) >= 0.8
+
+@pytest.mark.asyncio
+async def test_query_time_knobs_trade_recall():
+    """Test that probing every IVF bucket returns exact results."""
+    storage = ANNVectorStorage(make_config(ANNIndexType.IVF))
+    exact = InMemoryVectorStorage()
+    chunks = make_chunks(800)
+    await storage.add_chunks(chunks)
+    await exact.add_chunks(chunks)
+
+    queries = np.random.default_rng(7).normal(size=(10, DIM)).astype(np.float32)
+    assert await recall_at_k(storage, exact, queries, 5, nprobe=16) == 1.0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", list(ANNIndexType))
+async def test_filtered_ann_search_only_returns_matches(index_type: ANNIndexType):
+    """Test that filtered searches through the index only return matching chunks."""
+    storage = ANNVectorStorage(make_config(index_type))
+    await storage.add_chunks(make_chunks(600))
+
+    results = await storage.search_similar_chunks(np.ones(DIM, dtype=np.float32), top_k=10, filters={"bucket": 2})
+    assert len(results) == 10
+    assert all(chunk.metadata["bucket"] == 2 for chunk in results)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", list(ANNIndexType))
+async def test_index_follows_deletes_and_compaction(index_type: ANNIndexType):
+    """Test that deleted documents disappear from ANN results, before and after compaction."""
+    config = make_config(index_type)
+    config.compaction_min_dead_rows = 100
+    config.compaction_threshold = 0.4
+    storage = ANNVectorStorage(config)
+    chunks = make_chunks(600)
+    await storage.add_chunks([chunk.model_copy(update={"document_id": f"doc-{i % 3}"}) for i, chunk in enumerate(chunks)])
+
+    await storage.delete_document("doc-0")
+    assert storage._size == 600
+    query = np.asarray(chunks[0].embedding, dtype=np.float32)
+    results = await storage.search_similar_chunks(query, top_k=10)
+    assert len(results) == 10
+    assert all(chunk.document_id != "doc-0" for chunk in results)
+
+    await storage.delete_document("doc-1")
+    if index_type is ANNIndexType.HNSW:
+        # Dead HNSW nodes stay as routing-only tombstones until an explicit compaction
+        assert storage._size == 600
+        results = await storage.search_similar_chunks(query, top_k=10)
+        assert all(chunk.document_id == "doc-2" for chunk in results)
+        storage.compact()
+    assert storage._size == 200
+    assert len(storage.index) == 200
+    results = await storage.search_similar_chunks(query, top_k=10)
+    assert len(results) == 10
+    assert all(chunk.document_id == "doc-2" for chunk in results)
+
+@pytest.mark.asyncio
+async def test_hnsw_compaction_repairs_the_graph_in_place(monkeypatch):
+    """Test that compacting an HNSW store keeps recall without re-inserting the surviving rows."""
+    storage = ANNVectorStorage(make_config(ANNIndexType.HNSW))
+    exact = InMemoryVectorStorage()
+    chunks = make_chunks(1200)
+    await storage.add_chunks([chunk.model_copy(update={"document_id": f"doc-{i % 2}"}) for i, chunk in enumerate(chunks)])
+    await exact.add_chunks([chunk for i, chunk in enumerate(chunks) if i % 2])
+    await storage.delete_document("doc-0")
+
+    inserted = []
+    original_insert = storage.index._insert
+    monkeypatch.setattr(storage.index, "_insert", lambda row, vector: (inserted.append(row), original_insert(row, vector)))
+    storage.compact()
+
+    assert storage._size == len(storage.index) == 600
+    assert len(inserted) < 10
+    assert all(0 <= node < 600 for layer in storage.index._layers for links in layer.values() for node in links)
+    queries = np.random.default_rng(5).normal(size=(20, DIM)).astype(np.float32)
+    assert await recall_at_k(storage, exact, queries, 10) >= 0.8
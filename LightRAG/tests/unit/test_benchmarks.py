@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pytest
+
+from LightRAG.benchmarks.corpus import SyntheticCorpus, SyntheticCorpusConfig, SyntheticQueryEmbedder
+from LightRAG.benchmarks.runner import BenchmarkConfig, DEFAULT_SCALES, TARGETS, latency_summary, query_schedule, run_benchmarks
+
+# --- Test Data ---
+
+def small_corpus(num_chunks: int = 95) -> SyntheticCorpus:
+    return SyntheticCorpus(SyntheticCorpusConfig(num_chunks=num_chunks, embedding_dim=16, chunks_per_document=10))
+
+def small_config(**kwargs) -> BenchmarkConfig:
+    defaults = dict(scales=(300,), embedding_dim=16, num_queries=20, warmup_queries=2, top_k=5, isolate=False)
+    defaults.update(kwargs)
+    return BenchmarkConfig(**defaults)
+
+# --- Test Cases ---
+
+def test_corpus_is_deterministic_and_independent_of_batch_size():
+    """Test that the corpus has the requested size and is identical however it is batched."""
+    by_small = [chunk for _, chunks in small_corpus().batches(20) for chunk in chunks]
+    by_large = [chunk for _, chunks in small_corpus().batches(1000) for chunk in chunks]
+    documents = [document for documents, _ in small_corpus().batches(20) for document in documents]
+
+    assert len(by_small) == 95
+    assert len(documents) == 10
+    assert [chunk.id for chunk in by_small] == [chunk.id for chunk in by_large]
+    assert [chunk.content for chunk in by_small] == [chunk.content for chunk in by_large]
+    assert np.array_equal(np.asarray(by_small[-1].embedding), np.asarray(by_large[-1].embedding))
+    assert by_small[-1].document_id == "doc-9"
+
+@pytest.mark.asyncio
+async def test_queries_are_derived_from_their_source_chunk():
+    """Test that query text comes from the source chunk and the embedder returns its embedding offline."""
+    corpus = small_corpus()
+    chunks = {chunk.id: chunk for _, batch in corpus.batches() for chunk in batch}
+    queries = corpus.queries(10)
+
+    for query in queries:
+        source = chunks[query.source_chunk_id]
+        assert set(query.text.split()) <= set(source.content.split())
+        assert float(np.linalg.norm(query.embedding - np.asarray(source.embedding))) < 2.0
+
+    embedded = await SyntheticQueryEmbedder(queries, 16)([queries[0].text, "unseen text", "unseen text"])
+    assert embedded.shape == (3, 16)
+    assert np.array_equal(embedded[0], queries[0].embedding)
+    assert np.array_equal(embedded[1], embedded[2])
+
+def test_schedule_repeats_a_share_of_earlier_queries():
+    """Test that a fraction of timed queries replays earlier ones, so cache hits are measured."""
+    warmup, timed, is_repeat = query_schedule(small_corpus(), small_config(num_queries=20, repeat_fraction=0.25))
+
+    assert len(warmup) == 2 and len(timed) == 20
+    assert sum(is_repeat) == 5
+    issued = list(warmup)
+    for query, repeat in zip(timed, is_repeat):
+        assert any(query is earlier for earlier in issued) == repeat
+        issued.append(query)
+
+def test_default_run_is_bounded():
+    """Test that the default configuration kills cases that run too long, since it includes 1M-chunk builds."""
+    assert max(DEFAULT_SCALES) == 1_000_000
+    assert BenchmarkConfig().case_timeout_seconds is not None
+
+def test_latency_summary_percentiles():
+    """Test that latencies are summarised as millisecond percentiles."""
+    summary = latency_summary([i / 1000.0 for i in range(1, 101)])
+
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == pytest.approx(100.0)
+    assert latency_summary([]) == {}
+
+def test_run_writes_json_results_for_each_case(tmp_path):
+    """Test that a run measures every target at every scale and writes the report as JSON."""
+    output = tmp_path / "results" / "run.json"
+    report = run_benchmarks(small_config(scales=(150, 300), targets=["InMemoryVectorStorage", "HybridRetriever"]), output_path=str(output))
+
+    written = json.loads(output.read_text())
+    assert written == report
+    assert [(result["target"], result["scale"]) for result in written["results"]] == [
+        ("InMemoryVectorStorage", 150), ("HybridRetriever", 150),
+        ("InMemoryVectorStorage", 300), ("HybridRetriever", 300),
+    ]
+    for result in written["results"]:
+        assert result["status"] == "ok", result["error"]
+        assert result["ingest_chunks_per_second"] > 0
+        assert result["queries"] == 20
+        assert result["query_latency_ms"]["p50"] <= result["query_latency_ms"]["p95"] <= result["query_latency_ms"]["p99"]
+        assert result["repeat_queries"] == 4
+        assert result["repeat_query_latency_ms"]["p50"] > 0
+    assert written["config"]["targets"] == ["InMemoryVectorStorage", "HybridRetriever"]
+    assert "numpy" in written["environment"]
+
+def test_every_target_runs():
+    """Test that every registered storage and retriever completes a small case."""
+    report = run_benchmarks(small_config(scales=(120,), num_queries=5))
+
+    assert {result["target"] for result in report["results"]} == set(TARGETS)
+    failed = {result["target"]: result["error"] for result in report["results"] if result["status"] != "ok"}
+    assert failed == {}
+
+def test_unknown_target_is_rejected():
+    """Test that a misspelled target name fails before anything runs."""
+    with pytest.raises(ValueError):
+        run_benchmarks(small_config(targets=["NoSuchStorage"]))
+
+def test_isolated_case_reports_its_own_peak_rss():
+    """Test that an isolated case runs in a child process and reports that process's peak RSS."""
+    report = run_benchmarks(small_config(targets=["InMemoryVectorStorage"], isolate=True, case_timeout_seconds=120))
+
+    result = report["results"][0]
+    assert result["status"] == "ok", result["error"]
+    assert result["rss_isolated"] is True
+    if result["peak_rss_mb"] is not None:
+        assert result["peak_rss_mb"] >= result["baseline_rss_mb"] > 0
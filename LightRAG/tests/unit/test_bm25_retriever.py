@@ -0,0 +1,112 @@
+import math
+
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Query
+from LightRAG.models.enums import RetrievalMode
+from LightRAG.retrievers.bm25_retriever import BM25Retriever
+from LightRAG.storage.inverted_index import InvertedIndex, tokenize
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+VOCABULARY = [f"w{i}" for i in range(200)]
+
+def make_corpus(count: int, seed: int = 0) -> list:
+    """Zipf-like texts: a few very common terms and a long tail of rare ones."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(VOCABULARY) + 1)
+    weights /= weights.sum()
+    return [
+        Chunk(id=f"c{i}", document_id=f"d{i % 10}", content=" ".join(rng.choice(VOCABULARY, size=rng.integers(5, 40), p=weights)),
+              metadata={"parity": i % 2})
+        for i in range(count)
+    ]
+
+def exhaustive_bm25(chunks: list, query: str, k1: float = 1.2, b: float = 0.75) -> dict:
+    docs = [tokenize(chunk.content) for chunk in chunks]
+    avg_length = sum(len(doc) for doc in docs) / len(docs)
+    terms = list(dict.fromkeys(tokenize(query)))
+    dfs = {term: sum(1 for doc in docs if term in doc) for term in terms}
+    scores = {}
+    for chunk, doc in zip(chunks, docs):
+        score = 0.0
+        for term in terms:
+            df = dfs[term]
+            tf = doc.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_length))
+        if score > 0:
+            scores[chunk.id] = score
+    return scores
+
+# --- Test Cases ---
+
+@pytest.mark.parametrize("query", ["w0 w1 w150", "w3 w77", "w0 w1 w2 w3 w199"])
+def test_maxscore_matches_exhaustive_scoring(query: str):
+    """Test that early termination returns the exact BM25 top-k."""
+    chunks = make_corpus(2000)
+    index = InvertedIndex()
+    for chunk in chunks:
+        index.add(chunk.id, chunk.document_id, tokenize(chunk.content))
+
+    results = index.search(tokenize(query), top_k=10)
+    expected = exhaustive_bm25(chunks, query)
+
+    expected_top = sorted(expected.values(), reverse=True)[:10]
+    assert [score for _, score in results] == pytest.approx(expected_top, rel=1e-4)
+    for chunk_id, score in results:
+        assert expected[chunk_id] == pytest.approx(score, rel=1e-4)
+
+def test_common_terms_are_not_fully_scanned():
+    """Test that MaxScore skips most postings of frequent terms."""
+    chunks = make_corpus(5000)
+    index = InvertedIndex()
+    for chunk in chunks:
+        index.add(chunk.id, chunk.document_id, tokenize(chunk.content))
+    terms = ["w150", "w0", "w1", "w2"]
+    full = sum(index._postings[term].size for term in terms)
+
+    index.search(terms, top_k=5)
+
+    assert index.postings_visited < full / 2
+
+def test_remove_and_compact_keep_statistics_exact():
+    """Test that removed chunks vanish from results and scores match a fresh index."""
+    chunks = make_corpus(300)
+    index = InvertedIndex(compaction_threshold=0.2, compaction_min_dead_rows=10)
+    for chunk in chunks:
+        index.add(chunk.id, chunk.document_id, tokenize(chunk.content))
+    assert index.remove_document("d3") == 30
+    index.remove([f"c{i}" for i in range(0, 300, 7)])
+
+    survivors = [chunk for chunk in chunks if chunk.document_id != "d3" and int(chunk.id[1:]) % 7]
+    fresh = InvertedIndex()
+    for chunk in survivors:
+        fresh.add(chunk.id, chunk.document_id, tokenize(chunk.content))
+
+    assert index._size == len(survivors)  # compaction ran
+    for query in (["w0", "w5"], ["w40", "w41"]):
+        assert index.search(query, 20) == pytest.approx(fresh.search(query, 20))
+
+@pytest.mark.asyncio
+async def test_retriever_reads_chunks_from_storage():
+    """Test NAIVE retrieval end to end, including metadata filters."""
+    storage = InMemoryVectorStorage()
+    chunks = [
+        Chunk(id="a", document_id="d1", content="Graph databases store entities", metadata={"lang": "en"}),
+        Chunk(id="b", document_id="d1", content="Vector databases store embeddings", metadata={"lang": "en"}),
+        Chunk(id="c", document_id="d2", content="Bases de datos vectoriales", metadata={"lang": "es"}),
+    ]
+    await storage.add_chunks(chunks)
+    retriever = BM25Retriever(storage)
+    retriever.add_chunks(chunks)
+
+    result = await retriever.retrieve(Query(id="q1", text="vector databases", mode=RetrievalMode.NAIVE, top_k=2))
+    assert [chunk.id for chunk in result.retrieved_chunks] == ["b", "a"]
+    assert result.scores[0] > result.scores[1] > 0
+    assert result.metadata["mode"] == "NAIVE"
+
+    filtered = await retriever.retrieve(Query(id="q2", text="vectoriales databases", top_k=5, filters={"lang": "es"}))
+    assert [chunk.id for chunk in filtered.retrieved_chunks] == ["c"]
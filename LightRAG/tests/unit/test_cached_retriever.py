@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Query, RetrieverResult
+from LightRAG.retrievers.bm25_retriever import BM25Retriever
+from LightRAG.retrievers.cached_retriever import CachedRetriever, RetrievalCacheConfig, TermInvalidation, VectorInvalidation
+from LightRAG.retrievers.vector_retriever import VectorRetriever
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+EMBEDDINGS = {
+    "cats": [1.0, 0.0, 0.0],
+    "dogs": [0.0, 1.0, 0.0],
+    "fish": [0.0, 0.0, 1.0],
+}
+
+embed_calls = []
+
+async def fake_embed(texts: list) -> np.ndarray:
+    embed_calls.append(list(texts))
+    return np.asarray([EMBEDDINGS.get(text, [0.5, 0.5, 0.0]) for text in texts], dtype=np.float32)
+
+class CountingRetriever(VectorRetriever):
+    """VectorRetriever that counts retrievals."""
+    def __init__(self, storage, embedding_func):
+        super().__init__(storage, embedding_func)
+        self.calls = 0
+
+    async def retrieve_with_embedding(self, query: Query):
+        self.calls += 1
+        return await super().retrieve_with_embedding(query)
+
+def make_chunk(chunk_id: str, doc_id: str, vector, **metadata) -> Chunk:
+    return Chunk(id=chunk_id, document_id=doc_id, content=chunk_id, embedding=vector, metadata=metadata)
+
+@pytest_asyncio.fixture
+async def storage() -> InMemoryVectorStorage:
+    storage = InMemoryVectorStorage()
+    await storage.add_chunks([
+        make_chunk("c-cats", "d-cats", EMBEDDINGS["cats"], lang="en"),
+        make_chunk("c-dogs", "d-dogs", EMBEDDINGS["dogs"], lang="en"),
+        make_chunk("c-fish", "d-fish", EMBEDDINGS["fish"], lang="de"),
+    ])
+    return storage
+
+def make_cache(storage, **config) -> CachedRetriever:
+    return CachedRetriever(CountingRetriever(storage, fake_embed), storage, RetrievalCacheConfig(**config))
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(storage: InMemoryVectorStorage):
+    """Test that the same (text, mode, top_k, filters) hits, and a different top_k or filter misses."""
+    cache = make_cache(storage)
+
+    first = await cache.retrieve(Query(id="q1", text="cats", top_k=1))
+    second = await cache.retrieve(Query(id="q2", text=" cats ", top_k=1))
+    await cache.retrieve(Query(id="q3", text="cats", top_k=2))
+    await cache.retrieve(Query(id="q4", text="cats", top_k=1, filters={"lang": "de"}))
+
+    assert cache.retriever.calls == 3
+    assert second.query_id == "q2"
+    assert [c.id for c in second.retrieved_chunks] == [c.id for c in first.retrieved_chunks]
+    assert second.metadata["cached"] is True
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_rate == pytest.approx(0.25)
+
+@pytest.mark.asyncio
+async def test_delete_evicts_only_dependent_entries(storage: InMemoryVectorStorage):
+    """Test that deleting a document drops entries that returned it and keeps the rest."""
+    cache = make_cache(storage)
+    cats, dogs = Query(id="q1", text="cats", top_k=1), Query(id="q2", text="dogs", top_k=1)
+    await cache.retrieve(cats)
+    await cache.retrieve(dogs)
+
+    await cache.delete_document("d-cats")
+    after = await cache.retrieve(cats)
+    await cache.retrieve(dogs)
+
+    assert "c-cats" not in [c.id for c in after.retrieved_chunks]
+    assert cache.retriever.calls == 3
+    assert cache.stats.invalidations == 1
+    assert cache.stats.max_hit_writes_behind == 1
+
+@pytest.mark.asyncio
+async def test_add_chunks_evicts_only_entries_the_chunk_can_enter(storage: InMemoryVectorStorage):
+    """Test that a new chunk drops entries it outscores or whose filters it passes, not the rest."""
+    cache = make_cache(storage)
+    cats = Query(id="q1", text="cats", top_k=2)
+    dogs = Query(id="q2", text="dogs", top_k=1)
+    german = Query(id="q3", text="cats", top_k=1, filters={"lang": "de"})
+    for query in (cats, dogs, german):
+        await cache.retrieve(query)
+    assert isinstance(cache.invalidation, VectorInvalidation)
+    embeds_before_write = len(embed_calls)
+
+    # Close to "cats", English: enters the cats top-2, cannot beat "dogs" or pass the German filter
+    await cache.add_chunks([make_chunk("c-kitten", "d-kitten", [0.99, 0.1, 0.0], lang="en")])
+    # Invalidation scores against the stored query embeddings, never the embedder
+    assert len(embed_calls) == embeds_before_write
+
+    assert len(cache) == 2
+    fresh = await cache.retrieve(cats)
+    assert [c.id for c in fresh.retrieved_chunks] == ["c-cats", "c-kitten"]
+    await cache.retrieve(dogs)
+    await cache.retrieve(german)
+    assert cache.retriever.calls == 4
+
+    # Replacing a returned chunk in place invalidates entries that returned it
+    await cache.add_chunks([make_chunk("c-dogs", "d-dogs", [0.0, 0.9, 0.1], lang="en")])
+    await cache.retrieve(dogs)
+    assert cache.retriever.calls == 5
+
+@pytest.mark.asyncio
+async def test_entries_that_were_not_full_are_invalidated_by_matching_chunks(storage: InMemoryVectorStorage):
+    """Test that a result with fewer than top_k chunks is dropped when a chunk passing its filter arrives."""
+    cache = make_cache(storage)
+    query = Query(id="q1", text="fish", top_k=5, filters={"lang": "de"})
+    await cache.retrieve(query)
+
+    await cache.add_chunks([make_chunk("c-trout", "d-trout", [0.0, 1.0, 0.0], lang="de")])
+    result = await cache.retrieve(query)
+
+    assert [c.id for c in result.retrieved_chunks] == ["c-fish", "c-trout"]
+
+@pytest.mark.asyncio
+async def test_result_overlapping_a_write_is_not_cached(storage: InMemoryVectorStorage):
+    """Test that a retrieval racing a write is returned but not stored."""
+    cache = make_cache(storage)
+    gate = asyncio.Event()
+    original = cache.retriever.retrieve_with_embedding
+
+    async def slow_retrieve(query):
+        await gate.wait()
+        return await original(query)
+
+    cache.retriever.retrieve_with_embedding = slow_retrieve
+    pending = asyncio.create_task(cache.retrieve(Query(id="q1", text="cats", top_k=1)))
+    await asyncio.sleep(0)
+    await cache.delete_document("d-fish")
+    gate.set()
+    await pending
+
+    assert len(cache) == 0
+    assert cache.stats.discarded_fills == 1
+
+@pytest.mark.asyncio
+async def test_ttl_and_staleness_metrics(storage: InMemoryVectorStorage):
+    """Test that hit ages are reported and entries past the TTL are refreshed."""
+    now = [0.0]
+    cache = make_cache(storage, ttl_seconds=60, clock=lambda: now[0])
+    query = Query(id="q1", text="cats", top_k=1)
+
+    await cache.retrieve(query)
+    now[0] = 30
+    await cache.retrieve(query)
+    now[0] = 61
+    await cache.retrieve(query)
+
+    assert cache.retriever.calls == 2
+    assert cache.stats.max_hit_age == pytest.approx(30)
+    assert cache.stats.mean_hit_age == pytest.approx(30)
+    assert cache.stats.evictions == 1
+
+@pytest.mark.asyncio
+async def test_unrelated_writes_leave_lexical_entries_cached():
+    """Test that with a BM25 retriever, a new chunk only drops entries whose query shares one of its terms."""
+    storage = InMemoryVectorStorage()
+    bm25 = BM25Retriever(storage)
+    topics = [f"topic{i}" for i in range(20)]
+    chunks = [Chunk(id=f"c-{topic}", document_id=f"d-{topic}", content=f"notes about {topic}") for topic in topics]
+    await storage.add_chunks(chunks)
+    bm25.add_chunks(chunks)
+    cache = CachedRetriever(bm25, storage)
+    assert isinstance(cache.invalidation, TermInvalidation)
+    for topic in topics:
+        await cache.retrieve(Query(id=topic, text=topic, top_k=3))
+
+    unrelated = Chunk(id="c-other", document_id="d-other", content="weather report for tuesday")
+    bm25.add_chunks([unrelated])
+    await cache.add_chunks([unrelated])
+    assert len(cache) == 20
+
+    related = Chunk(id="c-more", document_id="d-more", content="more on topic7")
+    bm25.add_chunks([related])
+    await cache.add_chunks([related])
+    assert len(cache) == 19
+    result = await cache.retrieve(Query(id="again", text="topic7", top_k=3))
+    assert {c.id for c in result.retrieved_chunks} == {"c-topic7", "c-more"}
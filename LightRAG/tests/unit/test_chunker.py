@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+
+from LightRAG.ingestion.chunker import ChunkerConfig, RegexTokenEncoder, TokenChunker
+from LightRAG.models.data_models import Document
+from LightRAG.models.enums import DataSource
+
+# --- Test Data ---
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "über", "naïve", "—", "!?"]
+
+def make_text(words: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    separators = rng.choice([" ", " ", " ", "\n", "  ", ", "], size=words)
+    return "".join(f"{rng.choice(WORDS)}{separator}" for separator in separators)
+
+def make_chunker(size: int = 20, overlap: int = 5, window: int = 64) -> TokenChunker:
+    return TokenChunker(ChunkerConfig(chunk_size=size, chunk_overlap=overlap, window_chars=window), RegexTokenEncoder())
+
+# --- Test Cases ---
+
+def test_spans_are_slices_with_consistent_offsets():
+    """Test that each chunk is the source slice at its offsets, with the configured size and overlap."""
+    text = make_text(500)
+    spans = list(make_chunker().spans(text))
+    total_tokens = len(RegexTokenEncoder().token_offsets(text))
+
+    assert spans[0].char_start == 0 and spans[0].token_start == 0
+    assert spans[-1].char_end == len(text) and spans[-1].token_end == total_tokens
+    for span in spans:
+        assert span.text == text[span.char_start:span.char_end]
+    for previous, span in zip(spans, spans[1:]):
+        assert previous.token_end - previous.token_start == 20
+        assert span.token_start == previous.token_end - 5
+        assert span.char_start < previous.char_end
+
+def test_streamed_pieces_match_whole_string():
+    """Test that chunking a stream of pieces gives the same spans as chunking the joined text."""
+    text = make_text(800, seed=1)
+    chunker = make_chunker(size=32, overlap=8, window=100)
+    pieces = [text[i:i + 37] for i in range(0, len(text), 37)]
+
+    assert [vars(span) for span in chunker.spans(iter(pieces))] == [vars(span) for span in chunker.spans(text)]
+
+def test_window_size_does_not_change_chunks():
+    """Test that windows cut at whitespace so tokenization matches a single pass."""
+    text = make_text(600, seed=2)
+    small = list(make_chunker(window=50).spans(text))
+    large = list(make_chunker(window=1 << 20).spans(text))
+
+    assert [vars(span) for span in small] == [vars(span) for span in large]
+
+def test_short_and_empty_inputs():
+    """Test that text shorter than a chunk yields one chunk and empty text yields none."""
+    chunker = make_chunker()
+
+    assert [span.text for span in chunker.spans("just a few words")] == ["just a few words"]
+    assert list(chunker.spans("")) == []
+    assert list(chunker.spans(iter([]))) == []
+
+def test_chunk_document_records_positions():
+    """Test that chunks carry ids, document metadata and offsets."""
+    document = Document(id="doc", content=make_text(100, seed=3), source=DataSource.TEXT, metadata={"lang": "en"})
+    chunks = list(make_chunker()(document))
+
+    assert [chunk.id for chunk in chunks] == [f"doc-chunk-{i}" for i in range(len(chunks))]
+    assert all(chunk.document_id == "doc" for chunk in chunks)
+    first = chunks[0].metadata
+    assert first["lang"] == "en" and first["chunk_index"] == 0
+    assert chunks[1].content == document.content[chunks[1].metadata["char_start"]:chunks[1].metadata["char_end"]]
+
+def test_generator_is_lazy():
+    """Test that chunks are produced before an unbounded stream of pieces is exhausted."""
+    def endless():
+        while True:
+            yield "word " * 10
+
+    spans = make_chunker(size=10, overlap=0, window=64).spans(endless())
+    first = [next(spans) for _ in range(3)]
+    assert [span.token_start for span in first] == [0, 10, 20]
+
+def test_invalid_overlap_is_rejected():
+    with pytest.raises(ValueError):
+        make_chunker(size=10, overlap=10)
+
+def test_tiktoken_encoder_offsets():
+    """Test that the tiktoken encoder chunks to exact token counts."""
+    pytest.importorskip("tiktoken")
+    text = make_text(300, seed=4)
+    spans = list(TokenChunker(ChunkerConfig(chunk_size=50, chunk_overlap=10, window_chars=200)).spans(text))
+
+    assert spans[0].char_start == 0 and spans[0].text == text[:spans[0].char_end]
+    assert all(span.token_end - span.token_start == 50 for span in spans[:-1])
+    assert spans[-1].char_end == len(text)
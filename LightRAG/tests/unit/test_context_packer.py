@@ -0,0 +1,122 @@
+import pytest
+
+from LightRAG.generation.packer import ContextPacker, ContextPackerConfig, PackedContextGenerator
+from LightRAG.ingestion.chunker import TokenChunker, ChunkerConfig, RegexTokenEncoder, TiktokenEncoder
+from LightRAG.models.data_models import Document, Chunk, Query, RetrieverResult, GeneratorContext
+from LightRAG.models.enums import DataSource, RetrievalMode
+from LightRAG.tests.mocks.mock_factory import MockGenerator
+
+# --- Test Data ---
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+def make_chunk(id: str, content: str, doc_id: str = "doc", **metadata) -> Chunk:
+    return Chunk(id=id, document_id=doc_id, content=content, metadata=metadata)
+
+def make_result(chunks, scores=None) -> RetrieverResult:
+    return RetrieverResult(query_id="q-pack", retrieved_chunks=chunks, scores=scores)
+
+def packer(max_tokens: int, **kwargs) -> ContextPacker:
+    return ContextPacker(ContextPackerConfig(max_tokens=max_tokens, token_counter=word_count, **kwargs))
+
+DOCUMENT_TEXT = " ".join(f"w{i}" for i in range(40))
+
+# --- Test Cases ---
+
+def test_chunks_are_packed_by_score_within_budget():
+    """Test that the best-scoring chunks are kept, best first, and smaller ones fill leftover budget."""
+    chunks = [
+        make_chunk("low", "one two three", doc_id="a"),
+        make_chunk("high", "one two three four five six", doc_id="b"),
+        make_chunk("big", "one two three four five six seven", doc_id="c"),
+        make_chunk("mid", "one two", doc_id="d"),
+    ]
+    packed = packer(10).pack(make_result(chunks, scores=[0.2, 0.9, 0.5, 0.4]))
+
+    assert [chunk.id for chunk in packed.retrieved_chunks] == ["high", "mid"]
+    assert packed.scores == [0.9, 0.4]
+    stats = packed.metadata["packing"]
+    assert stats["tokens_used"] == 8
+    assert stats["chunks_over_budget"] == 2
+
+def test_per_chunk_overhead_counts_against_budget():
+    """Test that the per-chunk overhead is charged for every packed chunk."""
+    chunks = [make_chunk(f"c{i}", "one two", doc_id=f"d{i}") for i in range(4)]
+    packed = packer(9, per_chunk_overhead_tokens=1).pack(make_result(chunks))
+
+    assert len(packed.retrieved_chunks) == 3
+    assert packed.scores is None
+
+def test_overlapping_chunker_output_is_trimmed_by_offsets():
+    """Test that overlap between adjacent TokenChunker chunks of one document is sent only once."""
+    document = Document(id="doc", content=DOCUMENT_TEXT, source=DataSource.TEXT)
+    chunker = TokenChunker(ChunkerConfig(chunk_size=10, chunk_overlap=4), RegexTokenEncoder())
+    chunks = list(chunker(document))
+    assert len(chunks) >= 3
+
+    packed = packer(1000).pack(make_result(chunks[:3], scores=[0.9, 0.8, 0.7]))
+    combined = "".join(chunk.content for chunk in packed.retrieved_chunks)
+
+    assert combined.split() == DOCUMENT_TEXT.split()[:len(combined.split())]
+    assert word_count(combined) == len(set(combined.split()))
+    assert packed.metadata["packing"]["chars_trimmed"] > 0
+    for chunk in packed.retrieved_chunks[1:]:
+        assert chunk.metadata["trimmed"] is True
+        assert DOCUMENT_TEXT[chunk.metadata["char_start"]:chunk.metadata["char_end"]] == chunk.content
+
+def test_overlap_is_trimmed_by_text_without_offsets():
+    """Test that a shared suffix/prefix between chunks of one document is trimmed from the later chunk."""
+    first = make_chunk("c0", "alpha beta gamma delta epsilon zeta")
+    second = make_chunk("c1", "delta epsilon zeta eta theta iota")
+    contained = make_chunk("c2", "gamma delta")
+    other_doc = make_chunk("c3", "delta epsilon zeta eta", doc_id="other")
+
+    packed = packer(100, min_overlap_chars=5).pack(make_result([first, second, contained, other_doc]))
+
+    assert [chunk.content for chunk in packed.retrieved_chunks] == [
+        first.content, " eta theta iota", other_doc.content,
+    ]
+    assert packed.metadata["packing"]["chunks_redundant"] == 1
+
+def test_token_counts_are_cached_per_chunk():
+    """Test that packing the same chunks again does not call the token counter again."""
+    calls = []
+
+    def counting(text: str) -> int:
+        calls.append(text)
+        return word_count(text)
+
+    context_packer = ContextPacker(ContextPackerConfig(max_tokens=100, token_counter=counting))
+    chunks = [make_chunk(f"c{i}", f"chunk number {i}", doc_id=f"d{i}") for i in range(5)]
+    context_packer.pack(make_result(chunks))
+    context_packer.pack(make_result(list(reversed(chunks))))
+
+    assert len(calls) == 5
+    assert context_packer.count_hits == 5
+
+    # A re-ingested chunk reusing an id is recounted
+    context_packer.pack(make_result([make_chunk("c0", "new text for chunk zero", doc_id="d0")]))
+    assert len(calls) == 6
+
+def test_default_counter_matches_the_chunker_encoding():
+    """Test that the default token counter agrees with the encoder TokenChunker would use."""
+    text = "Packing counts tokens, like the chunker does."
+    try:
+        expected = len(TiktokenEncoder().token_offsets(text))
+    except ImportError:
+        expected = len(RegexTokenEncoder().token_offsets(text))
+
+    assert ContextPackerConfig().token_counter(text) == expected
+
+@pytest.mark.asyncio
+async def test_packed_generator_only_sees_packed_context():
+    """Test that the wrapper hands the generator the packed context only."""
+    chunks = [make_chunk(f"c{i}", "one two three", doc_id=f"d{i}") for i in range(4)]
+    query = Query(id="q-pack", text="packed question", mode=RetrievalMode.VECTOR)
+    context = GeneratorContext(query=query, retrieved_context=make_result(chunks, scores=[0.1, 0.4, 0.3, 0.2]))
+
+    generator = PackedContextGenerator(MockGenerator(), packer(6))
+    response = await generator.generate(context)
+
+    assert response.context_used == ["c1", "c2"]
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+import numpy as np
+
+from LightRAG.ingestion import directory
+from LightRAG.ingestion.directory import DirectoryIngestionConfig, DirectoryLoader, ingest_directory
+from LightRAG.ingestion.pdf import PDFExtractionConfig
+from LightRAG.ingestion.pipeline import IngestionPipeline
+from LightRAG.ingestion.registry import DocumentRegistry
+from LightRAG.models.data_models import Chunk
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+
+def fake_count(path: str) -> int:
+    return 2
+
+def fake_extract(path: str, start: int, end: int) -> list:
+    if "broken" in path:
+        raise RuntimeError("not a PDF")
+    return [f"pdf page {page + 1}" for page in range(start, end)]
+
+def make_tree(root, files: int = 30):
+    for i in range(files):
+        folder = root / f"group{i % 3}" / "nested"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"note{i}.txt").write_text(f"note {i}\n\nsecond paragraph {i}", encoding="utf-8")
+    (root / "ignored.csv").write_text("a,b", encoding="utf-8")
+    (root / "manual.pdf").write_bytes(b"%PDF fake")
+    (root / "broken.pdf").write_bytes(b"garbage")
+
+def make_config(**overrides) -> DirectoryIngestionConfig:
+    pdf = PDFExtractionConfig(workers=1, count_pages=fake_count, extract_pages=fake_extract)
+    return DirectoryIngestionConfig(pdf=pdf, **overrides)
+
+def paragraph_chunker(document):
+    for i, paragraph in enumerate(document.content.split("\n\n")):
+        yield Chunk(id=f"{document.id}#{i}", document_id=document.id, content=paragraph)
+
+async def fake_embed(texts):
+    return np.ones((len(texts), 4), dtype=np.float32)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_loader_streams_matching_files_as_documents(tmp_path):
+    """Test that text and PDF files under the tree become Documents and failures are recorded."""
+    make_tree(tmp_path)
+    loader = DirectoryLoader(str(tmp_path), make_config())
+
+    documents = {document.id: document async for document in loader.documents()}
+
+    assert len(documents) == 31
+    assert documents["group1/nested/note4.txt"].content == "note 4\n\nsecond paragraph 4"
+    stat = (tmp_path / "group1" / "nested" / "note4.txt").stat()
+    assert documents["group1/nested/note4.txt"].metadata == {
+        "path": "group1/nested/note4.txt", "extension": ".txt", "file_size": stat.st_size, "file_mtime_ns": stat.st_mtime_ns}
+    assert documents["manual.pdf"].content == "pdf page 1\npdf page 2"
+    assert "ignored.csv" not in documents
+    assert loader.failures["broken.pdf"] == "RuntimeError: not a PDF"
+    assert loader.files_found == 32 and loader.files_loaded == 31
+
+@pytest.mark.asyncio
+async def test_open_file_limit_is_enforced(tmp_path, monkeypatch):
+    """Test that concurrent reads never exceed max_open_files while still overlapping."""
+    make_tree(tmp_path, files=40)
+    lock, active, peak = threading.Lock(), [0], [0]
+    original = directory._read_text
+
+    def tracking_read(path, encoding):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        return original(path, encoding)
+
+    monkeypatch.setattr(directory, "_read_text", tracking_read)
+    loader = DirectoryLoader(str(tmp_path), make_config(extensions=(".txt",), max_open_files=4, read_threads=16))
+    documents = [document async for document in loader.documents()]
+
+    assert len(documents) == 40
+    assert 1 < peak[0] <= 4
+
+@pytest.mark.asyncio
+async def test_in_flight_documents_are_bounded_by_the_consumer(tmp_path, monkeypatch):
+    """Test that a slow consumer stops the loader from reading ahead of the in-flight limit."""
+    make_tree(tmp_path, files=30)
+    reads = []
+    original = directory._read_text
+    monkeypatch.setattr(directory, "_read_text", lambda path, encoding: reads.append(path) or original(path, encoding))
+    loader = DirectoryLoader(str(tmp_path), make_config(extensions=(".txt",), max_in_flight_documents=5))
+    stream = loader.documents()
+
+    await stream.__anext__()
+    await asyncio.sleep(0.05)
+    # The document handed over plus at most five loaded ahead of the consumer
+    assert len(reads) == 6
+    rest = [document async for document in stream]
+    assert len(rest) == 29 and len(reads) == 30
+
+@pytest.mark.asyncio
+async def test_ingest_directory_feeds_the_pipeline(tmp_path):
+    """Test that a directory is ingested end to end, with unreadable files reported as failed."""
+    make_tree(tmp_path, files=12)
+    storage = InMemoryVectorStorage()
+    pipeline = IngestionPipeline(storage, paragraph_chunker, fake_embed)
+
+    report = await ingest_directory(str(tmp_path), pipeline, make_config())
+
+    assert report.documents_completed == 13
+    assert report.documents_failed == 1 and "broken.pdf" in report.failures
+    assert len(storage) == 12 * 2 + 1
+    assert await storage.get_document("group0/nested/note0.txt") is not None
+
+@pytest.mark.asyncio
+async def test_unchanged_files_are_skipped_before_reading(tmp_path, monkeypatch):
+    """Test that a second run reads only files whose size or mtime changed, and no PDF is re-extracted."""
+    make_tree(tmp_path, files=6)
+    registry = DocumentRegistry()
+    await ingest_directory(str(tmp_path), IngestionPipeline(InMemoryVectorStorage(), paragraph_chunker, fake_embed, registry=registry), make_config())
+
+    reads, extracted = [], []
+    original_read, original_stream = directory._read_text, directory.stream_pdf_pages
+    monkeypatch.setattr(directory, "_read_text", lambda path, encoding: reads.append(path) or original_read(path, encoding))
+    monkeypatch.setattr(directory, "stream_pdf_pages", lambda *args: extracted.append(args[0]) or original_stream(*args))
+    edited = tmp_path / "group0" / "nested" / "note0.txt"
+    edited.write_text("an edited note", encoding="utf-8")
+    touched = tmp_path / "group1" / "nested" / "note1.txt"
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10**9))
+
+    storage = InMemoryVectorStorage()
+    report = await ingest_directory(str(tmp_path), IngestionPipeline(storage, paragraph_chunker, fake_embed, registry=registry), make_config())
+
+    assert sorted(reads) == sorted([str(edited), str(touched)])
+    # broken.pdf never completed, so it is the only PDF opened again
+    assert extracted == [str(tmp_path / "broken.pdf")]
+    assert report.documents_completed == 1 and report.documents_unchanged == 6
+    assert registry.get("group1/nested/note1.txt").source_mtime_ns == touched.stat().st_mtime_ns
+    assert registry.is_unchanged_source("group1/nested/note1.txt", touched.stat().st_size, touched.stat().st_mtime_ns)
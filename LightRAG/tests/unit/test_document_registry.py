@@ -0,0 +1,194 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+import numpy as np
+
+from LightRAG.ingestion.pipeline import IngestionConfig, IngestionPipeline
+from LightRAG.ingestion.registry import DocumentRegistry, content_hash
+from LightRAG.models.data_models import Document, Chunk
+from LightRAG.models.enums import DataSource, ProcessingStatus
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+DIM = 4
+
+def make_document(i: int, paragraphs=None) -> Document:
+    paragraphs = paragraphs or [f"doc {i} paragraph {p}" for p in range(3)]
+    return Document(id=f"d{i}", content="\n\n".join(paragraphs), source=DataSource.TEXT)
+
+def paragraph_chunker(document: Document):
+    for i, paragraph in enumerate(document.content.split("\n\n")):
+        yield Chunk(id=f"{document.id}-{i}", document_id=document.id, content=paragraph)
+
+class RecordingEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    async def __call__(self, texts):
+        self.texts.extend(texts)
+        return np.stack([np.full(DIM, float(len(text)), dtype=np.float32) for text in texts])
+
+def make_pipeline(storage, registry, embedder, chunker=paragraph_chunker) -> IngestionPipeline:
+    return IngestionPipeline(storage, chunker, embedder, IngestionConfig(batch_timeout=0.001), registry=registry)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_unchanged_documents_are_skipped():
+    """Test that re-ingesting identical documents embeds and writes nothing."""
+    storage, registry = InMemoryVectorStorage(), DocumentRegistry()
+    await make_pipeline(storage, registry, RecordingEmbedder()).run([make_document(i) for i in range(5)])
+
+    embedder = RecordingEmbedder()
+    report = await make_pipeline(storage, registry, embedder).run([make_document(i) for i in range(5)])
+
+    assert report.documents_unchanged == 5 and report.documents_completed == 0
+    assert embedder.texts == []
+    assert registry.get("d3").status is ProcessingStatus.COMPLETED
+    assert registry.get("d3").content_hash == content_hash(make_document(3).content)
+
+@pytest.mark.asyncio
+async def test_changed_document_reembeds_only_changed_chunks():
+    """Test that a changed document replaces its stored version and reuses unchanged chunk embeddings."""
+    storage, registry = InMemoryVectorStorage(), DocumentRegistry()
+    await make_pipeline(storage, registry, RecordingEmbedder()).run([make_document(0), make_document(1)])
+
+    embedder = RecordingEmbedder()
+    changed = make_document(0, ["doc 0 paragraph 0", "a rewritten paragraph"])
+    report = await make_pipeline(storage, registry, embedder).run([changed, make_document(1)])
+
+    assert embedder.texts == ["a rewritten paragraph"]
+    assert report.chunks_reused == 1 and report.documents_unchanged == 1
+    chunks = await storage.get_chunks_by_doc_id("d0")
+    assert sorted(chunk.content for chunk in chunks) == ["a rewritten paragraph", "doc 0 paragraph 0"]
+    assert await storage.get_chunk("d0-2") is None
+    assert set(registry.chunk_hashes("d0")) == {"d0-0", "d0-1"}
+    reused = await storage.get_chunk("d0-0")
+    np.testing.assert_array_equal(np.asarray(reused.embedding), np.full(DIM, 17.0))
+
+@pytest.mark.asyncio
+async def test_failed_reingest_keeps_the_stored_version():
+    """Test that a changed document whose new version fails leaves the previous version and its hashes in place."""
+    storage, registry = InMemoryVectorStorage(), DocumentRegistry()
+    await make_pipeline(storage, registry, RecordingEmbedder()).run([make_document(0)])
+    changed = make_document(0, ["doc 0 paragraph 0", "a rewritten paragraph"])
+
+    async def failing(texts):
+        raise RuntimeError("embedder down")
+
+    report = await make_pipeline(storage, registry, failing).run([changed])
+
+    assert report.documents_failed == 1
+    assert registry.get("d0").status is ProcessingStatus.FAILED
+    chunks = await storage.get_chunks_by_doc_id("d0")
+    assert sorted(chunk.content for chunk in chunks) == [f"doc 0 paragraph {p}" for p in range(3)]
+    assert set(registry.chunk_hashes("d0")) == {"d0-0", "d0-1", "d0-2"}
+
+    embedder = RecordingEmbedder()
+    report = await make_pipeline(storage, registry, embedder).run([changed])
+
+    assert report.documents_completed == 1 and report.chunks_reused == 1
+    assert embedder.texts == ["a rewritten paragraph"]
+    assert sorted(chunk.content for chunk in await storage.get_chunks_by_doc_id("d0")) == ["a rewritten paragraph", "doc 0 paragraph 0"]
+    assert set(registry.chunk_hashes("d0")) == {"d0-0", "d0-1"}
+
+@pytest.mark.asyncio
+async def test_failed_documents_are_retried_from_persisted_status(tmp_path):
+    """Test that a later run, with a registry reopened from disk, only processes what did not complete."""
+    path = str(tmp_path / "registry.sqlite")
+    storage = InMemoryVectorStorage()
+
+    def broken_chunker(document):
+        if document.id == "d2":
+            raise ValueError("parser crashed")
+        return paragraph_chunker(document)
+
+    registry = DocumentRegistry(path)
+    await make_pipeline(storage, registry, RecordingEmbedder(), broken_chunker).run([make_document(i) for i in range(4)])
+    registry.close()
+
+    registry = DocumentRegistry(path)
+    assert [record.doc_id for record in registry.with_status(ProcessingStatus.FAILED)] == ["d2"]
+    assert registry.get("d2").error == "ValueError: parser crashed"
+
+    embedder = RecordingEmbedder()
+    report = await make_pipeline(storage, registry, embedder).run([make_document(i) for i in range(4)])
+
+    assert report.documents_unchanged == 3 and report.documents_completed == 1
+    assert embedder.texts == [f"doc 2 paragraph {p}" for p in range(3)]
+    assert registry.with_status(ProcessingStatus.FAILED, ProcessingStatus.PENDING, ProcessingStatus.PROCESSING) == []
+
+@pytest.mark.asyncio
+async def test_interrupted_load_resumes_without_reembedding_written_chunks():
+    """Test that cancelling a bulk load leaves unfinished documents to resume, reusing chunks already written."""
+    storage, registry = InMemoryVectorStorage(), DocumentRegistry()
+    documents = [make_document(i) for i in range(20)]
+
+    class InterruptingEmbedder(RecordingEmbedder):
+        async def __call__(self, texts):
+            if len(self.texts) >= 30:
+                await asyncio.Event().wait()
+            return await super().__call__(texts)
+
+    config = IngestionConfig(embed_batch_size=2, write_batch_size=2, embed_workers=1, write_workers=1, batch_timeout=0.001)
+    task = asyncio.create_task(IngestionPipeline(storage, paragraph_chunker, InterruptingEmbedder(), config, registry=registry).run(documents))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    unfinished = registry.with_status(ProcessingStatus.PENDING, ProcessingStatus.PROCESSING)
+    assert unfinished
+    embedder = RecordingEmbedder()
+    report = await make_pipeline(storage, registry, embedder).run(documents)
+
+    assert report.documents_completed == len(unfinished)
+    assert report.documents_unchanged == 20 - len(unfinished)
+    assert len(embedder.texts) + report.chunks_reused == 3 * len(unfinished)
+    assert len(storage) == 60
+    assert registry.with_status(ProcessingStatus.PENDING, ProcessingStatus.PROCESSING) == []
+
+@pytest.mark.asyncio
+async def test_registry_is_updated_off_the_event_loop_once_per_write_batch():
+    """Test that registry commits run on a worker thread and chunk hashes are stored per write batch."""
+    threads, batches = set(), []
+
+    class RecordingRegistry(DocumentRegistry):
+        def set_status(self, doc_id, status, error=None):
+            threads.add(threading.current_thread())
+            super().set_status(doc_id, status, error)
+
+        def put_chunk_records(self, records):
+            threads.add(threading.current_thread())
+            batches.append(len(records))
+            super().put_chunk_records(records)
+
+    storage, registry = InMemoryVectorStorage(), RecordingRegistry()
+    config = IngestionConfig(write_batch_size=30, write_workers=1, batch_timeout=0.05)
+    report = await IngestionPipeline(storage, paragraph_chunker, RecordingEmbedder(), config, registry=registry).run(
+        [make_document(i) for i in range(10)])
+
+    assert report.documents_completed == 10
+    assert threading.main_thread() not in threads
+    assert sum(batches) == 30 and len(batches) < 10
+    assert registry.chunk_hashes("d4") == {f"d4-{p}": content_hash(f"doc 4 paragraph {p}") for p in range(3)}
+    assert registry.with_status(ProcessingStatus.COMPLETED)[0].doc_id == "d0"
+
+def test_registry_without_source_columns_is_upgraded(tmp_path):
+    """Test that a registry file written before source stats were recorded opens and keeps its records."""
+    path = str(tmp_path / "registry.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE documents (doc_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, status TEXT NOT NULL, error TEXT, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO documents VALUES ('d0', 'abc', 'COMPLETED', NULL, 0.0)")
+    conn.commit()
+    conn.close()
+
+    registry = DocumentRegistry(path)
+
+    assert registry.is_current("d0", "abc")
+    assert registry.get("d0").source_size is None
+    assert not registry.is_unchanged_source("d0", 10, 20)
+    assert not registry.begin_if_changed("d0", "abc", 10, 20)
+    assert registry.is_unchanged_source("d0", 10, 20)
@@ -0,0 +1,65 @@
+import pytest
+import sys
+import numpy as np
+
+from LightRAG.models.data_models import Chunk
+from LightRAG.models.embedding import Embedding
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+DIM = 1536
+
+def make_chunk(embedding) -> Chunk:
+    return Chunk(id="c1", document_id="d1", content="text", embedding=embedding)
+
+# --- Test Cases ---
+
+def test_list_input_still_validates():
+    """Test that chunks built from plain float lists keep working."""
+    chunk = make_chunk([0.5, 0.25, 1.0])
+
+    assert isinstance(chunk.embedding, Embedding)
+    assert chunk.embedding == [0.5, 0.25, 1.0]
+    assert chunk.embedding.tolist() == [0.5, 0.25, 1.0]
+    assert len(chunk.embedding) == 3
+
+def test_float32_array_is_adopted_without_copy():
+    """Test that float32 arrays are wrapped, not copied, and are read-only inside the chunk."""
+    vector = np.arange(DIM, dtype=np.float32)
+    chunk = make_chunk(vector)
+
+    assert np.shares_memory(np.asarray(chunk.embedding), vector)
+    assert vector.flags.writeable  # caller's array is left untouched
+    with pytest.raises(ValueError):
+        np.asarray(chunk.embedding)[0] = 1.0
+
+def test_bytes_and_json_round_trip():
+    """Test raw float32 buffers and JSON serialisation round-trip exactly."""
+    vector = np.random.default_rng(0).normal(size=8).astype(np.float32)
+    from_bytes = make_chunk(vector.tobytes())
+    assert from_bytes.embedding == vector
+
+    restored = Chunk.model_validate_json(from_bytes.model_dump_json())
+    assert restored.embedding == from_bytes.embedding
+    assert Chunk.model_json_schema()["properties"]["embedding"]["anyOf"][0]["type"] == "array"
+
+def test_memory_per_embedding_is_much_smaller_than_list():
+    """Test that an embedding costs roughly 4 bytes per dimension instead of ~32."""
+    values = np.random.default_rng(1).normal(size=DIM).tolist()
+    list_bytes = sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+    embedding = Embedding(values)
+    embedding_bytes = sys.getsizeof(embedding) + sys.getsizeof(embedding.array) + embedding.nbytes
+
+    assert embedding.nbytes == DIM * 4
+    assert list_bytes / embedding_bytes > 7
+
+@pytest.mark.asyncio
+async def test_storage_holds_each_vector_once():
+    """Test storage strips embeddings from stored chunks and re-attaches them on read."""
+    storage = InMemoryVectorStorage()
+    chunk = make_chunk(np.ones(4, dtype=np.float32))
+    await storage.add_chunks([chunk])
+
+    assert storage._chunks["c1"].embedding is None
+    retrieved = await storage.get_chunk("c1")
+    assert retrieved.embedding == chunk.embedding
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+
+import pytest
+import numpy as np
+
+from LightRAG.embedding.cache import CachedEmbeddingFunction, EmbeddingCacheConfig, SQLiteEmbeddingStore, cache_key, normalize_text
+
+# --- Test Data ---
+DIM = 8
+
+class CountingEmbedder:
+    """Deterministic fake embedder that records every batch it is called with."""
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def __call__(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return np.stack([np.full(DIM, float(len(text)), dtype=np.float32) + np.arange(DIM) for text in texts])
+
+def make_cache(embedder, **overrides) -> CachedEmbeddingFunction:
+    return CachedEmbeddingFunction(embedder, EmbeddingCacheConfig(model="test-model", **overrides))
+
+# --- Test Cases ---
+
+def test_keys_depend_on_model_and_normalized_text():
+    """Test that whitespace variants share a key and different models do not."""
+    assert normalize_text("  hello \n  world ") == "hello world"
+    assert cache_key("m", "hello world") == cache_key("m", " hello\tworld\n")
+    assert cache_key("m", "hello world") != cache_key("other", "hello world")
+
+@pytest.mark.asyncio
+async def test_only_misses_reach_the_embedder():
+    """Test that a batch sends only uncached, distinct texts to the embedder, in one call."""
+    embedder = CountingEmbedder()
+    cache = make_cache(embedder)
+
+    first = await cache(["a", "bb", "a"])
+    second = await cache(["bb", "ccc", "a  "])
+
+    assert embedder.calls == [["a", "bb"], ["ccc"]]
+    assert first.shape == (3, DIM) and first.dtype == np.float32
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(second[0], first[1])
+    np.testing.assert_array_equal(second[2], first[0])
+    # Counters are per text, so the repeated "a" of the first batch counts as a miss twice
+    assert cache.stats.misses == 4
+    assert cache.stats.memory_hits == 2
+    assert cache.stats.hit_rate == pytest.approx(2 / 6)
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    """Test that the memory tier stays bounded and keeps recently used entries."""
+    embedder = CountingEmbedder()
+    cache = make_cache(embedder, max_memory_entries=2)
+
+    await cache(["a", "bb"])
+    await cache(["a"])
+    await cache(["ccc"])
+    await cache(["a", "bb"])
+
+    assert embedder.calls == [["a", "bb"], ["ccc"], ["bb"]]
+
+@pytest.mark.asyncio
+async def test_disk_tier_persists_across_instances(tmp_path):
+    """Test that a new cache on the same SQLite file serves earlier embeddings without the embedder."""
+    path = str(tmp_path / "cache" / "embeddings.sqlite")
+    first = make_cache(CountingEmbedder(), disk_path=path)
+    expected = await first(["alpha", "beta"])
+    first.close()
+
+    embedder = CountingEmbedder()
+    second = make_cache(embedder, disk_path=path)
+    result = await second(["beta", "alpha", "gamma"])
+
+    assert embedder.calls == [["gamma"]]
+    np.testing.assert_array_equal(result[0], expected[1])
+    np.testing.assert_array_equal(result[1], expected[0])
+    assert second.stats.disk_hits == 2
+    assert second.stats.misses == 1
+    second.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_in_flight_misses():
+    """Test that overlapping calls embed a shared text only once."""
+    embedder = CountingEmbedder(delay=0.01)
+    cache = make_cache(embedder)
+
+    left, right = await asyncio.gather(cache(["shared", "x"]), cache(["shared", "y"]))
+
+    assert sorted(text for call in embedder.calls for text in call) == ["shared", "x", "y"]
+    np.testing.assert_array_equal(left[0], right[0])
+
+@pytest.mark.asyncio
+async def test_embedder_errors_propagate_and_are_not_cached():
+    """Test that a failed embedding call raises and a retry reaches the embedder again."""
+    attempts = []
+
+    async def flaky(texts, **kwargs):
+        attempts.append(list(texts))
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return np.ones((len(texts), DIM), dtype=np.float32)
+
+    cache = make_cache(flaky)
+    with pytest.raises(RuntimeError):
+        await cache(["a"])
+    result = await cache(["a"])
+
+    assert attempts == [["a"], ["a"]]
+    assert result.shape == (1, DIM)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_embedding():
+    """Test that cancelling the call that started an embedding leaves callers waiting on the same text unaffected."""
+    embedder = CountingEmbedder(delay=0.05)
+    cache = make_cache(embedder)
+
+    owner = asyncio.create_task(cache(["hello"]))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache(["hello", "world"]))
+    await asyncio.sleep(0.01)
+    owner.cancel()
+    result = await waiter
+
+    assert owner.cancelled()
+    assert result.shape == (2, DIM)
+    assert embedder.calls == [["hello"], ["world"]]
+    await cache(["hello"])
+    assert len(embedder.calls) == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_owner():
+    """Test that a caller waiting on another call's embedding can be cancelled on its own."""
+    cache = make_cache(CountingEmbedder(delay=0.05))
+
+    owner = asyncio.create_task(cache(["hello"]))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache(["hello"]))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+
+    assert (await owner).shape == (1, DIM)
+    assert waiter.cancelled()
+
+@pytest.mark.asyncio
+async def test_keyword_arguments_are_part_of_the_key():
+    """Test that calls with different embedder options never share cached vectors."""
+    embedder = CountingEmbedder()
+    cache = make_cache(embedder)
+
+    await cache(["a"])
+    await cache(["a"], model="large")
+    await cache(["a"], model="large")
+    await cache(["a"], model="small")
+    await cache(["a"], handle=object())
+
+    assert embedder.calls == [["a"], ["a"], ["a"], ["a"]]
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.bypassed == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_does_not_block_the_event_loop(tmp_path, monkeypatch):
+    """Test that SQLite reads and writes run off the event loop thread."""
+    threads = []
+    for name in ("get_many", "put_many"):
+        original = getattr(SQLiteEmbeddingStore, name)
+
+        def recording(self, *args, _original=original):
+            threads.append(threading.current_thread())
+            return _original(self, *args)
+
+        monkeypatch.setattr(SQLiteEmbeddingStore, name, recording)
+    cache = make_cache(CountingEmbedder(), disk_path=str(tmp_path / "embeddings.sqlite"))
+
+    await cache(["alpha"])
+    await cache.warm(["beta"], np.ones((1, DIM), dtype=np.float32))
+
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+    cache.close()
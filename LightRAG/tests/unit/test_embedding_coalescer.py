@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+import numpy as np
+
+from LightRAG.embedding.coalescer import CoalescerConfig, EmbeddingCoalescer
+
+# --- Test Data ---
+DIM = 4
+
+class OverheadEmbedder:
+    """Fake endpoint serving one request at a time, with a fixed cost per call plus a small cost per text."""
+    def __init__(self, call_overhead: float = 0.005, per_text: float = 0.00002):
+        self.call_overhead = call_overhead
+        self.per_text = per_text
+        self.batches = []
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, texts):
+        async with self._lock:
+            await asyncio.sleep(self.call_overhead + self.per_text * len(texts))
+            self.batches.append(list(texts))
+            return np.stack([np.full(DIM, float(text.split()[-1]), dtype=np.float32) for text in texts])
+
+def value(vectors: np.ndarray) -> list:
+    return vectors[:, 0].astype(int).tolist()
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_batches_and_get_their_own_results():
+    """Test that concurrent requests are merged into few calls and fanned back in order."""
+    embedder = OverheadEmbedder()
+    coalescer = EmbeddingCoalescer(embedder, CoalescerConfig(max_batch_size=64))
+
+    results = await asyncio.gather(*(coalescer([f"text {i}", f"text {i + 1000}"]) for i in range(100)))
+
+    assert [value(result) for result in results] == [[i, i + 1000] for i in range(100)]
+    assert len(embedder.batches) == 4
+    assert all(len(batch) <= 64 for batch in embedder.batches)
+    assert coalescer.stats.mean_batch_size == pytest.approx(50.0)
+
+@pytest.mark.asyncio
+async def test_token_budget_bounds_each_batch():
+    """Test that batches stay within the token budget, and an oversized text travels alone."""
+    embedder = OverheadEmbedder(call_overhead=0.0)
+    config = CoalescerConfig(max_batch_tokens=10, token_counter=lambda text: len(text.split()))
+    coalescer = EmbeddingCoalescer(embedder, config)
+
+    texts = ["w w w 1", "w w w 2", "w w w 3", " ".join(["w"] * 20) + " 4", "w 5"]
+    results = await asyncio.gather(*(coalescer([text]) for text in texts))
+
+    assert [value(result)[0] for result in results] == [1, 2, 3, 4, 5]
+    assert [len(batch) for batch in embedder.batches] == [2, 1, 1, 1]
+
+@pytest.mark.asyncio
+async def test_large_request_is_split_and_reassembled():
+    """Test that one caller's texts spanning several batches come back whole and in order."""
+    embedder = OverheadEmbedder(call_overhead=0.0)
+    coalescer = EmbeddingCoalescer(embedder, CoalescerConfig(max_batch_size=8))
+
+    result = await coalescer([f"t {i}" for i in range(30)])
+
+    assert value(result) == list(range(30))
+    assert [len(batch) for batch in embedder.batches] == [8, 8, 8, 6]
+
+@pytest.mark.asyncio
+async def test_lone_caller_is_flushed_after_max_wait():
+    """Test that a single request is sent once the wait bound passes."""
+    coalescer = EmbeddingCoalescer(OverheadEmbedder(call_overhead=0.0), CoalescerConfig(max_wait_seconds=0.01))
+
+    started = time.perf_counter()
+    result = await coalescer(["only 7"])
+
+    assert value(result) == [7]
+    assert 0.005 <= time.perf_counter() - started < 0.5
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller_in_the_batch():
+    """Test that a failed batched call raises in each waiting caller."""
+    async def failing(texts):
+        raise RuntimeError("503 from embedding service")
+
+    coalescer = EmbeddingCoalescer(failing)
+    results = await asyncio.gather(coalescer(["a 1"]), coalescer(["b 2"]), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_coalescing_beats_one_call_per_request():
+    """Test the throughput gain against a fake with fixed per-call overhead."""
+    callers = 100
+
+    direct = OverheadEmbedder()
+    started = time.perf_counter()
+    await asyncio.gather(*(direct([f"q {i}"]) for i in range(callers)))
+    direct_seconds = time.perf_counter() - started
+
+    batched = OverheadEmbedder()
+    coalescer = EmbeddingCoalescer(batched)
+    started = time.perf_counter()
+    await asyncio.gather(*(coalescer([f"q {i}"]) for i in range(callers)))
+    coalesced_seconds = time.perf_counter() - started
+
+    assert len(direct.batches) == callers and len(batched.batches) == 1
+    assert coalesced_seconds * 5 < direct_seconds
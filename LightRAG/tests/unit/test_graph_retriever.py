@@ -0,0 +1,98 @@
+import time
+
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Query
+from LightRAG.models.enums import RetrievalMode
+from LightRAG.retrievers.graph_retriever import GraphRetriever, GraphRetrieverConfig
+from LightRAG.storage.entity_graph import EntityGraph
+from LightRAG.tests.mocks.mock_factory import MockVectorStorage
+
+# --- Test Data ---
+
+def project_graph() -> EntityGraph:
+    """The project team graph from networkX/NetworkX_demo.py, with chunks per entity."""
+    graph = EntityGraph()
+    for name in ["Alice", "Bob", "Charlie", "David", "Project Alpha", "Project Beta", "Python", "UX Design", "Database"]:
+        graph.add_entity(name, [f"chunk-{name.lower().replace(' ', '-')}"])
+    graph.add_relations(
+        ["Alice", "Bob", "Charlie", "David", "Bob", "Alice", "Charlie", "David", "Project Beta"],
+        ["Project Alpha", "Project Alpha", "Project Alpha", "Project Beta", "Project Beta", "Python", "UX Design", "Python", "Database"],
+        [1.0, 1.0, 1.0, 1.0, 0.2, 0.5, 0.5, 0.5, 0.8],
+    )
+    return graph
+
+def storage_for(graph: EntityGraph) -> MockVectorStorage:
+    chunks = {
+        chunk_id: Chunk(id=chunk_id, document_id="team", content=graph.name(node), metadata={"entity": graph.name(node)})
+        for node in range(graph.num_nodes) for chunk_id in graph.chunk_ids(node)
+    }
+    return MockVectorStorage(chunks=chunks)
+
+# --- Test Cases ---
+
+def test_find_entities_matches_multi_word_names():
+    """Test that query seeding finds single- and multi-word entity names."""
+    graph = project_graph()
+    assert {graph.name(node) for node in graph.find_entities("Who on project alpha knows python?")} == {"Project Alpha", "Python"}
+
+def test_expand_respects_hops_fan_out_and_weights():
+    """Test hop limits, heaviest-first fan-out caps and edge-weight pruning."""
+    graph = project_graph()
+    alice = graph.node_id("Alice")
+
+    nodes, scores = graph.expand([alice], hops=1)
+    assert {graph.name(node) for node in nodes} == {"Alice", "Project Alpha", "Python"}
+    assert dict(zip(nodes.tolist(), scores.tolist()))[graph.node_id("Project Alpha")] == pytest.approx(0.5)
+
+    nodes, _ = graph.expand([alice], hops=1, fan_out=1)
+    assert {graph.name(node) for node in nodes} == {"Alice", "Project Alpha"}
+
+    nodes, _ = graph.expand([alice], hops=2, min_weight=0.6)
+    assert {graph.name(node) for node in nodes} == {"Alice", "Project Alpha", "Bob", "Charlie"}
+
+def test_directed_graph_follows_edge_direction():
+    """Test that directed graphs only expand along outgoing relations."""
+    graph = EntityGraph(directed=True)
+    graph.add_relations(["a", "b"], ["b", "c"])
+    nodes, _ = graph.expand([graph.node_id("c")], hops=2)
+    assert nodes.tolist() == [graph.node_id("c")]
+
+def test_two_hop_expansion_on_million_edge_graph_is_fast():
+    """Test that a capped 2-hop expansion stays in the millisecond range at 1M edges."""
+    rng = np.random.default_rng(0)
+    num_nodes, num_edges = 100_000, 1_000_000
+    graph = EntityGraph()
+    names = [f"e{i}" for i in range(num_nodes)]
+    for name in names:
+        graph.add_entity(name)
+    sources = rng.integers(0, num_nodes, num_edges)
+    targets = rng.integers(0, num_nodes, num_edges)
+    graph.add_relations([names[i] for i in sources], [names[i] for i in targets], rng.random(num_edges) + 0.01)
+    graph.expand([0], hops=1)  # freeze the CSR arrays outside the timed region
+
+    seeds = rng.integers(0, num_nodes, 5).tolist()
+    started = time.perf_counter()
+    for _ in range(10):
+        nodes, _ = graph.expand(seeds, hops=2, fan_out=32)
+    elapsed = (time.perf_counter() - started) / 10
+
+    assert nodes.shape[0] > 100
+    assert elapsed < 0.05
+
+@pytest.mark.asyncio
+async def test_retriever_ranks_chunks_by_path_score():
+    """Test GRAPH retrieval end to end, including metadata filters."""
+    graph = project_graph()
+    retriever = GraphRetriever(storage_for(graph), graph, GraphRetrieverConfig(hops=2))
+
+    result = await retriever.retrieve(Query(id="q1", text="What does Charlie work on?", mode=RetrievalMode.GRAPH, top_k=3))
+
+    assert [chunk.id for chunk in result.retrieved_chunks[:1]] == ["chunk-charlie"]
+    assert {chunk.id for chunk in result.retrieved_chunks[1:]} == {"chunk-project-alpha", "chunk-ux-design"}
+    assert result.scores == sorted(result.scores, reverse=True)
+    assert result.metadata["seed_entities"] == ["Charlie"]
+
+    filtered = await retriever.retrieve(Query(id="q2", text="Charlie", top_k=5, filters={"entity": {"$in": ["Bob", "Alice"]}}))
+    assert {chunk.id for chunk in filtered.retrieved_chunks} == {"chunk-alice", "chunk-bob"}
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from LightRAG.models.data_models import Chunk, Query, RetrieverResult
+from LightRAG.models.enums import FusionStrategy, RetrievalMode
+from LightRAG.retrievers.hybrid_retriever import HybridRetriever, HybridBranch, HybridRetrieverConfig
+
+# --- Test Data ---
+
+class FixedRetriever:
+    """Returns a fixed ranking after an optional delay."""
+    def __init__(self, ranking: list, scores: list = None, delay: float = 0.0, fail: bool = False):
+        self.ranking = ranking
+        self.scores = scores
+        self.delay = delay
+        self.fail = fail
+        self.requested_top_k = None
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        self.requested_top_k = query.top_k
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("branch failed")
+        chunks = [Chunk(id=chunk_id, document_id="doc", content=chunk_id) for chunk_id in self.ranking[:query.top_k]]
+        return RetrieverResult(query_id=query.id, retrieved_chunks=chunks, scores=self.scores)
+
+def make_query(top_k: int = 3) -> Query:
+    return Query(id="q1", text="anything", mode=RetrievalMode.HYBRID, top_k=top_k)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_reciprocal_rank_fusion_favours_agreement():
+    """Test that chunks ranked well by several branches rise to the top."""
+    vector = FixedRetriever(["a", "b", "c"])
+    graph = FixedRetriever(["b", "d", "a"])
+    retriever = HybridRetriever([HybridBranch("vector", vector), HybridBranch("graph", graph)])
+
+    result = await retriever.retrieve(make_query(top_k=3))
+
+    assert [chunk.id for chunk in result.retrieved_chunks] == ["b", "a", "d"]
+    assert result.scores[0] == pytest.approx(1 / 62 + 1 / 61)
+    assert vector.requested_top_k == 6
+    assert result.metadata["contributing_branches"] == ["vector", "graph"]
+
+@pytest.mark.asyncio
+async def test_weighted_score_fusion_normalises_branch_scores():
+    """Test weighted fusion on min-max normalised scores with branch weights."""
+    vector = FixedRetriever(["a", "b", "c"], scores=[0.9, 0.5, 0.1])
+    lexical = FixedRetriever(["c", "a"], scores=[12.0, 3.0])
+    retriever = HybridRetriever(
+        [HybridBranch("vector", vector, weight=1.0), HybridBranch("lexical", lexical, weight=2.0)],
+        HybridRetrieverConfig(fusion=FusionStrategy.WEIGHTED_SCORE),
+    )
+
+    result = await retriever.retrieve(make_query(top_k=2))
+
+    assert [chunk.id for chunk in result.retrieved_chunks] == ["c", "a"]
+    assert result.scores == pytest.approx([2.0, 1.0])
+
+@pytest.mark.asyncio
+async def test_slow_and_failing_branches_drop_out():
+    """Test per-branch deadlines: slow branches are dropped and latency is recorded."""
+    fast = FixedRetriever(["a", "b"])
+    slow = FixedRetriever(["z"], delay=5.0)
+    broken = FixedRetriever(["y"], fail=True)
+    retriever = HybridRetriever([
+        HybridBranch("vector", fast),
+        HybridBranch("graph", slow, timeout=0.05),
+        HybridBranch("lexical", broken),
+    ])
+
+    started = asyncio.get_running_loop().time()
+    result = await retriever.retrieve(make_query(top_k=2))
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 1.0
+    assert [chunk.id for chunk in result.retrieved_chunks] == ["a", "b"]
+    branches = result.metadata["branches"]
+    assert branches["vector"]["status"] == "ok" and branches["vector"]["results"] == 2
+    assert branches["graph"]["status"] == "timeout"
+    assert 40.0 <= branches["graph"]["latency_ms"] < 1000.0
+    assert branches["lexical"]["status"] == "error"
+    assert result.metadata["contributing_branches"] == ["vector"]
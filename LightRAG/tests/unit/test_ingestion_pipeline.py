@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+import numpy as np
+
+from LightRAG.ingestion.pipeline import IngestionConfig, IngestionPipeline
+from LightRAG.models.data_models import Document, Chunk
+from LightRAG.models.enums import DataSource, ProcessingStatus
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+DIM = 4
+
+def make_document(i: int, paragraphs: int = 3) -> Document:
+    content = "\n\n".join(f"doc {i} paragraph {p}" for p in range(paragraphs))
+    return Document(id=f"d{i}", content=content, source=DataSource.TEXT)
+
+def paragraph_chunker(document: Document):
+    """Lazily yields one chunk per paragraph."""
+    for i, paragraph in enumerate(document.content.split("\n\n")):
+        yield Chunk(id=f"{document.id}-{i}", document_id=document.id, content=paragraph, metadata={"position": i})
+
+class RecordingEmbedder:
+    def __init__(self):
+        self.batch_sizes = []
+
+    async def __call__(self, texts):
+        self.batch_sizes.append(len(texts))
+        return np.ones((len(texts), DIM), dtype=np.float32)
+
+class StatusLog:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, doc_id, status, error):
+        self.events.append((doc_id, status))
+
+    def final(self):
+        return {doc_id: status for doc_id, status in self.events}
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_embedded_chunks_and_documents():
+    """Test that every chunk is embedded in batches, written, and every document completes."""
+    storage = InMemoryVectorStorage()
+    embedder = RecordingEmbedder()
+    statuses = StatusLog()
+    pipeline = IngestionPipeline(storage, paragraph_chunker, embedder,
+                                 IngestionConfig(embed_batch_size=8, write_batch_size=16), on_status=statuses)
+
+    report = await pipeline.run(make_document(i) for i in range(50))
+
+    assert report.documents_completed == 50 and report.documents_failed == 0
+    assert report.chunks_written == 150
+    assert len(storage) == 150
+    assert max(embedder.batch_sizes) <= 8 and sum(embedder.batch_sizes) == 150
+    assert await storage.get_document("d7") is not None
+    assert (await storage.get_chunk("d7-2")).metadata == {"position": 2}
+    assert set(statuses.final().values()) == {ProcessingStatus.COMPLETED}
+    assert [status for doc_id, status in statuses.events if doc_id == "d0"] == [
+        ProcessingStatus.PENDING, ProcessingStatus.PROCESSING, ProcessingStatus.COMPLETED]
+    assert report.stages["write"].items_out == 150
+    assert report.stages["embed"].batches >= 150 // 8
+    assert pipeline.in_flight == {}
+
+@pytest.mark.asyncio
+async def test_failures_mark_only_the_affected_documents():
+    """Test that chunker and storage errors fail their documents and the rest still complete."""
+    class FlakyStorage(InMemoryVectorStorage):
+        async def add_chunks(self, chunks):
+            if any(chunk.document_id == "d3" for chunk in chunks):
+                raise IOError("disk full")
+            await super().add_chunks(chunks)
+
+    def chunker(document):
+        if document.id == "d1":
+            raise ValueError("unparseable")
+        return paragraph_chunker(document)
+
+    storage = FlakyStorage()
+    statuses = StatusLog()
+    # Batches of one chunk so a storage failure only touches its own document
+    pipeline = IngestionPipeline(storage, chunker, RecordingEmbedder(),
+                                 IngestionConfig(write_batch_size=1), on_status=statuses)
+
+    report = await pipeline.run([make_document(i) for i in range(5)])
+
+    assert report.documents_failed == 2 and report.documents_completed == 3
+    assert report.failures["d1"] == "ValueError: unparseable"
+    assert report.failures["d3"].startswith("OSError")
+    final = statuses.final()
+    assert final["d1"] is ProcessingStatus.FAILED and final["d3"] is ProcessingStatus.FAILED
+    assert final["d0"] is ProcessingStatus.COMPLETED
+    assert await storage.get_document("d3") is None
+    assert pipeline.in_flight == {}
+
+@pytest.mark.asyncio
+async def test_backpressure_bounds_work_in_flight():
+    """Test that a stalled writer stops the source from being drained beyond the queue bounds."""
+    release = asyncio.Event()
+
+    class StalledStorage(InMemoryVectorStorage):
+        async def add_chunks(self, chunks):
+            await release.wait()
+            await super().add_chunks(chunks)
+
+    produced = 0
+    def source():
+        nonlocal produced
+        for i in range(20_000):
+            produced += 1
+            yield make_document(i, paragraphs=1)
+
+    config = IngestionConfig(chunk_workers=1, embed_workers=1, write_workers=1, embed_batch_size=4, write_batch_size=4,
+                             document_queue_size=2, chunk_queue_size=4, write_queue_size=4, batch_timeout=0.001)
+    storage = StalledStorage()
+    pipeline = IngestionPipeline(storage, paragraph_chunker, RecordingEmbedder(), config)
+    task = asyncio.create_task(pipeline.run(source()))
+    await asyncio.sleep(0.05)
+
+    # Queues (2 + 4 + 4) plus one batch or item held by each worker
+    assert produced <= 2 + 4 + 4 + 3 * 4 + 1
+    assert all(metrics.max_queue_depth <= 4 for metrics in pipeline.metrics().values())
+
+    release.set()
+    report = await task
+    assert report.documents_completed == 20_000
+    assert produced == 20_000
+    assert len(storage) == 20_000
+
+@pytest.mark.asyncio
+async def test_failed_document_leaves_no_chunks_behind():
+    """Test that chunks written before a document failed are removed from storage."""
+    class FlakyStorage(InMemoryVectorStorage):
+        async def add_chunks(self, chunks):
+            if any(chunk.id == "d1-2" for chunk in chunks):
+                raise IOError("disk full")
+            await super().add_chunks(chunks)
+
+    storage = FlakyStorage()
+    pipeline = IngestionPipeline(storage, paragraph_chunker, RecordingEmbedder(), IngestionConfig(write_batch_size=1))
+
+    report = await pipeline.run([make_document(i) for i in range(3)])
+
+    assert report.documents_failed == 1 and report.chunks_written == 8
+    assert await storage.get_chunks_by_doc_id("d1") == []
+    assert len(storage) == 6
+    assert pipeline.in_flight == {}
+
+@pytest.mark.asyncio
+async def test_source_error_cancels_every_stage():
+    """Test that a raising source propagates and leaves no stage workers running."""
+    async def source():
+        for i in range(5):
+            yield make_document(i)
+        raise RuntimeError("listing failed")
+
+    pipeline = IngestionPipeline(InMemoryVectorStorage(), paragraph_chunker, RecordingEmbedder())
+
+    with pytest.raises(RuntimeError, match="listing failed"):
+        await pipeline.run(source())
+    assert asyncio.all_tasks() == {asyncio.current_task()}
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk
+from LightRAG.models.enums import FilterStrategy
+from LightRAG.storage.metadata_index import MetadataIndex
+from LightRAG.storage.vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+# --- Test Data ---
+ROWS = [
+    {"lang": "en", "year": 2023},
+    {"lang": "de", "year": 2024},
+    {"lang": "en", "year": 2024},
+    {"lang": "fr", "year": 2024, "tags": ["unindexed"]},
+]
+
+@pytest.fixture
+def index() -> MetadataIndex:
+    index = MetadataIndex()
+    for row, metadata in enumerate(ROWS):
+        index.add(row, metadata)
+    return index
+
+def matching_rows(index: MetadataIndex, filters: dict) -> list:
+    return np.flatnonzero(index.resolve(filters, len(ROWS))).tolist()
+
+# --- Test Cases ---
+
+def test_equality_in_and_or(index: MetadataIndex):
+    """Test each filter operator resolves to the expected rows."""
+    assert matching_rows(index, {"lang": "en"}) == [0, 2]
+    assert matching_rows(index, {"lang": {"$in": ["de", "fr"]}}) == [1, 3]
+    assert matching_rows(index, {"lang": "en", "year": 2024}) == [2]
+    assert matching_rows(index, {"$or": [{"lang": "de"}, {"year": 2023}]}) == [0, 1]
+    assert matching_rows(index, {"$and": [{"year": 2024}, {"$or": [{"lang": "en"}, {"lang": "fr"}]}]}) == [2, 3]
+    assert matching_rows(index, {"lang": "es"}) == []
+
+def test_estimate_uses_posting_lengths(index: MetadataIndex):
+    """Test cardinality estimates used by the planner."""
+    assert index.estimate({"lang": "en"}) == 2
+    assert index.estimate({"lang": "en", "year": 2024}) == 2
+    assert index.estimate({"$or": [{"lang": "de"}, {"lang": "fr"}]}) == 2
+
+def test_unsupported_operator_raises(index: MetadataIndex):
+    """Test that unknown operators are rejected rather than silently ignored."""
+    with pytest.raises(ValueError):
+        index.resolve({"year": {"$gt": 2020}}, len(ROWS))
+
+@pytest.mark.asyncio
+async def test_planner_strategies_return_same_full_results():
+    """Test that pre- and post-filtering both return top_k exact matches."""
+    rng = np.random.default_rng(0)
+    chunks = [
+        Chunk(id=f"c{i}", document_id="d", content="", embedding=rng.normal(size=8).tolist(),
+              metadata={"shard": i % 10, "rare": i == 7})
+        for i in range(500)
+    ]
+    storage = InMemoryVectorStorage(VectorStorageConfig(prefilter_selectivity=0.2))
+    await storage.add_chunks(chunks)
+    query = rng.normal(size=8)
+
+    assert storage.plan_filters({"shard": 3}) is FilterStrategy.PRE_FILTER
+    assert storage.plan_filters({"shard": {"$in": [0, 1, 2, 3, 4]}}) is FilterStrategy.POST_FILTER
+    assert storage.plan_filters(None) is None
+
+    pre = await storage.search_similar_chunks_with_scores(query, 10, {"shard": 3})
+    storage.config.prefilter_selectivity = 0.0
+    post = await storage.search_similar_chunks_with_scores(query, 10, {"shard": 3})
+    assert storage.plan_filters({"shard": 3}) is FilterStrategy.POST_FILTER
+    assert len(pre) == 10
+    assert [chunk.id for chunk, _ in pre] == [chunk.id for chunk, _ in post]
+    assert all(chunk.metadata["shard"] == 3 for chunk, _ in pre)
+
+    rare = await storage.search_similar_chunks(query, 10, {"rare": True})
+    assert [chunk.id for chunk in rare] == ["c7"]
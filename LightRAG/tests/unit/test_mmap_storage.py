@@ -0,0 +1,139 @@
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Document
+from LightRAG.models.enums import SimilarityMetric, DataSource
+from LightRAG.storage.mmap_storage import MmapVectorStorage, MmapStorageConfig
+from LightRAG.storage.vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+# --- Test Data ---
+DIM = 16
+
+def make_chunks(count: int, seed: int = 0, doc_id: str = "doc-1") -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    return [
+        Chunk(id=f"{doc_id}-chunk-{i}", document_id=doc_id, content=f"chunk {i}", embedding=vectors[i].tolist(), metadata={"parity": i % 2})
+        for i in range(count)
+    ]
+
+def open_store(path, metric: SimilarityMetric = SimilarityMetric.COSINE) -> MmapVectorStorage:
+    return MmapVectorStorage(MmapStorageConfig(path=str(path), metric=metric))
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metric", list(SimilarityMetric))
+async def test_reopened_store_matches_in_memory_search(tmp_path, metric: SimilarityMetric):
+    """Test a reopened store returns the same ranking and scores as in-memory storage."""
+    chunks = make_chunks(300)
+    store = open_store(tmp_path, metric)
+    await store.add_chunks(chunks[:150])
+    await store.add_chunks(chunks[150:])
+    reference = InMemoryVectorStorage(VectorStorageConfig(metric=metric))
+    await reference.add_chunks(chunks)
+
+    reopened = open_store(tmp_path, metric)
+    query = np.random.default_rng(1).normal(size=DIM).astype(np.float32)
+    results = await reopened.search_similar_chunks_with_scores(query, top_k=10)
+    expected = await reference.search_similar_chunks_with_scores(query, top_k=10)
+
+    assert len(reopened) == 300
+    assert [chunk.id for chunk, _ in results] == [chunk.id for chunk, _ in expected]
+    assert np.allclose([score for _, score in results], [score for _, score in expected], atol=1e-5)
+    assert results[0][0].embedding == expected[0][0].embedding
+
+@pytest.mark.asyncio
+async def test_open_reads_no_row_data(tmp_path):
+    """Test that opening a store defers loading keys, metadata and documents."""
+    await open_store(tmp_path).add_chunks(make_chunks(50))
+
+    reopened = open_store(tmp_path)
+
+    assert reopened._keys_by_row is None
+    assert reopened._metadata_index is None
+    assert reopened._documents is None
+    assert (await reopened.get_chunk("doc-1-chunk-7")).content == "chunk 7"
+
+@pytest.mark.asyncio
+async def test_filtered_search(tmp_path):
+    """Test metadata filters restrict results after reopening."""
+    await open_store(tmp_path).add_chunks(make_chunks(100))
+    reopened = open_store(tmp_path)
+
+    query = np.ones(DIM, dtype=np.float32)
+    results = await reopened.search_similar_chunks(query, top_k=20, filters={"parity": 1})
+
+    assert len(results) == 20
+    assert all(chunk.metadata["parity"] == 1 for chunk in results)
+
+@pytest.mark.asyncio
+async def test_delete_and_replace_persist(tmp_path):
+    """Test that deletions and replacements survive a reopen."""
+    store = open_store(tmp_path)
+    document = Document(id="doc-1", content="text", source=DataSource.TEXT)
+    await store.add_document(document)
+    await store.add_chunks(make_chunks(10, doc_id="doc-1") + make_chunks(5, seed=2, doc_id="doc-2"))
+    await store.replace_document(document, make_chunks(3, seed=3, doc_id="doc-1"))
+    assert await store.delete_document("doc-2") == 5
+
+    reopened = open_store(tmp_path)
+    assert len(reopened) == 3
+    assert len(await reopened.get_chunks_by_doc_id("doc-1")) == 3
+    assert await reopened.get_chunks_by_doc_id("doc-2") == []
+    assert (await reopened.get_document("doc-1")).content == "text"
+    results = await reopened.search_similar_chunks(np.ones(DIM, dtype=np.float32), top_k=10)
+    assert {chunk.document_id for chunk in results} == {"doc-1"}
+
+@pytest.mark.asyncio
+async def test_uncommitted_tail_is_discarded(tmp_path):
+    """Test that bytes written past the manifest (an interrupted add) are dropped on the next add."""
+    await open_store(tmp_path).add_chunks(make_chunks(10))
+    with open(tmp_path / "payload.bin", "ab") as f:
+        f.write(b"partial write")
+
+    store = open_store(tmp_path)
+    await store.add_chunks(make_chunks(5, seed=4, doc_id="doc-2"))
+    reopened = open_store(tmp_path)
+
+    assert len(reopened) == 15
+    assert (await reopened.get_chunk("doc-2-chunk-4")).content == "chunk 4"
+
+@pytest.mark.asyncio
+async def test_rejected_replacement_keeps_the_existing_chunk(tmp_path):
+    """Test that re-adding a chunk with a wrong-dimension embedding fails without losing the stored version."""
+    chunks = make_chunks(5)
+    store = open_store(tmp_path)
+    await store.add_chunks(chunks)
+    bad = Chunk(id=chunks[1].id, document_id="doc-1", content="bad", embedding=[0.1, 0.2, 0.3])
+
+    with pytest.raises(ValueError):
+        await store.add_chunks([bad])
+
+    for reader in (store, open_store(tmp_path)):
+        assert len(reader) == 5
+        assert (await reader.get_chunk(chunks[1].id)).content == "chunk 1"
+        results = await reader.search_similar_chunks(chunks[1].embedding, top_k=1)
+        assert [chunk.id for chunk in results] == [chunks[1].id]
+
+@pytest.mark.asyncio
+async def test_replacing_a_chunk_commits_one_version(tmp_path):
+    """Test that re-adding a chunk id leaves exactly one searchable copy after a reopen."""
+    chunks = make_chunks(5)
+    store = open_store(tmp_path)
+    await store.add_chunks(chunks)
+    await store.add_chunks([chunks[2].model_copy(update={"content": "updated"})])
+
+    reopened = open_store(tmp_path)
+    results = await reopened.search_similar_chunks(chunks[2].embedding, top_k=5)
+
+    assert len(reopened) == 5
+    assert [chunk.id for chunk in results].count(chunks[2].id) == 1
+    assert (await reopened.get_chunk(chunks[2].id)).content == "updated"
+
+@pytest.mark.asyncio
+async def test_metric_mismatch_raises(tmp_path):
+    """Test that reopening with a different metric is rejected."""
+    await open_store(tmp_path).add_chunks(make_chunks(5))
+    with pytest.raises(ValueError):
+        open_store(tmp_path, SimilarityMetric.L2)
@@ -74,4 +74,17 @@ async def test_retriever_respects_top_k_in_fallback(basic_retriever_config: Mock
     assert result.query_id == query_id
     # Should return all 3 available chunks from mock storage
     assert len(result.retrieved_chunks) == 3
-    assert {chunk.id for chunk in result.retrieved_chunks} == {chunk_A1.id, chunk_A2.id, chunk_B1.id} 
\ No newline at end of file
+    assert {chunk.id for chunk in result.retrieved_chunks} == {chunk_A1.id, chunk_A2.id, chunk_B1.id} 
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_preserves_query_order(basic_retriever_config: MockPipelineConfig):
+    """Test that retrieve_many returns one result per query, in order."""
+    _, retriever, _ = create_mock_rag_pipeline(basic_retriever_config)
+    queries = [Query(id="q1", text="find content A"), Query(id="q2", text="unknown", top_k=1)]
+
+    results = await retriever.retrieve_many(queries)
+
+    assert [result.query_id for result in results] == ["q1", "q2"]
+    assert [chunk.id for chunk in results[0].retrieved_chunks] == ["cA1", "cA2"]
+    assert len(results[1].retrieved_chunks) == 1
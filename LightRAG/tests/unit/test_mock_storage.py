@@ -127,4 +127,19 @@ async def test_search_similar_chunks_mock(sample_chunk1: Chunk, sample_chunk2: C
 
     results_top_5 = await storage.search_similar_chunks(mock_embedding, top_k=5)
     assert len(results_top_5) == 3 # Only 3 chunks available
-    assert {chunk.id for chunk in results_top_5} == {TEST_CHUNK_ID_1, TEST_CHUNK_ID_2, TEST_CHUNK_ID_3} 
\ No newline at end of file
+    assert {chunk.id for chunk in results_top_5} == {TEST_CHUNK_ID_1, TEST_CHUNK_ID_2, TEST_CHUNK_ID_3} 
+
+
+@pytest.mark.asyncio
+async def test_delete_document(sample_doc1: Document, sample_chunk1: Chunk, sample_chunk2: Chunk, sample_chunk3: Chunk):
+    """Test deleting a document removes the document and only its chunks."""
+    storage = MockVectorStorage()
+    await storage.add_document(sample_doc1)
+    await storage.add_chunks([sample_chunk1, sample_chunk2, sample_chunk3])
+
+    removed = await storage.delete_document(TEST_DOC_ID_1)
+
+    assert removed == 2
+    assert await storage.get_document(TEST_DOC_ID_1) is None
+    assert await storage.get_chunks_by_doc_id(TEST_DOC_ID_1) == []
+    assert await storage.get_chunk(TEST_CHUNK_ID_3) is not None
@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from LightRAG.ingestion.chunker import ChunkerConfig, RegexTokenEncoder, TokenChunker
+from LightRAG.ingestion.pdf import PDFExtractionConfig, stream_pdf_pages
+from LightRAG.models.data_models import Document
+from LightRAG.models.enums import DataSource
+
+# --- Test Data ---
+# Fake page functions stand in for PyMuPDF; module-level so pool processes can unpickle them
+PAGES = 40
+
+def fake_count(path: str) -> int:
+    return PAGES
+
+def fake_extract(path: str, start: int, end: int) -> list:
+    # Earlier ranges are slower, so tasks finish out of page order
+    time.sleep(0.02 * (PAGES - start) / PAGES)
+    return [f"text of page {page + 1} " for page in range(start, end)]
+
+def failing_extract(path: str, start: int, end: int) -> list:
+    raise RuntimeError("corrupt xref")
+
+def make_config(**overrides) -> PDFExtractionConfig:
+    options = dict(workers=2, pages_per_task=3, count_pages=fake_count, extract_pages=fake_extract)
+    options.update(overrides)
+    return PDFExtractionConfig(**options)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_pages_stream_in_order_from_a_process_pool():
+    """Test that pages extracted by pool workers are yielded in page order."""
+    pages = [item async for item in stream_pdf_pages("book.pdf", make_config())]
+
+    assert [number for number, _ in pages] == list(range(1, PAGES + 1))
+    assert pages[9] == (10, "text of page 10 ")
+
+@pytest.mark.asyncio
+async def test_shared_executor_and_bounded_submission():
+    """Test that a caller-provided pool is reused and left running."""
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        config = make_config(pages_per_task=7, max_pending_tasks=1)
+        first = [number async for number, _ in stream_pdf_pages("a.pdf", config, executor)]
+        second = [number async for number, _ in stream_pdf_pages("b.pdf", config, executor)]
+
+    assert first == second == list(range(1, PAGES + 1))
+
+@pytest.mark.asyncio
+async def test_worker_errors_propagate():
+    """Test that a failing page range surfaces to the consumer."""
+    with pytest.raises(RuntimeError, match="corrupt xref"):
+        async for _ in stream_pdf_pages("broken.pdf", make_config(extract_pages=failing_extract)):
+            pass
+
+@pytest.mark.asyncio
+async def test_chunking_consumes_the_page_stream():
+    """Test that the async page stream feeds the chunker, producing chunks across page boundaries."""
+    chunker = TokenChunker(ChunkerConfig(chunk_size=25, chunk_overlap=5, window_chars=64), RegexTokenEncoder())
+    document = Document(id="book", content="", source=DataSource.FILE, source_uri="book.pdf")
+
+    async def page_texts():
+        async for _, text in stream_pdf_pages("book.pdf", make_config()):
+            yield text
+
+    chunks = [chunk async for chunk in chunker.achunk_document(document, page_texts())]
+    full_text = "".join(fake_extract("book.pdf", 0, PAGES))
+
+    assert chunks[0].content == full_text[:chunks[0].metadata["char_end"]]
+    assert chunks[-1].metadata["char_end"] == len(full_text)
+    assert all(chunk.content == full_text[chunk.metadata["char_start"]:chunk.metadata["char_end"]] for chunk in chunks)
@@ -0,0 +1,117 @@
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk
+from LightRAG.models.enums import QuantizationMode
+from LightRAG.storage.quantization import ScalarQuantizer, ProductQuantizer
+from LightRAG.storage.quantized_storage import QuantizedVectorStorage, QuantizedStorageConfig
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+DIM = 32
+
+def make_chunks(count: int, seed: int = 0) -> list:
+    vectors = np.random.default_rng(seed).normal(size=(count, DIM)).astype(np.float32)
+    return [Chunk(id=f"c{i}", document_id=f"d{i % 5}", content="", embedding=vectors[i], metadata={"shard": i % 5}) for i in range(count)]
+
+async def build(mode: QuantizationMode, chunks: list, **overrides) -> QuantizedVectorStorage:
+    config = QuantizedStorageConfig(quantization=mode, train_size=300, pq_subspaces=8, pq_centroids=64, **overrides)
+    storage = QuantizedVectorStorage(config)
+    for start in range(0, len(chunks), 200):
+        await storage.add_chunks(chunks[start:start + 200])
+    return storage
+
+async def recall(storage, exact: InMemoryVectorStorage, queries: np.ndarray, top_k: int) -> float:
+    hits = 0
+    for query in queries:
+        found = {chunk.id for chunk in await storage.search_similar_chunks(query, top_k)}
+        hits += len(found & {chunk.id for chunk in await exact.search_similar_chunks(query, top_k)})
+    return hits / (len(queries) * top_k)
+
+# --- Test Cases ---
+
+@pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(num_subspaces=8, num_centroids=64)])
+def test_code_dot_products_match_reconstructions(quantizer):
+    """Test that scoring over codes equals scoring the decoded vectors."""
+    vectors = np.random.default_rng(0).normal(size=(500, DIM)).astype(np.float32)
+    quantizer.train(vectors)
+    codes = quantizer.encode(vectors)
+    query = np.random.default_rng(1).normal(size=DIM).astype(np.float32)
+
+    np.testing.assert_allclose(quantizer.dots(query, codes), quantizer.decode(codes) @ query, rtol=1e-4, atol=1e-3)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, min_recall", [(QuantizationMode.SCALAR, 0.9), (QuantizationMode.PRODUCT, 0.4)])
+async def test_training_switches_to_codes_and_shrinks_memory(mode: QuantizationMode, min_recall: float):
+    """Test that storage trains after train_size rows, drops float32 vectors and keeps useful recall."""
+    chunks = make_chunks(1000)
+    storage = await build(mode, chunks)
+    exact = InMemoryVectorStorage()
+    await exact.add_chunks(chunks)
+
+    assert storage.is_quantized
+    footprint = storage.memory_footprint()
+    assert footprint["vectors"] == 0
+    assert footprint["codes"] * 4 <= exact.memory_footprint()["vectors"]
+
+    queries = np.random.default_rng(5).normal(size=(10, DIM)).astype(np.float32)
+    assert await recall(storage, exact, queries, 10) >= min_recall
+
+@pytest.mark.asyncio
+async def test_rerank_against_full_precision_file(tmp_path):
+    """Test that re-ranking with on-disk vectors recovers exact scores and embeddings."""
+    chunks = make_chunks(1000)
+    storage = await build(QuantizationMode.PRODUCT, chunks, full_precision_path=str(tmp_path / "vectors.f32"), rerank_factor=10)
+    exact = InMemoryVectorStorage()
+    await exact.add_chunks(chunks)
+
+    query = np.asarray(chunks[42].embedding)
+    results = await storage.search_similar_chunks_with_scores(query, 5, filters={"shard": 2})
+    assert results[0][0].id == "c42"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert results[0][0].embedding == chunks[42].embedding
+
+    queries = np.random.default_rng(5).normal(size=(10, DIM)).astype(np.float32)
+    assert await recall(storage, exact, queries, 10) >= 0.8
+
+@pytest.mark.asyncio
+async def test_existing_full_precision_file_needs_overwrite(tmp_path):
+    """Test that an existing full-precision file is only replaced when overwrite is requested."""
+    path = tmp_path / "vectors.f32"
+    path.write_bytes(b"someone else's data")
+
+    with pytest.raises(FileExistsError):
+        QuantizedVectorStorage(QuantizedStorageConfig(full_precision_path=str(path)))
+    assert path.read_bytes() == b"someone else's data"
+
+    QuantizedVectorStorage(QuantizedStorageConfig(full_precision_path=str(path), overwrite_full_precision=True))
+    assert not path.exists()
+
+@pytest.mark.asyncio
+async def test_indivisible_dimension_is_rejected_before_rows_are_stored():
+    """Test that a dimension product quantization cannot split is rejected up front, not at training time."""
+    with pytest.raises(ValueError):
+        QuantizedVectorStorage(QuantizedStorageConfig(quantization=QuantizationMode.PRODUCT, embedding_dim=10))
+
+    storage = QuantizedVectorStorage(QuantizedStorageConfig(quantization=QuantizationMode.PRODUCT, train_size=100))
+    vectors = np.random.default_rng(0).normal(size=(150, 10)).astype(np.float32)
+    with pytest.raises(ValueError):
+        await storage.add_chunks([Chunk(id=f"c{i}", document_id="d0", content="", embedding=vectors[i]) for i in range(150)])
+
+    assert len(storage) == 0
+    assert await storage.get_chunk("c0") is None
+    assert storage.embedding_dim is None
+    await storage.add_chunks(make_chunks(20))
+    assert len(storage) == 20
+
+@pytest.mark.asyncio
+async def test_deletes_and_compaction_on_codes():
+    """Test that compaction moves codes along with rows."""
+    chunks = make_chunks(600)
+    storage = await build(QuantizationMode.SCALAR, chunks, compaction_min_dead_rows=1)
+    for doc in ("d0", "d1", "d2"):
+        await storage.delete_document(doc)
+
+    assert storage._size == len(storage) == 240
+    results = await storage.search_similar_chunks(np.asarray(chunks[4].embedding), 3)
+    assert results[0].id == "c4"
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from LightRAG.utils.rate_limiter import AdaptiveRateLimiter, RateLimitError, RateLimiterConfig, TokenBucket
+
+# --- Local Stand-in Server ---
+# A tiny HTTP endpoint on localhost that behaves like a model API with a concurrency quota:
+# requests beyond `capacity` in flight get "429 Too Many Requests" with a Retry-After header.
+
+class StandInServer:
+    def __init__(self, capacity: int, latency: float, retry_after: float = 0.02):
+        self.capacity = capacity
+        self.latency = latency
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+        self.port = None
+        self._server = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readuntil(b"\r\n\r\n")
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            writer.write(f"HTTP/1.0 429 Too Many Requests\r\nRetry-After: {self.retry_after}\r\n\r\n".encode())
+        else:
+            self.in_flight += 1
+            try:
+                await asyncio.sleep(self.latency)
+            finally:
+                self.in_flight -= 1
+            self.served += 1
+            writer.write(b"HTTP/1.0 200 OK\r\n\r\nembedding")
+        await writer.drain()
+        writer.close()
+
+async def call_server(port: int, text: str) -> str:
+    """Client for the stand-in: raises RateLimitError on 429, like a provider SDK would."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST /embed HTTP/1.0\r\nContent-Length: {len(text)}\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.decode().partition("\r\n\r\n")
+    if " 429 " in head.splitlines()[0]:
+        retry_after = next(float(line.split(":")[1]) for line in head.splitlines() if line.startswith("Retry-After"))
+        raise RateLimitError("429 Too Many Requests", retry_after=retry_after)
+    return body
+
+@pytest_asyncio.fixture
+async def server():
+    server = StandInServer(capacity=4, latency=0.01)
+    await server.start()
+    yield server
+    await server.close()
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_limiter_converges_below_server_quota(server: StandInServer):
+    """Test that 429s shrink the in-flight limit and every call eventually succeeds."""
+    limiter = AdaptiveRateLimiter(lambda text: call_server(server.port, text), RateLimiterConfig(
+        initial_concurrency=32, max_concurrency=32, max_retries=10, decrease_cooldown_seconds=0.02))
+
+    results = await asyncio.gather(*(limiter(f"text {i}") for i in range(120)))
+
+    assert results == ["embedding"] * 120
+    assert server.served == 120
+    assert limiter.stats.rate_limited == server.rejected > 0
+    assert limiter.stats.decreases >= 1
+    assert limiter.concurrency_limit < 32
+
+@pytest.mark.asyncio
+async def test_limiter_without_adaptation_would_storm(server: StandInServer):
+    """Test that the same load sent unthrottled is mostly rejected (the baseline the limiter avoids)."""
+    outcomes = await asyncio.gather(*(call_server(server.port, "x") for _ in range(40)), return_exceptions=True)
+
+    assert sum(isinstance(outcome, RateLimitError) for outcome in outcomes) >= 30
+
+@pytest.mark.asyncio
+async def test_concurrency_grows_additively_on_success():
+    """Test that successful calls raise the limit towards the maximum."""
+    async def fast(text):
+        await asyncio.sleep(0)
+        return text
+
+    limiter = AdaptiveRateLimiter(fast, RateLimiterConfig(initial_concurrency=1, max_concurrency=6))
+    await asyncio.gather(*(limiter(str(i)) for i in range(200)))
+
+    assert limiter.concurrency_limit == 6
+    assert limiter.stats.increases == 5
+
+@pytest.mark.asyncio
+async def test_slow_calls_count_as_congestion():
+    """Test that calls above the latency target reduce the limit."""
+    async def slow(text):
+        await asyncio.sleep(0.02)
+        return text
+
+    limiter = AdaptiveRateLimiter(slow, RateLimiterConfig(initial_concurrency=8, latency_target_seconds=0.005,
+                                                          decrease_cooldown_seconds=0.0))
+    await asyncio.gather(*(limiter(str(i)) for i in range(8)))
+
+    assert limiter.concurrency_limit == 1
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_budget_paces_calls():
+    """Test that the RPM budget spaces calls out once the burst is spent."""
+    calls = []
+
+    async def record(text):
+        calls.append(time.perf_counter())
+        return text
+
+    # 6000 RPM = 100/s, with a 0.1s (10 request) burst
+    limiter = AdaptiveRateLimiter(record, RateLimiterConfig(requests_per_minute=6000, burst_seconds=0.1, initial_concurrency=64))
+    started = time.perf_counter()
+    await asyncio.gather(*(limiter(str(i)) for i in range(40)))
+
+    assert time.perf_counter() - started >= 0.25
+    assert limiter.stats.max_queue_wait >= 0.25
+    assert limiter.limits()["requests_per_minute"] == 6000
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute_budget_uses_token_counter():
+    """Test that the TPM budget charges each call its counted tokens."""
+    limiter = AdaptiveRateLimiter(
+        lambda text: asyncio.sleep(0, result=text),
+        RateLimiterConfig(tokens_per_minute=60_000, burst_seconds=0.1, token_counter=lambda text: 100, initial_concurrency=64),
+    )
+    started = time.perf_counter()
+    # 1000 tokens/s with a 100-token burst: five calls of 100 tokens need ~0.4s of refill
+    await asyncio.gather(*(limiter(str(i)) for i in range(5)))
+
+    assert time.perf_counter() - started >= 0.35
+
+@pytest.mark.asyncio
+async def test_other_errors_propagate_without_retry():
+    attempts = []
+
+    async def broken(text):
+        attempts.append(text)
+        raise ValueError("bad request")
+
+    limiter = AdaptiveRateLimiter(broken)
+    with pytest.raises(ValueError):
+        await limiter("x")
+    assert attempts == ["x"] and limiter.stats.errors == 1
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    async def always_limited(text):
+        raise RateLimitError(retry_after=0.001)
+
+    limiter = AdaptiveRateLimiter(always_limited, RateLimiterConfig(max_retries=2))
+    with pytest.raises(RateLimitError):
+        await limiter("x")
+    assert limiter.stats.rate_limited == 3 and limiter.stats.retries == 2
+
+@pytest.mark.asyncio
+async def test_token_bucket_admits_oversized_requests_as_debt():
+    """Test that a request larger than the bucket is admitted when full and delays the next one."""
+    bucket = TokenBucket(rate_per_minute=6000, burst_seconds=0.01)
+    started = time.perf_counter()
+    await bucket.acquire(5)
+    await bucket.acquire(1)
+
+    assert time.perf_counter() - started >= 0.04
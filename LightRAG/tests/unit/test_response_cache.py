@@ -0,0 +1,163 @@
+from typing import AsyncGenerator
+import asyncio
+
+import pytest
+import numpy as np
+
+from LightRAG.generation.cache import CachedGenerator, ResponseCacheConfig
+from LightRAG.models.data_models import Chunk, Query, RetrieverResult, GeneratorContext
+from LightRAG.tests.mocks.mock_factory import MockGenerator
+
+# --- Test Data ---
+chunk_A = Chunk(id="cA", document_id="d1", content="Chunk A")
+chunk_B = Chunk(id="cB", document_id="d1", content="Chunk B")
+
+class CountingGenerator(MockGenerator):
+    """MockGenerator that counts generations (streamed or not) and can be slowed down."""
+    def __init__(self, delay: float = 0.0):
+        super().__init__(first_token_delay=delay)
+        self.calls = 0
+
+    async def stream_generate(self, context: GeneratorContext) -> AsyncGenerator[str, None]:
+        # generate() consumes this stream, so every generation is counted once
+        self.calls += 1
+        async for token in super().stream_generate(context):
+            yield token
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_context(text: str, chunks=(chunk_A, chunk_B), query_id: str = "q1") -> GeneratorContext:
+    return GeneratorContext(
+        query=Query(id=query_id, text=text),
+        retrieved_context=RetrieverResult(query_id=query_id, retrieved_chunks=list(chunks)),
+    )
+
+async def fake_embed(texts):
+    """Bag-of-letters embedding: near-duplicate spellings land close together."""
+    vectors = np.zeros((len(texts), 26), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vectors[row, ord(char) - ord("a")] += 1
+    return vectors
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_same_query_and_context_hits():
+    """Test that a normalised repeat of the query over the same context is served from the cache."""
+    generator = CountingGenerator()
+    cache = CachedGenerator(generator)
+
+    first = await cache.generate(make_context("What is A?"))
+    second = await cache.generate(make_context("  what is   a? ", query_id="q2"))
+
+    assert generator.calls == 1
+    assert second.answer == first.answer
+    assert second.query_id == "q2"
+    assert second.context_used == ["cA", "cB"]
+    assert second.metadata["cached"] is True
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+@pytest.mark.asyncio
+async def test_context_ids_and_order_are_part_of_the_key():
+    """Test that different or reordered context chunks miss."""
+    generator = CountingGenerator()
+    cache = CachedGenerator(generator)
+
+    await cache.generate(make_context("What is A?"))
+    await cache.generate(make_context("What is A?", chunks=(chunk_B, chunk_A)))
+    await cache.generate(make_context("What is A?", chunks=(chunk_A,)))
+
+    assert generator.calls == 3
+
+@pytest.mark.asyncio
+async def test_ttl_and_size_eviction():
+    """Test that entries expire after the TTL and the least recently used entry is evicted."""
+    clock = FakeClock()
+    generator = CountingGenerator()
+    cache = CachedGenerator(generator, ResponseCacheConfig(max_entries=2, ttl_seconds=10, clock=clock))
+
+    await cache.generate(make_context("one"))
+    await cache.generate(make_context("two"))
+    await cache.generate(make_context("one"))
+    await cache.generate(make_context("three"))
+    assert len(cache) == 2 and cache.stats.evictions == 1
+
+    await cache.generate(make_context("one"))
+    assert generator.calls == 3
+    await cache.generate(make_context("two"))
+    assert generator.calls == 4
+
+    clock.now = 11
+    await cache.generate(make_context("one"))
+    assert generator.calls == 5
+    assert cache.stats.expirations == 1
+
+@pytest.mark.asyncio
+async def test_semantic_mode_matches_near_duplicates():
+    """Test that near-duplicate queries hit above the threshold, but only for the same context."""
+    generator = CountingGenerator()
+    cache = CachedGenerator(generator, ResponseCacheConfig(similarity_threshold=0.9), embedding_func=fake_embed)
+
+    first = await cache.generate(make_context("how do I reset my password"))
+    near = await cache.generate(make_context("how do i reset my pasword"))
+    other_context = await cache.generate(make_context("how do i reset my pasword", chunks=(chunk_A,)))
+    unrelated = await cache.generate(make_context("billing address change"))
+
+    assert near.answer == first.answer
+    assert cache.stats.semantic_hits == 1
+    assert other_context.answer != first.answer
+    assert unrelated.answer != first.answer
+    assert generator.calls == 3
+
+@pytest.mark.asyncio
+async def test_stream_generate_populates_and_replays():
+    """Test that a completed stream is cached and replayed token by token through both APIs."""
+    generator = CountingGenerator()
+    cache = CachedGenerator(generator)
+    context = make_context("Stream about A")
+
+    streamed = "".join([token async for token in cache.stream_generate(context)])
+    replayed_tokens = [token async for token in cache.stream_generate(context)]
+    response = await cache.generate(context)
+
+    assert generator.calls == 1
+    assert len(replayed_tokens) > 1
+    assert "".join(replayed_tokens) == streamed
+    assert response.answer == streamed
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_generate_once():
+    """Test that overlapping identical requests share one underlying generation."""
+    generator = CountingGenerator(delay=0.01)
+    cache = CachedGenerator(generator)
+
+    responses = await asyncio.gather(*(cache.generate(make_context("FAQ", query_id=f"q{i}")) for i in range(5)))
+
+    assert generator.calls == 1
+    assert [response.query_id for response in responses] == [f"q{i}" for i in range(5)]
+    assert len({response.answer for response in responses}) == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_identical_requests():
+    """Test that cancelling the request that started a generation leaves identical requests unaffected."""
+    generator = CountingGenerator(delay=0.05)
+    cache = CachedGenerator(generator)
+
+    first = asyncio.create_task(cache.generate(make_context("FAQ", query_id="q1")))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.generate(make_context("FAQ", query_id="q2")))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    response = await second
+
+    assert first.cancelled()
+    assert response.query_id == "q2"
+    assert generator.calls == 1
+    assert len(cache) == 1
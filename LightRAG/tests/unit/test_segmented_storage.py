@@ -0,0 +1,198 @@
+import asyncio
+import os
+
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Document
+from LightRAG.models.enums import SimilarityMetric, DataSource
+from LightRAG.storage.segmented_storage import SegmentedVectorStorage, SegmentedStorageConfig
+from LightRAG.storage.vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+# --- Test Data ---
+DIM = 16
+
+def make_chunks(count: int, seed: int = 0, doc_id: str = "doc-1") -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    return [
+        Chunk(id=f"{doc_id}-chunk-{i}", document_id=doc_id, content=f"chunk {i}", embedding=vectors[i].tolist(), metadata={"parity": i % 2})
+        for i in range(count)
+    ]
+
+def make_config(path, **overrides) -> SegmentedStorageConfig:
+    settings = {"path": str(path), "segment_max_rows": 50, "max_segments": 3, "merge_factor": 2, "merge_batch_size": 16}
+    settings.update(overrides)
+    return SegmentedStorageConfig(**settings)
+
+async def ids_for(storage, query: np.ndarray, top_k: int = 10, filters=None) -> list:
+    return [chunk.id for chunk, _ in await storage.search_similar_chunks_with_scores(query, top_k, filters)]
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metric", list(SimilarityMetric))
+async def test_search_across_segments_matches_in_memory(tmp_path, metric: SimilarityMetric):
+    """Test that merging per-segment top-k gives the same ranking as one exact index."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path, metric=metric, max_segments=100))
+    reference = InMemoryVectorStorage(VectorStorageConfig(metric=metric))
+    for seed in range(7):
+        chunks = make_chunks(30, seed=seed, doc_id=f"doc-{seed}")
+        await storage.add_chunks(chunks)
+        await storage.wait_for_seal()
+        await reference.add_chunks(chunks)
+
+    assert storage.segment_count == 3
+    query = np.random.default_rng(99).normal(size=DIM).astype(np.float32)
+    assert await ids_for(storage, query) == await ids_for(reference, query)
+    assert await ids_for(storage, query, filters={"parity": 0}) == await ids_for(reference, query, filters={"parity": 0})
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_batch_search_merges_segments(tmp_path):
+    """Test that batched search over sealed and in-memory segments matches single queries."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path, max_segments=100))
+    for seed in range(3):
+        await storage.add_chunks(make_chunks(40, seed=seed, doc_id=f"doc-{seed}"))
+    queries = np.random.default_rng(7).normal(size=(4, DIM)).astype(np.float32)
+
+    batch = await storage.search_similar_chunks_batch(queries, top_k=5, filters={"parity": 1})
+
+    for query, results in zip(queries, batch):
+        assert [chunk.id for chunk, _ in results] == await ids_for(storage, query, top_k=5, filters={"parity": 1})
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_wal_replay_recovers_unsealed_writes(tmp_path):
+    """Test that writes not yet sealed into a segment survive a restart via the WAL."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path))
+    await storage.add_document(Document(id="doc-1", content="text", source=DataSource.TEXT))
+    await storage.add_chunks(make_chunks(60, doc_id="doc-1"))
+    await storage.wait_for_seal()
+    await storage.add_chunks(make_chunks(10, seed=1, doc_id="doc-2"))
+    await storage.delete_document("doc-2")
+    await storage.add_chunks(make_chunks(5, seed=2, doc_id="doc-3"))
+    # Simulate a crash that tore the last WAL record
+    with open(tmp_path / "wal.log", "ab") as f:
+        f.write(b'{"op": "add_chu')
+
+    reopened = await SegmentedVectorStorage.open(make_config(tmp_path))
+
+    assert reopened.segment_count == 1
+    assert len(reopened) == 65
+    assert await reopened.get_chunks_by_doc_id("doc-2") == []
+    assert (await reopened.get_chunk("doc-3-chunk-4")).content == "chunk 4"
+    assert (await reopened.get_document("doc-1")).content == "text"
+
+@pytest.mark.asyncio
+async def test_tombstones_hide_sealed_rows(tmp_path):
+    """Test that deletes and re-adds shadow rows in sealed segments without rewriting them."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path))
+    await storage.add_chunks(make_chunks(50, doc_id="doc-1"))
+    await storage.wait_for_seal()
+    await storage.add_chunks(make_chunks(50, seed=1, doc_id="doc-2"))
+    await storage.wait_for_seal()
+    assert storage.segment_count == 2
+
+    updated = make_chunks(1, seed=5, doc_id="doc-1")[0]
+    await storage.add_chunks([updated])
+    assert await storage.delete_document("doc-2") == 50
+
+    assert len(storage) == 50
+    results = await ids_for(storage, np.asarray(updated.embedding), top_k=100)
+    assert len(results) == 50 and len(set(results)) == 50
+    assert results[0] == updated.id
+    assert (await storage.get_chunk(updated.id)).embedding == updated.embedding
+
+@pytest.mark.asyncio
+async def test_background_compaction_merges_segments(tmp_path):
+    """Test that compaction bounds the segment count, drops dead rows and keeps results."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path))
+    for seed in range(6):
+        await storage.add_chunks(make_chunks(50, seed=seed, doc_id=f"doc-{seed}"))
+        await storage.wait_for_seal()
+    await storage.delete_document("doc-0")
+    query = np.ones(DIM, dtype=np.float32)
+    before = await ids_for(storage, query)
+
+    await storage.compact()
+
+    assert storage.segment_count <= 3
+    assert len(storage) == 250
+    assert await ids_for(storage, query) == before
+    assert len(os.listdir(tmp_path / "segments")) == storage.segment_count
+    reopened = await SegmentedVectorStorage.open(make_config(tmp_path))
+    assert await ids_for(reopened, query) == before
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_writes_only_tombstone_segments_holding_the_ids(tmp_path):
+    """Test that writes consult per-segment id filters instead of loading every segment's keys."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path, max_segments=100))
+    for seed in range(3):
+        await storage.add_chunks(make_chunks(50, seed=seed, doc_id=f"doc-{seed}"))
+        await storage.wait_for_seal()
+    await storage.close()
+
+    reopened = await SegmentedVectorStorage.open(make_config(tmp_path, max_segments=100))
+    segments = [segment for _, segment in reopened._segments]
+    await reopened.add_chunks(make_chunks(10, seed=9, doc_id="doc-new"))
+    assert all(segment._keys_by_row is None for segment in segments)
+
+    updated = make_chunks(1, seed=5, doc_id="doc-1")[0]
+    await reopened.add_chunks([updated])
+    assert [segment._keys_by_row is not None for segment in segments] == [False, True, False]
+    assert len(reopened) == 160
+    assert (await reopened.get_chunk(updated.id)).embedding == updated.embedding
+    await reopened.close()
+
+@pytest.mark.asyncio
+async def test_writes_during_a_background_seal_are_kept(tmp_path):
+    """Test that the frozen segment stays readable while sealing and later writes are applied to it."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path))
+    await storage.add_document(Document(id="doc-2", content="text", source=DataSource.TEXT))
+    await storage.add_chunks(make_chunks(25, doc_id="doc-1") + make_chunks(25, seed=1, doc_id="doc-2"))
+    await asyncio.sleep(0)
+    assert storage._sealing is not None and storage.segment_count == 0
+
+    updated = make_chunks(1, seed=5, doc_id="doc-1")[0]
+    await storage.add_chunks([updated])
+    assert await storage.delete_document("doc-2") == 25
+    assert len(storage) == 25
+    assert (await ids_for(storage, np.asarray(updated.embedding), top_k=1)) == [updated.id]
+
+    await storage.wait_for_seal()
+    assert storage.segment_count == 1
+    assert not os.path.exists(tmp_path / "wal-00000000.log")
+    reopened = await SegmentedVectorStorage.open(make_config(tmp_path))
+    for store in (storage, reopened):
+        assert len(store) == 25
+        assert await store.get_document("doc-2") is None
+        assert await store.get_chunks_by_doc_id("doc-2") == []
+        assert (await store.get_chunk(updated.id)).embedding == updated.embedding
+    await storage.close()
+
+@pytest.mark.asyncio
+async def test_interrupted_seal_is_recovered_from_its_log(tmp_path):
+    """Test that writes of a seal that never reached the manifest are replayed ahead of later writes."""
+    storage = await SegmentedVectorStorage.open(make_config(tmp_path))
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    storage._write_segment = crash
+    await storage.add_chunks(make_chunks(50, doc_id="doc-1"))
+    with pytest.raises(OSError):
+        await storage.wait_for_seal()
+    await storage.delete_document("doc-1")
+    await storage.add_chunks(make_chunks(5, seed=1, doc_id="doc-2"))
+    assert len(storage) == 5
+
+    reopened = await SegmentedVectorStorage.open(make_config(tmp_path))
+
+    assert reopened.segment_count == 0
+    assert len(reopened) == 5
+    assert await reopened.get_chunks_by_doc_id("doc-1") == []
+    assert not any(name.startswith("wal-") for name in os.listdir(tmp_path))
+    await reopened.seal()
+    assert reopened.segment_count == 1 and len(reopened) == 5
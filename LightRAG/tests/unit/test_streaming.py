@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from LightRAG.generation.cache import CachedGenerator
+from LightRAG.generation.streaming import TokenStream, stream_answer
+from LightRAG.models.data_models import Query, Chunk, RetrieverResult, GeneratorContext
+from LightRAG.models.enums import RetrievalMode
+from LightRAG.tests.mocks.mock_factory import MockGenerator, MockRetriever, MockVectorStorage
+
+# --- Test Data ---
+
+chunk_S1 = Chunk(id="cS1", document_id="docS", content="Streaming chunk one")
+chunk_S2 = Chunk(id="cS2", document_id="docS", content="Streaming chunk two")
+
+ANSWER = "one two three four five six seven eight"
+
+def make_context(text: str = "stream me") -> GeneratorContext:
+    query = Query(id="q-stream", text=text, mode=RetrievalMode.VECTOR)
+    retrieved = RetrieverResult(query_id=query.id, retrieved_chunks=[chunk_S1, chunk_S2], scores=[0.9, 0.8])
+    return GeneratorContext(query=query, retrieved_context=retrieved)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class SlowRetriever(MockRetriever):
+    """Mock retriever that takes `delay` seconds to answer."""
+    def __init__(self, delay: float):
+        super().__init__(MockVectorStorage(), {"stream me": [chunk_S1, chunk_S2]})
+        self.delay = delay
+
+    async def retrieve(self, query: Query) -> RetrieverResult:
+        await asyncio.sleep(self.delay)
+        return await super().retrieve(query)
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_tokens_reach_consumer_before_generation_finishes():
+    """Test that the first token is delivered long before the full answer has been produced."""
+    generator = MockGenerator({"stream me": ANSWER}, first_token_delay=0.02, token_delay=0.05)
+    started = time.perf_counter()
+    arrivals = []
+    async for _ in generator.stream_generate(make_context()):
+        arrivals.append(time.perf_counter() - started)
+
+    assert len(arrivals) == 4
+    assert arrivals[0] < 0.05
+    assert arrivals[-1] >= 0.02 + 3 * 0.05
+
+@pytest.mark.asyncio
+async def test_token_stream_records_ttft_and_inter_token_latency():
+    """Test that TokenStream timings are measured from the request start and between tokens."""
+    clock = FakeClock()
+
+    async def tokens():
+        for delay, piece in [(0.25, "a "), (0.01, "b "), (0.03, "c")]:
+            clock.now += delay
+            yield piece
+
+    stream = TokenStream(tokens(), make_context(), clock=clock)
+    assert [piece async for piece in stream] == ["a ", "b ", "c"]
+    assert stream.time_to_first_token == pytest.approx(0.25)
+    assert stream.inter_token_latencies == pytest.approx([0.01, 0.03])
+
+    response = stream.response()
+    assert response.answer == "a b c"
+    assert response.context_used == [chunk_S1.id, chunk_S2.id]
+    assert response.metadata == {
+        "tokens": 3,
+        "time_to_first_token_ms": pytest.approx(250.0),
+        "mean_inter_token_ms": pytest.approx(20.0),
+        "max_inter_token_ms": pytest.approx(30.0),
+        "total_ms": pytest.approx(290.0),
+    }
+
+@pytest.mark.asyncio
+async def test_response_requires_a_consumed_stream():
+    """Test that asking for the response of an unfinished stream raises."""
+    stream = TokenStream(MockGenerator({"stream me": ANSWER}).stream_generate(make_context()), make_context())
+    await stream.__anext__()
+    with pytest.raises(RuntimeError):
+        stream.response()
+
+@pytest.mark.asyncio
+async def test_generate_reports_stream_timings():
+    """Test that the mock's generate() records TTFT from its configured first-token delay."""
+    generator = MockGenerator({"stream me": ANSWER}, first_token_delay=0.03)
+    response = await generator.generate(make_context())
+
+    assert response.answer == ANSWER
+    assert response.metadata["tokens"] == 4
+    assert response.metadata["time_to_first_token_ms"] >= 30.0
+    assert response.metadata["total_ms"] >= response.metadata["time_to_first_token_ms"]
+
+@pytest.mark.asyncio
+async def test_stream_answer_ttft_includes_retrieval():
+    """Test that end-to-end TTFT covers retrieval plus the generator's first-token delay."""
+    generator = MockGenerator({"stream me": ANSWER}, first_token_delay=0.02)
+    stream = await stream_answer(SlowRetriever(0.03), generator, make_context().query)
+
+    pieces = [piece async for piece in stream]
+    response = stream.response()
+    assert "".join(pieces) == ANSWER
+    assert response.context_used == [chunk_S1.id, chunk_S2.id]
+    assert response.metadata["retrieval_ms"] >= 30.0
+    assert response.metadata["time_to_first_token_ms"] >= 50.0
+
+@pytest.mark.asyncio
+async def test_cached_replay_drops_original_timings():
+    """Test that a cached response does not report the latencies of the generation it replays."""
+    cached = CachedGenerator(MockGenerator({"stream me": ANSWER}))
+    first = await cached.generate(make_context())
+    second = await cached.generate(make_context())
+
+    assert "time_to_first_token_ms" in first.metadata
+    assert second.metadata == {"cached": True}
@@ -0,0 +1,62 @@
+import pytest
+import pytest_asyncio
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Query
+from LightRAG.retrievers.vector_retriever import VectorRetriever
+from LightRAG.storage.vector_storage import InMemoryVectorStorage
+
+# --- Test Data ---
+EMBEDDINGS = {
+    "cats": [1.0, 0.0, 0.0],
+    "dogs": [0.0, 1.0, 0.0],
+    "fish": [0.0, 0.0, 1.0],
+}
+
+async def fake_embed(texts: list) -> np.ndarray:
+    return np.asarray([EMBEDDINGS.get(text, [0.5, 0.5, 0.0]) for text in texts], dtype=np.float32)
+
+@pytest_asyncio.fixture
+async def storage() -> InMemoryVectorStorage:
+    storage = InMemoryVectorStorage()
+    await storage.add_chunks([
+        Chunk(id=f"c-{name}", document_id="doc", content=f"About {name}", embedding=vector)
+        for name, vector in EMBEDDINGS.items()
+    ])
+    return storage
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+async def test_retriever_returns_real_scores(storage: InMemoryVectorStorage):
+    """Test that retrieval ranks by similarity and reports the storage scores."""
+    retriever = VectorRetriever(storage, fake_embed)
+    result = await retriever.retrieve(Query(id="q1", text="dogs", top_k=2))
+
+    assert result.query_id == "q1"
+    assert result.retrieved_chunks[0].id == "c-dogs"
+    assert result.scores[0] == pytest.approx(1.0)
+    assert result.scores[1] == pytest.approx(0.0)
+
+@pytest.mark.asyncio
+async def test_retrieve_many_batches_embedding_and_search(storage: InMemoryVectorStorage):
+    """Test that retrieve_many embeds once and matches per-query retrieval."""
+    calls = []
+    async def counting_embed(texts: list) -> np.ndarray:
+        calls.append(list(texts))
+        return await fake_embed(texts)
+
+    retriever = VectorRetriever(storage, counting_embed)
+    queries = [
+        Query(id="q1", text="cats", top_k=1),
+        Query(id="q2", text="fish", top_k=3),
+        Query(id="q3", text="dogs", top_k=2, filters={"missing": True}),
+    ]
+    results = await retriever.retrieve_many(queries)
+
+    assert calls == [["cats", "fish", "dogs"]]
+    assert [result.query_id for result in results] == ["q1", "q2", "q3"]
+    for query, result in zip(queries, results):
+        single = await retriever.retrieve(query)
+        assert [chunk.id for chunk in result.retrieved_chunks] == [chunk.id for chunk in single.retrieved_chunks]
+        assert result.scores == pytest.approx(single.scores)
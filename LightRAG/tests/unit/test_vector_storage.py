@@ -0,0 +1,159 @@
+import pytest
+import numpy as np
+
+from LightRAG.models.data_models import Chunk, Document
+from LightRAG.models.enums import SimilarityMetric, DataSource
+from LightRAG.storage.vector_storage import InMemoryVectorStorage, VectorStorageConfig
+
+# --- Test Data ---
+DIM = 16
+
+def make_chunks(count: int, seed: int = 0, doc_id: str = "doc-1") -> list:
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    return [
+        Chunk(id=f"chunk-{i}", document_id=doc_id, content=f"chunk {i}", embedding=vectors[i].tolist(), metadata={"parity": i % 2})
+        for i in range(count)
+    ]
+
+def brute_force(chunks: list, query: np.ndarray, top_k: int, metric: SimilarityMetric) -> list:
+    matrix = np.asarray([c.embedding for c in chunks], dtype=np.float32)
+    if metric is SimilarityMetric.DOT_PRODUCT:
+        scores = matrix @ query
+    elif metric is SimilarityMetric.COSINE:
+        scores = (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    else:
+        scores = -np.linalg.norm(matrix - query, axis=1)
+    order = np.argsort(-scores)[:top_k]
+    return [chunks[i].id for i in order]
+
+# --- Test Cases ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metric", list(SimilarityMetric))
+async def test_search_matches_brute_force(metric: SimilarityMetric):
+    """Test exact search returns the same ranking as a brute-force scan for every metric."""
+    chunks = make_chunks(200)
+    storage = InMemoryVectorStorage(VectorStorageConfig(metric=metric))
+    await storage.add_chunks(chunks)
+
+    query = np.random.default_rng(1).normal(size=DIM).astype(np.float32)
+    results = await storage.search_similar_chunks_with_scores(query, top_k=10)
+
+    assert [chunk.id for chunk, _ in results] == brute_force(chunks, query, 10, metric)
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metric", list(SimilarityMetric))
+@pytest.mark.parametrize("filters", [None, {"parity": 1}, {"parity": {"$in": [0, 1]}}])
+async def test_batch_search_matches_single_queries(metric: SimilarityMetric, filters):
+    """Test the matrix-matrix batch path returns exactly the per-query results."""
+    storage = InMemoryVectorStorage(VectorStorageConfig(metric=metric))
+    await storage.add_chunks(make_chunks(200))
+    queries = np.random.default_rng(2).normal(size=(5, DIM)).astype(np.float32)
+
+    batch = await storage.search_similar_chunks_batch(queries, top_k=7, filters=filters)
+
+    assert len(batch) == 5
+    for query, results in zip(queries, batch):
+        single = await storage.search_similar_chunks_with_scores(query, top_k=7, filters=filters)
+        assert [chunk.id for chunk, _ in results] == [chunk.id for chunk, _ in single]
+        assert np.allclose([score for _, score in results], [score for _, score in single], atol=1e-5)
+
+@pytest.mark.asyncio
+async def test_matrix_grows_in_amortized_steps():
+    """Test that the embedding matrix grows geometrically instead of per insert."""
+    storage = InMemoryVectorStorage(VectorStorageConfig(initial_capacity=8))
+    chunks = make_chunks(20)
+    capacities = []
+    for chunk in chunks:
+        await storage.add_chunks([chunk])
+        capacities.append(storage.capacity)
+
+    assert len(storage) == 20
+    assert sorted(set(capacities)) == [8, 16, 32]
+
+@pytest.mark.asyncio
+async def test_readding_chunk_replaces_its_embedding():
+    """Test re-adding a chunk ID replaces the old vector instead of duplicating it."""
+    storage = InMemoryVectorStorage(VectorStorageConfig(metric=SimilarityMetric.DOT_PRODUCT))
+    await storage.add_chunks([
+        Chunk(id="a", document_id="d", content="a", embedding=[1.0, 0.0]),
+        Chunk(id="b", document_id="d", content="b", embedding=[0.0, 1.0]),
+    ])
+    await storage.add_chunks([Chunk(id="a", document_id="d", content="a2", embedding=[0.0, 2.0])])
+
+    results = await storage.search_similar_chunks_with_scores([0.0, 1.0], top_k=5)
+    assert [(chunk.id, score) for chunk, score in results] == [("a", 2.0), ("b", 1.0)]
+    assert results[0][0].content == "a2"
+
+@pytest.mark.asyncio
+async def test_search_with_equality_filter():
+    """Test filters restrict results to chunks with matching metadata."""
+    storage = InMemoryVectorStorage()
+    await storage.add_chunks(make_chunks(50))
+
+    results = await storage.search_similar_chunks(np.ones(DIM), top_k=50, filters={"parity": 1})
+    assert len(results) == 25
+    assert all(chunk.metadata["parity"] == 1 for chunk in results)
+
+@pytest.mark.asyncio
+async def test_dimension_mismatch_raises():
+    """Test that embeddings of the wrong dimension are rejected."""
+    storage = InMemoryVectorStorage()
+    await storage.add_chunks(make_chunks(3))
+    with pytest.raises(ValueError):
+        await storage.search_similar_chunks([1.0, 2.0], top_k=1)
+    with pytest.raises(ValueError):
+        await storage.add_chunks([Chunk(id="x", document_id="d", content="x", embedding=[1.0])])
+
+@pytest.mark.asyncio
+async def test_delete_document_removes_rows_and_index_entries():
+    """Test that deleting a document removes its chunks from reads, search and filters."""
+    storage = InMemoryVectorStorage()
+    await storage.add_chunks(make_chunks(10, seed=1, doc_id="keep") + [
+        Chunk(id=f"gone-{i}", document_id="gone", content="", embedding=[1.0] * DIM, metadata={"parity": 1})
+        for i in range(5)
+    ])
+
+    assert await storage.delete_document("gone") == 5
+    assert await storage.get_chunks_by_doc_id("gone") == []
+    assert await storage.get_chunk("gone-0") is None
+    assert len(storage) == 10
+
+    results = await storage.search_similar_chunks([1.0] * DIM, top_k=15, filters={"parity": 1})
+    assert {chunk.document_id for chunk in results} == {"keep"}
+    assert await storage.delete_document("gone") == 0
+
+@pytest.mark.asyncio
+async def test_replace_document_swaps_chunk_set():
+    """Test replacing a document drops chunks missing from the new version."""
+    storage = InMemoryVectorStorage()
+    document = Document(id="doc-1", content="v1", source=DataSource.TEXT)
+    await storage.add_document(document)
+    await storage.add_chunks(make_chunks(4))
+
+    new_chunks = make_chunks(2, seed=5)
+    await storage.replace_document(document.model_copy(update={"content": "v2"}), new_chunks)
+
+    assert (await storage.get_document("doc-1")).content == "v2"
+    assert [chunk.id for chunk in await storage.get_chunks_by_doc_id("doc-1")] == ["chunk-0", "chunk-1"]
+    assert len(storage) == 2
+    results = await storage.search_similar_chunks_with_scores(new_chunks[0].embedding, top_k=5)
+    assert results[0][0].id == "chunk-0"
+    assert results[0][1] == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_compaction_reclaims_dead_rows():
+    """Test that dead rows are compacted away while search results stay correct."""
+    storage = InMemoryVectorStorage(VectorStorageConfig(compaction_min_dead_rows=1, compaction_threshold=0.5))
+    await storage.add_chunks(make_chunks(6, doc_id="a"))
+    await storage.add_chunks([chunk.model_copy(update={"id": f"b-{chunk.id}", "document_id": "b"}) for chunk in make_chunks(4, seed=3)])
+
+    await storage.delete_document("a")
+
+    assert storage._size == 4
+    assert len(storage) == 4
+    results = await storage.search_similar_chunks(np.ones(DIM), top_k=10, filters={"parity": 0})
+    assert sorted(chunk.id for chunk in results) == ["b-chunk-0", "b-chunk-2"]
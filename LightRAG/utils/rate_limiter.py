@@ -0,0 +1,255 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+class RateLimitError(Exception):
+    """Raised by a model function (or its stand-in) when the provider rejects a call with 429."""
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = 429
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Recognises RateLimitError, openai.RateLimitError and HTTP-style errors carrying status 429."""
+    return (
+        isinstance(error, RateLimitError)
+        or getattr(error, "status_code", None) == 429
+        or type(error).__name__ == "RateLimitError"
+    )
+
+def approximate_request_tokens(*args, **kwargs) -> int:
+    """Rough token cost of a call: ~4 characters per token over its string (or list of strings) arguments."""
+    characters = 0
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, str):
+            characters += len(value)
+        elif isinstance(value, (list, tuple)):
+            characters += sum(len(item) for item in value if isinstance(item, str))
+    return characters // 4 + 1
+
+# --- Budgets ---
+
+class TokenBucket:
+    """Refills at `rate_per_minute`, holding at most `burst_seconds` worth; waiters are served FIFO."""
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        async with self._lock:
+            # An amount above capacity is admitted from a full bucket and paid off as debt
+            needed = min(amount, self.capacity)
+            while True:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+class _AdaptiveSlots:
+    """Counting semaphore whose limit can change while callers wait."""
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancellation; hand the slot on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+# --- Adaptive Limiter ---
+
+@dataclass
+class RateLimiterConfig:
+    """Budgets and AIMD parameters for AdaptiveRateLimiter."""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    # Seconds of budget that may be spent in a burst
+    burst_seconds: float = 1.0
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    # Added to the limit per limit-many successful calls (i.e. per round of in-flight calls)
+    additive_increase: float = 1.0
+    multiplicative_decrease: float = 0.5
+    # Calls slower than this count as congestion; None ignores latency
+    latency_target_seconds: Optional[float] = None
+    # Minimum spacing between two decreases, so one burst of 429s only halves the limit once
+    decrease_cooldown_seconds: float = 1.0
+    max_retries: int = 3
+    # Backoff for rate-limited retries without a Retry-After hint: base * 2**attempt
+    retry_base_delay: float = 0.5
+    token_counter: Callable[..., int] = field(default=approximate_request_tokens)
+    clock: Callable[[], float] = field(default=time.monotonic)
+
+@dataclass
+class RateLimiterStats:
+    """Counters for AdaptiveRateLimiter."""
+    calls: int = 0
+    successes: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    errors: int = 0
+    increases: int = 0
+    decreases: int = 0
+    # Seconds spent waiting for a slot and budget before each attempt
+    total_queue_wait: float = 0.0
+    max_queue_wait: float = 0.0
+    attempts: int = 0
+
+    @property
+    def mean_queue_wait(self) -> float:
+        return self.total_queue_wait / self.attempts if self.attempts else 0.0
+
+class AdaptiveRateLimiter:
+    """
+    Wraps an async model function (an embedder or LLM completion) with budgets and adaptive concurrency.
+
+    Every attempt waits for an in-flight slot, then for request and token budget from
+    per-minute token buckets. The in-flight limit follows AIMD: it grows by
+    `additive_increase` per round of successful calls and is multiplied by
+    `multiplicative_decrease` on a rate-limit response, or a call slower than
+    `latency_target_seconds`, at most once per cooldown. A rate-limited call pauses new
+    attempts until its Retry-After (or exponential backoff) has passed, then is retried
+    up to `max_retries` times. Other errors propagate unchanged.
+
+    `limits()` reports the current limit, in-flight and waiting calls and budgets; `stats`
+    holds counters and queue wait times.
+    """
+    def __init__(self, func: Callable[..., Awaitable[Any]], config: Optional[RateLimiterConfig] = None):
+        self.func = func
+        self.config = config or RateLimiterConfig()
+        config = self.config
+        self.stats = RateLimiterStats()
+        self._slots = _AdaptiveSlots(float(min(max(config.initial_concurrency, config.min_concurrency), config.max_concurrency)))
+        self._requests = TokenBucket(config.requests_per_minute, config.burst_seconds, config.clock) if config.requests_per_minute else None
+        self._tokens = TokenBucket(config.tokens_per_minute, config.burst_seconds, config.clock) if config.tokens_per_minute else None
+        self._last_decrease = -math.inf
+        self._paused_until = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._slots.limit)
+
+    def limits(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": self.concurrency_limit,
+            "in_flight": self._slots.in_flight,
+            "waiting": self._slots.waiting,
+            "requests_per_minute": self.config.requests_per_minute,
+            "tokens_per_minute": self.config.tokens_per_minute,
+            "mean_queue_wait": self.stats.mean_queue_wait,
+            "max_queue_wait": self.stats.max_queue_wait,
+        }
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        self.stats.calls += 1
+        tokens = self.config.token_counter(*args, **kwargs) if self._tokens is not None else 0
+        for attempt in range(self.config.max_retries + 1):
+            queued = self.config.clock()
+            await self._slots.acquire()
+            try:
+                await self._wait_for_budget(tokens)
+                self._record_wait(self.config.clock() - queued)
+                started = self.config.clock()
+                try:
+                    result = await self.func(*args, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        self.stats.errors += 1
+                        raise
+                    self.stats.rate_limited += 1
+                    self._decrease()
+                    delay = getattr(e, "retry_after", None) or self.config.retry_base_delay * 2 ** attempt
+                    self._paused_until = max(self._paused_until, self.config.clock() + delay)
+                    if attempt == self.config.max_retries:
+                        raise
+                    logger.debug("Rate limited; retrying in %.3fs with concurrency %d", delay, self.concurrency_limit)
+                    self.stats.retries += 1
+                    continue
+                latency = self.config.clock() - started
+                if self.config.latency_target_seconds is not None and latency > self.config.latency_target_seconds:
+                    self._decrease()
+                else:
+                    self._increase()
+                self.stats.successes += 1
+                return result
+            finally:
+                self._slots.release()
+
+    async def _wait_for_budget(self, tokens: int) -> None:
+        while True:
+            pause = self._paused_until - self.config.clock()
+            if pause <= 0:
+                break
+            await asyncio.sleep(pause)
+        if self._requests is not None:
+            await self._requests.acquire(1)
+        if self._tokens is not None:
+            await self._tokens.acquire(tokens)
+
+    def _record_wait(self, waited: float) -> None:
+        self.stats.attempts += 1
+        self.stats.total_queue_wait += waited
+        self.stats.max_queue_wait = max(self.stats.max_queue_wait, waited)
+
+    def _increase(self) -> None:
+        slots = self._slots
+        if slots.limit >= self.config.max_concurrency:
+            return
+        previous = int(slots.limit)
+        slots.limit = min(float(self.config.max_concurrency), slots.limit + self.config.additive_increase / max(slots.limit, 1.0))
+        if int(slots.limit) > previous:
+            self.stats.increases += 1
+            slots.wake()
+
+    def _decrease(self) -> None:
+        now = self.config.clock()
+        if now - self._last_decrease < self.config.decrease_cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._slots.limit = max(float(self.config.min_concurrency), self._slots.limit * self.config.multiplicative_decrease)
+        self.stats.decreases += 1
+        logger.info("Reduced model call concurrency to %d", self.concurrency_limit)